@@ -19,6 +19,13 @@ import pygame
 import sys
 import math
 import os
+from engine.prefetch import PREFETCHER
+from engine.text_cache import render_text, blit_alpha
+from engine.layers import StaticLayer
+from engine.glow_cache import get_glow
+from engine.frame_timing import frame_timer, TIMING_KEY
+from engine.profiler import scene_profiler
+from battle.battle_system import arena_jobs
 
 # Base directory untuk assets (parent folder dari arena)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -28,6 +35,10 @@ SCREEN_WIDTH = 1400
 SCREEN_HEIGHT = 800
 FPS = 60
 
+# Animasi hover thumbnail: 1.00 -> 1.05 dengan langkah 0.01
+HOVER_STEPS = 5
+HOVER_SCALE_STEP = 0.01
+
 # === WARNA ===
 WHITE = (255, 255, 255)
 GOLD = (255, 200, 100)
@@ -53,8 +64,10 @@ class ArenaSlot:
         is_hovered: Boolean status mouse di atas slot
         is_selected: Boolean status slot sedang dipilih
         hover_alpha: Intensitas transparansi saat hover (untuk animasi)
-        hover_scale: Faktor pembesaran gambar saat hover
+        hover_step: Index anak tangga pembesaran saat hover (0..HOVER_STEPS)
+        hover_scale: Faktor pembesaran gambar saat hover (dari hover_step)
         image: Surface gambar arena yang sudah di-resize
+        thumbnails: Thumbnail pre-scaled untuk setiap hover_step
     """
     
     def __init__(self, arena_data, x, y, slot_width=300, slot_height=200):
@@ -75,22 +88,31 @@ class ArenaSlot:
         self.is_selected = False
         self.hover_alpha = 0
         self.select_alpha = 0
-        self.hover_scale = 1.0
+        self.hover_step = 0
         
         try:
-            self.original_image = pygame.image.load(arena_data["path"]).convert()
+            # Gambar full-resolution hanya dipakai di sini untuk membuat thumbnail
+            original_image = pygame.image.load(arena_data["path"]).convert()
             padding = 20
             target_width = slot_width - padding * 2
             target_height = slot_height - 60
             
-            img_width = self.original_image.get_width()
-            img_height = self.original_image.get_height()
+            img_width = original_image.get_width()
+            img_height = original_image.get_height()
             scale = min(target_width / img_width, target_height / img_height)
             
             new_width = int(img_width * scale)
             new_height = int(img_height * scale)
             
-            self.image = pygame.transform.scale(self.original_image, (new_width, new_height))
+            # Tangga thumbnail: satu ukuran per hover_step (smoothscale, sekali saja)
+            self.thumbnails = [
+                pygame.transform.smoothscale(
+                    original_image,
+                    (int(new_width * (1 + i * HOVER_SCALE_STEP)), int(new_height * (1 + i * HOVER_SCALE_STEP)))
+                )
+                for i in range(HOVER_STEPS + 1)
+            ]
+            self.image = self.thumbnails[0]
             self.image_width = new_width
             self.image_height = new_height
             self.loaded = True
@@ -106,10 +128,10 @@ class ArenaSlot:
         # Update hover animation
         if self.is_hovered:
             self.hover_alpha = min(255, self.hover_alpha + 25)
-            self.hover_scale = min(1.05, self.hover_scale + 0.01)
+            self.hover_step = min(HOVER_STEPS, self.hover_step + 1)
         else:
             self.hover_alpha = max(0, self.hover_alpha - 25)
-            self.hover_scale = max(1.0, self.hover_scale - 0.01)
+            self.hover_step = max(0, self.hover_step - 1)
         
         # Update selection animation
         if self.is_selected:
@@ -126,33 +148,30 @@ class ArenaSlot:
         """
         card_rect = pygame.Rect(self.x, self.y, self.slot_width, self.slot_height)
         
-        # 1. Base Card Background
-        card_surf = pygame.Surface((self.slot_width, self.slot_height), pygame.SRCALPHA)
-        pygame.draw.rect(card_surf, (20, 40, 80, 180), card_surf.get_rect(), border_radius=15)
+        # 1. Base Card Background (surface dari glow cache)
+        card_surf = get_glow((self.slot_width, self.slot_height), (20, 40, 80), 180, 15)
         screen.blit(card_surf, (self.x, self.y))
         
         # 2. Selection Glow Effect
         if self.select_alpha > 0:
             for i in range(3):
-                glow_surf = pygame.Surface((self.slot_width + 8 + i*4, self.slot_height + 8 + i*4), pygame.SRCALPHA)
+                glow_surf = get_glow((self.slot_width + 8 + i*4, self.slot_height + 8 + i*4),
+                                     ORANGE, self.select_alpha // (4 + i), 15)
                 glow_rect = glow_surf.get_rect(center=(self.x + self.slot_width//2, self.y + self.slot_height//2))
-                pygame.draw.rect(glow_surf, (*ORANGE, self.select_alpha // (4 + i)), 
-                               glow_surf.get_rect(), border_radius=15)
                 screen.blit(glow_surf, glow_rect)
             pygame.draw.rect(screen, (*ORANGE, self.select_alpha), card_rect, 4, border_radius=15)
         
         # 3. Hover Frame Effect
         if self.hover_alpha > 0:
-            hover_surf = pygame.Surface((self.slot_width, self.slot_height), pygame.SRCALPHA)
-            pygame.draw.rect(hover_surf, (*CYAN, self.hover_alpha // 5), hover_surf.get_rect(), border_radius=15)
+            hover_surf = get_glow((self.slot_width, self.slot_height), CYAN, self.hover_alpha // 5, 15)
             screen.blit(hover_surf, (self.x, self.y))
             pygame.draw.rect(screen, (*CYAN, self.hover_alpha), card_rect, 3, border_radius=15)
         
         # 4. Arena Image & Frame
         if self.loaded:
-            scaled_w = int(self.image_width * self.hover_scale)
-            scaled_h = int(self.image_height * self.hover_scale)
-            scaled_image = pygame.transform.scale(self.image, (scaled_w, scaled_h))
+            # Ambil thumbnail pre-scaled (tanpa resample per frame)
+            scaled_image = self.thumbnails[self.hover_step]
+            scaled_w, scaled_h = scaled_image.get_size()
             
             frame_padding = 10
             frame_rect = pygame.Rect(
@@ -163,8 +182,7 @@ class ArenaSlot:
             )
             
             # Image Frame Background
-            frame_surf = pygame.Surface((frame_rect.width, frame_rect.height), pygame.SRCALPHA)
-            pygame.draw.rect(frame_surf, (15, 30, 60, 200), frame_surf.get_rect(), border_radius=10)
+            frame_surf = get_glow(frame_rect.size, (15, 30, 60), 200, 10)
             screen.blit(frame_surf, frame_rect.topleft)
             
             # Blit Scaled Image
@@ -178,15 +196,18 @@ class ArenaSlot:
         
         # 5. Arena Name Label
         name_bg_rect = pygame.Rect(self.x + 5, self.y + self.slot_height - 45, self.slot_width - 10, 40)
-        name_bg_surf = pygame.Surface((self.slot_width - 10, 40), pygame.SRCALPHA)
-        pygame.draw.rect(name_bg_surf, (15, 30, 60, 220), name_bg_surf.get_rect(), border_radius=8)
+        name_bg_surf = get_glow((self.slot_width - 10, 40), (15, 30, 60), 220, 8)
         screen.blit(name_bg_surf, (self.x + 5, self.y + self.slot_height - 45))
         
-        font = pygame.font.Font(None, 28)
         name_color = ORANGE if self.is_selected else WHITE
-        name_text = font.render(self.name, True, name_color)
+        name_text = render_text(self.name, 28, name_color)
         screen.blit(name_text, name_text.get_rect(center=name_bg_rect.center))
 
+    @property
+    def hover_scale(self):
+        """Faktor pembesaran gambar saat ini (1.0 - 1.05)."""
+        return 1 + self.hover_step * HOVER_SCALE_STEP
+
     def get_rect(self):
         """Returns: pygame.Rect area dari slot ini."""
         return pygame.Rect(self.x, self.y, self.slot_width, self.slot_height)
@@ -216,6 +237,9 @@ class ArenaSelection:
         
         self.load_background()
         self.load_arenas()
+        self.static_layer = StaticLayer(self.draw_static)
+        self.timer = frame_timer('arena_selection')    # Timing per fase (F3)
+        self.profiler = scene_profiler('arena_selection')  # Profiler (F9)
     
     def load_background(self):
         """Muat gambar background utama"""
@@ -247,22 +271,36 @@ class ArenaSelection:
         for slot in self.slots:
             slot.update()
     
-    def draw_header(self):
-        """Render judul dan animasi garis."""
+    def draw_static(self, surface):
+        """
+        Compose bagian statis (background, overlay, header, judul, footer) ke layer.
+        
+        Args:
+            surface: Surface layer (lihat engine/layers.py)
+        """
+        if self.background:
+            surface.blit(self.background, (0, 0))
+            overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
+            overlay.fill((0, 0, 0, 100)); surface.blit(overlay, (0, 0))
+        else: surface.fill((20, 45, 90))
+        
         header_surf = pygame.Surface((SCREEN_WIDTH, 170), pygame.SRCALPHA)
         header_surf.fill((10, 25, 50, 150))
-        self.screen.blit(header_surf, (0, 0))
+        surface.blit(header_surf, (0, 0))
         
-        title_font = pygame.font.Font(None, 80)
         title_text = "SELECT BATTLE ARENA"
         
         # Title Glow & Main Text
         for i in range(3):
-            glow = title_font.render(title_text, True, (*ORANGE, 60 - i*15))
-            self.screen.blit(glow, glow.get_rect(center=(SCREEN_WIDTH // 2 + i, 70 + i)))
-        title = title_font.render(title_text, True, WHITE)
-        self.screen.blit(title, title.get_rect(center=(SCREEN_WIDTH // 2, 70)))
+            glow = render_text(title_text, 80, (*ORANGE, 60 - i*15))
+            surface.blit(glow, glow.get_rect(center=(SCREEN_WIDTH // 2 + i, 70 + i)))
+        title = render_text(title_text, 80, WHITE)
+        surface.blit(title, title.get_rect(center=(SCREEN_WIDTH // 2, 70)))
         
+        self.draw_footer(surface)
+
+    def draw_header(self):
+        """Render bagian header yang beranimasi: garis dekoratif dan hint konfirmasi."""
         # Decorative Line
         line_w = 600
         lx = (SCREEN_WIDTH - line_w) // 2
@@ -272,27 +310,37 @@ class ArenaSelection:
         
         # Confirmation Hint
         if self.selected_index is not None:
-            inst_font = pygame.font.Font(None, 28)
-            inst = inst_font.render("Press SPACE to confirm selection", True, GOLD)
+            inst = render_text("Press SPACE to confirm selection", 28, GOLD)
             pulse = abs(math.sin(self.time * 0.1))
-            inst.set_alpha(int(200 + pulse * 55))
-            self.screen.blit(inst, inst.get_rect(center=(SCREEN_WIDTH // 2, 145)))
+            blit_alpha(self.screen, inst, inst.get_rect(center=(SCREEN_WIDTH // 2, 145)), int(200 + pulse * 55))
 
-    def draw_footer(self):
-        """Render panel instruksi kontrol di bagian bawah screen."""
+    def draw_footer(self, surface):
+        """Render panel instruksi kontrol di bagian bawah screen (bagian dari layer statis)."""
         footer_surf = pygame.Surface((SCREEN_WIDTH, 60), pygame.SRCALPHA)
         footer_surf.fill((10, 25, 50, 180))
-        self.screen.blit(footer_surf, (0, SCREEN_HEIGHT - 60))
+        surface.blit(footer_surf, (0, SCREEN_HEIGHT - 60))
         
-        font = pygame.font.Font(None, 24)
         controls = [("MOUSE", "Select Arena"), ("SPACE", "Confirm"), ("ESC", "Back")]
         
         start_x = (SCREEN_WIDTH - 700) // 2
         for i, (key, act) in enumerate(controls):
             x = start_x + i * (700 // len(controls))
-            pygame.draw.rect(self.screen, (40, 70, 120, 200), (x + 20, SCREEN_HEIGHT - 45, 80, 22), border_radius=4)
-            self.screen.blit(font.render(key, True, ORANGE), (x + 35, SCREEN_HEIGHT - 42))
-            self.screen.blit(font.render(act, True, WHITE), (x + 30, SCREEN_HEIGHT - 20))
+            pygame.draw.rect(surface, (40, 70, 120, 200), (x + 20, SCREEN_HEIGHT - 45, 80, 22), border_radius=4)
+            surface.blit(render_text(key, 24, ORANGE), (x + 35, SCREEN_HEIGHT - 42))
+            surface.blit(render_text(act, 24, WHITE), (x + 30, SCREEN_HEIGHT - 20))
+
+    def draw(self):
+        """Drawing logic: layer statis (1 blit), lalu elemen animasi, lalu flip display."""
+        self.static_layer.draw(self.screen)
+        self.timer.mark('draw_bg')
+        
+        self.draw_header()
+        for slot in self.slots: slot.draw(self.screen)
+        self.timer.mark('draw_ui')
+        self.timer.draw(self.screen)
+        
+        pygame.display.flip()
+        self.timer.mark('display')
 
     def run(self):
         """
@@ -303,17 +351,30 @@ class ArenaSelection:
             None: Jika user keluar atau menekan ESC.
         """
         clock = pygame.time.Clock()
+        timer = self.timer
         while True:
+            timer.frame()
+            self.profiler.frame()
             mouse_pos = pygame.mouse.get_pos()
+            timer.mark('input')
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
+                    timer.close()
+                    self.profiler.close()
                     pygame.quit(); sys.exit()
                 
                 if event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_ESCAPE:
+                        timer.close()
+                        self.profiler.close()
                         return None
                     if event.key == pygame.K_SPACE and self.selected_index is not None:
+                        timer.close()
+                        self.profiler.close()
                         return self.slots[self.selected_index].name
+                    if event.key == TIMING_KEY:
+                        timer = self.timer = timer.toggled()
+                    self.profiler.handle_key(event.key)
                 
                 if event.type == pygame.MOUSEBUTTONDOWN:
                     for i, slot in enumerate(self.slots):
@@ -322,23 +383,16 @@ class ArenaSelection:
                                 self.slots[self.selected_index].is_selected = False
                             self.selected_index = i
                             slot.is_selected = True
+                            # Decode background arena di background thread
+                            PREFETCHER.prefetch('arena', arena_jobs(slot.name))
                 
                 if event.type == pygame.MOUSEMOTION:
                     for slot in self.slots: slot.check_hover(mouse_pos)
+            timer.mark('events')
 
-            # Drawing logic
-            if self.background:
-                self.screen.blit(self.background, (0, 0))
-                overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-                overlay.fill((0, 0, 0, 100)); self.screen.blit(overlay, (0, 0))
-            else: self.screen.fill((20, 45, 90))
-            
             self.update()
-            self.draw_header()
-            for slot in self.slots: slot.draw(self.screen)
-            self.draw_footer()
-            
-            pygame.display.flip()
+            timer.mark('physics')
+            self.draw()
             clock.tick(FPS)
 
 if __name__ == "__main__":
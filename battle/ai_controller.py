@@ -1,22 +1,45 @@
 """
 FILE: ai_controller.py
 DESKRIPSI: Otak AI menggunakan Finite State Machine (FSM)
-DIGUNAKAN OLEH: battle_system.py (membuat AIController untuk mode AI)
-MENGGUNAKAN: fighter_base.py (mengontrol Fighter via ai_move)
+DIGUNAKAN OLEH: battle_system.py (membuat AIController untuk mode AI),
+                team_simulation.py (AI di battle N fighter)
+MENGGUNAKAN: fighter_base.py (bitmask input), match_random.py (RNG deterministik),
+             ai_policy.py (tabel policy hasil compile FSM)
 
 ALUR PROGRAM:
-1. BattleSystem membuat AIController(fighter_p2, fighter_p1)
-2. Setiap frame, AIController.update() dipanggil
+1. BattleSimulation membuat AIController(fighter_p2, fighter_p1, rng)
+2. Setiap tick, AIController.decide() dipanggil
 3. AI mengevaluasi situasi -> pilih state -> pilih action
-4. Action dikonversi ke input -> Fighter.ai_move() dipanggil
+   (battle N fighter: target diganti tiap tick ke lawan terdekat lewat find_target,
+   query ke spatial grid yang sama dengan collision)
+   Aturan FSM ditulis di evaluate_situation() & get_action(); saat main, decide()
+   memakai tabel hasil compile aturan tersebut (ai_policy.py): satu index situasi
+   + lookup, hasil identik dengan memanggil kedua method
+4. Action dikonversi ke bitmask input -> BattleSimulation memanggil Fighter.step()
+
+Semua keputusan acak memakai rng milik match (satu angka per keputusan),
+sehingga seed + input yang sama selalu menghasilkan pertandingan yang sama.
 
 - Enum (State Pattern): AIState untuk representasi state FSM
 - Composition: AIController memiliki Fighter (bukan inheritance)
 - Encapsulation: Logic AI tersembunyi dari BattleSystem
 """
-import pygame
 import random
 from enum import Enum
+from battle.fighter_base import INPUT_LEFT, INPUT_RIGHT, INPUT_JUMP, INPUT_NAMES
+from battle.match_random import MatchRandom
+
+
+# === SETTINGS AI (dipakai juga oleh batch_engine.py) ===
+ATTACK_RANGE = 120          # Jarak maksimal untuk menyerang
+SAFE_DISTANCE = 200         # Jarak aman dari lawan (lebih jauh = PURSUIT)
+DEFENSIVE_DISTANCE = 200    # Lawan menyerang dalam jarak ini = DEFENSIVE
+RETREAT_DISTANCE = 150      # RETREAT: selalu mundur jika lebih dekat dari ini
+LOW_HP = 25                 # HP di bawah ini = RETREAT
+COUNTER_CHANCE = 0.3        # DEFENSIVE: peluang serang balik
+FAKE_OUT_CHANCE = 0.3       # RETREAT: peluang maju (fake out)
+REACTION_TIME = 10          # Delay antara keputusan (dalam frame)
+STATE_INTERVAL = 30         # Evaluasi ulang state FSM tiap N frame
 
 
 class AIState(Enum):
@@ -44,36 +67,70 @@ class AIController:
     Attributes:
         fighter: Fighter yang dikontrol (P2)
         target: Fighter lawan (P1)
+        find_target: Callable -> lawan terdekat (None = target tetap)
         state: State FSM saat ini
+        rng: RNG deterministik (MatchRandom) untuk keputusan acak
+        attack_range, safe_distance: Setting FSM; tabel policy di-compile per setting
+        policy: PolicyTable yang sedang dipakai (ai_policy.policy_table)
     
-    Dipanggil dari: BattleSystem saat mode == 'ai'
-    Mempengaruhi: Fighter P2 via ai_move()
+    Dipanggil dari: BattleSimulation saat mode == 'ai'
+    Mempengaruhi: Fighter P2 via bitmask input
     """
     
-    def __init__(self, fighter, target):
+    def __init__(self, fighter, target, rng=None, find_target=None):
         """
         Constructor - Setup AI controller
         
         Args:
             fighter: Fighter yang akan dikontrol oleh AI (biasanya P2)
             target: Fighter lawan yang jadi target (biasanya P1)
+            rng: MatchRandom milik match (None = seed acak)
+            find_target: Callable tanpa argumen yang mengembalikan lawan terdekat
+                         (None jika tidak ada); dipakai battle N fighter
         
-        Dipanggil dari: BattleSystem.__init__() jika mode == 'ai'
+        Dipanggil dari: BattleSimulation.__init__() jika mode == 'ai'
         """
         # === REFERENSI KE FIGHTERS ===
         self.fighter = fighter      # Fighter yang dikontrol AI
         self.target = target        # Fighter lawan (target)
+        self.find_target = find_target  # Query lawan terdekat (None = 1v1)
         
         # === FSM STATE ===
         self.state = AIState.PURSUIT    # Mulai dengan mengejar lawan
         self.state_timer = 0            # Timer untuk evaluasi ulang state
         
         # === SETTINGS AI ===
-        self.attack_range = 120     # Jarak maksimal untuk menyerang
-        self.safe_distance = 200    # Jarak aman dari lawan
-        self.reaction_time = 10     # Delay antara keputusan (dalam frame)
+        self.policy = None          # PolicyTable untuk attack_range / safe_distance di bawah
+        self.attack_range = ATTACK_RANGE    # Jarak maksimal untuk menyerang
+        self.safe_distance = SAFE_DISTANCE  # Jarak aman dari lawan
+        self.reaction_time = REACTION_TIME  # Delay antara keputusan (dalam frame)
         self.cooldown = 0           # Cooldown keputusan saat ini
         self.action = 'move_forward'    # Action yang sedang dilakukan
+        
+        # === RNG ===
+        # Tanpa rng dari match: seed acak (perilaku lama, tidak bisa di-replay)
+        self.rng = rng if rng is not None else MatchRandom(random.getrandbits(64))
+    
+    
+    @property
+    def attack_range(self):
+        """Jarak maksimal untuk menyerang (setting FSM)."""
+        return self._attack_range
+    
+    @attack_range.setter
+    def attack_range(self, value):
+        self._attack_range = value
+        self.policy = None      # Tabel di-compile ulang di decide() berikutnya
+    
+    @property
+    def safe_distance(self):
+        """Jarak aman dari lawan (setting FSM)."""
+        return self._safe_distance
+    
+    @safe_distance.setter
+    def safe_distance(self, value):
+        self._safe_distance = value
+        self.policy = None      # Tabel di-compile ulang di decide() berikutnya
     
     
     def get_distance(self):
@@ -116,7 +173,7 @@ class AIController:
             5. AGGRESSIVE - jika HP >= HP lawan
             6. DEFENSIVE - default
         
-        Dipanggil dari: update() setiap 30 frame
+        Aturan sumber tabel policy (ai_policy.compile_policy); decide() memakai tabelnya
         """
         dist = self.get_distance()
         my_hp = self.fighter.health
@@ -129,11 +186,11 @@ class AIController:
             return AIState.PUNISH
         
         # 2. HP kritis, mundur!
-        if my_hp < 25:
+        if my_hp < LOW_HP:
             return AIState.RETREAT
         
         # 3. Lawan menyerang, hindari
-        if self.target.attacking and dist < 200:
+        if self.target.attacking and dist < DEFENSIVE_DISTANCE:
             return AIState.DEFENSIVE
         
         # 4. Lawan jauh, kejar
@@ -164,7 +221,9 @@ class AIController:
         - RETREAT: Mundur terus
         - PUNISH: Serang dengan attack kuat
         
-        Dipanggil dari: update() setiap reaction_time frame
+        Maksimal satu angka diambil dari self.rng per keputusan
+        
+        Aturan sumber tabel policy (ai_policy.compile_policy); decide() memakai tabelnya
         """
         dist = self.get_distance()
         
@@ -173,7 +232,7 @@ class AIController:
         if self.state == AIState.AGGRESSIVE:
             # Serang jika dalam range, kalau tidak maju
             if dist < self.attack_range:
-                return random.choice(['attack1', 'attack2', 'attack3'])
+                return ('attack1', 'attack2', 'attack3')[int(self.rng.random() * 3)]
             return 'move_forward'
         
         elif self.state == AIState.DEFENSIVE:
@@ -181,7 +240,7 @@ class AIController:
             if self.target.attacking:
                 return 'move_back'
             # Sesekali serang balik (30% chance)
-            if dist < self.attack_range and random.random() < 0.3:
+            if dist < self.attack_range and self.rng.random() < COUNTER_CHANCE:
                 return 'attack1'
             return 'move_back'
         
@@ -191,76 +250,101 @@ class AIController:
         
         elif self.state == AIState.RETREAT:
             # Mundur, tapi kadang maju (fake out)
-            if dist < 150:
+            if dist < RETREAT_DISTANCE:
                 return 'move_back'
-            return 'move_back' if random.random() > 0.3 else 'move_forward'
+            return 'move_back' if self.rng.random() > FAKE_OUT_CHANCE else 'move_forward'
         
         elif self.state == AIState.PUNISH:
             # Serang dengan attack kuat
             if dist < self.attack_range:
-                return random.choice(['attack2', 'attack3'])
+                return ('attack2', 'attack3')[int(self.rng.random() * 2)]
             return 'move_forward'
         
         return 'move_forward'
     
     
-    def update(self, screen_w, screen_h, round_over):
+    def decide(self, round_over):
         """
-        Main update loop AI - Dipanggil setiap frame
+        Keputusan AI untuk satu tick
         
         Args:
-            screen_w, screen_h: Ukuran layar
             round_over: True jika pertandingan selesai
         
+        Returns:
+            int | None: Bitmask INPUT_* untuk Fighter.step(),
+                        None jika AI tidak bergerak sama sekali (selesai / mati)
+        
         Proses:
+            0. Ganti target ke lawan terdekat (jika ada find_target)
             1. Update state FSM (setiap 30 frame)
             2. Pilih action (setiap reaction_time frame)
-            3. Convert action ke input dictionary
-            4. Panggil fighter.ai_move() dengan input
+            3. Convert action ke bitmask input
+        Langkah 1 & 2 lewat tabel policy (hasil sama dengan evaluate_situation()
+        & get_action()); index situasi dihitung sekali jika salah satunya jalan
         
-        Dipanggil dari: BattleSystem.run() jika mode == 'ai'
-        Mempengaruhi: self.fighter via ai_move()
+        Dipanggil dari: BattleSimulation.step() jika mode == 'ai'
         """
         # Skip jika game selesai atau AI mati
         if round_over or not self.fighter.alive:
-            return
+            return None
         
-        # === UPDATE STATE FSM (setiap 30 frame) ===
-        self.state_timer += 1
-        if self.state_timer >= 30:
-            self.state = self.evaluate_situation()
-            self.state_timer = 0
+        # === PILIH TARGET (battle N fighter) ===
+        if self.find_target is not None:
+            target = self.find_target()
+            if target is None:
+                return None
+            self.target = target
         
-        # === PILIH ACTION (setiap reaction_time frame) ===
+        self.state_timer += 1
         self.cooldown -= 1
-        if self.cooldown <= 0:
-            self.action = self.get_action()
-            self.cooldown = self.reaction_time
+        if self.state_timer >= STATE_INTERVAL or self.cooldown <= 0:
+            # Tabel mengikuti setting instance (setter attack_range / safe_distance
+            # membuang tabel lama, jadi tidak ada cek setting per keputusan)
+            policy = self.policy
+            if policy is None:
+                # Import di sini: ai_policy meng-compile tabel dari method class ini
+                from battle.ai_policy import policy_table
+                policy = self.policy = policy_table(self.attack_range, self.safe_distance)
+            fighter, target = self.fighter, self.target
+            index = policy.situation(abs(fighter.rect.centerx - target.rect.centerx),
+                                     fighter.health, target.health,
+                                     target.attacking, target.hit, target.jump)
+            
+            # === UPDATE STATE FSM (setiap 30 frame) ===
+            if self.state_timer >= STATE_INTERVAL:
+                self.state = policy.next_state(self.state, index)
+                self.state_timer = 0
+            
+            # === PILIH ACTION (setiap reaction_time frame) ===
+            if self.cooldown <= 0:
+                self.action = policy.choose(self.state, index, self.rng)
+                self.cooldown = self.reaction_time
         
         # === CONVERT ACTION KE INPUT ===
-        ai_input = {
-            'left': False, 
-            'right': False, 
-            'jump': False,
-            'attack1': False, 
-            'attack2': False, 
-            'attack3': False
-        }
-        
         # Tentukan arah (AI di kanan atau kiri target?)
         facing_right = self.fighter.rect.centerx < self.target.rect.centerx
         
         if self.action == 'move_forward':
             # Maju = ke arah target
-            ai_input['right' if facing_right else 'left'] = True
-        elif self.action == 'move_back':
+            return INPUT_RIGHT if facing_right else INPUT_LEFT
+        if self.action == 'move_back':
             # Mundur = menjauhi target
-            ai_input['left' if facing_right else 'right'] = True
-        elif self.action == 'jump':
-            ai_input['jump'] = True
-        elif self.action.startswith('attack'):
-            ai_input[self.action] = True
-        
-        # === KIRIM INPUT KE FIGHTER ===
-        # ai_move() ada di fighter_base.py
-        self.fighter.ai_move(screen_w, screen_h, self.target, round_over, ai_input)
+            return INPUT_LEFT if facing_right else INPUT_RIGHT
+        if self.action == 'jump':
+            return INPUT_JUMP
+        return INPUT_NAMES.get(self.action, 0)
+    
+    
+    def update(self, screen_w, screen_h, round_over):
+        """
+        Update AI + gerakkan fighter (kompatibilitas, tanpa BattleSimulation)
+        
+        Args:
+            screen_w, screen_h: Ukuran layar
+            round_over: True jika pertandingan selesai
+        
+        Mempengaruhi: self.fighter via step()
+        """
+        inputs = self.decide(round_over)
+        if inputs is not None:
+            self.fighter.step(screen_w, screen_h, self.target, round_over, inputs)
@@ -0,0 +1,347 @@
+"""
+FILE: ai_policy.py
+DESKRIPSI: Policy AI dalam bentuk tabel - FSM AIController di-compile menjadi tabel
+           padat (state x situasi) sehingga satu keputusan = satu index + maksimal
+           satu angka acak
+DIGUNAKAN OLEH: ai_controller.py (AIController.decide), batch_engine.py (versi array)
+MENGGUNAKAN: ai_controller.py (aturan FSM: evaluate_situation / get_action + konstanta),
+             bisect, numpy (opsional, hanya untuk arrays())
+
+ALUR PROGRAM:
+1. Situasi didiskretkan menjadi index (PolicyTable.n_situations):
+   - Bucket jarak: tiap ambang di aturan FSM menjadi batas bucket (dist_edges());
+     '<' ambang t -> batas t, '>' ambang t -> batas t + 1 (jarak selalu int)
+   - HP sendiri kritis (< LOW_HP) dan unggul HP (HP sendiri >= HP lawan)
+   - Flag target: menyerang, kena hit, lompat
+2. compile_policy() menjalankan aturan FSM asli sekali per cell (state x situasi)
+   dengan fighter tiruan di titik wakil tiap bucket:
+   - evaluate_situation() -> state berikutnya
+   - get_action() dengan RNG tiruan: batas tiap action di sumbu angka acak dicari
+     dengan bisection pada grid angka MatchRandom (kelipatan 2^-53), jadi batas
+     tabel identik dengan perbandingan di FSM (tanpa pembulatan)
+3. PolicyTable.choose(): index cell -> action; jika cell punya lebih dari satu
+   action, ambil SATU angka rng lalu bisect ke batas cell (cell dengan satu action
+   tidak mengambil angka, sama seperti FSM)
+4. policy_table(attack_range, safe_distance): tabel bersama per setting AI
+   (di-compile sekali per process per setting, < 0.1 detik); arrays() menyediakan
+   versi NumPy untuk BatchEngine (setting default)
+
+AIController meminta tabel sesuai attack_range / safe_distance miliknya, jadi
+setting per instance tetap berlaku; mengubah aturan / konstanta FSM lain otomatis
+mengubah tabel saat process berikutnya.
+
+Jalankan langsung untuk cek tabel vs FSM + kecepatan keputusan:
+    python -m battle.ai_policy
+"""
+from bisect import bisect_right
+from types import SimpleNamespace
+from battle.ai_controller import (
+    AIController, AIState, ATTACK_RANGE, SAFE_DISTANCE, DEFENSIVE_DISTANCE,
+    RETREAT_DISTANCE, LOW_HP,
+)
+
+
+# === KODE STATE & ACTION (urutan = index tabel, sama dengan snapshot.py) ===
+STATES = tuple(AIState)
+STATE_INDEX = {state: i for i, state in enumerate(STATES)}
+ACTIONS = ('move_forward', 'move_back', 'jump', 'attack1', 'attack2', 'attack3')
+ACTION_INDEX = {action: i for i, action in enumerate(ACTIONS)}
+
+# === DISKRETISASI SITUASI ===
+FLAGS = 5                   # low_hp, hp_lead, target attacking, target hit, target jump
+MAX_ACTIONS = 3             # Action per cell paling banyak (attack1/2/3)
+
+RANDOM_STEPS = 1 << 53      # MatchRandom.random() = kelipatan 1 / 2^53
+
+
+def dist_edges(attack_range=ATTACK_RANGE, safe_distance=SAFE_DISTANCE):
+    """
+    Batas bucket jarak: d < attack_range, d < RETREAT_DISTANCE, d < DEFENSIVE_DISTANCE,
+    d > safe_distance (bucket = jumlah batas <= d)
+    """
+    return tuple(sorted({attack_range, RETREAT_DISTANCE, DEFENSIVE_DISTANCE, safe_distance + 1}))
+
+
+def _situation_values(index, edges):
+    """Nilai wakil (dist, hp, enemy_hp, attacking, hit, jump) untuk index situasi."""
+    index, jump = divmod(index, 2)
+    index, hit = divmod(index, 2)
+    index, attacking = divmod(index, 2)
+    index, lead = divmod(index, 2)
+    bucket, low = divmod(index, 2)
+    dist = edges[bucket - 1] if bucket else 0
+    hp = LOW_HP - 1 if low else LOW_HP
+    return dist, hp, hp if lead else hp + 1, bool(attacking), bool(hit), bool(jump)
+
+
+# === COMPILE DARI FSM ===
+
+class _ProbeRandom:
+    """RNG tiruan: random() selalu mengembalikan value, jumlah pengambilan dicatat."""
+
+    def __init__(self):
+        self.value = 0.0
+        self.draws = 0
+
+    def random(self):
+        self.draws += 1
+        return self.value
+
+
+def _probe_action(ai, probe, step):
+    """Action FSM saat angka acak = step / 2^53 -> (index action, jumlah angka diambil)."""
+    probe.value = step / RANDOM_STEPS
+    probe.draws = 0
+    action = ACTION_INDEX[ai.get_action()]
+    if probe.draws > 1:
+        raise ValueError(f"aturan FSM {ai.state} mengambil {probe.draws} angka acak per keputusan")
+    return action, probe.draws
+
+
+def _compile_actions(ai, probe):
+    """
+    Action + batas angka acak satu cell (ai sudah di-set ke state & situasi cell)
+
+    Returns:
+        tuple: (index action, batas awal action ke-2, ke-3, ...); action i dipilih
+               jika bounds[i - 1] <= u < bounds[i]
+    """
+    action, draws = _probe_action(ai, probe, 0)
+    if not draws:
+        return (action,), ()
+    actions, bounds, low = [action], [], 0
+    top = RANDOM_STEPS - 1
+    while _probe_action(ai, probe, top)[0] != actions[-1]:
+        # Cari step terkecil dengan action berbeda (action(low) = action terakhir)
+        high = top
+        while high - low > 1:
+            mid = (low + high) // 2
+            if _probe_action(ai, probe, mid)[0] == actions[-1]:
+                low = mid
+            else:
+                high = mid
+        actions.append(_probe_action(ai, probe, high)[0])
+        bounds.append(high / RANDOM_STEPS)
+        low = high
+    return tuple(actions), tuple(bounds)
+
+
+def compile_policy(attack_range=ATTACK_RANGE, safe_distance=SAFE_DISTANCE):
+    """
+    Jalankan aturan FSM AIController di semua cell
+
+    Args:
+        attack_range, safe_distance: Setting AIController yang di-compile
+
+    Returns:
+        PolicyTable
+    """
+    me = SimpleNamespace(rect=SimpleNamespace(centerx=0), health=100, alive=True)
+    target = SimpleNamespace(rect=SimpleNamespace(centerx=0), health=100,
+                             attacking=False, hit=False, jump=False)
+    probe = _ProbeRandom()
+    ai = AIController(me, target, probe)
+    ai.attack_range, ai.safe_distance = attack_range, safe_distance
+    edges = dist_edges(attack_range, safe_distance)
+
+    transition, actions, bounds = [], [], []
+    for state in STATES:
+        for index in range((len(edges) + 1) << FLAGS):
+            dist, me.health, target.health, target.attacking, target.hit, target.jump = \
+                _situation_values(index, edges)
+            target.rect.centerx = dist
+            transition.append(STATE_INDEX[ai.evaluate_situation()])
+            ai.state = state
+            cell_actions, cell_bounds = _compile_actions(ai, probe)
+            actions.append(cell_actions)
+            bounds.append(cell_bounds)
+    return PolicyTable((attack_range, safe_distance), edges, transition, actions, bounds)
+
+
+class PolicyTable:
+    """
+    Tabel padat policy AI, index cell = index state * n_situations + index situasi
+
+    Attributes:
+        key: (attack_range, safe_distance) yang di-compile
+        dist_edges: Batas bucket jarak (lihat dist_edges())
+        n_situations: Jumlah situasi (bucket jarak x 2^FLAGS)
+        transition: Index state hasil evaluasi FSM per cell
+        actions: Tuple index action per cell (1 = tanpa angka acak)
+        bounds: Tuple batas angka acak per cell (len(actions) - 1)
+        next_states: transition versi AIState (untuk AIController)
+        names: actions versi string (untuk AIController)
+    """
+
+    def __init__(self, key, edges, transition, actions, bounds):
+        self.key = key
+        self.dist_edges = edges
+        self.n_situations = (len(edges) + 1) << FLAGS
+        self.transition = transition
+        self.actions = actions
+        self.bounds = bounds
+        self.next_states = [STATES[i] for i in transition]
+        self.names = [tuple(ACTIONS[a] for a in cell) for cell in actions]
+        self._arrays = None
+
+    def situation(self, dist, hp, enemy_hp, attacking, hit, jump):
+        """
+        Index situasi dari nilai mentah
+
+        Args:
+            dist: Jarak horizontal (int) ke target
+            hp, enemy_hp: HP sendiri & target
+            attacking, hit, jump: Flag target
+
+        Returns:
+            int: Index di [0, n_situations)
+        """
+        index = bisect_right(self.dist_edges, dist)
+        index = index * 2 + (hp < LOW_HP)
+        index = index * 2 + (hp >= enemy_hp)
+        index = index * 2 + bool(attacking)
+        index = index * 2 + bool(hit)
+        return index * 2 + bool(jump)
+
+    def next_state(self, state, index):
+        """State FSM berikutnya (AIState) pada situasi index."""
+        return self.next_states[STATE_INDEX[state] * self.n_situations + index]
+
+    def choose(self, state, index, rng):
+        """
+        Action (string) untuk state + situasi; satu rng.random() hanya jika cell
+        punya lebih dari satu action
+        """
+        cell = STATE_INDEX[state] * self.n_situations + index
+        names = self.names[cell]
+        if len(names) == 1:
+            return names[0]
+        return names[bisect_right(self.bounds[cell], rng.random())]
+
+    def probabilities(self, cell):
+        """
+        Peluang tiap action di cell
+
+        Returns:
+            dict: Nama action -> peluang (jumlah = 1)
+        """
+        edges = (0.0, *self.bounds[cell], 1.0)
+        return {ACTIONS[a]: edges[i + 1] - edges[i] for i, a in enumerate(self.actions[cell])}
+
+    def arrays(self):
+        """
+        Versi NumPy untuk BatchEngine (dibuat sekali)
+
+        Returns:
+            tuple: (transition int32 [cell], actions int32 [cell, MAX_ACTIONS],
+                    bounds float64 [cell, MAX_ACTIONS - 1] (sisa = 2.0, tidak pernah
+                    tercapai), draws bool [cell])
+        """
+        if self._arrays is None:
+            import numpy as np
+            transition = np.array(self.transition, np.int32)
+            cells = len(self.transition)
+            actions = np.zeros((cells, MAX_ACTIONS), np.int32)
+            bounds = np.full((cells, MAX_ACTIONS - 1), 2.0)
+            for cell, (cell_actions, cell_bounds) in enumerate(zip(self.actions, self.bounds)):
+                actions[cell, :len(cell_actions)] = cell_actions
+                bounds[cell, :len(cell_bounds)] = cell_bounds
+            draws = np.array([len(a) > 1 for a in self.actions])
+            self._arrays = (transition, actions, bounds, draws)
+        return self._arrays
+
+
+_policies = {}     # (attack_range, safe_distance) -> PolicyTable
+
+
+def policy_table(attack_range=ATTACK_RANGE, safe_distance=SAFE_DISTANCE):
+    """PolicyTable bersama per setting AI (di-compile dari FSM saat pertama dipakai)."""
+    key = (attack_range, safe_distance)
+    policy = _policies.get(key)
+    if policy is None:
+        policy = _policies[key] = compile_policy(attack_range, safe_distance)
+    return policy
+
+
+# === ENTRY POINT (cek tabel vs FSM) ===
+if __name__ == "__main__":
+    import random
+    import time
+    from battle.match_random import MatchRandom
+
+    start = time.perf_counter()
+    policy = compile_policy()
+    n_situations = policy.n_situations
+    print(f"{len(policy.transition)} cell ({len(STATES)} state x {n_situations} situasi), "
+          f"compile {(time.perf_counter() - start) * 1000:.1f} ms")
+    for state in STATES:
+        cell = STATE_INDEX[state] * n_situations + policy.situation(0, 100, 100, False, False, False)
+        print(f"  {state.value:<11} dekat, HP unggul: {policy.probabilities(cell)}")
+
+    me = SimpleNamespace(rect=SimpleNamespace(centerx=0), health=100, alive=True)
+    target = SimpleNamespace(rect=SimpleNamespace(centerx=0), health=100,
+                             attacking=False, hit=False, jump=False)
+    fsm, table = MatchRandom(0), MatchRandom(0)
+    ai = AIController(me, target, fsm)
+
+    # Setting default + setting instance lain (tabel di-compile dari setting tersebut)
+    for setting in ((ATTACK_RANGE, SAFE_DISTANCE), (90, 260)):
+        policy = policy_table(*setting)
+        ai.attack_range, ai.safe_distance = setting
+        ai.rng = fsm
+        rng = random.Random(3)
+        mismatch = 0
+
+        # Situasi acak (jarak di sekitar batas bucket, HP sama / beda tipis) x angka acak
+        for _ in range(200000):
+            dist = rng.choice((rng.randrange(0, 400),
+                               rng.choice(policy.dist_edges) + rng.randrange(-1, 2)))
+            target.rect.centerx = dist * rng.choice((-1, 1))
+            me.health = rng.randrange(-10, 101)
+            target.health = me.health + rng.randrange(-2, 3)
+            target.attacking, target.hit, target.jump = (rng.random() < 0.5 for _ in range(3))
+            state = rng.choice(STATES)
+            index = policy.situation(dist, me.health, target.health,
+                                     target.attacking, target.hit, target.jump)
+            ai.state = state
+            seed = rng.getrandbits(64)
+            fsm.setstate(seed)
+            table.setstate(seed)
+            want = (ai.evaluate_situation(), ai.get_action(), fsm.getstate())
+            got = (policy.next_state(state, index), policy.choose(state, index, table), table.getstate())
+            mismatch += got != want
+
+        # Batas persis: angka acak tepat di / tepat sebelum tiap batas cell
+        for state in STATES:
+            for index in range(policy.n_situations):
+                cell = STATE_INDEX[state] * policy.n_situations + index
+                dist, me.health, target.health, target.attacking, target.hit, target.jump = \
+                    _situation_values(index, policy.dist_edges)
+                target.rect.centerx = dist
+                ai.state = state
+                for bound in policy.bounds[cell]:
+                    for step in (round(bound * RANDOM_STEPS) - 1, round(bound * RANDOM_STEPS)):
+                        probe = SimpleNamespace(random=lambda: step / RANDOM_STEPS)
+                        ai.rng = probe
+                        mismatch += ai.get_action() != policy.choose(state, index, probe)
+        print(f"tabel vs FSM (attack_range {setting[0]}, safe_distance {setting[1]}): "
+              f"{'OK' if mismatch == 0 else f'{mismatch} MISMATCH'}")
+
+    policy = policy_table()
+    ai.attack_range, ai.safe_distance = ATTACK_RANGE, SAFE_DISTANCE
+
+    # Kecepatan satu keputusan (evaluasi state + action)
+    ai.rng = fsm
+    n = 200000
+    start = time.perf_counter()
+    for _ in range(n):
+        ai.evaluate_situation()
+        ai.get_action()
+    fsm_us = (time.perf_counter() - start) * 1e6 / n
+    start = time.perf_counter()
+    for _ in range(n):
+        index = policy.situation(abs(me.rect.centerx - target.rect.centerx), me.health,
+                                 target.health, target.attacking, target.hit, target.jump)
+        policy.next_state(state, index)
+        policy.choose(state, index, fsm)
+    print(f"keputusan: FSM {fsm_us:.2f} us, tabel {(time.perf_counter() - start) * 1e6 / n:.2f} us")
@@ -0,0 +1,605 @@
+"""
+FILE: batch_engine.py
+DESKRIPSI: Engine batch NumPy (struct-of-arrays) - menjalankan ribuan match sekaligus
+           dengan aturan yang sama persis seperti Fighter + AIController
+DIGUNAKAN OLEH: match_farm.py (--engine batch), developer (balancing, riset AI)
+MENGGUNAKAN: numpy, fighter_base.py (konstanta gameplay & bitmask input),
+             ai_policy.py (tabel policy AI versi array), simulation.py (spawn, ukuran arena),
+             collision_masks.py (mask hit/hurt per frame)
+
+ALUR PROGRAM:
+1. BatchEngine(p1_chars, p2_chars, seeds, mode) menyimpan state N match dalam array
+   berbentuk (2, N): index 0 = P1, index 1 = P2
+2. step(inputs) menjalankan satu tick untuk semua match sekaligus, urutan sama
+   dengan BattleSimulation.step():
+   - P1: keputusan AI (mode 'cpu', lookup tabel policy per match) atau input
+     -> _step_fighter (input, attack, fisika)
+   - P2: keputusan AI (mode 'ai'/'cpu') atau input -> _step_fighter
+   - _update() animasi kedua fighter
+   - _resolve_attacks() P1 lalu P2: broadphase kotak hit vs hurt untuk semua match
+     sekaligus (tabel rect per karakter), Mask.overlap hanya untuk kandidat
+   - Cek pemenang
+3. Cabang if/else per fighter diganti mask boolean; RNG splitmix64 per match
+   hanya maju pada match yang memang mengambil angka acak (sama dengan MatchRandom)
+4. verify_parity() membandingkan semua field dengan BattleSimulation tiap tick
+
+Jalankan langsung untuk cek parity + throughput:
+    python -m battle.batch_engine
+
+CATATAN:
+    Engine dimulai langsung di fase fight (tanpa countdown intro), sama seperti
+    BattleSimulation dengan intro_count = 0.
+"""
+import time
+import numpy as np
+from battle.fighter_base import (
+    SPEED, GRAVITY, JUMP_VELOCITY, ATTACK_COOLDOWN, ATTACK_DAMAGE, ANIMATION_TICKS,
+    HITBOX_W, HITBOX_H, ATTACK_W, FLOOR_OFFSET,
+    INPUT_LEFT, INPUT_RIGHT, INPUT_JUMP, INPUT_ATTACKS,
+)
+from battle.ai_controller import LOW_HP, REACTION_TIME, STATE_INTERVAL
+from battle.ai_policy import STATES, ACTIONS, policy_table
+from battle.match_random import MatchRandom, GOLDEN
+from battle.simulation import BattleSimulation, SCREEN_W, SCREEN_H, SPAWN_P1, SPAWN_P2
+from battle.characters import CHARACTERS
+from engine.collision_masks import COLLISION_MASKS
+
+
+# === DATA KARAKTER (array) ===
+CHAR_NAMES = list(CHARACTERS)
+FRAME_COUNTS = np.array([data[4] for data in CHARACTERS.values()], dtype=np.int32)  # [karakter, action]
+
+# === KODE STATE & ACTION AI (urutan = index array, lihat ai_policy.py) ===
+AGGRESSIVE, DEFENSIVE, PURSUIT, RETREAT, PUNISH = range(5)
+AI_STATES = STATES
+MOVE_FORWARD, MOVE_BACK, JUMP, ATTACK1, ATTACK2, ATTACK3 = range(6)
+ACTION_BITS = np.array([0, 0, INPUT_JUMP, *INPUT_ATTACKS], dtype=np.int32)
+
+# === KONSTANTA SPLITMIX64 (uint64) ===
+_GOLDEN = np.uint64(GOLDEN)
+_MIX1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX2 = np.uint64(0x94D049BB133111EB)
+_S11, _S27, _S30, _S31 = (np.uint64(s) for s in (11, 27, 30, 31))
+
+HALF_W = HITBOX_W // 2      # centerx = x + HALF_W (sama dengan pygame.Rect)
+
+_collision_tables = None
+
+
+def collision_tables():
+    """
+    Tabel mask collision semua karakter (dibuat sekali per process)
+
+    Returns:
+        tuple: (masks, has_masks, hit_rect, has_hit, hurt_rect)
+            masks: list per karakter - hasil COLLISION_MASKS.get() atau None
+            has_masks: bool [karakter]
+            hit_rect, hurt_rect: int32 [karakter, flip, action, frame, (x, y, w, h)]
+                                 relatif terhadap pojok kiri atas hitbox
+            has_hit: bool [karakter, flip, action, frame] - frame aktif
+        Karakter tanpa mask: hurt = hitbox, tidak ada frame aktif
+    """
+    global _collision_tables
+    if _collision_tables is None:
+        n_chars, n_actions = FRAME_COUNTS.shape
+        shape = (n_chars, 2, n_actions, int(FRAME_COUNTS.max()))
+        hit_rect = np.zeros(shape + (4,), np.int32)
+        hurt_rect = np.zeros(shape + (4,), np.int32)
+        hurt_rect[...] = (0, 0, HITBOX_W, HITBOX_H)
+        has_hit = np.zeros(shape, bool)
+        masks = []
+        for c, (folder, scale, offset, files, frames) in enumerate(CHARACTERS.values()):
+            collision = COLLISION_MASKS.get(folder, scale, offset, files, frames, HITBOX_W)
+            masks.append(collision)
+            if collision is None:
+                continue
+            for facing, actions in enumerate(collision):
+                for action, row in enumerate(actions):
+                    for i, frame in enumerate(row):
+                        if frame.hurt_rect is not None:
+                            hurt_rect[c, facing, action, i] = frame.hurt_rect
+                        else:
+                            hurt_rect[c, facing, action, i] = (0, 0, 0, 0)
+                        if frame.hit is not None:
+                            hit_rect[c, facing, action, i] = frame.hit_rect
+                            has_hit[c, facing, action, i] = True
+        has_masks = np.array([m is not None for m in masks])
+        _collision_tables = (masks, has_masks, hit_rect, has_hit, hurt_rect)
+    return _collision_tables
+
+
+class BatchEngine:
+    """
+    State N match dalam array NumPy (struct-of-arrays)
+    
+    Attributes:
+        n: Jumlah match
+        x, y, vel_y, health, attack_cooldown, attack_type, action, frame_index,
+        update_time, hits_landed: int32 (2, N)
+        image_frame: Frame yang tampil tick ini (int32 (2, N))
+        alive, running, jump, attacking, attack_hit, hit, flip: bool (2, N)
+        tick: Jumlah tick fight yang sudah dijalankan (sama untuk semua match)
+        round_over, winner, end_tick: Status akhir tiap match (N,)
+        rng_state: State splitmix64 tiap match (uint64, N)
+        ai_state, ai_timer, ai_cooldown, ai_action: State AIController (2, N)
+    """
+    
+    def __init__(self, p1_chars, p2_chars, seeds, mode='cpu',
+                 screen_w=SCREEN_W, screen_h=SCREEN_H):
+        """
+        Constructor - Semua match mulai dari posisi spawn
+        
+        Args:
+            p1_chars, p2_chars: Nama karakter tiap match (list, panjang N)
+            seeds: Seed RNG tiap match (list int, panjang N)
+            mode: 'pvp', 'ai' (AI di P2), atau 'cpu' (AI di kedua sisi)
+            screen_w, screen_h: Batas arena
+        """
+        n = len(seeds)
+        self.n = n
+        self.mode = mode
+        self.screen_w = screen_w
+        self.screen_h = screen_h
+        self.ai = (mode == 'cpu', mode in ('ai', 'cpu'))    # AI aktif per sisi
+        
+        # === KARAKTER ===
+        self.char = np.array([[CHAR_NAMES.index(c) for c in p1_chars],
+                              [CHAR_NAMES.index(c) for c in p2_chars]], dtype=np.intp)
+        self.frame_counts = FRAME_COUNTS[self.char]       # (2, N, 8)
+        self.has_masks = collision_tables()[1][self.char]  # (2, N)
+        
+        # === POSISI & FISIKA ===
+        shape = (2, n)
+        self.x = np.array([[SPAWN_P1[0]] * n, [SPAWN_P2[0]] * n], dtype=np.int32)
+        self.y = np.array([[SPAWN_P1[1]] * n, [SPAWN_P2[1]] * n], dtype=np.int32)
+        self.vel_y = np.zeros(shape, np.int32)
+        self.flip = np.array([[False] * n, [True] * n])
+        
+        # === STATUS KARAKTER ===
+        self.health = np.full(shape, 100, np.int32)
+        self.alive = np.ones(shape, bool)
+        self.running = np.zeros(shape, bool)
+        self.jump = np.zeros(shape, bool)
+        self.attacking = np.zeros(shape, bool)
+        self.attack_hit = np.zeros(shape, bool)
+        self.attack_type = np.zeros(shape, np.int32)
+        self.attack_cooldown = np.zeros(shape, np.int32)
+        self.hit = np.zeros(shape, bool)
+        self.hits_landed = np.zeros(shape, np.int32)
+        
+        # === ANIMASI ===
+        self.action = np.zeros(shape, np.int32)
+        self.frame_index = np.zeros(shape, np.int32)
+        self.image_frame = np.zeros(shape, np.int32)
+        self.update_time = np.zeros(shape, np.int32)
+        
+        # === MATCH ===
+        self.tick = 0
+        self.round_over = np.zeros(n, bool)
+        self.winner = np.zeros(n, np.int8)          # 0 = belum ada, 1 / 2
+        self.end_tick = np.zeros(n, np.int32)       # Tick saat pemenang ditentukan
+        self.rng_state = np.array([s & (2 ** 64 - 1) for s in seeds], dtype=np.uint64)
+        
+        # === AI ===
+        self.ai_state = np.full(shape, PURSUIT, np.int32)
+        self.ai_timer = np.zeros(shape, np.int32)
+        self.ai_cooldown = np.zeros(shape, np.int32)
+        self.ai_action = np.full(shape, MOVE_FORWARD, np.int32)
+    
+    
+    def _random(self, mask):
+        """
+        MatchRandom.random() untuk match yang mask-nya True
+        
+        Returns:
+            ndarray: float64 (N,), 0 untuk match yang tidak mengambil angka
+        """
+        u = np.zeros(self.n)
+        idx = np.flatnonzero(mask)
+        if idx.size:
+            state = self.rng_state[idx] + _GOLDEN
+            self.rng_state[idx] = state
+            z = (state ^ (state >> _S30)) * _MIX1
+            z = (z ^ (z >> _S27)) * _MIX2
+            z ^= z >> _S31
+            u[idx] = (z >> _S11).astype(np.float64) * (1.0 / (1 << 53))
+        return u
+    
+    
+    def _decide(self, p):
+        """
+        AIController.decide() versi vektor untuk sisi p
+        
+        Returns:
+            tuple: (inputs int32 (N,), acting bool (N,)); acting False = None
+                   (round selesai / fighter mati -> fighter tidak di-step)
+        """
+        o = 1 - p
+        acting = ~self.round_over & self.alive[p]
+        cx = self.x[p] + HALF_W
+        tcx = self.x[o] + HALF_W
+        dist = np.abs(cx - tcx)
+        
+        timer = self.ai_timer[p]
+        timer[acting] += 1
+        reeval = acting & (timer >= STATE_INTERVAL)
+        cooldown = self.ai_cooldown[p]
+        cooldown[acting] -= 1
+        choose = acting & (cooldown <= 0)
+        if reeval.any() or choose.any():
+            policy = policy_table()     # Setting default AIController
+            transition, actions, bounds, draws = policy.arrays()
+            index = self._situation(p, dist, policy.dist_edges)
+            n_situations = policy.n_situations
+            
+            # === UPDATE STATE FSM (setiap STATE_INTERVAL tick) ===
+            state = self.ai_state[p]
+            state[reeval] = transition[state * n_situations + index][reeval]
+            timer[reeval] = 0
+            
+            # === PILIH ACTION (setiap REACTION_TIME tick) ===
+            # Satu angka acak hanya untuk cell yang punya lebih dari satu action
+            cell = state * n_situations + index
+            u = self._random(choose & draws[cell])
+            pick = (u[:, None] >= bounds[cell]).sum(axis=1)
+            self.ai_action[p][choose] = actions[cell, pick][choose]
+            cooldown[choose] = REACTION_TIME
+        
+        # === CONVERT ACTION KE INPUT ===
+        action = self.ai_action[p]
+        facing_right = cx < tcx
+        forward = np.where(facing_right, INPUT_RIGHT, INPUT_LEFT)
+        back = np.where(facing_right, INPUT_LEFT, INPUT_RIGHT)
+        inputs = np.where(action == MOVE_FORWARD, forward,
+                          np.where(action == MOVE_BACK, back, ACTION_BITS[action]))
+        return inputs, acting
+    
+    
+    def _situation(self, p, dist, edges):
+        """PolicyTable.situation() versi vektor untuk sisi p (index situasi per match)."""
+        o = 1 - p
+        hp, enemy_hp = self.health[p], self.health[o]
+        index = np.searchsorted(edges, dist, side='right')
+        index = index * 2 + (hp < LOW_HP)
+        index = index * 2 + (hp >= enemy_hp)
+        index = index * 2 + self.attacking[o]
+        index = index * 2 + self.hit[o]
+        return index * 2 + self.jump[o]
+    
+    
+    def _step_fighter(self, p, inputs, acting):
+        """
+        Fighter.step() (input, attack, _apply_physics) versi vektor untuk sisi p
+        
+        Args:
+            p: 0 = P1, 1 = P2
+            inputs: Bitmask INPUT_* (N,)
+            acting: Match yang fighter-nya di-step tick ini (N,)
+        """
+        o = 1 - p
+        w, h = self.screen_w, self.screen_h
+        x, y = self.x[p], self.y[p]
+        tx, ty = self.x[o], self.y[o]
+        
+        # === INPUT GERAK ===
+        self.running[p][acting] = False
+        allowed = acting & ~self.attacking[p] & self.alive[p] & ~self.round_over
+        self.attack_type[p][allowed] = 0
+        
+        left = allowed & (inputs & INPUT_LEFT != 0)
+        right = allowed & (inputs & INPUT_RIGHT != 0)
+        dx = np.where(right, SPEED, np.where(left, -SPEED, 0)).astype(np.int32)
+        self.running[p] |= left | right
+        
+        jumping = allowed & (inputs & INPUT_JUMP != 0) & ~self.jump[p]
+        self.vel_y[p][jumping] = JUMP_VELOCITY
+        self.jump[p][jumping] = True
+        
+        # === ATTACK ===
+        # Beberapa tombol sekaligus: hanya yang pertama lolos cooldown,
+        # attack_type = tombol terakhir yang ditekan (sama dengan loop di step())
+        pressed = [allowed & (inputs & bit != 0) for bit in INPUT_ATTACKS]
+        fire = (pressed[0] | pressed[1] | pressed[2]) & (self.attack_cooldown[p] == 0)
+        if fire.any():
+            self.attacking[p][fire] = True
+            self.attack_cooldown[p][fire] = ATTACK_COOLDOWN
+            self.attack_hit[p][fire] = False
+            # Tanpa mask: hit langsung dicek dengan hitbox kotak (dengan mask: _resolve_attacks)
+            atk_x = np.where(self.flip[p], x - HITBOX_W, x + HITBOX_W)
+            landed = (fire & ~self.has_masks[p] & (atk_x < tx + HITBOX_W) & (tx < atk_x + ATTACK_W)
+                      & (y < ty + HITBOX_H) & (ty < y + HITBOX_H))
+            self.health[o][landed] -= ATTACK_DAMAGE
+            self.hit[o][landed] = True
+            self.hits_landed[p][landed] += 1
+        for i, mask in enumerate(pressed):
+            self.attack_type[p][mask] = i + 1
+        
+        # === GRAVITASI ===
+        vel_y = self.vel_y[p]
+        vel_y[acting] += GRAVITY
+        dy = vel_y.copy()
+        
+        # === BATAS LAYAR ===
+        dx = np.where(x + dx < 0, -x, dx)
+        dx = np.where(x + HITBOX_W + dx > w, w - (x + HITBOX_W), dx)
+        floor = acting & (y + HITBOX_H + dy > h - FLOOR_OFFSET)
+        vel_y[floor] = 0
+        self.jump[p][floor] = False
+        dy = np.where(floor, h - FLOOR_OFFSET - (y + HITBOX_H), dy)
+        
+        # === COLLISION DENGAN LAWAN ===
+        fx = x + dx
+        collide = (fx < tx + HITBOX_W) & (tx < fx + HITBOX_W) & (y < ty + HITBOX_H) & (ty < y + HITBOX_H)
+        dx = np.where(collide & (dx > 0), tx - (x + HITBOX_W) - 10,
+                      np.where(collide & (dx < 0), tx + HITBOX_W - x + 10, dx))
+        
+        # === AUTO-FLIP MENGHADAP LAWAN ===
+        cx, tcx = x + HALF_W, tx + HALF_W
+        turn = acting & (np.abs(tcx - cx) > 20)
+        self.flip[p][turn] = (tcx < cx)[turn]
+        
+        # === UPDATE COOLDOWN & POSISI ===
+        cooldown = self.attack_cooldown[p]
+        cooldown[acting & (cooldown > 0)] -= 1
+        x += np.where(acting, dx, 0)
+        y += np.where(acting, dy, 0)
+    
+    
+    def _update(self):
+        """Fighter.update() (state animasi) versi vektor untuk kedua sisi."""
+        self.tick += 1
+        tick = self.tick
+        
+        # === TENTUKAN ANIMASI BERDASARKAN STATE ===
+        dead = self.health <= 0
+        self.health[dead] = 0
+        self.alive[dead] = False
+        new_action = np.select(
+            [dead, self.hit, self.attacking, self.jump, self.running],
+            [7, 6, 2 + self.attack_type, 2, 1],
+            0,
+        )
+        
+        # === GANTI ANIMASI JIKA BERBEDA ===
+        changed = new_action != self.action
+        self.action[changed] = new_action[changed]
+        self.frame_index[changed] = 0
+        self.update_time[changed] = tick
+        
+        # === UPDATE FRAME ANIMASI ===
+        self.image_frame[:] = self.frame_index
+        advance = tick - self.update_time > ANIMATION_TICKS
+        self.frame_index[advance] += 1
+        self.update_time[advance] = tick
+        
+        # === HANDLE ANIMASI SELESAI ===
+        n_frames = np.take_along_axis(self.frame_counts, self.action[..., None], axis=2)[..., 0]
+        done = self.frame_index >= n_frames
+        self.frame_index[:] = np.where(done & ~self.alive, n_frames - 1,
+                                       np.where(done, 0, self.frame_index))
+        finished = done & self.alive
+        self.attacking[finished & (self.action >= 3) & (self.action <= 5)] = False
+        self.hit[finished & (self.action == 6)] = False
+    
+    
+    def _resolve_attacks(self, p):
+        """
+        Fighter.resolve_attack() versi vektor untuk sisi p (semua match sekaligus)
+        
+        Broadphase (kotak hit frame aktif vs kotak hurt lawan) dihitung dengan array;
+        hanya kandidat yang lolos yang dicek Mask.overlap satu per satu.
+        """
+        o = 1 - p
+        masks, _, hit_table, has_hit, hurt_table = collision_tables()
+        char, flip = self.char[p], self.flip[p].astype(np.intp)
+        action, frame = self.action[p], self.image_frame[p]
+        active = (~self.round_over & self.attacking[p] & ~self.attack_hit[p]
+                  & has_hit[char, flip, action, frame])
+        if not active.any():
+            return
+        
+        idx = np.flatnonzero(active)
+        hit = hit_table[char[idx], flip[idx], action[idx], frame[idx]]
+        t_char, t_flip = self.char[o][idx], self.flip[o][idx].astype(np.intp)
+        t_action, t_frame = self.action[o][idx], self.image_frame[o][idx]
+        hurt = hurt_table[t_char, t_flip, t_action, t_frame]
+        hx, hy = self.x[p][idx] + hit[:, 0], self.y[p][idx] + hit[:, 1]
+        tx, ty = self.x[o][idx] + hurt[:, 0], self.y[o][idx] + hurt[:, 1]
+        overlap = ((hx < tx + hurt[:, 2]) & (tx < hx + hit[:, 2])
+                   & (hy < ty + hurt[:, 3]) & (ty < hy + hit[:, 3])
+                   & (hurt[:, 2] > 0))
+        
+        landed = np.zeros(self.n, bool)
+        for j in np.flatnonzero(overlap):
+            i = idx[j]
+            target = masks[t_char[j]]
+            if target is not None:
+                hit_mask = masks[char[i]][flip[i]][action[i]][frame[i]].hit
+                hurt_mask = target[t_flip[j]][t_action[j]][t_frame[j]].hurt
+                if hit_mask.overlap(hurt_mask, (int(tx[j] - hx[j]), int(ty[j] - hy[j]))) is None:
+                    continue
+            landed[i] = True
+        
+        self.attack_hit[p][landed] = True
+        self.health[o][landed] -= ATTACK_DAMAGE
+        self.hit[o][landed] = True
+        self.hits_landed[p][landed] += 1
+    
+    
+    def step(self, inputs=None):
+        """
+        Jalankan satu tick untuk semua match
+        
+        Args:
+            inputs: Bitmask input int (2, N) untuk sisi non-AI (None = tanpa input)
+        """
+        if inputs is None:
+            inputs = np.zeros((2, self.n), np.int32)
+        everyone = np.ones(self.n, bool)
+        for p in (0, 1):
+            if self.ai[p]:
+                side_inputs, acting = self._decide(p)
+            else:
+                side_inputs, acting = inputs[p], everyone
+            self._step_fighter(p, side_inputs, acting)
+        
+        self._update()
+        self._resolve_attacks(0)
+        self._resolve_attacks(1)
+        
+        # === CEK PEMENANG ===
+        open_ = ~self.round_over
+        p1_dead = open_ & ~self.alive[0]
+        p2_dead = open_ & ~self.alive[1] & ~p1_dead
+        self.winner[p1_dead] = 2
+        self.winner[p2_dead] = 1
+        ended = p1_dead | p2_dead
+        self.round_over |= ended
+        self.end_tick[ended] = self.tick
+    
+    
+    def subset(self, indices):
+        """
+        Engine baru yang hanya berisi match tertentu (state disalin)
+        
+        Dipakai untuk membuang match yang sudah selesai agar tick berikutnya
+        hanya menghitung match yang masih berjalan.
+        
+        Args:
+            indices: Index match yang dipertahankan
+        
+        Returns:
+            BatchEngine
+        """
+        sub = object.__new__(BatchEngine)
+        for name, value in self.__dict__.items():
+            if isinstance(value, np.ndarray):
+                value = value[indices] if value.ndim == 1 else value[:, indices]
+            setattr(sub, name, value)
+        sub.n = len(indices)
+        return sub
+    
+    
+    def run(self, max_ticks):
+        """
+        Step sampai semua match selesai atau max_ticks tercapai (mode AI)
+        
+        Returns:
+            int: Jumlah tick yang dijalankan
+        """
+        while self.tick < max_ticks and not self.round_over.all():
+            self.step()
+        return self.tick
+
+
+# === PARITY DENGAN VERSI OBJECT ===
+
+FIGHTER_FIELDS = ('x', 'y', 'vel_y', 'health', 'alive', 'running', 'jump', 'attacking',
+                  'attack_type', 'attack_cooldown', 'hit', 'action', 'frame_index',
+                  'image_frame', 'update_time', 'flip', 'hits_landed', 'attack_hit')
+
+
+def _object_field(fighter, field):
+    """Nilai field Fighter yang setara dengan array BatchEngine."""
+    if field in ('x', 'y'):
+        return getattr(fighter.rect, field)
+    return getattr(fighter, field)
+
+
+def compare(engine, sims):
+    """
+    Bandingkan state BatchEngine dengan list BattleSimulation
+
+    Returns:
+        str | None: Deskripsi perbedaan pertama, None jika identik
+    """
+    for i, sim in enumerate(sims):
+        for p, fighter in enumerate((sim.p1, sim.p2)):
+            for field in FIGHTER_FIELDS:
+                a, b = getattr(engine, field)[p, i], _object_field(fighter, field)
+                if a != b:
+                    return f"match {i} P{p + 1} {field}: batch={a} object={b}"
+            ai = sim.ai_p1 if p == 0 else sim.ai
+            if ai is not None:
+                got = (AI_STATES[engine.ai_state[p, i]], int(engine.ai_timer[p, i]),
+                       int(engine.ai_cooldown[p, i]), ACTIONS[engine.ai_action[p, i]])
+                want = (ai.state, ai.state_timer, ai.cooldown, ai.action)
+                if got != want:
+                    return f"match {i} P{p + 1} ai: batch={got} object={want}"
+        got = (bool(engine.round_over[i]), int(engine.winner[i]) or None, int(engine.rng_state[i]))
+        want = (sim.round_over, sim.winner, sim.rng.getstate())
+        if got != want:
+            return f"match {i} match-state: batch={got} object={want}"
+    return None
+
+
+def verify_parity(n=48, ticks=2500, seed=1, mode='cpu'):
+    """
+    Jalankan N match di BatchEngine dan BattleSimulation, bandingkan tiap tick
+
+    Args:
+        n: Jumlah match (karakter dirotasi agar semua pasangan ikut)
+        ticks: Jumlah tick yang dibandingkan
+        seed: Seed dasar (seed match + input acak untuk sisi non-AI)
+        mode: 'pvp', 'ai', atau 'cpu'
+
+    Returns:
+        str | None: Perbedaan pertama (dengan nomor tick), None jika identik
+    """
+    seeds_rng = MatchRandom(seed)
+    seeds = [seeds_rng.next_u64() for _ in range(n)]
+    p1_chars = [CHAR_NAMES[i % len(CHAR_NAMES)] for i in range(n)]
+    p2_chars = [CHAR_NAMES[(i // len(CHAR_NAMES)) % len(CHAR_NAMES)] for i in range(n)]
+
+    engine = BatchEngine(p1_chars, p2_chars, seeds, mode)
+    sims = []
+    for a, b, s in zip(p1_chars, p2_chars, seeds):
+        sim = BattleSimulation.headless(a, b, mode, s)
+        sim.intro_count = 0
+        sims.append(sim)
+
+    input_rng = MatchRandom(seed ^ 0xABCDEF)
+    for t in range(1, ticks + 1):
+        inputs = np.array([[input_rng.next_u64() & 0x3F for _ in range(n)] for _ in (0, 1)],
+                          dtype=np.int32)
+        engine.step(inputs)
+        for i, sim in enumerate(sims):
+            sim.step(int(inputs[0, i]), int(inputs[1, i]))
+        diff = compare(engine, sims)
+        if diff:
+            return f"tick {t}: {diff}"
+    return None
+
+
+def _throughput(n, ticks):
+    """Match-tick/detik: loop BattleSimulation vs BatchEngine (mode 'cpu')."""
+    seeds = list(range(n))
+    chars = [CHAR_NAMES[i % len(CHAR_NAMES)] for i in range(n)]
+
+    sims = [BattleSimulation.headless(a, b, 'cpu', s) for a, b, s in zip(chars, chars[::-1], seeds)]
+    for sim in sims:
+        sim.intro_count = 0
+    start = time.perf_counter()
+    for _ in range(ticks):
+        for sim in sims:
+            sim.step(0)
+    object_rate = n * ticks / (time.perf_counter() - start)
+
+    engine = BatchEngine(chars, chars[::-1], seeds, 'cpu')
+    start = time.perf_counter()
+    for _ in range(ticks):
+        engine.step()
+    batch_rate = n * ticks / (time.perf_counter() - start)
+    return object_rate, batch_rate
+
+
+# === ENTRY POINT (parity + throughput) ===
+if __name__ == "__main__":
+    for mode in ('cpu', 'ai', 'pvp'):
+        diff = verify_parity(mode=mode)
+        print(f"parity {mode:>3}: {'OK' if diff is None else 'MISMATCH ' + diff}")
+
+    for n in (64, 1024, 8192):
+        object_rate, batch_rate = _throughput(n, 300)
+        print(f"N={n:>5}: object {object_rate:>12,.0f} match-tick/s   "
+              f"batch {batch_rate:>12,.0f} match-tick/s   ({batch_rate / object_rate:.1f}x)")
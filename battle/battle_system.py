@@ -4,28 +4,60 @@ DIGUNAKAN OLEH: menu.py (memanggil BattleSystem untuk mulai battle)
 
 ALUR PROGRAM:
 1. menu.py -> character selection -> arena selection -> BattleSystem()
-2. BattleSystem.__init__() membuat 2 Fighter dan AIController (jika mode AI)
+2. BattleSystem.__init__() membuat 2 Fighter dan BattleSimulation
+   (AIController dibuat oleh simulasi jika mode AI)
 3. BattleSystem.run() menjalankan game loop:
-   - Handle input (keyboard/quit)
-   - Update fighters (move, attack, animasi)
-   - Draw ke layar
+   - Handle input (keyboard/quit) -> bitmask input
+   - Accumulator: waktu nyata x time_scale dipecah jadi tick SIM_HZ tetap
+     -> BattleSimulation.step() 0..n kali per frame (deterministik)
+   - Draw state simulasi ke layar, posisi fighter diinterpolasi antar tick
+   - Render rate bebas dari sim rate (cap FPS, uncapped, atau vsync);
+     mesin lambat men-drop frame, bukan memperlambat game
 4. Jika ada pemenang, tampilkan victory screen
 5. ESC untuk kembali ke menu
+6. Input tiap tick direkam ke file replay (replay.py) sampai ada pemenang
+7. Tiap tick, update_effects() membandingkan HP / lompat / KO dengan tick lalu dan
+   memunculkan partikel (particles.py, opsional: butuh numpy); partikel digambar
+   di atas fighter lewat draw_effects(), murni visual (di luar simulasi)
 
-- Composition: BattleSystem memiliki Fighter dan AIController
+TeamBattle (team_battle.py) memakai loop & render yang sama untuk 2-8 fighter
+lewat create_match(), field_fighters(), winner_label(), draw_ui() dan hud_rects.
+
+- Composition: BattleSystem memiliki BattleSimulation (Fighter + AIController)
 - Factory Pattern: create_fighter() membuat Fighter dengan config
 - Encapsulation: Game loop tersembunyi dalam run()
 """
 import pygame
 import sys
 import os
+import time
+import random
 from battle.fighter_base import Fighter       # Class karakter
-from battle.ai_controller import AIController # Class AI
+from battle.characters import CHARACTERS, ARENAS  # Data karakter & arena
+from battle.fighter_base import keys_to_input, HITBOX_W  # Keyboard -> bitmask input
+from battle.simulation import BattleSimulation, SPAWN_P1, SPAWN_P2, SIM_HZ  # Inti simulasi
+from battle.snapshot import snapshot, restore  # Save state / rematch
+from battle.replay import ReplayWriter, REPLAY_DIR, replay_filename  # Rekam match
+from engine.sprite_cache import SPRITE_CACHE  # Cache sprite bersama
+from engine.collision_masks import COLLISION_MASKS  # Mask hit/hurt per frame
+from engine.prefetch import PREFETCHER        # Hasil prefetch dari menu
+from engine.text_cache import render_text     # Cache teks bersama
+from engine.frame_timing import frame_timer, TIMING_KEY  # Timing per fase (F3)
+from engine.profiler import scene_profiler   # Profiler on-demand (F9)
+try:
+    from engine.particles import ParticleSystem  # Partikel hit / debu / KO (butuh numpy)
+except ImportError:
+    ParticleSystem = None   # Tanpa numpy: battle tetap jalan, tanpa partikel
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 SCREEN_W, SCREEN_H = 1400, 800  # Ukuran layar
-FPS = 60                         # Frame per second
+FPS = 60                         # Batas render default (0 = uncapped)
+SIM_DT = 1.0 / SIM_HZ            # Durasi satu tick simulasi (detik)
+MAX_FRAME_STEPS = 5              # Maks tick per frame (x time scale); sisanya di-drop
+TIME_SCALES = (0.25, 0.5, 1.0, 2.0, 4.0, 8.0)   # Slow motion .. fast-forward ([ / ])
+MAX_LERP = 100                   # Perpindahan per tick di atas ini = teleport (tanpa interpolasi)
+REMATCH_KEY = pygame.K_RETURN    # Bukan tombol player (R = Attack 1 P1, lihat KEY_BINDINGS)
 
 # Warna (R, G, B)
 WHITE = (255, 255, 255)
@@ -35,59 +67,31 @@ CYAN = (100, 200, 255)      # Warna P1
 ORANGE = (255, 150, 80)     # Warna P2/AI
 
 
-# === DATA KARAKTER ===
-# Format: 'Nama': (folder, scale, [offset_x, offset_y], [files...], [frame_counts...])
-# Files: Idle, Run, Jump, Attack1, Attack2, Attack3, Hurt, Dead
-CHARACTERS = {
-    'Samurai': (
-        os.path.join(BASE_DIR, 'assets/character/Samurai'),     # Folder sprite
-        2.5,                            # Scale sprite
-        [40, 30],                       # Offset [x, y]
-        ['Idle.png', 'Run.png', 'Jump.png', 'Attack_1.png', 
-         'Attack_2.png', 'Attack_3.png', 'Hurt.png', 'Dead.png'],
-        [6, 8, 12, 6, 4, 3, 2, 3]       # Jumlah frame tiap animasi
-    ),
-    'Shinobi': (
-        os.path.join(BASE_DIR, 'assets/character/Shinobi'), 2.5, [40, 30],
-        ['Idle.png', 'Run.png', 'Jump.png', 'Attack_1.png', 
-         'Attack_2.png', 'Attack_3.png', 'Hurt.png', 'Dead.png'],
-        [6, 8, 12, 5, 3, 4, 2, 4]
-    ),
-    'Fighter': (
-        os.path.join(BASE_DIR, 'assets/character/Fighter'), 2.5, [40, 30],
-        ['Idle.png', 'Run.png', 'Jump.png', 'Attack_1.png', 
-         'Attack_2.png', 'Attack_3.png', 'Hurt.png', 'Dead.png'],
-        [6, 8, 10, 4, 3, 4, 3, 3]
-    ),
-    'Converted Vampire': (
-        os.path.join(BASE_DIR, 'assets/character/Vampire1'), 2.0, [60, 50],
-        ['Idle.png', 'Run.png', 'Jump.png', 'Attack_1.png', 
-         'Attack_2.png', 'Attack_3.png', 'Hurt.png', 'Dead.png'],
-        [5, 8, 7, 5, 3, 4, 1, 8]
-    ),
-    'Countess Vampire': (
-        os.path.join(BASE_DIR, 'assets/character/Vampire2'), 2.0, [60, 50],
-        ['Idle.png', 'Run.png', 'Jump.png', 'Attack_1.png', 
-         'Attack_2.png', 'Attack_3.png', 'Hurt.png', 'Dead.png'],
-        [5, 6, 6, 6, 3, 1, 2, 8]
-    ),
-    'Vampire Girl': (
-        os.path.join(BASE_DIR, 'assets/character/Vampire3'), 2.0, [60, 50],
-        ['Idle.png', 'Run.png', 'Jump.png', 'Attack_1.png', 
-         'Attack_2.png', 'Attack_3.png', 'Hurt.png', 'Dead.png'],
-        [5, 6, 6, 5, 4, 2, 2, 10]
-    ),
-}
+# Area HUD (nama + health bar) P1 dan P2, dipakai oleh render dirty-rect
+HUD_RECTS = [
+    pygame.Rect(48, 18, 404, 66),
+    pygame.Rect(SCREEN_W - 452, 18, 404, 66),
+]
+
 
+def character_jobs(name):
+    """
+    Job prefetch untuk semua sprite sheet battle satu karakter
+    
+    Dipanggil dari: select_character.py saat karakter dipilih
+    """
+    folder, scale, _offset, files, frames = CHARACTERS.get(name, CHARACTERS['Samurai'])
+    return [('frames', f"{folder}/{file}", n, scale) for file, n in zip(files, frames)]
 
-# === DATA ARENA ===
-# Format: 'Nama Arena': 'path/to/background.png'
-ARENAS = {
-    'Keputih': os.path.join(BASE_DIR, 'assets/arena/Keputih.png'),
-    'San Antonio': os.path.join(BASE_DIR, 'assets/arena/SanAntonio.png'),
-    'Taman Apsari': os.path.join(BASE_DIR, 'assets/arena/TamanApsari.png'),
-    'Tunjungan': os.path.join(BASE_DIR, 'assets/arena/Tunjungan.png')
-}
+
+def arena_jobs(name):
+    """
+    Job prefetch untuk background arena (sudah di-resize ke ukuran layar)
+    
+    Dipanggil dari: select_arena.py saat arena dipilih
+    """
+    bg_path = ARENAS.get(name, os.path.join(BASE_DIR, 'assets/arena/Keputih.png'))
+    return [('image', bg_path, (SCREEN_W, SCREEN_H))]
 
 
 class BattleSystem:
@@ -98,12 +102,15 @@ class BattleSystem:
         screen: Pygame display surface
         p1, p2: Fighter objects
         ai: AIController (None jika PvP)
-        mode: 'pvp' atau 'ai'
+        mode: 'pvp', 'ai', atau 'cpu'
+        hud_rects: Area HUD untuk render dirty-rect
     
     Dipanggil dari: menu.py setelah character & arena selection
     """
+    hud_rects = HUD_RECTS
     
-    def __init__(self, char_p1, char_p2, arena, mode='pvp'):
+    def __init__(self, char_p1, char_p2, arena, mode='pvp', dirty_rects=None, seed=None,
+                 record=None, render_fps=None, vsync=None, time_scale=1.0):
         """
         Constructor - Setup battle
         
@@ -111,50 +118,174 @@ class BattleSystem:
             char_p1: Nama karakter P1 (dari character selection)
             char_p2: Nama karakter P2 (dari character selection)
             arena: Nama arena (dari arena selection)
-            mode: 'pvp' (2 player) atau 'ai' (vs AI)
+            mode: 'pvp' (2 player), 'ai' (vs AI), atau 'cpu' (AI vs AI)
+            dirty_rects: True untuk render dirty-rect, None = ikut env
+                         PYFIGHTER_DIRTY_RECTS
+            seed: Seed RNG simulasi (None = acak)
+            record: True untuk merekam replay, None = ikut env PYFIGHTER_REPLAYS
+                    (default aktif, '0' = mati)
+            render_fps: Batas FPS render (0 / negatif = uncapped), None = ikut env
+                        PYFIGHTER_RENDER_FPS (default FPS, juga jika env bukan int)
+            vsync: True untuk render ikut refresh display, None = ikut env
+                   PYFIGHTER_VSYNC
+            time_scale: Kecepatan simulasi (1.0 = normal, <1 slow motion, >1 fast-forward)
         
         Dipanggil dari: menu.py
-        Membuat: Fighter P1, Fighter P2, AIController (jika mode AI)
+        Membuat: Fighter P1, Fighter P2, BattleSimulation (+ AIController jika mode AI)
         """
         # === INIT PYGAME ===
         pygame.init()
-        self.screen = pygame.display.set_mode((SCREEN_W, SCREEN_H))
+        if vsync is None:
+            vsync = os.environ.get('PYFIGHTER_VSYNC') == '1'
+        self.screen = None
+        if vsync:
+            try:
+                # vsync hanya didukung renderer SCALED / OpenGL
+                self.screen = pygame.display.set_mode((SCREEN_W, SCREEN_H), pygame.SCALED, vsync=1)
+            except pygame.error:
+                vsync = False
+        if self.screen is None:
+            self.screen = pygame.display.set_mode((SCREEN_W, SCREEN_H))
         pygame.display.set_caption("Py-Fighter")
         self.clock = pygame.time.Clock()
         
+        # === TIMING ===
+        # Simulasi selalu SIM_HZ; render_fps hanya membatasi frame yang digambar
+        if render_fps is None:
+            raw = os.environ.get('PYFIGHTER_RENDER_FPS', '')
+            try:
+                render_fps = int(raw) if raw else FPS
+            except ValueError:
+                # Env salah (mis. '60.0' / 'uncapped') tidak boleh menghentikan battle
+                print(f"[battle] PYFIGHTER_RENDER_FPS={raw!r} bukan bilangan bulat; "
+                      f"memakai {FPS} (0 = uncapped)")
+                render_fps = FPS
+        render_fps = max(0, render_fps)     # Negatif = uncapped, sama seperti 0
+        self.vsync = vsync
+        self.render_fps = 0 if vsync else render_fps    # vsync: flip yang menahan
+        self.time_scale = time_scale
+        self.dropped_ticks = 0      # Tick yang di-drop karena frame terlalu lambat
+        self.timer = frame_timer('battle')  # NullTimer kecuali PYFIGHTER_TIMING(_CSV)
+        self.profiler = scene_profiler('battle')    # F9 / PYFIGHTER_PROFILE
+        
         # === SIMPAN CONFIG ===
         self.mode = mode
         self.p1_name = char_p1
         self.p2_name = char_p2
+        self.arena = arena
+        
+        # === AMBIL HASIL PREFETCH ===
+        # Sheet karakter & arena yang sudah di-decode di background thread
+        # (selama player di menu) masuk ke SPRITE_CACHE -> load di bawah jadi hit
+        PREFETCHER.collect(wait=True)
         
         # === LOAD BACKGROUND ===
         # Menggunakan file dari assets/arena/
         try:
             bg_path = ARENAS.get(arena, os.path.join(BASE_DIR, 'assets/arena/Keputih.png'))
-            self.bg = pygame.transform.scale(
-                pygame.image.load(bg_path).convert(),
-                (SCREEN_W, SCREEN_H)
-            )
+            self.bg = SPRITE_CACHE.get_image(bg_path, (SCREEN_W, SCREEN_H))
         except:
             self.bg = None  # Fallback: warna solid
         
+        # === FIGHTERS + SIMULASI ===
+        # Seed acak per match
+        if seed is None:
+            seed = random.getrandbits(64)
+        self.create_match(seed)
+        self.sim.timer = self.timer if self.timer.enabled else None
+        
+        # === RENDER STATE ===
+        # Dirty-rect: hanya area yang berubah yang digambar ulang & di-update
+        # (untuk mesin low-end / kiosk; aktifkan via PYFIGHTER_DIRTY_RECTS=1)
+        if dirty_rects is None:
+            dirty_rects = os.environ.get('PYFIGHTER_DIRTY_RECTS') == '1'
+        self.dirty_rects = dirty_rects
+        self.last_scene = None      # Scene frame sebelumnya (intro/fight/over)
+        self.prev_rects = []        # Bounding box sprite frame sebelumnya
+        self.prev_health = None     # HP semua fighter saat frame sebelumnya
+        self.tick_positions = None  # Fighter -> posisi hitbox sebelum tick terakhir
+        self.alpha = 1.0            # Posisi render antara tick lalu (0) dan sekarang (1)
+        
+        # === PARTIKEL (visual saja, di luar simulasi) ===
+        self.particles = ParticleSystem() if ParticleSystem is not None else None
+        self.fx_prev = None         # Fighter -> (HP, lompat, hidup) tick sebelumnya
+        
+        # === REPLAY ===
+        # Input tiap tick direkam ke REPLAY_DIR (override: PYFIGHTER_REPLAY_DIR)
+        if record is None:
+            record = os.environ.get('PYFIGHTER_REPLAYS') != '0'
+        self.record = record
+        self.recorder = None
+        self.start_recording()
+    
+    
+    def create_match(self, seed):
+        """
+        Buat fighter + simulasi (dipanggil sekali dari __init__)
+        
+        Args:
+            seed: Seed RNG simulasi
+        
+        Di-override oleh TeamBattle (team_battle.py) untuk battle 2-8 fighter
+        """
         # === BUAT FIGHTERS ===
         # create_fighter() adalah Factory Method
-        self.p1 = self.create_fighter(char_p1, 200, 450, False)   # P1 di kiri
-        self.p2 = self.create_fighter(char_p2, 1000, 450, True)   # P2 di kanan
+        p1 = self.create_fighter(self.p1_name, *SPAWN_P1, False)   # P1 di kiri
+        p2 = self.create_fighter(self.p2_name, *SPAWN_P2, True)    # P2 di kanan
         
-        # === SETUP AI (jika mode AI) ===
-        if mode == 'ai':
-            # AIController mengontrol P2, target adalah P1
-            self.ai = AIController(self.p2, self.p1)
-        else:
-            self.ai = None
+        # === SIMULASI (fisika, attack, animasi, AI, countdown) ===
+        # BattleSystem hanya membaca state-nya untuk render
+        # (mode 'ai': AIController mengontrol P2 dengan RNG milik simulasi)
+        self.sim = BattleSimulation(p1, p2, self.mode, seed, SCREEN_W, SCREEN_H)
+        self.p1 = self.sim.p1
+        self.p2 = self.sim.p2
+        self.ai = self.sim.ai
+        
+        # === SNAPSHOT ===
+        # State awal untuk rematch instan + slot save state (F5 / F6)
+        self.start_state = snapshot(self.sim)
+        self.saved_state = None
+    
+    
+    def field_fighters(self):
+        """Fighter yang digambar (urutan gambar), P1 lalu P2."""
+        return (self.p1, self.p2)
+    
+    
+    def winner_label(self):
+        """
+        Teks + warna victory screen
         
-        # === GAME STATE ===
-        self.round_over = False     # True jika ada pemenang
-        self.winner = None          # 1 atau 2
-        self.intro_count = 3        # Countdown sebelum mulai
-        self.last_count = pygame.time.get_ticks()
+        Returns:
+            tuple: (teks, warna)
+        """
+        if self.sim.winner == 1:
+            return f"{self.p1_name} WINS!", CYAN
+        return f"{self.p2_name} WINS!", ORANGE
+    
+    
+    def start_recording(self):
+        """
+        Mulai file replay baru dari state simulasi saat ini
+        
+        Dipanggil dari: __init__(), handle_state_key() (load state / rematch)
+        """
+        self.stop_recording()
+        if not self.record:
+            return
+        folder = os.environ.get('PYFIGHTER_REPLAY_DIR', REPLAY_DIR)
+        path = os.path.join(folder, replay_filename(self.p1_name, self.p2_name, self.sim.rng.state))
+        try:
+            self.recorder = ReplayWriter(path, self.sim, self.p1_name, self.p2_name, self.arena)
+        except OSError:
+            self.recorder = None    # Folder tidak bisa ditulis: main tanpa replay
+    
+    
+    def stop_recording(self):
+        """Tutup replay aktif (checksum state saat ini sebagai state akhir)."""
+        if self.recorder:
+            self.recorder.close(self.sim)
+            self.recorder = None
     
     
     def create_fighter(self, name, x, y, flip):
@@ -171,9 +302,10 @@ class BattleSystem:
         
         Proses:
             1. Ambil data dari CHARACTERS dict
-            2. Load semua sprite sheet dari folder
-            3. Potong sprite sheet jadi frames
-            4. Scale setiap frame
+            2. Ambil frames tiap animasi dari SPRITE_CACHE
+               (load, potong, dan scale hanya saat cache miss)
+            3. Ambil juga versi flipped (hadap kiri) dari cache
+            4. Ambil mask collision per frame dari COLLISION_MASKS
             5. Return Fighter dengan animations
         """
         # Ambil data karakter, default ke Samurai jika tidak ditemukan
@@ -182,40 +314,43 @@ class BattleSystem:
         )
         
         # === LOAD ANIMATIONS ===
+        # Frames diambil dari SPRITE_CACHE: decode + potong + scale hanya
+        # terjadi sekali per (karakter, animasi, scale), dipakai bersama
+        # oleh rematch dan mirror match
+        # Versi hadap kiri (flipped) juga diambil dari cache sekali di sini,
+        # jadi Fighter.draw() tidak membuat surface baru setiap frame
         animations = []
+        animations_flipped = []
+        loaded = True
         for file, num_frames in zip(files, frames):
             try:
-                # Load sprite sheet
-                sheet = pygame.image.load(f"{folder}/{file}").convert_alpha()
-                w = sheet.get_width() // num_frames  # Lebar per frame
-                h = sheet.get_height()
-                
-                # Potong menjadi frames individual
-                anim = []
-                for i in range(num_frames):
-                    frame = sheet.subsurface(i * w, 0, w, h)
-                    # Scale frame
-                    scaled = pygame.transform.scale(
-                        frame, 
-                        (int(w * scale), int(h * scale))
-                    )
-                    anim.append(scaled)
-                animations.append(anim)
+                path = f"{folder}/{file}"
+                animations.append(SPRITE_CACHE.get_frames(path, num_frames, scale))
+                animations_flipped.append(SPRITE_CACHE.get_mirrored(path, num_frames, scale))
                 
             except Exception:
-                # Fallback: dummy sprite pink
+                # Fallback: dummy sprite pink (simetris, tidak perlu di-flip)
                 dummy = pygame.Surface((100, 100), pygame.SRCALPHA)
                 dummy.fill((255, 0, 255))
+                loaded = False
                 animations.append([dummy] * num_frames)
+                animations_flipped.append([dummy] * num_frames)
+        
+        # === MASK COLLISION ===
+        # Mask sama persis dengan versi headless (replay / netplay tetap sinkron):
+        # dari pack / cache, atau dibangun dari frame yang baru dimuat.
+        # Sprite dummy tidak dipakai - get() akan gagal load dan kembali ke hitbox kotak
+        collision = COLLISION_MASKS.get(folder, scale, offset, files, frames, HITBOX_W,
+                                        animations if loaded else None)
         
         # === RETURN FIGHTER INSTANCE ===
         # Fighter class ada di fighter_base.py
         return Fighter(name, x, y, flip, 
                       {'scale': scale, 'offset': offset}, 
-                      animations)
+                      animations, animations_flipped, collision)
     
     
-    def draw_health_bar(self, health, x, y, color):
+    def draw_health_bar(self, health, x, y, color, width=400, height=30):
         """
         Gambar health bar ke layar
         
@@ -223,15 +358,16 @@ class BattleSystem:
             health: HP saat ini (0-100)
             x, y: Posisi bar
             color: Warna bar HP
+            width, height: Ukuran bar (default bar 1v1)
         """
         # Background (gelap)
-        pygame.draw.rect(self.screen, (50, 50, 50), (x-2, y-2, 404, 34))
+        pygame.draw.rect(self.screen, (50, 50, 50), (x-2, y-2, width + 4, height + 4))
         # Base (abu-abu)
-        pygame.draw.rect(self.screen, (200, 200, 200), (x, y, 400, 30))
+        pygame.draw.rect(self.screen, (200, 200, 200), (x, y, width, height))
         # HP bar (warna sesuai health)
-        pygame.draw.rect(self.screen, color, (x, y, 400 * health / 100, 30))
+        pygame.draw.rect(self.screen, color, (x, y, width * health / 100, height))
         # Border
-        pygame.draw.rect(self.screen, (0, 0, 0), (x, y, 400, 30), 3)
+        pygame.draw.rect(self.screen, (0, 0, 0), (x, y, width, height), 3)
     
     
     def draw_ui(self):
@@ -263,128 +399,398 @@ class BattleSystem:
         self.draw_health_bar(self.p2.health, SCREEN_W - 450, 50, c2)
         
         # === GAMBAR NAMA ===
-        font = pygame.font.Font(None, 32)
+        # Label statis -> diambil dari cache teks (render sekali saja)
+        p1_label = "CPU" if self.mode == 'cpu' else "P1"
         self.screen.blit(
-            font.render(f"P1: {self.p1_name}", True, CYAN), 
+            render_text(f"{p1_label}: {self.p1_name}", 32, CYAN), 
             (50, 20)
         )
-        p2_label = "AI" if self.mode == 'ai' else "P2"
+        p2_label = "AI" if self.mode in ('ai', 'cpu') else "P2"
         self.screen.blit(
-            font.render(f"{p2_label}: {self.p2_name}", True, ORANGE), 
+            render_text(f"{p2_label}: {self.p2_name}", 32, ORANGE), 
             (SCREEN_W - 450, 20)
         )
     
     
+    def draw_positions(self, fighters):
+        """
+        Posisi gambar tiap fighter: interpolasi linear antara tick lalu dan sekarang
+        
+        Args:
+            fighters: Hasil field_fighters()
+        
+        Returns:
+            list: (x, y) posisi hitbox per fighter untuk Fighter.draw()
+        
+        Lompatan besar (load state, rematch, seek) dan fighter yang baru masuk
+        arena tidak diinterpolasi
+        """
+        now = [f.rect.topleft for f in fighters]
+        prev = self.tick_positions
+        if prev is None or self.alpha >= 1.0:
+            return now
+        a = self.alpha
+        positions = []
+        for f, (x, y) in zip(fighters, now):
+            px, py = prev.get(f, (x, y))
+            if abs(x - px) <= MAX_LERP and abs(y - py) <= MAX_LERP:
+                positions.append((round(px + (x - px) * a), round(py + (y - py) * a)))
+            else:
+                positions.append((x, y))
+        return positions
+    
+    
+    def render_full(self, in_intro):
+        """
+        Gambar ulang seluruh layar lalu update seluruh display
+        
+        Args:
+            in_intro: True jika masih countdown (tampilkan angka)
+        """
+        timer = self.timer
+        
+        # === DRAW BACKGROUND ===
+        if self.bg:
+            self.screen.blit(self.bg, (0, 0))
+        else:
+            self.screen.fill((50, 50, 50))
+        timer.mark('draw_bg')
+        
+        # === TEKS COUNTDOWN ===
+        if in_intro:
+            txt = str(self.sim.intro_count) if self.sim.intro_count > 0 else "FIGHT!"
+            color = YELLOW if self.sim.intro_count > 0 else RED
+            text = render_text(txt, 200, color)
+            self.screen.blit(text, text.get_rect(center=(SCREEN_W//2, SCREEN_H//2)))
+            timer.mark('draw_ui')
+        
+        # === DRAW FIGHTERS ===
+        fighters = self.field_fighters()
+        positions = self.draw_positions(fighters)
+        for fighter, pos in zip(fighters, positions):
+            fighter.draw(self.screen, pos)
+        timer.mark('draw_fighters')
+        self.draw_effects()
+        timer.mark('effects')
+        
+        # === DRAW UI ===
+        self.draw_ui()
+        
+        # === VICTORY SCREEN ===
+        if self.sim.round_over:
+            # Overlay gelap
+            overlay = pygame.Surface((SCREEN_W, SCREEN_H), pygame.SRCALPHA)
+            overlay.fill((0, 0, 0, 150))
+            self.screen.blit(overlay, (0, 0))
+            
+            # Teks pemenang
+            label, color = self.winner_label()
+            text = render_text(label, 100, color)
+            self.screen.blit(text, text.get_rect(center=(SCREEN_W//2, SCREEN_H//2 - 50)))
+            
+            # Instruksi
+            self.screen.blit(
+                render_text("Press ESC to return", 50, WHITE),
+                (SCREEN_W//2 - 150, SCREEN_H//2 + 50)
+            )
+            text = render_text("Press ENTER for rematch", 40, WHITE)
+            self.screen.blit(text, text.get_rect(center=(SCREEN_W//2, SCREEN_H//2 + 120)))
+        timer.mark('draw_ui')
+        timer.draw(self.screen)     # Overlay timing (F3)
+        
+        # === UPDATE DISPLAY ===
+        pygame.display.update()
+        timer.mark('display')
+        
+        # Catat kondisi frame ini sebagai dasar dirty-rect frame berikutnya
+        # Termasuk effect_rects() (sama dengan render_dirty): effect dari full redraw
+        # ini dipulihkan di frame dirty pertama sesudahnya
+        self.prev_rects = ([f.get_draw_rect(pos) for f, pos in zip(fighters, positions)]
+                           + self.effect_rects())
+        self.prev_health = tuple(f.health for f in fighters)
+    
+    
+    def render_dirty(self):
+        """
+        Mode dirty-rect: pulihkan hanya area yang berubah dari background
+        
+        Area kotor:
+            - Bounding box sprite tiap fighter (posisi frame lalu + sekarang)
+            - Area effect_rects() (projectile, dll.) frame lalu + sekarang
+            - Area HUD (nama + health bar) jika HP berubah atau
+              tertimpa area sprite; jika tidak, HUD tidak digambar ulang
+        
+        Hanya list rect tersebut yang dikirim ke display.update()
+        """
+        fighters = self.field_fighters()
+        positions = self.draw_positions(fighters)
+        rects = [f.get_draw_rect(pos) for f, pos in zip(fighters, positions)]
+        rects.extend(self.effect_rects())
+        dirty = self.prev_rects + rects
+        
+        # HUD digambar sekaligus oleh draw_ui(): jika salah satu bagian kotor,
+        # semua area dipulihkan agar teks tidak di-blend berulang kali
+        health = tuple(f.health for f in fighters)
+        hud_dirty = health != self.prev_health or any(
+            hud.collidelist(dirty) != -1 for hud in self.hud_rects
+        )
+        if hud_dirty:
+            dirty.extend(self.hud_rects)
+        
+        # === PULIHKAN BACKGROUND DI AREA KOTOR ===
+        screen_rect = self.screen.get_rect()
+        dirty = [r.clip(screen_rect) for r in dirty]
+        for r in dirty:
+            if self.bg:
+                self.screen.blit(self.bg, r, r)
+            else:
+                self.screen.fill((50, 50, 50), r)
+        self.timer.mark('draw_bg')
+        
+        # === GAMBAR ULANG FIGHTERS & UI ===
+        for fighter, pos in zip(fighters, positions):
+            fighter.draw(self.screen, pos)
+        self.timer.mark('draw_fighters')
+        self.draw_effects()
+        self.timer.mark('effects')
+        if hud_dirty:
+            self.draw_ui()
+        self.timer.mark('draw_ui')
+        
+        pygame.display.update(dirty)
+        self.timer.mark('display')
+        self.prev_rects = rects
+        self.prev_health = health
+    
+    
+    def update_effects(self):
+        """
+        Spawn partikel dari perubahan state fighter tick ini, lalu update partikel
+        
+        Event (dibanding tick sebelumnya):
+            - HP turun      -> hit_spark di sisi depan fighter yang terkena
+            - Mendarat      -> landing_dust di kaki
+            - Baru KO       -> ko_burst di tengah badan
+        """
+        particles = self.particles
+        if particles is None:
+            return
+        prev = self.fx_prev or {}
+        state = {}
+        for fighter in self.field_fighters():
+            alive = fighter.alive
+            state[fighter] = (fighter.health, fighter.jump, alive)
+            if fighter not in prev:
+                continue
+            health, jump, was_alive = prev[fighter]
+            rect = fighter.rect
+            if fighter.health < health:
+                direction = 1 if fighter.flip else -1   # Percikan menjauhi penyerang
+                particles.emit('hit_spark', rect.centerx - direction * 25, rect.y + 70, direction)
+            if jump and not fighter.jump and alive:
+                particles.emit('landing_dust', rect.centerx, rect.bottom)
+            if was_alive and not alive:
+                particles.emit('ko_burst', rect.centerx, rect.centery)
+        self.fx_prev = state
+        particles.update()
+    
+    
+    def draw_effects(self):
+        """Gambar efek di atas fighter (partikel; TeamBattle menambah projectile)."""
+        if self.particles is not None:
+            self.particles.draw(self.screen)
+    
+    
+    def effect_rects(self):
+        """
+        Area layar yang akan ditimpa draw_effects() frame ini (mode dirty-rect)
+        
+        Returns:
+            list: Rect (satu rect pembungkus semua partikel, atau kosong)
+        """
+        if self.particles is None:
+            return []
+        return self.particles.bounds()
+    
+    
+    def reset_effects(self):
+        """Buang partikel & event state setelah state simulasi diganti (load / rematch / seek)."""
+        self.fx_prev = None
+        if self.particles is not None:
+            self.particles.clear()
+    
+    
+    def handle_state_key(self, key):
+        """
+        Save state / load state / rematch lewat snapshot.py
+        
+        Args:
+            key: Tombol yang ditekan (event KEYDOWN)
+        
+        Tombol:
+            F5: Simpan state match saat ini
+            F6: Kembali ke state yang disimpan
+            REMATCH_KEY / Enter (setelah ada pemenang): Rematch dari state awal
+                (seed RNG baru)
+        """
+        if key == pygame.K_F5:
+            self.saved_state = snapshot(self.sim)
+            return
+        if key == pygame.K_F6 and self.saved_state is not None:
+            self.stop_recording()   # Replay lama ditutup dengan state sebelum load
+            restore(self.sim, self.saved_state)
+        elif key == REMATCH_KEY and self.sim.round_over:
+            self.stop_recording()
+            restore(self.sim, self.start_state)
+            self.sim.rng.setstate(random.getrandbits(64))
+        else:
+            return
+        self.last_scene = None      # Paksa full redraw setelah state berubah
+        self.tick_positions = None  # Tanpa interpolasi dari state lama
+        self.reset_effects()
+        self.start_recording()      # Timeline baru -> file replay baru
+    
+    
+    def handle_timing_key(self, key):
+        """
+        F3: tampilkan / sembunyikan overlay timing per fase (frame_timing.py)
+        
+        Saat timer mati, instrumentasi simulasi juga dilepas (sim.timer = None)
+        """
+        if key != TIMING_KEY:
+            return
+        self.timer = self.timer.toggled()
+        self.sim.timer = self.timer if self.timer.enabled else None
+        self.last_scene = None      # Full redraw (overlay tidak ikut dirty-rect)
+    
+    
+    def handle_speed_key(self, key):
+        """
+        Ubah time scale simulasi
+        
+        Tombol:
+            [ : lebih lambat (slow motion, min 0.25x)
+            ] : lebih cepat (fast-forward, maks 8x - beberapa tick per frame)
+            = : kembali normal (1x)
+        """
+        if key == pygame.K_EQUALS:
+            self.time_scale = 1.0
+            return
+        faster = [s for s in TIME_SCALES if s > self.time_scale]
+        slower = [s for s in TIME_SCALES if s < self.time_scale]
+        if key == pygame.K_RIGHTBRACKET and faster:
+            self.time_scale = faster[0]
+        elif key == pygame.K_LEFTBRACKET and slower:
+            self.time_scale = slower[-1]
+    
+    
+    def advance(self, key):
+        """
+        Jalankan simulasi untuk satu frame dari keyboard lokal
+        
+        Keyboard dibaca per slot player (P1 = WASD + R/T/Y, P2 = Arrow + Numpad),
+        lalu satu tick simulasi dijalankan dan input-nya direkam ke replay.
+        Di-override oleh NetplayBattle (netplay.py) untuk input jaringan + rollback
+        dan oleh ReplayBattle (replay.py) untuk input dari rekaman.
+        
+        Args:
+            key: Hasil pygame.key.get_pressed()
+        
+        Returns:
+            bool: True jika masih countdown intro
+        """
+        in_intro = self.sim.step(keys_to_input(key, 0), keys_to_input(key, 1))
+        if self.recorder:
+            self.recorder.record(*self.sim.last_inputs)
+            if self.sim.round_over:
+                self.stop_recording()   # Match selesai: tulis checksum akhir
+        return in_intro
+    
+    
     def run(self):
         """
         Main Game Loop - Inti dari game
         
-        Loop:
-            1. Handle events (quit, escape)
-            2. Draw background
-            3. Jika countdown: tampilkan angka
-            4. Jika game aktif:
-               - Update P1 (keyboard input)
-               - Update P2 (keyboard/AI)
-               - Cek pemenang
-            5. Draw fighters dan UI
-            6. Jika ada pemenang: tampilkan victory
+        Loop (satu iterasi = satu frame render):
+            1. Handle events (quit, escape, F5/F6 save/load state, Enter rematch,
+               [ / ] / = time scale, F3 overlay timing, F9 profiler)
+            2. Accumulator += waktu frame x time_scale; selama >= SIM_DT:
+               baca keyboard -> bitmask input, jalankan 1 tick BattleSimulation
+               (maks MAX_FRAME_STEPS x time_scale tick; sisa waktu di-drop)
+            3. Render state simulasi dengan posisi fighter diinterpolasi
+               (alpha = sisa accumulator / SIM_DT): full redraw, atau dirty-rect
+               saat fight berjalan (hanya area fighter & HUD yang berubah)
+            4. Jika ada pemenang: tampilkan victory (selalu full redraw)
+        
+        Timing per fase (events, input, ai, physics, draw_bg, draw_fighters,
+        draw_ui, display) dicatat self.timer; no-op jika tidak aktif
         
         Returns:
             bool: True untuk kembali ke menu
         
         Dipanggil dari: menu.py setelah create BattleSystem
         """
+        accumulator = SIM_DT        # Frame pertama langsung menjalankan satu tick
+        in_intro = True
+        last = time.perf_counter()
         while True:
-            self.clock.tick(FPS)  # Limit 60 FPS
+            self.clock.tick(self.render_fps)  # 0 = uncapped / vsync
+            self.timer.frame()
+            self.profiler.frame()
+            now = time.perf_counter()
+            accumulator += (now - last) * self.time_scale
+            last = now
             
             # === HANDLE EVENTS ===
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
+                    self.stop_recording()
+                    self.timer.close()
+                    self.profiler.close()
                     pygame.quit()
                     sys.exit()
                 if event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_ESCAPE:
+                        self.stop_recording()
+                        self.timer.close()
+                        self.profiler.close()
                         return True  # Kembali ke menu
+                    self.handle_state_key(event.key)
+                    self.handle_speed_key(event.key)
+                    self.handle_timing_key(event.key)
+                    self.profiler.handle_key(event.key)
+            self.timer.mark('events')
             
-            # === DRAW BACKGROUND ===
-            if self.bg:
-                self.screen.blit(self.bg, (0, 0))
-            else:
-                self.screen.fill((50, 50, 50))
-            
-            # === INTRO COUNTDOWN ===
-            if self.intro_count > 0:
-                # Kurangi countdown setiap 1 detik
-                if pygame.time.get_ticks() - self.last_count > 1000:
-                    self.intro_count -= 1
-                    self.last_count = pygame.time.get_ticks()
-                
-                # Tampilkan angka countdown
-                font = pygame.font.Font(None, 200)
-                txt = str(self.intro_count) if self.intro_count > 0 else "FIGHT!"
-                color = YELLOW if self.intro_count > 0 else RED
-                text = font.render(txt, True, color)
-                self.screen.blit(text, text.get_rect(center=(SCREEN_W//2, SCREEN_H//2)))
+            # === INPUT -> SIMULASI (tick tetap) ===
+            # Keyboard dibaca sekali per frame, dipakai semua tick frame ini
+            key = pygame.key.get_pressed()
+            self.timer.mark('input')
+            max_steps = max(1, int(MAX_FRAME_STEPS * max(1.0, self.time_scale)))
+            steps = 0
+            while accumulator >= SIM_DT:
+                if steps == max_steps:
+                    # Frame terlalu lambat: buang sisa waktu (game tidak melambat)
+                    self.dropped_ticks += int(accumulator / SIM_DT)
+                    accumulator %= SIM_DT
+                    break
+                self.tick_positions = {f: f.rect.topleft for f in self.field_fighters()}
+                in_intro = self.advance(key)
+                self.update_effects()
+                self.timer.mark('effects')
+                accumulator -= SIM_DT
+                steps += 1
+            self.alpha = accumulator / SIM_DT
             
+            # === RENDER ===
+            # Dirty-rect hanya saat scene fight sudah stabil; pergantian scene
+            # (countdown -> fight) dan victory overlay selalu full redraw
+            scene = 'intro' if in_intro else ('over' if self.sim.round_over else 'fight')
+            if (self.dirty_rects and scene == 'fight' and self.last_scene == 'fight'
+                    and not self.timer.overlay):
+                self.render_dirty()
             else:
-                # === GAME LOGIC ===
-                
-                # P1 selalu pakai keyboard
-                # move() ada di fighter_base.py
-                self.p1.move(SCREEN_W, SCREEN_H, self.p2, self.round_over)
-                
-                # P2: AI atau keyboard
-                if self.ai:
-                    # AI update -> ai_move()
-                    self.ai.update(SCREEN_W, SCREEN_H, self.round_over)
-                else:
-                    # Keyboard P2
-                    self.p2.move(SCREEN_W, SCREEN_H, self.p1, self.round_over)
-                
-                # Update animasi
-                self.p1.update()
-                self.p2.update()
-                
-                # === CEK PEMENANG ===
-                if not self.round_over:
-                    if not self.p1.alive:
-                        self.round_over = True
-                        self.winner = 2
-                    elif not self.p2.alive:
-                        self.round_over = True
-                        self.winner = 1
-            
-            # === DRAW FIGHTERS ===
-            self.p1.draw(self.screen)
-            self.p2.draw(self.screen)
-            
-            # === DRAW UI ===
-            self.draw_ui()
-            
-            # === VICTORY SCREEN ===
-            if self.round_over:
-                # Overlay gelap
-                overlay = pygame.Surface((SCREEN_W, SCREEN_H), pygame.SRCALPHA)
-                overlay.fill((0, 0, 0, 150))
-                self.screen.blit(overlay, (0, 0))
-                
-                # Teks pemenang
-                font = pygame.font.Font(None, 100)
-                winner_name = self.p1_name if self.winner == 1 else self.p2_name
-                color = CYAN if self.winner == 1 else ORANGE
-                text = font.render(f"{winner_name} WINS!", True, color)
-                self.screen.blit(text, text.get_rect(center=(SCREEN_W//2, SCREEN_H//2 - 50)))
-                
-                # Instruksi
-                font2 = pygame.font.Font(None, 50)
-                self.screen.blit(
-                    font2.render("Press ESC to return", True, WHITE),
-                    (SCREEN_W//2 - 150, SCREEN_H//2 + 50)
-                )
-            
-            # === UPDATE DISPLAY ===
-            pygame.display.update()
+                self.render_full(in_intro)
+            self.last_scene = scene
         
         return True
 
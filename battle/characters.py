@@ -0,0 +1,86 @@
+"""
+FILE: characters.py
+DESKRIPSI: Data karakter dan arena (tanpa pygame), dipakai bersama oleh layar battle
+           dan simulasi headless
+DIGUNAKAN OLEH: battle_system.py (load sprite & background), simulation.py (fighter headless)
+MENGGUNAKAN: -
+
+ALUR PROGRAM:
+1. CHARACTERS menyimpan folder sprite, scale, offset, file & jumlah frame
+2. PROJECTILES menyimpan serangan jarak jauh karakter (dipakai TeamSimulation)
+3. ARENAS menyimpan path background tiap arena
+4. battle_system.py meng-import ulang keduanya (nama lama tetap berlaku)
+"""
+import os
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# === DATA KARAKTER ===
+# Format: 'Nama': (folder, scale, [offset_x, offset_y], [files...], [frame_counts...])
+# Files: Idle, Run, Jump, Attack1, Attack2, Attack3, Hurt, Dead
+CHARACTERS = {
+    'Samurai': (
+        os.path.join(BASE_DIR, 'assets/character/Samurai'),     # Folder sprite
+        2.5,                            # Scale sprite
+        [40, 30],                       # Offset [x, y]
+        ['Idle.png', 'Run.png', 'Jump.png', 'Attack_1.png', 
+         'Attack_2.png', 'Attack_3.png', 'Hurt.png', 'Dead.png'],
+        [6, 8, 12, 6, 4, 3, 2, 3]       # Jumlah frame tiap animasi
+    ),
+    'Shinobi': (
+        os.path.join(BASE_DIR, 'assets/character/Shinobi'), 2.5, [40, 30],
+        ['Idle.png', 'Run.png', 'Jump.png', 'Attack_1.png', 
+         'Attack_2.png', 'Attack_3.png', 'Hurt.png', 'Dead.png'],
+        [6, 8, 12, 5, 3, 4, 2, 4]
+    ),
+    'Fighter': (
+        os.path.join(BASE_DIR, 'assets/character/Fighter'), 2.5, [40, 30],
+        ['Idle.png', 'Run.png', 'Jump.png', 'Attack_1.png', 
+         'Attack_2.png', 'Attack_3.png', 'Hurt.png', 'Dead.png'],
+        [6, 8, 10, 4, 3, 4, 3, 3]
+    ),
+    'Converted Vampire': (
+        os.path.join(BASE_DIR, 'assets/character/Vampire1'), 2.0, [60, 50],
+        ['Idle.png', 'Run.png', 'Jump.png', 'Attack_1.png', 
+         'Attack_2.png', 'Attack_3.png', 'Hurt.png', 'Dead.png'],
+        [5, 8, 7, 5, 3, 4, 1, 8]
+    ),
+    'Countess Vampire': (
+        os.path.join(BASE_DIR, 'assets/character/Vampire2'), 2.0, [60, 50],
+        ['Idle.png', 'Run.png', 'Jump.png', 'Attack_1.png', 
+         'Attack_2.png', 'Attack_3.png', 'Hurt.png', 'Dead.png'],
+        [5, 6, 6, 6, 3, 1, 2, 8]
+    ),
+    'Vampire Girl': (
+        os.path.join(BASE_DIR, 'assets/character/Vampire3'), 2.0, [60, 50],
+        ['Idle.png', 'Run.png', 'Jump.png', 'Attack_1.png', 
+         'Attack_2.png', 'Attack_3.png', 'Hurt.png', 'Dead.png'],
+        [5, 6, 6, 5, 4, 2, 2, 10]
+    ),
+}
+
+
+# === DATA PROJECTILE ===
+# Format: 'Nama': (attack, file, frames, [w, h], [muzzle_x, muzzle_y], speed, life, damage)
+# attack: attack_type (1-3) yang menembak projectile (menggantikan hit melee serangan itu)
+# muzzle: titik tembak relatif tengah atas hitbox, x ke arah hadap
+PROJECTILES = {
+    'Countess Vampire': (
+        3,                              # Attack 3: tangan terjulur ke depan
+        'Blood_Charge_1.png', 3,        # Sprite (folder karakter) & jumlah frame
+        [48, 20],                       # Hitbox projectile
+        [58, 100],                      # Ujung tangan pose Attack 3
+        14, 70, 10                      # Pixel/tick, umur (tick), damage
+    ),
+}
+
+
+# === DATA ARENA ===
+# Format: 'Nama Arena': 'path/to/background.png'
+ARENAS = {
+    'Keputih': os.path.join(BASE_DIR, 'assets/arena/Keputih.png'),
+    'San Antonio': os.path.join(BASE_DIR, 'assets/arena/SanAntonio.png'),
+    'Taman Apsari': os.path.join(BASE_DIR, 'assets/arena/TamanApsari.png'),
+    'Tunjungan': os.path.join(BASE_DIR, 'assets/arena/Tunjungan.png')
+}
@@ -5,16 +5,77 @@ MENGGUNAKAN: pygame (untuk rendering dan input)
 
 ALUR PROGRAM:
 1. BattleSystem membuat Fighter via create_fighter()
-2. Setiap frame, Fighter.move() atau Fighter.ai_move() dipanggil
-3. Fighter.update() mengupdate animasi berdasarkan state
-4. Fighter.draw() menggambar karakter ke layar
+2. Setiap tick, BattleSimulation memanggil Fighter.step() dengan bitmask input
+   (dari keyboard via keys_to_input() atau dari AIController)
+3. Fighter.update() mengupdate animasi berdasarkan state (jam dalam tick)
+4. Fighter.resolve_attack() mengecek hit pada frame attack yang aktif
+   (mask per frame dari collision_masks.py: AABB dulu, lalu overlap pixel)
+5. Fighter.draw() menggambar karakter ke layar
 
 - Encapsulation: Semua atribut karakter dibungkus dalam class
-- Method: move(), ai_move(), attack(), update(), draw()
+- Method: step(), move(), ai_move(), attack(), update(), resolve_attack(), hurt_by(), draw()
 """
 import pygame
 
 
+# === KONSTANTA GAMEPLAY (per tick, 60 tick/detik) ===
+SPEED = 10              # Kecepatan gerak horizontal (pixel/tick)
+GRAVITY = 2             # Percepatan jatuh (untuk jump)
+JUMP_VELOCITY = -30     # Kecepatan awal lompat
+ATTACK_COOLDOWN = 20    # Delay antar serangan (tick)
+ATTACK_DAMAGE = 10      # HP yang dikurangi tiap serangan kena
+ANIMATION_TICKS = 3     # Frame animasi maju jika sudah LEBIH dari 3 tick (~50ms)
+HITBOX_W, HITBOX_H = 80, 180    # Ukuran hitbox karakter
+ATTACK_W = int(HITBOX_W * 1.5)  # Lebar hitbox serangan
+FLOOR_OFFSET = 110      # Jarak lantai dari bawah layar
+
+# === INPUT BITMASK ===
+# Input satu tick = gabungan bit di bawah (dipakai simulasi, AI, replay)
+INPUT_LEFT = 1
+INPUT_RIGHT = 2
+INPUT_JUMP = 4
+INPUT_ATTACK1 = 8
+INPUT_ATTACK2 = 16
+INPUT_ATTACK3 = 32
+INPUT_ATTACKS = (INPUT_ATTACK1, INPUT_ATTACK2, INPUT_ATTACK3)
+INPUT_NAMES = {
+    'left': INPUT_LEFT, 'right': INPUT_RIGHT, 'jump': INPUT_JUMP,
+    'attack1': INPUT_ATTACK1, 'attack2': INPUT_ATTACK2, 'attack3': INPUT_ATTACK3,
+}
+
+# Key binding per player: (kiri, kanan, lompat, [attack 1, 2, 3])
+KEY_BINDINGS = (
+    (pygame.K_a, pygame.K_d, pygame.K_w, (pygame.K_r, pygame.K_t, pygame.K_y)),       # P1
+    (pygame.K_LEFT, pygame.K_RIGHT, pygame.K_UP,
+     (pygame.K_KP1, pygame.K_KP2, pygame.K_KP3)),                                      # P2
+)
+
+
+def keys_to_input(key, player):
+    """
+    Ubah status keyboard menjadi bitmask input
+    
+    Args:
+        key: Hasil pygame.key.get_pressed()
+        player: 0 = P1 (WASD + R/T/Y), 1 = P2 (Arrow + Numpad 1/2/3)
+    
+    Returns:
+        int: Bitmask INPUT_*
+    """
+    left, right, up, atk_keys = KEY_BINDINGS[player]
+    inputs = 0
+    if key[left]:
+        inputs |= INPUT_LEFT
+    if key[right]:
+        inputs |= INPUT_RIGHT
+    if key[up]:
+        inputs |= INPUT_JUMP
+    for bit, k in zip(INPUT_ATTACKS, atk_keys):
+        if key[k]:
+            inputs |= bit
+    return inputs
+
+
 class Fighter:
     """
     Class Fighter - Representasi karakter yang bisa bertarung
@@ -24,10 +85,13 @@ class Fighter:
         rect (Rect): Posisi dan ukuran hitbox karakter
         health (int): HP karakter (0-100)
         alive (bool): Status hidup/mati
-        animations (list): Kumpulan sprite animasi
+        animations (list): Kumpulan sprite animasi (hadap kanan)
+        animations_flipped (list): Sprite animasi yang sama, hadap kiri
+        collision (tuple): Mask hit/hurt per [arah][action][frame] (None = hitbox kotak)
     """
     
-    def __init__(self, name, x, y, flip, data, animations):
+    def __init__(self, name, x, y, flip, data, animations, animations_flipped=None,
+                 collision=None):
         """
         Constructor - Dipanggil saat membuat Fighter baru
         
@@ -37,6 +101,9 @@ class Fighter:
             flip: True jika menghadap kiri (P2)
             data: Dictionary berisi scale dan offset sprite
             animations: List of sprite frames untuk setiap action
+            animations_flipped: Frames hadap kiri (None = dibuat saat draw pertama)
+            collision: Hasil COLLISION_MASKS.get() (None = hit dicek dengan hitbox
+                       kotak saat attack dimulai)
         
         Dipanggil dari: BattleSystem.create_fighter()
         """
@@ -44,11 +111,13 @@ class Fighter:
         self.name = name
         self.flip = flip                    # True = hadap kiri, False = hadap kanan
         self.animations = animations        # Sprite animations dari battle_system.py
+        self.animations_flipped = animations_flipped    # Versi hadap kiri (pre-flipped)
+        self.collision = collision          # Mask per frame, index [flip][action][frame]
         self.scale = data['scale']
         self.offset = data['offset']        # Offset untuk positioning sprite
         
         # === POSISI & FISIKA ===
-        self.rect = pygame.Rect(x, y, 80, 180)  # Hitbox karakter (x, y, width, height)
+        self.rect = pygame.Rect(x, y, HITBOX_W, HITBOX_H)  # Hitbox karakter
         self.vel_y = 0                          # Kecepatan vertikal (untuk jump)
         
         # === STATUS KARAKTER ===
@@ -59,13 +128,19 @@ class Fighter:
         self.attacking = False      # True jika sedang animasi attack
         self.attack_type = 0        # 1=Attack1, 2=Attack2, 3=Attack3
         self.attack_cooldown = 0    # Delay antar serangan (dalam frames)
+        self.attack_hit = False     # True jika serangan saat ini sudah kena (sekali per attack)
         self.hit = False            # True jika baru terkena serangan
+        self.hits_landed = 0        # Jumlah serangan yang kena lawan (statistik)
+        self.ranged_attack = 0      # attack_type yang menembak projectile (0 = semua melee)
+        self.shot_pending = False   # True: serangan jarak jauh baru dimulai, belum ditembak
         
         # === ANIMASI ===
         self.action = 0             # Index animasi saat ini (0=idle, 1=run, dst)
         self.frame_index = 0        # Frame ke-berapa dalam animasi
         self.image = self.animations[0][0]  # Sprite yang sedang ditampilkan
-        self.update_time = pygame.time.get_ticks()  # Waktu update frame terakhir
+        self.image_frame = 0                # Index frame dari self.image
+        self.ticks = 0              # Jumlah update() (jam animasi, dalam tick)
+        self.update_time = 0        # Tick saat frame animasi terakhir berganti
     
     
     def move(self, screen_w, screen_h, target, round_over):
@@ -81,96 +156,94 @@ class Fighter:
             P1 (flip=False): WASD + R/T/Y untuk attack
             P2 (flip=True): Arrow keys + Numpad 1/2/3 untuk attack
         
-        Dipanggil dari: BattleSystem.run() setiap frame
+        Dipanggil dari: kode lama yang membaca keyboard langsung
+        (BattleSystem sekarang memakai keys_to_input() + BattleSimulation)
         """
-        SPEED = 10      # Kecepatan gerak horizontal (pixel/frame)
-        GRAVITY = 2     # Kecepatan jatuh (untuk jump)
-        dx, dy = 0, 0   # Perpindahan frame ini
+        key = pygame.key.get_pressed()
+        inputs = keys_to_input(key, 1 if self.flip else 0)
+        self.step(screen_w, screen_h, target, round_over, inputs)
+    
+    
+    def ai_move(self, screen_w, screen_h, target, round_over, ai_input):
+        """
+        Handle gerakan dari dictionary input (format lama AIController)
+        
+        Args:
+            ai_input: Dictionary berisi:
+                      {'left': bool, 'right': bool, 'jump': bool,
+                       'attack1': bool, 'attack2': bool, 'attack3': bool}
+        """
+        inputs = 0
+        for name, bit in INPUT_NAMES.items():
+            if ai_input.get(name):
+                inputs |= bit
+        self.step(screen_w, screen_h, target, round_over, inputs)
+    
+    
+    def step(self, screen_w, screen_h, target, round_over, inputs, others=None):
+        """
+        Satu tick logika dari input eksplisit (tanpa baca keyboard / jam)
+        
+        Args:
+            screen_w, screen_h: Ukuran layar (untuk batas gerak)
+            target: Fighter lawan yang dihadap (untuk collision & attack),
+                    None jika tidak ada lawan tersisa
+            round_over: True jika pertandingan sudah selesai
+            inputs: Bitmask INPUT_* (left/right/jump/attack1-3)
+            others: Fighter yang badannya menghalangi (None = hanya target);
+                    battle N fighter mengisinya dari query spatial grid
+        
+        Dipanggil dari: BattleSimulation.step(), TeamSimulation.step(), move(), ai_move()
+        """
+        dx, dy = 0, 0   # Perpindahan tick ini
         self.running = False
         
         # Hanya bisa bergerak jika tidak sedang attack dan masih hidup
         if not self.attacking and self.alive and not round_over:
             self.attack_type = 0
-            key = pygame.key.get_pressed()
-            
-            # === TENTUKAN KONTROL BERDASARKAN PLAYER ===
-            if not self.flip:  # Player 1 (kiri)
-                left, right, up = pygame.K_a, pygame.K_d, pygame.K_w
-                atk_keys = [pygame.K_r, pygame.K_t, pygame.K_y]  # Attack 1, 2, 3
-            else:              # Player 2 (kanan)
-                left, right, up = pygame.K_LEFT, pygame.K_RIGHT, pygame.K_UP
-                atk_keys = [pygame.K_KP1, pygame.K_KP2, pygame.K_KP3]  # Numpad 1, 2, 3
             
             # === HANDLE INPUT GERAK ===
-            if key[left]: 
+            if inputs & INPUT_LEFT: 
                 dx = -SPEED
                 self.running = True
-            if key[right]: 
+            if inputs & INPUT_RIGHT: 
                 dx = SPEED
                 self.running = True
-            if key[up] and not self.jump: 
-                self.vel_y = -30    # Lompat ke atas
+            if inputs & INPUT_JUMP and not self.jump: 
+                self.vel_y = JUMP_VELOCITY  # Lompat ke atas
                 self.jump = True
             
             # === HANDLE INPUT ATTACK ===
-            for i, k in enumerate(atk_keys):
-                if key[k]:
+            for i, bit in enumerate(INPUT_ATTACKS):
+                if inputs & bit:
                     self.attack(target)         # -> Panggil method attack()
                     self.attack_type = i + 1    # 1, 2, atau 3
-        
-        # Terapkan fisika (gravity, collision, batas layar)
-        self._apply_physics(dx, dy, screen_w, screen_h, target, GRAVITY)
-    
-    
-    def ai_move(self, screen_w, screen_h, target, round_over, ai_input):
-        """
-        Handle gerakan untuk AI (bukan keyboard, tapi dari AIController)
-        
-        Args:
-            ai_input: Dictionary dari AIController berisi:
-                      {'left': bool, 'right': bool, 'jump': bool,
-                       'attack1': bool, 'attack2': bool, 'attack3': bool}
-        
-        Dipanggil dari: AIController.update() -> fighter.ai_move()
-        """
-        SPEED, GRAVITY = 10, 2
-        dx, dy = 0, 0
-        self.running = False
-        
-        if not self.attacking and self.alive and not round_over:
-            self.attack_type = 0
             
-            # === BACA INPUT DARI AI ===
-            if ai_input.get('left'): 
-                dx, self.running = -SPEED, True
-            if ai_input.get('right'): 
-                dx, self.running = SPEED, True
-            if ai_input.get('jump') and not self.jump: 
-                self.vel_y, self.jump = -30, True
-            
-            # === CEK ATTACK INPUT ===
-            for i in range(1, 4):
-                if ai_input.get(f'attack{i}'):
-                    self.attack(target)
-                    self.attack_type = i
+            # Serangan jarak jauh baru dimulai tick ini: projectile ditembak oleh
+            # simulasi (TeamSimulation), bukan hit melee
+            if (self.attacking and self.attack_type == self.ranged_attack
+                    and self.attack_cooldown == ATTACK_COOLDOWN):
+                self.shot_pending = True
         
-        self._apply_physics(dx, dy, screen_w, screen_h, target, GRAVITY)
+        # Terapkan fisika (gravity, collision, batas layar)
+        self._apply_physics(dx, dy, screen_w, screen_h, target, GRAVITY, others)
     
     
-    def _apply_physics(self, dx, dy, screen_w, screen_h, target, gravity):
+    def _apply_physics(self, dx, dy, screen_w, screen_h, target, gravity, others=None):
         """
         Private method - Terapkan fisika dan collision
         
         Args:
             dx, dy: Perpindahan yang diinginkan
-            target: Lawan (untuk collision)
+            target: Lawan yang dihadap (None = tidak ada)
             gravity: Konstanta gravitasi
+            others: Fighter untuk collision badan (None = hanya target)
         
         Proses:
             1. Terapkan gravitasi ke vel_y
             2. Cek batas layar (kiri, kanan, bawah)
-            3. Cek collision dengan lawan
-            4. Auto-flip menghadap lawan
+            3. Cek collision dengan lawan (satu per satu, urut others)
+            4. Auto-flip menghadap target
         """
         # === GRAVITASI ===
         self.vel_y += gravity   # Tambah kecepatan jatuh
@@ -181,22 +254,26 @@ class Fighter:
             dx = -self.rect.left
         if self.rect.right + dx > screen_w:            # Batas kanan
             dx = screen_w - self.rect.right
-        if self.rect.bottom + dy > screen_h - 110:     # Batas bawah (lantai)
+        if self.rect.bottom + dy > screen_h - FLOOR_OFFSET:    # Batas bawah (lantai)
             self.vel_y = 0
             self.jump = False
-            dy = screen_h - 110 - self.rect.bottom
+            dy = screen_h - FLOOR_OFFSET - self.rect.bottom
         
         # === COLLISION DENGAN LAWAN ===
+        if others is None:
+            others = () if target is None else (target,)
         future = self.rect.copy()
         future.x += dx
-        if future.colliderect(target.rect):
-            if dx > 0:      # Gerak ke kanan, tabrak lawan
-                dx = target.rect.left - self.rect.right - 10
-            elif dx < 0:    # Gerak ke kiri, tabrak lawan
-                dx = target.rect.right - self.rect.left + 10
+        for other in others:
+            if future.colliderect(other.rect):
+                if dx > 0:      # Gerak ke kanan, tabrak lawan
+                    dx = other.rect.left - self.rect.right - 10
+                elif dx < 0:    # Gerak ke kiri, tabrak lawan
+                    dx = other.rect.right - self.rect.left + 10
+                future.x = self.rect.x + dx
         
         # === AUTO-FLIP MENGHADAP LAWAN ===
-        if abs(target.rect.centerx - self.rect.centerx) > 20:
+        if target is not None and abs(target.rect.centerx - self.rect.centerx) > 20:
             self.flip = target.rect.centerx < self.rect.centerx
         
         # === UPDATE COOLDOWN & POSISI ===
@@ -211,19 +288,23 @@ class Fighter:
         Lakukan serangan ke target
         
         Args:
-            target: Fighter lawan
+            target: Fighter lawan yang dihadap (None = tidak ada)
         
         Proses:
             1. Cek cooldown (tidak bisa spam attack)
-            2. Buat attack hitbox di depan karakter
-            3. Jika hitbox kena target, kurangi HP target
+            2. Dengan mask: hit dicek tiap tick oleh resolve_attack() pada frame aktif
+            3. Tanpa mask: buat attack hitbox di depan karakter, jika kena
+               target langsung kurangi HP target
         
-        Dipanggil dari: move() atau ai_move() saat tekan tombol attack
-        Mempengaruhi: target.health, target.hit
+        Dipanggil dari: step() saat input attack aktif
+        Mempengaruhi: target.health, target.hit, self.hits_landed
         """
         if self.attack_cooldown == 0:
             self.attacking = True
-            self.attack_cooldown = 20   # Delay 20 frame sebelum bisa attack lagi
+            self.attack_cooldown = ATTACK_COOLDOWN  # Delay sebelum bisa attack lagi
+            self.attack_hit = False
+            if self.collision is not None:
+                return
             
             # === BUAT ATTACK HITBOX ===
             if self.flip:   # Hadap kiri
@@ -231,13 +312,13 @@ class Fighter:
             else:           # Hadap kanan
                 atk_x = self.rect.right
             
-            atk_rect = pygame.Rect(atk_x, self.rect.y, 
-                                   self.rect.width * 1.5, self.rect.height)
+            atk_rect = pygame.Rect(atk_x, self.rect.y, ATTACK_W, self.rect.height)
             
             # === CEK HIT ===
-            if atk_rect.colliderect(target.rect):
-                target.health -= 10     # Kurangi HP lawan
+            if target is not None and atk_rect.colliderect(target.rect):
+                target.health -= ATTACK_DAMAGE  # Kurangi HP lawan
                 target.hit = True       # Trigger animasi hurt
+                self.hits_landed += 1   # Statistik (match farm / replay)
     
     
     def update(self):
@@ -254,8 +335,13 @@ class Fighter:
             6 = Hurt (kena hit)
             7 = Death (mati)
         
-        Dipanggil dari: BattleSystem.run() setiap frame
+        Waktu animasi dihitung dalam tick (1 update = 1 tick), bukan jam
+        dinding, sehingga hasilnya deterministik.
+        
+        Dipanggil dari: BattleSimulation.step() setiap tick
         """
+        self.ticks += 1
+        
         # === TENTUKAN ANIMASI BERDASARKAN STATE ===
         if self.health <= 0:
             self.health = 0
@@ -276,14 +362,15 @@ class Fighter:
         if new_action != self.action:
             self.action = new_action
             self.frame_index = 0        # Reset ke frame pertama
-            self.update_time = pygame.time.get_ticks()
+            self.update_time = self.ticks
         
         # === UPDATE FRAME ANIMASI ===
         self.image = self.animations[self.action][self.frame_index]
+        self.image_frame = self.frame_index
         
-        if pygame.time.get_ticks() - self.update_time > 50:  # 50ms per frame
+        if self.ticks - self.update_time > ANIMATION_TICKS:  # ~50ms per frame
             self.frame_index += 1
-            self.update_time = pygame.time.get_ticks()
+            self.update_time = self.ticks
         
         # === HANDLE ANIMASI SELESAI ===
         if self.frame_index >= len(self.animations[self.action]):
@@ -298,19 +385,126 @@ class Fighter:
                     self.hit = False
     
     
-    def draw(self, surface):
+    def attack_rect(self):
+        """
+        Bounding box hit mask frame yang sedang tampil (koordinat layar)
+        
+        Returns:
+            Rect | None: None jika bukan frame aktif, serangan sudah kena,
+                         serangan jarak jauh (projectile), atau fighter tanpa mask
+        
+        Dipakai TeamSimulation untuk query broadphase sebelum resolve_attack()
+        """
+        if not self.attacking or self.attack_hit or self.collision is None:
+            return None
+        if self.attack_type == self.ranged_attack:
+            return None     # Kena lewat projectile
+        frame = self.collision[self.flip][self.action][self.image_frame]
+        if frame.hit is None:
+            return None     # Windup / recovery / animasi lain (hurt membatalkan attack)
+        return frame.hit_rect.move(self.rect.topleft)
+    
+    
+    def resolve_attack(self, *targets):
+        """
+        Cek hit serangan pada frame animasi yang sedang tampil
+        
+        Args:
+            targets: Fighter lawan yang dicek (1v1: lawan; N fighter: kandidat
+                     dari broadphase grid)
+        
+        Proses:
+            1. Hanya frame aktif animasi attack (punya hit mask) yang dicek,
+               dan hanya sekali kena per serangan (semua target yang tersentuh
+               di tick yang sama ikut kena)
+            2. Broadphase: bounding box hit mask vs bounding box hurt mask lawan
+            3. Narrowphase: Mask.overlap dengan offset antar keduanya
+            4. Kena: kurangi HP target (sama dengan attack() tanpa mask)
+        
+        Dipanggil dari: BattleSimulation.step() / TeamSimulation.step() setelah update()
+        Mempengaruhi: target.health, target.hit, self.hits_landed
+        """
+        hit_rect = self.attack_rect()
+        if hit_rect is None:
+            return
+        hit = self.collision[self.flip][self.action][self.image_frame].hit
+        
+        for target in targets:
+            if not target.hurt_by(hit, hit_rect):
+                continue
+            self.attack_hit = True
+            target.health -= ATTACK_DAMAGE
+            target.hit = True
+            self.hits_landed += 1
+    
+    
+    def hurt_by(self, hit, hit_rect):
+        """
+        Cek apakah mask serangan mengenai fighter ini pada frame yang sedang tampil
+        
+        Args:
+            hit: Mask serangan (frame aktif fighter lain, atau hitbox projectile)
+            hit_rect: Posisi mask serangan (koordinat layar)
+        
+        Returns:
+            bool: True jika kena (AABB hurt mask, lalu overlap pixel)
+        
+        Dipakai resolve_attack() dan hit projectile di TeamSimulation
+        """
+        if self.collision is None:
+            return hit_rect.colliderect(self.rect)
+        hurt = self.collision[self.flip][self.action][self.image_frame]
+        if hurt.hurt is None:
+            return False    # Frame kosong (transparan)
+        hurt_rect = hurt.hurt_rect.move(self.rect.topleft)
+        if not hit_rect.colliderect(hurt_rect):
+            return False
+        return hit.overlap(hurt.hurt, (hurt_rect.x - hit_rect.x,
+                                       hurt_rect.y - hit_rect.y)) is not None
+    
+    
+    def get_draw_rect(self, pos=None):
+        """
+        Bounding box sprite yang digambar oleh draw()
+        
+        Args:
+            pos: Posisi hitbox (x, y) untuk digambar (None = rect saat ini)
+        
+        Returns:
+            Rect: Area layar yang ditimpa sprite frame saat ini
+        
+        Digunakan oleh: BattleSystem.render_dirty()
+        """
+        x, y = pos or self.rect.topleft
+        w, h = self.image.get_size()
+        return pygame.Rect(x - self.offset[0], y - self.offset[1], w, h)
+    
+    
+    def draw(self, surface, pos=None):
         """
         Gambar karakter ke layar
         
         Args:
             surface: Pygame surface (screen) untuk menggambar
+            pos: Posisi hitbox (x, y) untuk digambar, mis. hasil interpolasi
+                 antar tick (None = rect saat ini)
         
         Proses:
-            1. Flip sprite jika karakter menghadap kiri
+            1. Pilih frame pre-flipped jika karakter menghadap kiri
+               (tidak ada alokasi surface baru per frame)
             2. Blit sprite ke posisi dengan offset
         
         Dipanggil dari: BattleSystem.run() setiap frame
         """
-        img = pygame.transform.flip(self.image, self.flip, False)
-        surface.blit(img, (self.rect.x - self.offset[0], 
-                          self.rect.y - self.offset[1]))
+        if self.flip:
+            if self.animations_flipped is None:
+                # Lazy: buat set hadap kiri sekali saat pertama dibutuhkan
+                self.animations_flipped = [
+                    [pygame.transform.flip(f, True, False) for f in anim]
+                    for anim in self.animations
+                ]
+            img = self.animations_flipped[self.action][self.image_frame]
+        else:
+            img = self.image
+        x, y = pos or self.rect.topleft
+        surface.blit(img, (x - self.offset[0], y - self.offset[1]))
@@ -0,0 +1,282 @@
+"""
+FILE: match_farm.py
+DESKRIPSI: Match farm AI vs AI tanpa window - semua pasangan karakter di semua arena,
+           paralel di semua core, menghasilkan matriks win-rate untuk balancing
+DIGUNAKAN OLEH: Developer (dijalankan manual dari terminal)
+MENGGUNAKAN: simulation.py (BattleSimulation mode 'cpu'), match_random.py (seed turunan),
+             characters.py (CHARACTERS, ARENAS)
+
+ALUR PROGRAM:
+1. build_jobs() membuat daftar match: setiap pasangan (P1, P2) x setiap arena x repeats
+   - Seed tiap match diturunkan dari base seed (urutan job tetap -> hasil sama)
+2. Match dibagi ke ProcessPoolExecutor (default: semua core)
+   - --engine object: satu BattleSimulation per match
+   - --engine batch: BatchEngine (numpy) menjalankan ribuan match per process
+3. Setiap hasil (pemenang, durasi, damage, hits) langsung ditulis ke file JSONL
+   (streaming, tidak menunggu semua match selesai)
+4. Setelah selesai: cetak matriks win-rate (karakter vs lawan, karakter per arena)
+   dan throughput (match/detik)
+
+Jalankan:
+    python -m battle.match_farm --repeats 10 --seed 42
+
+CATATAN:
+    Arena belum mempengaruhi simulasi (hanya background), tapi tetap dicatat
+    per match agar hasil bisa dipecah per arena saat arena punya efek gameplay.
+"""
+import os
+import json
+import time
+import argparse
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+from battle.simulation import BattleSimulation, SIM_HZ
+from battle.match_random import MatchRandom
+from battle.characters import CHARACTERS, ARENAS
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+OUTPUT_PATH = os.path.join(BASE_DIR, 'reports', 'match_farm.jsonl')
+MAX_TICKS = 99 * SIM_HZ     # Batas waktu ronde (99 detik), lalu diputuskan oleh HP
+BATCH_SIZE = 4096           # Maks match per BatchEngine (mode --engine batch)
+COMPACT_TICKS = SIM_HZ      # Interval membuang match selesai dari BatchEngine
+
+
+def build_jobs(base_seed, repeats=1, characters=None, arenas=None):
+    """
+    Daftar semua match yang akan dijalankan
+
+    Args:
+        base_seed: Seed dasar (seed tiap match diturunkan dari sini)
+        repeats: Jumlah match per (P1, P2, arena)
+        characters: Daftar nama karakter (default semua CHARACTERS)
+        arenas: Daftar nama arena (default semua ARENAS)
+
+    Returns:
+        list: Tuple (index, p1, p2, arena, seed)
+    """
+    characters = list(CHARACTERS) if characters is None else characters
+    arenas = list(ARENAS) if arenas is None else arenas
+    seeds = MatchRandom(base_seed)
+    jobs = []
+    for p1 in characters:
+        for p2 in characters:
+            for arena in arenas:
+                for _ in range(repeats):
+                    jobs.append((len(jobs), p1, p2, arena, seeds.next_u64()))
+    return jobs
+
+
+def run_match(job, max_ticks=MAX_TICKS):
+    """
+    Jalankan satu match AI vs AI headless sampai selesai
+
+    Args:
+        job: Tuple dari build_jobs()
+        max_ticks: Batas tick; jika habis, HP lebih tinggi menang (sama = seri)
+
+    Returns:
+        dict: Hasil match (siap ditulis sebagai satu baris JSON)
+    """
+    _index, p1_name, p2_name, _arena, seed = job
+    sim = BattleSimulation.headless(p1_name, p2_name, 'cpu', seed)
+    sim.intro_count = 0     # Tanpa countdown: langsung fight
+
+    while not sim.round_over and sim.tick < max_ticks:
+        sim.step(0)
+
+    p1, p2 = sim.p1, sim.p2
+    winner = sim.winner
+    timeout = winner is None
+    if timeout:
+        winner = 1 if p1.health > p2.health else (2 if p2.health > p1.health else 0)
+
+    return _result(job, winner, timeout, sim.tick,
+                   (p1.health, p2.health), (p1.hits_landed, p2.hits_landed))
+
+
+def run_batch(jobs, max_ticks=MAX_TICKS):
+    """
+    Jalankan sekumpulan match sekaligus di BatchEngine (hasil sama dengan run_match)
+
+    Setiap COMPACT_TICKS tick, match yang sudah selesai dicatat lalu dibuang
+    dari engine, sehingga sisa match panjang tidak ikut menyeret yang lain.
+
+    Args:
+        jobs: List tuple dari build_jobs()
+        max_ticks: Batas tick per match
+
+    Returns:
+        list: Hasil tiap job, urutan sama dengan jobs
+    """
+    from battle.batch_engine import BatchEngine     # numpy hanya dibutuhkan mode batch
+    engine = BatchEngine([j[1] for j in jobs], [j[2] for j in jobs], [j[4] for j in jobs], 'cpu')
+    remaining = list(range(len(jobs)))      # index job untuk tiap kolom engine
+    results = [None] * len(jobs)
+
+    while engine.n and engine.tick < max_ticks:
+        engine.step()
+        if engine.tick % COMPACT_TICKS == 0 and engine.round_over.any():
+            keep = []
+            for col, job_index in enumerate(remaining):
+                if engine.round_over[col]:
+                    results[job_index] = _batch_result(engine, col, jobs[job_index], max_ticks)
+                else:
+                    keep.append(col)
+            engine = engine.subset(keep)
+            remaining = [remaining[col] for col in keep]
+
+    for col, job_index in enumerate(remaining):
+        results[job_index] = _batch_result(engine, col, jobs[job_index], max_ticks)
+    return results
+
+
+def _batch_result(engine, col, job, max_ticks):
+    """Hasil satu match dari kolom BatchEngine."""
+    health = (int(engine.health[0, col]), int(engine.health[1, col]))
+    timeout = not engine.round_over[col]
+    if timeout:
+        winner = 1 if health[0] > health[1] else (2 if health[1] > health[0] else 0)
+    else:
+        winner = int(engine.winner[col])
+    ticks = max_ticks if timeout else int(engine.end_tick[col])
+    hits = (int(engine.hits_landed[0, col]), int(engine.hits_landed[1, col]))
+    return _result(job, winner, timeout, ticks, health, hits)
+
+
+def _result(job, winner, timeout, ticks, health, hits):
+    """Satu baris hasil match (format JSONL)."""
+    index, p1_name, p2_name, arena, seed = job
+    return {
+        'index': index,
+        'p1': p1_name,
+        'p2': p2_name,
+        'arena': arena,
+        'seed': seed,
+        'winner': winner,               # 1, 2, atau 0 (seri)
+        'timeout': timeout,
+        'ticks': ticks,
+        'seconds': ticks / SIM_HZ,      # Durasi dalam waktu game
+        'damage': [100 - max(health[1], 0), 100 - max(health[0], 0)],
+        'hits': list(hits),
+    }
+
+
+def farm(jobs, out_path=OUTPUT_PATH, workers=None, max_ticks=MAX_TICKS, engine='object'):
+    """
+    Jalankan semua match secara paralel dan stream hasilnya ke JSONL
+
+    Args:
+        jobs: Daftar job dari build_jobs()
+        out_path: File JSONL output (ditimpa)
+        workers: Jumlah process (default: jumlah core)
+        max_ticks: Batas tick per match
+        engine: 'object' (BattleSimulation per match) atau
+                'batch' (BatchEngine, satu batch match per task)
+
+    Returns:
+        tuple: (list hasil, detik wall-clock)
+    """
+    os.makedirs(os.path.dirname(out_path) or '.', exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+
+    if engine == 'batch':
+        # Satu task = satu batch (maks BATCH_SIZE match), hasil per batch di-stream
+        size = max(1, min(BATCH_SIZE, -(-len(jobs) // workers)))
+        tasks = [jobs[i:i + size] for i in range(0, len(jobs), size)]
+        worker, chunksize = partial(run_batch, max_ticks=max_ticks), 1
+    else:
+        tasks = [[job] for job in jobs]
+        worker = partial(_run_single, max_ticks=max_ticks)
+        chunksize = max(1, len(jobs) // (workers * 8))
+
+    results = []
+    start = time.perf_counter()
+    with open(out_path, 'w') as out, ProcessPoolExecutor(max_workers=workers) as pool:
+        # map() mengembalikan hasil sesuai urutan job -> file output reproducible
+        for batch in pool.map(worker, tasks, chunksize=chunksize):
+            for result in batch:
+                out.write(json.dumps(result) + '\n')
+            out.flush()
+            results.extend(batch)
+    return results, time.perf_counter() - start
+
+
+def _run_single(jobs, max_ticks=MAX_TICKS):
+    """Task mode 'object': list berisi satu job -> list berisi satu hasil."""
+    return [run_match(job, max_ticks) for job in jobs]
+
+
+def win_matrix(results, column='opponent'):
+    """
+    Matriks win-rate karakter (dari sudut pandang kedua sisi)
+
+    Args:
+        results: List hasil run_match()
+        column: 'opponent' (karakter vs lawan, gabungan semua arena)
+                atau 'arena' (karakter per arena, gabungan semua lawan)
+
+    Returns:
+        dict: matrix[a][b] = win-rate a melawan lawan / di arena b
+              (seri dihitung setengah)
+    """
+    wins = {}
+    games = {}
+    for r in results:
+        for me, other, side in ((r['p1'], r['p2'], 1), (r['p2'], r['p1'], 2)):
+            key = (me, other if column == 'opponent' else r['arena'])
+            games[key] = games.get(key, 0) + 1
+            if r['winner'] == side:
+                wins[key] = wins.get(key, 0) + 1
+            elif r['winner'] == 0:
+                wins[key] = wins.get(key, 0) + 0.5
+
+    rows = list(dict.fromkeys(k[0] for k in games))
+    cols = list(dict.fromkeys(k[1] for k in games))
+    return {
+        a: {b: wins.get((a, b), 0) / games[(a, b)] for b in cols if (a, b) in games}
+        for a in rows
+    }
+
+
+def format_matrix(matrix):
+    """Teks tabel matriks win-rate (baris = karakter, kolom = lawan / arena)."""
+    names = list(matrix)
+    cols = list(dict.fromkeys(b for row in matrix.values() for b in row))
+    width = max(len(n) for n in names) + 2
+    lines = [' ' * width + ''.join(f"{n[:10]:>11}" for n in cols) + f"{'overall':>11}"]
+    for a in names:
+        row = matrix[a]
+        overall = sum(row.values()) / len(row)
+        cells = ''.join(f"{row[b] * 100:10.1f}%" if b in row else ' ' * 11 for b in cols)
+        lines.append(f"{a:<{width}}{cells}{overall * 100:10.1f}%")
+    return '\n'.join(lines)
+
+
+# === ENTRY POINT ===
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="AI vs AI match farm (headless)")
+    parser.add_argument('--repeats', type=int, default=5, help="match per pasangan per arena")
+    parser.add_argument('--seed', type=int, default=0, help="base seed (hasil reproducible)")
+    parser.add_argument('--workers', type=int, default=None, help="jumlah process (default: semua core)")
+    parser.add_argument('--max-ticks', type=int, default=MAX_TICKS, help="batas tick per match")
+    parser.add_argument('--out', default=OUTPUT_PATH, help="file JSONL output")
+    parser.add_argument('--engine', choices=('object', 'batch'), default='object',
+                        help="object = BattleSimulation, batch = BatchEngine (numpy)")
+    args = parser.parse_args()
+
+    jobs = build_jobs(args.seed, args.repeats)
+    results, elapsed = farm(jobs, args.out, args.workers, args.max_ticks, args.engine)
+
+    ticks = sum(r['ticks'] for r in results)
+    timeouts = sum(r['timeout'] for r in results)
+    print("Win-rate vs lawan:")
+    print(format_matrix(win_matrix(results)))
+    print()
+    print("Win-rate per arena:")
+    print(format_matrix(win_matrix(results, 'arena')))
+    print()
+    print(f"{len(results)} match ({timeouts} timeout) dalam {elapsed:.2f}s -> "
+          f"{len(results) / elapsed:,.1f} match/s, {ticks / elapsed:,.0f} tick/s, "
+          f"{ticks / SIM_HZ / elapsed:,.0f}x real time")
+    print(f"Hasil: {args.out}")
@@ -0,0 +1,71 @@
+"""
+FILE: match_random.py
+DESKRIPSI: RNG deterministik per pertandingan (splitmix64), state-nya cukup satu integer
+DIGUNAKAN OLEH: simulation.py (satu RNG per match), ai_controller.py (keputusan AI)
+MENGGUNAKAN: -
+
+ALUR PROGRAM:
+1. BattleSimulation membuat MatchRandom(seed) saat match dimulai
+2. AIController mengambil angka acak lewat rng.random()
+3. Seed + urutan input yang sama -> urutan angka yang sama di semua mesin
+   (tidak bergantung pada modul random global / versi Python)
+4. getstate() / setstate() dipakai untuk snapshot & replay
+
+Splitmix64: state += GOLDEN, lalu output di-mix (xor-shift + multiply) mod 2^64
+"""
+
+
+MASK64 = (1 << 64) - 1
+GOLDEN = 0x9E3779B97F4A7C15
+
+
+class MatchRandom:
+    """
+    Generator splitmix64
+    
+    Attributes:
+        state: State 64-bit saat ini
+    """
+
+    def __init__(self, seed=0):
+        """
+        Constructor
+        
+        Args:
+            seed: Integer seed (dipotong ke 64 bit)
+        """
+        self.state = seed & MASK64
+    
+    
+    def next_u64(self):
+        """
+        Ambil angka 64-bit berikutnya
+        
+        Returns:
+            int: 0 .. 2^64 - 1
+        """
+        self.state = (self.state + GOLDEN) & MASK64
+        z = self.state
+        z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+        z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK64
+        return z ^ (z >> 31)
+    
+    
+    def random(self):
+        """
+        Float acak [0, 1) dengan resolusi 53 bit
+        
+        Returns:
+            float: Sama persis untuk seed & urutan pemanggilan yang sama
+        """
+        return (self.next_u64() >> 11) * (1.0 / (1 << 53))
+    
+    
+    def getstate(self):
+        """State RNG (int) untuk snapshot."""
+        return self.state
+    
+    
+    def setstate(self, state):
+        """Pulihkan state dari getstate()."""
+        self.state = state & MASK64
@@ -21,6 +21,11 @@ import sys
 import random
 import math
 import os
+from engine.text_cache import render_text
+from engine.layers import StaticLayer
+from engine.glow_cache import get_glow
+from engine.frame_timing import frame_timer, TIMING_KEY
+from engine.profiler import scene_profiler
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
@@ -98,13 +103,13 @@ class ModeButton:
         else:
             surface.blit(img, pos)
 
-    def draw(self, screen, font):
+    def draw(self, screen, font_size):
         """
         Gambar tombol ke layar
         
         Args:
             screen: Pygame surface
-            font: Font untuk teks
+            font_size: Ukuran font untuk teks (render lewat cache teks)
         
         Visual:
             - Normal: border biru, teks putih
@@ -120,17 +125,16 @@ class ModeButton:
             scaled_h
         )
 
+        # Surface glow & latar tombol diambil dari glow cache (tanpa alokasi per frame)
         if self.hover_alpha > 0:
             for i in range(3):
                 margin = 4 + (i * 4)
-                glow_surf = pygame.Surface((scaled_w + margin*2, scaled_h + margin*2), pygame.SRCALPHA)
-                glow_color = (*ORANGE, (self.hover_alpha // (i + 4)))
-                pygame.draw.rect(glow_surf, glow_color, glow_surf.get_rect(), border_radius=20 + margin)
+                glow_surf = get_glow((scaled_w + margin*2, scaled_h + margin*2), ORANGE,
+                                     self.hover_alpha // (i + 4), 20 + margin)
                 screen.blit(glow_surf, glow_surf.get_rect(center=scaled_rect.center))
 
         bg_alpha = 230 if self.hovered else 200
-        button_surf = pygame.Surface((scaled_w, scaled_h), pygame.SRCALPHA)
-        pygame.draw.rect(button_surf, (20, 40, 80, bg_alpha), button_surf.get_rect(), border_radius=20)
+        button_surf = get_glow((scaled_w, scaled_h), (20, 40, 80), bg_alpha, 20)
         screen.blit(button_surf, scaled_rect)
         
         color = (*ORANGE, self.hover_alpha) if self.hovered else (60, 100, 160)
@@ -139,7 +143,7 @@ class ModeButton:
 
         if self.images and len(self.images) >= 2:
             padding = 30
-            vs_surf = font.render("vs", True, GOLD)
+            vs_surf = render_text("vs", font_size, GOLD)
             img_w = self.images[0].get_width()
             
             total_w = (img_w * 2) + vs_surf.get_width() + (padding * 2)
@@ -159,7 +163,7 @@ class ModeButton:
         else:
             # Fallback ke teks jika gambar tidak ada
             text_color = ORANGE if self.hovered else WHITE
-            text_surf = font.render(self.text, True, text_color)
+            text_surf = render_text(self.text, font_size, text_color)
             screen.blit(text_surf, text_surf.get_rect(center=scaled_rect.center))
     
     def check_click(self, pos):
@@ -219,8 +223,92 @@ class ModeSelection:
         ]
         
         # === FONTS ===
-        self.font = pygame.font.Font(None, 48)       # Untuk tombol
-        self.title_font = pygame.font.Font(None, 90) # Untuk judul
+        # Ukuran font saja; font & hasil render dikelola text_cache
+        self.font_size = 48         # Untuk tombol
+        self.title_size = 90        # Untuk judul
+        
+        # === LAYER STATIS ===
+        self.static_layer = StaticLayer(self.draw_static)
+        self.timer = frame_timer('mode_selection')     # Timing per fase (F3)
+        self.profiler = scene_profiler('mode_selection')   # Profiler (F9)
+    
+    def draw_static(self, surface, has_bg):
+        """
+        Compose bagian statis screen ke surface layer
+        
+        Args:
+            surface: Surface layer (lihat engine/layers.py)
+            has_bg: True jika background berhasil dimuat (input layer)
+        
+        Dipanggil dari: StaticLayer saat input layer berubah (bukan tiap frame)
+        """
+        # 1. Background
+        if has_bg:
+            surface.blit(self.bg, (0, 0))
+            overlay = pygame.Surface((SCREEN_W, SCREEN_H), pygame.SRCALPHA)
+            overlay.fill((0, 0, 0, 120))
+            surface.blit(overlay, (0, 0))
+        else:
+            surface.fill((20, 45, 90))
+        
+        # 2. Header (Visual Baru)
+        header_surf = pygame.Surface((SCREEN_W, 200), pygame.SRCALPHA)
+        header_surf.fill((10, 25, 50, 150))
+        surface.blit(header_surf, (0, 0))
+        
+        title_text = "SELECT GAME MODE"
+        for i in range(3): # Title Glow
+            glow = render_text(title_text, self.title_size, (*ORANGE, 60 - i*15))
+            surface.blit(glow, glow.get_rect(center=(SCREEN_W//2 + i, 80 + i)))
+        
+        title = render_text(title_text, self.title_size, WHITE)
+        surface.blit(title, title.get_rect(center=(SCREEN_W//2, 80)))
+        
+        # 3. Footer (Visual Baru)
+        footer_surf = pygame.Surface((SCREEN_W, 70), pygame.SRCALPHA)
+        footer_surf.fill((10, 25, 50, 180))
+        surface.blit(footer_surf, (0, SCREEN_H - 70))
+        
+        # Footer Instruction
+        instr = [("MOUSE", "Select Mode"), ("ESC", "Exit to Menu")]
+        for i, (key, act) in enumerate(instr):
+            x_pos = (SCREEN_W // 2 - 150) + (i * 200)
+            # Key Box
+            pygame.draw.rect(surface, (40, 70, 120, 200), (x_pos, SCREEN_H - 52, 90, 24), border_radius=4)
+            # Key Text
+            k_surf = render_text(key, 24, GOLD)
+            surface.blit(k_surf, k_surf.get_rect(center=(x_pos + 45, SCREEN_H - 40)))
+            # Action Text
+            a_surf = render_text(act, 24, WHITE)
+            surface.blit(a_surf, a_surf.get_rect(center=(x_pos + 45, SCREEN_H - 18)))
+    
+    def draw(self):
+        """
+        Gambar satu frame: layer statis, garis animasi, buttons, lalu flip display
+        
+        Dipanggil dari: run() setiap frame, engine/benchmark.py
+        """
+        # 1. Layer statis (background, overlay, header, judul, footer)
+        #    di-compose sekali, setiap frame cukup 1 blit
+        self.static_layer.draw(self.screen, (self.bg is not None,))
+        self.timer.mark('draw_bg')
+
+        # 2. Animated Line under title
+        line_w = 600
+        lx = (SCREEN_W - line_w) // 2
+        for i in range(3):
+            offset = math.sin(self.time * 0.05 + i) * 2
+            pygame.draw.line(self.screen, (*ORANGE, 150 - i*40), (lx, 130 + offset), (lx + line_w, 130 + offset), 2 + i)
+        
+        # 3. Buttons
+        for btn in self.buttons:
+            btn.draw(self.screen, self.font_size)
+        self.timer.mark('draw_ui')
+        self.timer.draw(self.screen)
+        
+        # === UPDATE DISPLAY ===
+        pygame.display.flip()
+        self.timer.mark('display')
     
     def run(self):
         """
@@ -233,91 +321,54 @@ class ModeSelection:
         Loop:
             1. Handle events (quit, ESC, click)
             2. Update hover state & animations
-            3. Draw background, title, buttons, footer
+            3. Draw layer statis (background, title, footer), garis animasi, buttons
             4. Return mode jika button diklik
+        
+        Timing per fase dicatat frame_timer (F3 / PYFIGHTER_TIMING)
         """
         clock = pygame.time.Clock()
+        timer = self.timer
         
         while True:
+            timer.frame()
+            self.profiler.frame()
             self.time += 1
             mouse = pygame.mouse.get_pos()
+            timer.mark('input')
             
             # === HANDLE EVENTS ===
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
+                    timer.close()
+                    self.profiler.close()
                     pygame.quit()
                     sys.exit()
                     
                 if event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_ESCAPE:
+                        timer.close()
+                        self.profiler.close()
                         return None  # Cancel, kembali ke menu
+                    if event.key == TIMING_KEY:
+                        timer = self.timer = timer.toggled()
+                    self.profiler.handle_key(event.key)
                 
                 if event.type == pygame.MOUSEBUTTONDOWN:
                     for btn in self.buttons:
                         if btn.check_click(mouse):
+                            timer.close()
+                            self.profiler.close()
                             return btn.mode 
+            timer.mark('events')
             
             # === UPDATE STATE ===
             for btn in self.buttons:
                 btn.hovered = btn.rect.collidepoint(mouse)
                 btn.update()
+            timer.mark('physics')
             
             # === DRAW ===
-            
-            # 1. Background
-            if self.bg:
-                self.screen.blit(self.bg, (0, 0))
-                overlay = pygame.Surface((SCREEN_W, SCREEN_H), pygame.SRCALPHA)
-                overlay.fill((0, 0, 0, 120))
-                self.screen.blit(overlay, (0, 0))
-            else:
-                self.screen.fill((20, 45, 90))
-            
-            # 2. Header (Visual Baru)
-            header_surf = pygame.Surface((SCREEN_W, 200), pygame.SRCALPHA)
-            header_surf.fill((10, 25, 50, 150))
-            self.screen.blit(header_surf, (0, 0))
-            
-            title_text = "SELECT GAME MODE"
-            for i in range(3): # Title Glow
-                glow = self.title_font.render(title_text, True, (*ORANGE, 60 - i*15))
-                self.screen.blit(glow, glow.get_rect(center=(SCREEN_W//2 + i, 80 + i)))
-            
-            title = self.title_font.render(title_text, True, WHITE)
-            self.screen.blit(title, title.get_rect(center=(SCREEN_W//2, 80)))
-
-            # Animated Line under title
-            line_w = 600
-            lx = (SCREEN_W - line_w) // 2
-            for i in range(3):
-                offset = math.sin(self.time * 0.05 + i) * 2
-                pygame.draw.line(self.screen, (*ORANGE, 150 - i*40), (lx, 130 + offset), (lx + line_w, 130 + offset), 2 + i)
-            
-            # 3. Buttons
-            for btn in self.buttons:
-                btn.draw(self.screen, self.font)
-            
-            # 4. Footer (Visual Baru)
-            footer_surf = pygame.Surface((SCREEN_W, 70), pygame.SRCALPHA)
-            footer_surf.fill((10, 25, 50, 180))
-            self.screen.blit(footer_surf, (0, SCREEN_H - 70))
-            
-            # Footer Instruction
-            small_font = pygame.font.Font(None, 24)
-            instr = [("MOUSE", "Select Mode"), ("ESC", "Exit to Menu")]
-            for i, (key, act) in enumerate(instr):
-                x_pos = (SCREEN_W // 2 - 150) + (i * 200)
-                # Key Box
-                pygame.draw.rect(self.screen, (40, 70, 120, 200), (x_pos, SCREEN_H - 52, 90, 24), border_radius=4)
-                # Key Text
-                k_surf = small_font.render(key, True, GOLD)
-                self.screen.blit(k_surf, k_surf.get_rect(center=(x_pos + 45, SCREEN_H - 40)))
-                # Action Text
-                a_surf = small_font.render(act, True, WHITE)
-                self.screen.blit(a_surf, a_surf.get_rect(center=(x_pos + 45, SCREEN_H - 18)))
-            
-            # === UPDATE DISPLAY ===
-            pygame.display.flip()
+            self.draw()
             clock.tick(FPS)
 
 # === ENTRY POINT ===
@@ -0,0 +1,543 @@
+"""
+FILE: netplay.py
+DESKRIPSI: PvP lewat jaringan (UDP) dengan rollback netcode - tiap peer menjalankan
+           simulasi sendiri, menebak input lawan, lalu rollback + simulasi ulang
+           saat input asli datang terlambat
+DIGUNAKAN OLEH: Player (dijalankan dari terminal, satu process per peer)
+MENGGUNAKAN: socket (UDP), simulation.py (BattleSimulation), snapshot.py (SnapshotRing,
+             checksum), battle_system.py (BattleSystem untuk render), fighter_base.py
+
+ALUR PROGRAM:
+1. Kedua peer membuat BattleSimulation dengan karakter & seed yang SAMA
+   - Player lokal selalu memakai kontrol P1 (WASD + R/T/Y) di keyboard sendiri
+2. Setiap frame, RollbackSession.advance(input_lokal):
+   - Terima paket: input lawan yang sudah pasti (confirmed) + checksum lawan
+   - Jika tebakan untuk frame lampau salah: restore snapshot frame itu dari
+     SnapshotRing lalu simulasi ulang sampai frame sekarang (rollback)
+   - Input lokal dijadwalkan untuk frame + input_delay
+   - Input lawan yang belum datang ditebak = input confirmed terakhir
+   - Simpan snapshot, jalankan satu tick, kirim input lokal yang belum di-ack
+3. Jika tebakan sudah max_rollback frame di depan input confirmed lawan,
+   peer menunggu (stall) agar rollback tidak pernah melewati budget frame
+4. Tiap CHECKSUM_INTERVAL frame yang sudah confirmed, crc32 snapshot dikirim
+   ke lawan dan dibandingkan -> deteksi desync
+5. Latency / jitter / packet loss buatan (per arah) untuk testing di satu mesin
+
+Jalankan (dua terminal):
+    python -m battle.netplay --player 1 --port 7001 --peer 127.0.0.1:7002 --seed 42
+    python -m battle.netplay --player 2 --port 7002 --peer 127.0.0.1:7001 --seed 42
+
+Test headless dua process di localhost (latency 60ms, jitter 10ms, loss 10%):
+    python -m battle.netplay --pair --latency 60 --jitter 10 --loss 0.1
+"""
+import sys
+import json
+import time
+import heapq
+import random
+import socket
+import struct
+import argparse
+import subprocess
+from battle.simulation import BattleSimulation, SIM_HZ
+from battle.snapshot import SnapshotRing, snapshot, checksum
+from battle.match_random import MatchRandom
+
+
+INPUT_DELAY = 2             # Input lokal dijalankan N frame setelah ditekan
+MAX_ROLLBACK = 8            # Maks frame tebakan (= kedalaman rollback maksimal)
+CHECKSUM_INTERVAL = 30      # Kirim crc32 state tiap N frame confirmed
+MAX_PACKET_INPUTS = 64      # Maks input per paket (sisanya paket berikutnya)
+FRAME_BUDGET_MS = 1000 / SIM_HZ     # 16.6 ms per frame
+PRUNE_INTERVAL = 60         # Buang riwayat input lama tiap N frame
+
+# Paket: magic, frame input pertama, ack (frame lawan confirmed terakhir),
+#        frame checksum (-1 = tidak ada), crc32, jumlah input; lalu 1 byte per input
+PACKET_MAGIC = b'PF'
+PACKET_HEADER = struct.Struct('<2sIiiIB')
+
+
+def encode_packet(start, ack, crc_frame, crc, inputs):
+    """Paket UDP: header + bitmask input frame start, start+1, ..."""
+    return PACKET_HEADER.pack(PACKET_MAGIC, start, ack, crc_frame, crc, len(inputs)) + bytes(inputs)
+
+
+def decode_packet(data):
+    """
+    Kebalikan encode_packet()
+
+    Returns:
+        tuple | None: (start, ack, crc_frame, crc, inputs), None jika paket rusak
+    """
+    if len(data) < PACKET_HEADER.size:
+        return None
+    magic, start, ack, crc_frame, crc, count = PACKET_HEADER.unpack_from(data)
+    inputs = data[PACKET_HEADER.size:]
+    if magic != PACKET_MAGIC or len(inputs) != count:
+        return None
+    return start, ack, crc_frame, crc, inputs
+
+
+class UdpTransport:
+    """
+    Socket UDP non-blocking dengan latency, jitter & packet loss buatan
+
+    Gangguan diterapkan di sisi kirim (satu arah); jalankan kedua peer dengan
+    setting yang sama untuk RTT = 2 * latency.
+
+    Attributes:
+        peer: Alamat (host, port) lawan
+        sent, received, dropped: Counter paket
+    """
+
+    def __init__(self, port, peer, latency_ms=0, jitter_ms=0, loss=0.0, seed=None):
+        """
+        Constructor
+
+        Args:
+            port: Port UDP lokal (bind di semua interface)
+            peer: (host, port) lawan
+            latency_ms: Delay tambahan per paket
+            jitter_ms: Delay acak tambahan 0..jitter_ms
+            loss: Peluang paket dibuang (0..1)
+            seed: Seed RNG gangguan (None = acak)
+        """
+        self.peer = peer
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.loss = loss
+        self.rng = random.Random(seed)
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(('0.0.0.0', port))
+        self.sock.setblocking(False)
+        self._pending = []          # Heap (waktu kirim, urutan, data)
+        self._seq = 0
+        self.sent = 0
+        self.received = 0
+        self.dropped = 0
+
+    def send(self, data):
+        """Kirim paket (dibuang / ditunda sesuai setting gangguan)."""
+        if self.loss and self.rng.random() < self.loss:
+            self.dropped += 1
+            return
+        delay = self.latency + self.rng.random() * self.jitter
+        if delay <= 0:
+            self._sendto(data)
+            return
+        heapq.heappush(self._pending, (time.perf_counter() + delay, self._seq, data))
+        self._seq += 1
+        self.flush()
+
+    def flush(self):
+        """Kirim paket tertunda yang waktunya sudah tiba."""
+        now = time.perf_counter()
+        while self._pending and self._pending[0][0] <= now:
+            self._sendto(heapq.heappop(self._pending)[2])
+
+    def _sendto(self, data):
+        try:
+            self.sock.sendto(data, self.peer)
+            self.sent += 1
+        except OSError:
+            pass                    # Lawan belum bind / jaringan putus: sama dengan loss
+
+    def receive(self):
+        """
+        Ambil semua paket yang sudah masuk (non-blocking)
+
+        Returns:
+            list: Data bytes tiap paket
+        """
+        self.flush()
+        packets = []
+        while True:
+            try:
+                data, _addr = self.sock.recvfrom(2048)
+            except BlockingIOError:
+                break
+            except OSError:
+                continue            # ICMP port unreachable dari sendto sebelumnya
+            self.received += 1
+            packets.append(data)
+        return packets
+
+    def close(self):
+        self.sock.close()
+
+
+class NetplayMetrics:
+    """
+    Statistik satu sesi netplay
+
+    Attributes:
+        rollbacks: Jumlah rollback
+        resim_frames: Total frame yang disimulasi ulang
+        max_depth: Rollback terdalam (frame)
+        rollback_ms_max, rollback_ms_total: Waktu rollback (restore + simulasi ulang)
+        over_budget: Rollback yang melebihi FRAME_BUDGET_MS
+        stalls: Frame menunggu input lawan (tebakan sudah max_rollback di depan)
+        checks, desyncs: Checksum yang dibandingkan / yang berbeda
+        desync_frame: Frame desync pertama (None = belum pernah)
+    """
+
+    def __init__(self):
+        self.rollbacks = 0
+        self.resim_frames = 0
+        self.max_depth = 0
+        self.rollback_ms_max = 0.0
+        self.rollback_ms_total = 0.0
+        self.over_budget = 0
+        self.stalls = 0
+        self.checks = 0
+        self.desyncs = 0
+        self.desync_frame = None
+
+    def as_dict(self):
+        """Semua metrik sebagai dict (untuk JSON / log)."""
+        return dict(vars(self))
+
+
+class RollbackSession:
+    """
+    Sinkronisasi satu BattleSimulation dengan peer lewat rollback
+
+    Frame f = nilai sim.tick SEBELUM tick ke-f dijalankan; snapshot frame f
+    di SnapshotRing adalah state sebelum input frame f diterapkan.
+
+    Attributes:
+        sim: BattleSimulation (mode 'pvp')
+        player: 0 = kita P1, 1 = kita P2
+        transport: UdpTransport (atau objek dengan send() / receive())
+        remote_confirmed: Semua input lawan sampai frame ini sudah diterima
+        metrics: NetplayMetrics
+    """
+
+    def __init__(self, sim, player, transport, input_delay=INPUT_DELAY,
+                 max_rollback=MAX_ROLLBACK, checksum_interval=CHECKSUM_INTERVAL):
+        """
+        Constructor
+
+        Args:
+            sim: BattleSimulation yang identik di kedua peer (karakter + seed)
+            player: 0 (P1) atau 1 (P2)
+            transport: Jalur paket ke peer
+            input_delay: Frame delay input lokal (lebih besar = rollback lebih jarang)
+            max_rollback: Maks frame tebakan sebelum stall
+            checksum_interval: Interval frame checksum desync
+        """
+        self.sim = sim
+        self.player = player
+        self.transport = transport
+        self.input_delay = input_delay
+        self.max_rollback = max_rollback
+        self.checksum_interval = checksum_interval
+        self.ring = SnapshotRing(max_rollback + 2)
+        self.metrics = NetplayMetrics()
+        self.connected = False      # True setelah paket pertama dari lawan
+        self.in_intro = True
+
+        # === RIWAYAT INPUT (frame -> bitmask) ===
+        start = sim.tick
+        self.local_inputs = {f: 0 for f in range(start, start + input_delay)}
+        self.local_last = start + input_delay - 1   # Frame terakhir yang sudah dijadwalkan
+        self.remote_inputs = {}
+        self.predicted = {}         # Tebakan yang dipakai untuk frame lawan
+        self.remote_confirmed = start - 1
+        self.peer_ack = start - 1   # Lawan sudah punya input kita sampai frame ini
+
+        # === CHECKSUM ===
+        self.next_check = start + checksum_interval
+        self.local_crc = (-1, 0)    # (frame, crc) terakhir yang dikirim
+        self.local_checksums = {}
+        self.remote_checksums = {}
+
+
+    @property
+    def sync_frame(self):
+        """Frame terbaru yang state-nya sudah pasti (semua input sebelumnya confirmed)."""
+        return min(self.remote_confirmed + 1, self.sim.tick)
+
+
+    def advance(self, local_input):
+        """
+        Satu frame game: terima paket, rollback bila perlu, jalankan satu tick
+
+        Args:
+            local_input: Bitmask INPUT_* player lokal frame ini
+
+        Returns:
+            bool | None: True jika masih countdown intro,
+                         None jika tidak ada tick baru (menunggu lawan / stall)
+        """
+        self.poll()
+        frame = self.sim.tick
+        if not self.connected or frame - self.remote_confirmed > self.max_rollback:
+            if self.connected:
+                self.metrics.stalls += 1
+            self.send()
+            return None
+
+        self.local_last = frame + self.input_delay
+        self.local_inputs[self.local_last] = local_input
+        self.in_intro = self._step(frame)
+        self.send()
+        if frame % PRUNE_INTERVAL == 0:
+            self._prune()
+        return self.in_intro
+
+
+    def _step(self, frame):
+        """Simpan snapshot frame lalu jalankan tick-nya (input lawan ditebak jika belum ada)."""
+        local = self.local_inputs[frame]
+        remote = self.remote_inputs.get(frame)
+        if remote is None:
+            # Tebakan: lawan masih menahan tombol yang sama
+            remote = self.remote_inputs.get(self.remote_confirmed, 0)
+            self.predicted[frame] = remote
+        self.ring.save(self.sim)
+        if self.player == 0:
+            return self.sim.step(local, remote)
+        return self.sim.step(remote, local)
+
+
+    def poll(self):
+        """Proses semua paket masuk; rollback sekali ke frame salah-tebak paling awal."""
+        rollback_to = None
+        for data in self.transport.receive():
+            packet = decode_packet(data)
+            if packet is None:
+                continue
+            self.connected = True
+            start, ack, crc_frame, crc, inputs = packet
+            self.peer_ack = max(self.peer_ack, ack)
+            if crc_frame >= 0:
+                self.remote_checksums[crc_frame] = crc
+
+            for frame, value in enumerate(inputs, start):
+                if frame <= self.remote_confirmed or frame in self.remote_inputs:
+                    continue
+                self.remote_inputs[frame] = value
+                if frame < self.sim.tick and self.predicted.get(frame) != value:
+                    if rollback_to is None or frame < rollback_to:
+                        rollback_to = frame
+            while self.remote_confirmed + 1 in self.remote_inputs:
+                self.remote_confirmed += 1
+
+        if rollback_to is not None:
+            self._rollback(rollback_to)
+        self._check_sync()
+
+
+    def _rollback(self, frame):
+        """Restore snapshot frame lalu simulasi ulang sampai frame sekarang."""
+        current = self.sim.tick
+        start = time.perf_counter()
+        self.ring.load(self.sim, frame)
+        while self.sim.tick < current:
+            self.in_intro = self._step(self.sim.tick)
+        ms = (time.perf_counter() - start) * 1000
+
+        m = self.metrics
+        depth = current - frame
+        m.rollbacks += 1
+        m.resim_frames += depth
+        m.max_depth = max(m.max_depth, depth)
+        m.rollback_ms_total += ms
+        m.rollback_ms_max = max(m.rollback_ms_max, ms)
+        if ms > FRAME_BUDGET_MS:
+            m.over_budget += 1
+
+
+    def _check_sync(self):
+        """Hitung checksum frame confirmed baru, bandingkan dengan milik lawan."""
+        sync = self.sync_frame
+        while self.next_check < sync:
+            frame = self.next_check
+            self.next_check += self.checksum_interval
+            if self.ring.has(frame):
+                crc = checksum(self.ring.view(frame))
+                self.local_checksums[frame] = crc
+                self.local_crc = (frame, crc)
+
+        m = self.metrics
+        for frame in [f for f in self.remote_checksums if f in self.local_checksums]:
+            m.checks += 1
+            if self.remote_checksums.pop(frame) != self.local_checksums.pop(frame):
+                m.desyncs += 1
+                if m.desync_frame is None:
+                    m.desync_frame = frame
+
+
+    def send(self):
+        """Kirim input lokal yang belum di-ack lawan (redundan -> tahan packet loss)."""
+        start = self.peer_ack + 1
+        end = min(self.local_last + 1, start + MAX_PACKET_INPUTS)
+        inputs = [self.local_inputs[f] for f in range(start, end)]
+        self.transport.send(encode_packet(start, self.remote_confirmed, *self.local_crc, inputs))
+
+
+    def _prune(self):
+        """Buang riwayat yang tidak mungkin dipakai lagi (rollback / kirim ulang)."""
+        sync = self.sync_frame
+        keep_local = min(self.peer_ack + 1, sync)
+        self.local_inputs = {f: v for f, v in self.local_inputs.items() if f >= keep_local}
+        self.remote_inputs = {f: v for f, v in self.remote_inputs.items()
+                              if f >= self.remote_confirmed}
+        self.predicted = {f: v for f, v in self.predicted.items() if f >= sync}
+        old = sync - self.checksum_interval * 4
+        for table in (self.local_checksums, self.remote_checksums):
+            for frame in [f for f in table if f < old]:
+                del table[frame]
+
+
+def _make_battle_class():
+    """NetplayBattle butuh pygame + display; import hanya jika dipakai."""
+    import pygame
+    from battle.battle_system import BattleSystem
+    from battle.fighter_base import keys_to_input
+
+    class NetplayBattle(BattleSystem):
+        """
+        BattleSystem PvP jaringan: input lokal + input peer lewat RollbackSession
+
+        Save/load state & rematch dimatikan (akan desync dengan peer).
+        """
+
+        def __init__(self, char_p1, char_p2, arena, player, transport, seed,
+                     input_delay=INPUT_DELAY, max_rollback=MAX_ROLLBACK):
+            super().__init__(char_p1, char_p2, arena, 'pvp', seed=seed, record=False)
+            self.session = RollbackSession(self.sim, player, transport,
+                                           input_delay, max_rollback)
+            pygame.display.set_caption(f"Py-Fighter - Netplay P{player + 1}")
+
+        def advance(self, key):
+            """Input lokal (kontrol P1) -> RollbackSession; stall = tidak ada tick."""
+            in_intro = self.session.advance(keys_to_input(key, 0))
+            if in_intro is None:
+                return self.session.in_intro
+            return in_intro
+
+        def handle_state_key(self, key):
+            pass
+
+        def handle_speed_key(self, key):
+            pass                    # Kedua peer harus berjalan 1x
+
+        def run(self):
+            try:
+                return super().run()
+            finally:
+                self.session.transport.close()
+
+    return NetplayBattle
+
+
+def _parse_peer(text):
+    host, port = text.rsplit(':', 1)
+    return host, int(port)
+
+
+def run_headless(args):
+    """
+    Peer tanpa display dengan input acak ter-seed, 60 frame/detik real time
+
+    Returns:
+        dict: Metrik sesi + checksum state akhir (frame args.ticks)
+    """
+    sim = BattleSimulation.headless(args.p1, args.p2, 'pvp', args.seed)
+    transport = UdpTransport(args.port, _parse_peer(args.peer), args.latency,
+                             args.jitter, args.loss, args.seed + args.player)
+    session = RollbackSession(sim, args.player - 1, transport, args.delay, args.rollback)
+    script = MatchRandom(args.seed * 31 + args.player)
+    held = 0
+    frames = 0
+    final_crc = None
+    linger_until = None
+    timeout = time.perf_counter() + args.ticks / SIM_HZ * 4 + 10
+    next_frame = time.perf_counter()
+
+    while True:
+        frames += 1
+        if frames % 8 == 0:
+            held = script.next_u64() & 0x3F     # Ganti tombol tiap 8 frame
+        if sim.tick < args.ticks:
+            session.advance(held)
+        else:
+            session.poll()
+            session.send()
+            if final_crc is None and session.remote_confirmed >= args.ticks - 1:
+                final_crc = checksum(snapshot(sim))
+                linger_until = time.perf_counter() + 1.0    # Tetap kirim untuk lawan
+        now = time.perf_counter()
+        if (linger_until is not None and now > linger_until) or now > timeout:
+            break
+        next_frame += 1 / SIM_HZ
+        time.sleep(max(0.0, next_frame - time.perf_counter()))
+
+    transport.close()
+    return {
+        'player': args.player,
+        'tick': sim.tick,
+        'final_crc': final_crc,
+        'winner': sim.winner,
+        'health': [sim.p1.health, sim.p2.health],
+        'packets': {'sent': transport.sent, 'received': transport.received,
+                    'dropped': transport.dropped},
+        **session.metrics.as_dict(),
+    }
+
+
+def run_pair(args):
+    """Jalankan dua peer headless (process terpisah) di localhost dan bandingkan hasil."""
+    common = ['--headless', '--seed', str(args.seed), '--ticks', str(args.ticks),
+              '--delay', str(args.delay), '--rollback', str(args.rollback),
+              '--latency', str(args.latency), '--jitter', str(args.jitter),
+              '--loss', str(args.loss), '--p1', args.p1, '--p2', args.p2]
+    ports = (args.port, args.port + 1)
+    procs = [
+        subprocess.Popen([sys.executable, '-m', 'battle.netplay', '--player', str(p + 1),
+                          '--port', str(ports[p]), '--peer', f"127.0.0.1:{ports[1 - p]}",
+                          *common], stdout=subprocess.PIPE, text=True)
+        for p in (0, 1)
+    ]
+    results = [json.loads(proc.communicate()[0].strip().splitlines()[-1]) for proc in procs]
+    for r in results:
+        print(json.dumps(r))
+    crcs = [r['final_crc'] for r in results]
+    ok = crcs[0] is not None and crcs[0] == crcs[1] and not any(r['desyncs'] for r in results)
+    print(f"final state: {'IN SYNC' if ok else 'DESYNC'} "
+          f"(crc {crcs[0]} / {crcs[1]}, frame {args.ticks})")
+    return ok
+
+
+# === ENTRY POINT ===
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="PvP netplay (UDP, rollback)")
+    parser.add_argument('--player', type=int, choices=(1, 2), default=1)
+    parser.add_argument('--port', type=int, default=7001, help="port UDP lokal")
+    parser.add_argument('--peer', default='127.0.0.1:7002', help="host:port lawan")
+    parser.add_argument('--seed', type=int, default=0, help="seed match (harus sama di kedua peer)")
+    parser.add_argument('--p1', default='Samurai', help="karakter P1")
+    parser.add_argument('--p2', default='Shinobi', help="karakter P2")
+    parser.add_argument('--arena', default='Keputih')
+    parser.add_argument('--delay', type=int, default=INPUT_DELAY, help="input delay (frame)")
+    parser.add_argument('--rollback', type=int, default=MAX_ROLLBACK, help="window rollback (frame)")
+    parser.add_argument('--latency', type=float, default=0, help="latency buatan per arah (ms)")
+    parser.add_argument('--jitter', type=float, default=0, help="jitter buatan (ms)")
+    parser.add_argument('--loss', type=float, default=0, help="packet loss buatan (0..1)")
+    parser.add_argument('--headless', action='store_true', help="tanpa display, input acak")
+    parser.add_argument('--ticks', type=int, default=1800, help="lama match headless (frame)")
+    parser.add_argument('--pair', action='store_true', help="jalankan dua peer headless")
+    args = parser.parse_args()
+
+    if args.pair:
+        sys.exit(0 if run_pair(args) else 1)
+    if args.headless:
+        print(json.dumps(run_headless(args)))
+    else:
+        transport = UdpTransport(args.port, _parse_peer(args.peer),
+                                 args.latency, args.jitter, args.loss)
+        NetplayBattle = _make_battle_class()
+        NetplayBattle(args.p1, args.p2, args.arena, args.player - 1, transport,
+                      args.seed, args.delay, args.rollback).run()
@@ -0,0 +1,570 @@
+"""
+FILE: replay.py
+DESKRIPSI: Format replay biner ringkas (input per tick, terkompresi, ditulis streaming)
+           + keyframe untuk seek acak + playback real time lewat renderer atau
+           headless secepat CPU + verifikasi
+DIGUNAKAN OLEH: battle_system.py (ReplayWriter merekam setiap match),
+                developer (playback / verifikasi dari terminal)
+MENGGUNAKAN: struct, zlib, simulation.py (BattleSimulation, SIM_VERSION),
+             snapshot.py (state awal + checksum akhir)
+
+ALUR PROGRAM:
+1. BattleSystem membuat ReplayWriter saat match dimulai:
+   - Header: magic, versi format, SIM_VERSION, seed, mode, karakter, arena,
+     snapshot state awal (rematch / load state juga bisa di-replay)
+2. Setiap tick, record(p1, p2) menambah 2 byte (bitmask INPUT_* tiap sisi,
+   termasuk input yang dihasilkan AI)
+   - Tiap CHUNK_TICKS tick, input di-compress (zlib) dan langsung ditulis ke file
+   - Tiap keyframe_interval tick, snapshot state lengkap ditulis sebagai keyframe
+     (zlib dari XOR dengan state awal -> field yang tidak berubah jadi nol)
+3. close(sim) menulis chunk terakhir + record akhir (jumlah tick, crc32 state akhir,
+   pemenang) + tabel index (offset semua chunk & keyframe) + footer
+   File tanpa index (game crash) tetap bisa diputar lewat scan berurutan
+4. Replay(path) membaca header + index; chunk & keyframe baru di-decode saat dipakai
+   - play_headless() / verify(): jalankan ulang dengan seed + input yang sama,
+     bandingkan checksum akhir
+   - seek(tick): restore keyframe terdekat <= tick, simulasi maju sisa tick saja
+
+Layout file:
+    HEADER | string x4 (mode, p1, p2, arena) | state awal |
+    ('I' + CHUNK + zlib(input) | 'K' + KEYFRAME + zlib(state ^ awal)) ... |
+    'E' + END | 'X' + INDEX + entri chunk + entri keyframe | FOOTER
+
+Jalankan:
+    python -m battle.replay verify reports/replays/*.pfr   (headless, secepat CPU)
+    python -m battle.replay play FILE                       (real time, dengan window)
+    python -m battle.replay seek FILE                       (ukur waktu seek acak)
+    python -m battle.replay selftest                        (rekam + verifikasi match AI)
+"""
+import os
+import sys
+import time
+import zlib
+import struct
+import argparse
+from bisect import bisect_right
+from battle.simulation import BattleSimulation, SIM_VERSION
+from battle.snapshot import snapshot, restore, checksum
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+REPLAY_DIR = os.path.join(BASE_DIR, 'reports', 'replays')
+REPLAY_EXT = '.pfr'
+FORMAT_VERSION = 2          # v2: keyframe + index (file v1 tetap bisa dibaca)
+READ_VERSIONS = (1, 2)
+CHUNK_TICKS = 600           # Input per chunk terkompresi (10 detik)
+KEYFRAME_TICKS = 600        # Keyframe tiap 10 detik -> seek maks 600 tick simulasi (~3 ms)
+SEEK_STEP = 300             # Lompatan tombol Kiri / Kanan saat playback
+
+# magic, versi format, SIM_VERSION, seed
+HEADER = struct.Struct('<4sHHQ')
+MAGIC = b'PFRP'
+STRING_LEN = struct.Struct('<B')
+STATE_LEN = struct.Struct('<H')
+# Chunk input: tick pertama (relatif ke awal replay), jumlah tick, panjang data zlib
+CHUNK = struct.Struct('<IHI')
+# Record akhir: jumlah tick, crc32 snapshot state akhir, pemenang (0 = belum ada)
+END = struct.Struct('<IIB')
+# Keyframe: tick (relatif ke awal replay), panjang data zlib
+KEYFRAME = struct.Struct('<IH')
+# Index: jumlah chunk, jumlah keyframe; entri = (tick, offset data, ukuran data[, jumlah tick])
+INDEX = struct.Struct('<II')
+INDEX_CHUNK = struct.Struct('<IIIH')
+INDEX_KEYFRAME = struct.Struct('<IIH')
+# Footer (akhir file): offset record index, magic
+FOOTER = struct.Struct('<I4s')
+FOOTER_MAGIC = b'PFIX'
+TAG_CHUNK = b'I'
+TAG_KEYFRAME = b'K'
+TAG_END = b'E'
+TAG_INDEX = b'X'
+
+
+def _xor(a, b):
+    """XOR dua buffer sama panjang (keyframe disimpan relatif ke state awal)."""
+    return (int.from_bytes(a, 'little') ^ int.from_bytes(b, 'little')).to_bytes(len(a), 'little')
+
+
+def replay_filename(p1, p2, seed):
+    """Nama file replay unik: waktu (ms) + karakter + seed."""
+    now = time.time()
+    stamp = time.strftime('%Y%m%d-%H%M%S', time.localtime(now)) + f"{int(now * 1000) % 1000:03d}"
+    names = f"{p1}_vs_{p2}".replace(' ', '-')
+    return f"{stamp}_{names}_{seed & 0xFFFFFFFF:08x}{REPLAY_EXT}"
+
+
+class ReplayWriter:
+    """
+    Perekam replay streaming
+
+    Attributes:
+        path: File tujuan
+        ticks: Jumlah tick yang sudah direkam
+        keyframe_bytes: Total byte keyframe + index (overhead seek)
+        closed: True setelah close()
+    """
+
+    def __init__(self, path, sim, p1_name, p2_name, arena, chunk_ticks=CHUNK_TICKS,
+                 keyframe_interval=KEYFRAME_TICKS):
+        """
+        Constructor - langsung menulis header + state awal
+
+        Args:
+            path: File tujuan (folder dibuat jika belum ada)
+            sim: BattleSimulation yang akan direkam (state saat ini = awal replay)
+            p1_name, p2_name: Nama karakter
+            arena: Nama arena
+            chunk_ticks: Jumlah tick per chunk terkompresi
+            keyframe_interval: Tick antar keyframe (0 = tanpa keyframe;
+                               kecil = seek lebih cepat, file lebih besar)
+        """
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.path = path
+        self.sim = sim
+        self.chunk_ticks = chunk_ticks
+        self.keyframe_interval = keyframe_interval
+        self.ticks = 0
+        self.keyframe_bytes = 0
+        self.closed = False
+        self._chunk_start = 0
+        self._buffer = bytearray()
+        self._chunks = []           # Entri index (tick, offset, ukuran, jumlah tick)
+        self._keyframes = []        # Entri index (tick, offset, ukuran)
+
+        self._file = open(path, 'wb')
+        self._file.write(HEADER.pack(MAGIC, FORMAT_VERSION, SIM_VERSION, sim.seed))
+        for text in (sim.mode, p1_name, p2_name, arena):
+            data = text.encode('utf-8')
+            self._file.write(STRING_LEN.pack(len(data)) + data)
+        self.start_state = snapshot(sim)
+        self._file.write(STATE_LEN.pack(len(self.start_state)) + self.start_state)
+
+
+    def record(self, p1_input, p2_input):
+        """Tambah input satu tick (dipanggil setelah sim.step())."""
+        self._buffer.append(p1_input)
+        self._buffer.append(p2_input)
+        self.ticks += 1
+        if self.ticks - self._chunk_start >= self.chunk_ticks:
+            self._write_chunk()
+        if self.keyframe_interval and self.ticks % self.keyframe_interval == 0:
+            self._write_keyframe()
+
+
+    def _write_keyframe(self):
+        """Snapshot state saat ini (= state replay pada tick self.ticks)."""
+        data = zlib.compress(_xor(snapshot(self.sim), self.start_state), 9)
+        self._file.write(TAG_KEYFRAME + KEYFRAME.pack(self.ticks, len(data)))
+        self._keyframes.append((self.ticks, self._file.tell(), len(data)))
+        self._file.write(data)
+        self.keyframe_bytes += 1 + KEYFRAME.size + len(data)
+
+
+    def _write_chunk(self):
+        """Compress input yang terkumpul lalu tulis + flush ke disk."""
+        if not self._buffer:
+            return
+        data = zlib.compress(bytes(self._buffer), 9)
+        count = len(self._buffer) // 2
+        self._file.write(TAG_CHUNK + CHUNK.pack(self._chunk_start, count, len(data)))
+        self._chunks.append((self._chunk_start, self._file.tell(), len(data), count))
+        self._file.write(data)
+        self._file.flush()
+        self._chunk_start = self.ticks
+        self._buffer.clear()
+
+
+    def close(self, sim=None):
+        """
+        Tutup replay dengan checksum state akhir + tabel index
+
+        Args:
+            sim: BattleSimulation yang direkam (None = sim dari constructor)
+        """
+        if self.closed:
+            return
+        sim = sim or self.sim
+        self._write_chunk()
+        self._file.write(TAG_END + END.pack(self.ticks, checksum(snapshot(sim)), sim.winner or 0))
+
+        index_offset = self._file.tell()
+        self._file.write(TAG_INDEX + INDEX.pack(len(self._chunks), len(self._keyframes)))
+        for tick, offset, size, count in self._chunks:
+            self._file.write(INDEX_CHUNK.pack(tick, offset, size, count))
+        for entry in self._keyframes:
+            self._file.write(INDEX_KEYFRAME.pack(*entry))
+        self._file.write(FOOTER.pack(index_offset, FOOTER_MAGIC))
+        self.keyframe_bytes += self._file.tell() - index_offset
+        self._file.close()
+        self.closed = True
+
+
+class Replay:
+    """
+    Isi file replay (chunk input & keyframe di-decode saat dibutuhkan)
+
+    Attributes:
+        mode, p1, p2, arena, seed: Setup match
+        format_version, sim_version: Versi saat direkam
+        start_state: Snapshot state awal
+        ticks: Jumlah tick yang direkam
+        keyframe_ticks: Tick tiap keyframe (urut)
+        keyframe_bytes: Byte keyframe + index di file (overhead seek)
+        final_crc, winner: Dari record akhir (None jika file terpotong)
+    """
+
+    def __init__(self, path):
+        """
+        Baca header + index (atau scan berurutan jika file tanpa index)
+
+        Raises:
+            ValueError: Bukan file replay / versi format tidak dikenal
+        """
+        with open(path, 'rb') as f:
+            data = f.read()
+        self.path = path
+        self.size = len(data)
+        self._data = data
+        magic, self.format_version, self.sim_version, self.seed = HEADER.unpack_from(data)
+        if magic != MAGIC or self.format_version not in READ_VERSIONS:
+            raise ValueError(f"{path}: bukan replay format v{READ_VERSIONS}")
+        pos = HEADER.size
+
+        strings = []
+        for _ in range(4):
+            (n,) = STRING_LEN.unpack_from(data, pos)
+            pos += STRING_LEN.size
+            strings.append(data[pos:pos + n].decode('utf-8'))
+            pos += n
+        self.mode, self.p1, self.p2, self.arena = strings
+        (n,) = STATE_LEN.unpack_from(data, pos)
+        pos += STATE_LEN.size
+        self.start_state = data[pos:pos + n]
+        pos += n
+
+        self._chunks = []           # (tick, offset, ukuran, jumlah tick)
+        self._keyframes = []        # (tick, offset, ukuran)
+        self.final_crc = None
+        self.winner = None
+        self.keyframe_bytes = 0
+        if not self._read_index():
+            self._scan(pos)
+        self._chunk_ticks = [c[0] for c in self._chunks]
+        self.keyframe_ticks = [k[0] for k in self._keyframes]
+        self.ticks = sum(c[3] for c in self._chunks)
+        self._decoded = {}          # index chunk -> bytes input
+        self._inputs = None
+
+
+    def _read_index(self):
+        """Baca tabel index dari footer. Returns: False jika tidak ada (file v1 / terpotong)."""
+        data = self._data
+        if len(data) < FOOTER.size:
+            return False
+        index_offset, magic = FOOTER.unpack_from(data, len(data) - FOOTER.size)
+        if magic != FOOTER_MAGIC or data[index_offset:index_offset + 1] != TAG_INDEX:
+            return False
+        pos = index_offset + 1
+        n_chunks, n_keyframes = INDEX.unpack_from(data, pos)
+        pos += INDEX.size
+        for _ in range(n_chunks):
+            self._chunks.append(INDEX_CHUNK.unpack_from(data, pos))
+            pos += INDEX_CHUNK.size
+        for _ in range(n_keyframes):
+            self._keyframes.append(INDEX_KEYFRAME.unpack_from(data, pos))
+            pos += INDEX_KEYFRAME.size
+        self.keyframe_bytes = (len(data) - index_offset
+                               + sum(1 + KEYFRAME.size + k[2] for k in self._keyframes))
+        # Record akhir tepat sebelum index
+        end = index_offset - END.size
+        if data[end - 1:end] == TAG_END:
+            _ticks, self.final_crc, winner = END.unpack_from(data, end)
+            self.winner = winner or None
+        return True
+
+
+    def _scan(self, pos):
+        """Baca record satu per satu (file tanpa index)."""
+        data = self._data
+        while pos < len(data):
+            tag = data[pos:pos + 1]
+            pos += 1
+            if tag == TAG_CHUNK:
+                start, count, size = CHUNK.unpack_from(data, pos)
+                pos += CHUNK.size
+                if pos + size > len(data):
+                    break           # Chunk terakhir terpotong
+                self._chunks.append((start, pos, size, count))
+                pos += size
+            elif tag == TAG_KEYFRAME:
+                tick, size = KEYFRAME.unpack_from(data, pos)
+                pos += KEYFRAME.size
+                self._keyframes.append((tick, pos, size))
+                self.keyframe_bytes += 1 + KEYFRAME.size + size
+                pos += size
+            elif tag == TAG_END:
+                _ticks, self.final_crc, winner = END.unpack_from(data, pos)
+                self.winner = winner or None
+                break
+            else:
+                break               # Terpotong / rusak: pakai record yang sudah terbaca
+
+
+    @property
+    def complete(self):
+        """True jika file punya record akhir (checksum bisa diverifikasi)."""
+        return self.final_crc is not None
+
+
+    @property
+    def inputs(self):
+        """Semua input (bytes, 2 byte per tick: P1, P2)."""
+        if self._inputs is None:
+            self._inputs = b''.join(self._chunk(i) for i in range(len(self._chunks)))
+        return self._inputs
+
+
+    def _chunk(self, i):
+        """Input satu chunk (decompress sekali, lalu di-cache)."""
+        data = self._decoded.get(i)
+        if data is None:
+            _tick, offset, size, _count = self._chunks[i]
+            data = self._decoded[i] = zlib.decompress(self._data[offset:offset + size])
+        return data
+
+
+    def input_range(self, start, end):
+        """
+        Input tick [start, end) tanpa decode chunk lain
+
+        Returns:
+            bytes: 2 byte per tick
+        """
+        parts = []
+        i = max(0, bisect_right(self._chunk_ticks, start) - 1)
+        while start < end and i < len(self._chunks):
+            tick, _offset, _size, count = self._chunks[i]
+            lo, hi = max(start, tick), min(end, tick + count)
+            if lo < hi:
+                parts.append(self._chunk(i)[(lo - tick) * 2:(hi - tick) * 2])
+            start = max(start, hi)
+            i += 1
+        return b''.join(parts)
+
+
+    def keyframe(self, i):
+        """Snapshot keyframe ke-i (bytes MATCH_SIZE)."""
+        _tick, offset, size = self._keyframes[i]
+        return _xor(zlib.decompress(self._data[offset:offset + size]), self.start_state)
+
+
+    def new_simulation(self):
+        """BattleSimulation headless pada state awal replay."""
+        sim = BattleSimulation.headless(self.p1, self.p2, self.mode, self.seed)
+        restore(sim, self.start_state)
+        return sim
+
+
+    def seek(self, tick, sim=None):
+        """
+        Pindah ke tick tertentu: restore keyframe terdekat lalu simulasi sisanya
+
+        Args:
+            tick: Tick tujuan (0 .. ticks), relatif ke awal replay
+            sim: BattleSimulation tujuan (None = simulasi headless baru)
+
+        Returns:
+            BattleSimulation: State replay pada tick tersebut
+        """
+        tick = max(0, min(tick, self.ticks))
+        sim = sim or self.new_simulation()
+        i = bisect_right(self.keyframe_ticks, tick) - 1
+        if i >= 0:
+            base = self.keyframe_ticks[i]
+            restore(sim, self.keyframe(i))
+        else:
+            base = 0
+            restore(sim, self.start_state)
+        data = self.input_range(base, tick)
+        for j in range(0, len(data), 2):
+            sim.step(data[j], data[j + 1])
+        return sim
+
+
+def play_headless(replay, sim=None):
+    """
+    Jalankan seluruh replay tanpa display, secepat CPU
+
+    Args:
+        replay: Replay
+        sim: BattleSimulation tujuan (None = replay.new_simulation())
+
+    Returns:
+        tuple: (sim setelah tick terakhir, tick pertama yang input-nya berbeda
+                dari rekaman atau None)
+    """
+    sim = sim or replay.new_simulation()
+    inputs = replay.inputs
+    diverged = None
+    for i in range(0, len(inputs), 2):
+        recorded = (inputs[i], inputs[i + 1])
+        sim.step(*recorded)
+        if diverged is None and sim.last_inputs != recorded:
+            diverged = i // 2       # Mis. AI memilih aksi lain -> simulasi berubah
+    return sim, diverged
+
+
+def verify(replay):
+    """
+    Putar ulang headless dan bandingkan dengan checksum rekaman
+
+    Returns:
+        tuple: (ok, tick input pertama yang berbeda atau None)
+    """
+    if not replay.complete or replay.sim_version != SIM_VERSION:
+        return False, None
+    sim, diverged = play_headless(replay)
+    return checksum(snapshot(sim)) == replay.final_crc and diverged is None, diverged
+
+
+def _make_battle_class():
+    """ReplayBattle butuh pygame + display; import hanya jika dipakai."""
+    from battle.battle_system import BattleSystem
+
+    class ReplayBattle(BattleSystem):
+        """
+        Putar replay real time lewat renderer BattleSystem
+
+        R: ulang dari awal, Kiri / Kanan: mundur / maju SEEK_STEP tick (lewat keyframe).
+        Setelah tick terakhir, simulasi berhenti (frame terakhir).
+        """
+
+        def __init__(self, replay):
+            super().__init__(replay.p1, replay.p2, replay.arena, replay.mode,
+                             seed=replay.seed, record=False)
+            self.replay = replay
+            self.restart()
+
+        def restart(self):
+            self.seek(0)
+
+        def seek(self, tick):
+            self.replay.seek(tick, self.sim)
+            self.cursor = max(0, min(tick, self.replay.ticks))
+            self.last_scene = None
+            self.tick_positions = None
+            self.reset_effects()
+
+        def advance(self, key):
+            """Input dari rekaman, bukan keyboard."""
+            if self.cursor >= self.replay.ticks:
+                return self.sim.intro_count > 0
+            i = self.cursor * 2
+            self.cursor += 1
+            return self.sim.step(self.replay.inputs[i], self.replay.inputs[i + 1])
+
+        def handle_state_key(self, key):
+            import pygame
+            if key == pygame.K_r:
+                self.restart()
+            elif key == pygame.K_LEFT:
+                self.seek(self.cursor - SEEK_STEP)
+            elif key == pygame.K_RIGHT:
+                self.seek(self.cursor + SEEK_STEP)
+
+    return ReplayBattle
+
+
+def measure_seeks(replay, count=50, seed=0):
+    """
+    Seek ke tick acak, ukur waktunya, dan cocokkan dengan playback linear
+
+    Returns:
+        tuple: (ok, rata-rata ms, maks ms)
+    """
+    from battle.match_random import MatchRandom
+    rng = MatchRandom(seed)
+    targets = [int(rng.random() * (replay.ticks + 1)) for _ in range(count)]
+
+    # State referensi: satu kali playback linear
+    expected = {}
+    sim = replay.new_simulation()
+    inputs = replay.inputs
+    wanted = set(targets)
+    for tick in range(replay.ticks + 1):
+        if tick in wanted:
+            expected[tick] = snapshot(sim)
+        if tick < replay.ticks:
+            sim.step(inputs[tick * 2], inputs[tick * 2 + 1])
+
+    times = []
+    ok = True
+    for tick in targets:
+        start = time.perf_counter()
+        replay.seek(tick, sim)
+        times.append((time.perf_counter() - start) * 1000)
+        ok = ok and snapshot(sim) == expected[tick]
+    return ok, sum(times) / len(times), max(times)
+
+
+def _selftest(seconds, keyframe_interval=KEYFRAME_TICKS):
+    """Rekam match AI (input P1 acak, ganti tiap 8 tick) lalu verifikasi."""
+    import tempfile
+    from battle.match_random import MatchRandom
+
+    sim = BattleSimulation.headless('Samurai', 'Countess Vampire', 'ai', 1234)
+    path = os.path.join(tempfile.mkdtemp(), 'selftest' + REPLAY_EXT)
+    writer = ReplayWriter(path, sim, 'Samurai', 'Countess Vampire', 'Keputih',
+                          keyframe_interval=keyframe_interval)
+    script = MatchRandom(99)
+    held = 0
+    for tick in range(seconds * 60):
+        if tick % 8 == 0:
+            held = script.next_u64() & 0x3F
+        sim.step(held)
+        writer.record(*sim.last_inputs)
+    writer.close(sim)
+    return path
+
+
+# === ENTRY POINT ===
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay Py-Fighter")
+    parser.add_argument('command', choices=('verify', 'play', 'info', 'seek', 'selftest'))
+    parser.add_argument('files', nargs='*')
+    parser.add_argument('--seconds', type=int, default=99, help="lama match selftest")
+    parser.add_argument('--keyframes', type=int, default=KEYFRAME_TICKS,
+                        help="interval keyframe selftest (tick, 0 = tanpa)")
+    args = parser.parse_args()
+
+    if args.command == 'selftest':
+        path = _selftest(args.seconds, args.keyframes)
+        args.files = [path]
+        args.command = 'verify'
+
+    failed = 0
+    for path in args.files:
+        replay = Replay(path)
+        if args.command == 'info':
+            print(f"{path}: {replay.p1} vs {replay.p2} @ {replay.arena} ({replay.mode}), "
+                  f"seed {replay.seed}, {replay.ticks} tick, {replay.size} byte, "
+                  f"sim v{replay.sim_version}, {'lengkap' if replay.complete else 'terpotong'}, "
+                  f"{len(replay.keyframe_ticks)} keyframe = {replay.keyframe_bytes} byte "
+                  f"({replay.keyframe_bytes / replay.size * 100:.0f}%)")
+        elif args.command == 'seek':
+            ok, mean, worst = measure_seeks(replay)
+            failed += not ok
+            print(f"{path}: seek {'OK' if ok else 'MISMATCH'}, rata-rata {mean:.2f} ms, "
+                  f"maks {worst:.2f} ms ({len(replay.keyframe_ticks)} keyframe, "
+                  f"overhead {replay.keyframe_bytes} byte)")
+        elif args.command == 'verify':
+            start = time.perf_counter()
+            ok, diverged = verify(replay)
+            elapsed = time.perf_counter() - start
+            failed += not ok
+            note = f", input berbeda mulai tick {diverged}" if diverged is not None else ""
+            print(f"{path}: {'OK' if ok else 'MISMATCH'} ({replay.ticks} tick, "
+                  f"{replay.size} byte, {replay.ticks / max(elapsed, 1e-9):,.0f} tick/s{note})")
+        else:
+            _make_battle_class()(replay).run()
+    sys.exit(1 if failed else 0)
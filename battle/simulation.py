@@ -0,0 +1,223 @@
+"""
+FILE: simulation.py
+DESKRIPSI: Inti simulasi battle deterministik - fisika, attack, animasi & AI dijalankan
+           per tick dari input eksplisit, tanpa display / jam / keyboard
+DIGUNAKAN OLEH: battle_system.py (BattleSystem.run() hanya membaca state untuk render)
+MENGGUNAKAN: fighter_base.py (Fighter.step/update), ai_controller.py (AIController.decide),
+             match_random.py (RNG per match), characters.py (data karakter),
+             collision_masks.py (mask hit/hurt per frame)
+
+ALUR PROGRAM:
+1. BattleSimulation(p1, p2, mode, seed) dibuat di awal match
+   - mode 'ai': AIController mengontrol P2 memakai RNG match
+   - mode 'cpu': AI di kedua sisi (match farm, demo)
+2. Setiap tick, pemanggil memberi bitmask input P1 (dan P2 jika pvp) ke step()
+   - Countdown intro: INTRO_TICKS tick per angka
+   - Fight: P1 step -> P2 step (AI/input) -> update animasi -> cek hit (mask
+     frame aktif, P1 dulu) -> cek pemenang
+3. Seed + urutan input yang sama -> state identik bit demi bit
+4. Renderer (BattleSystem) membaca p1, p2, intro_count, round_over, winner
+
+Jalankan langsung untuk cek determinisme & throughput headless:
+    python -m battle.simulation
+"""
+import time
+from battle.fighter_base import Fighter, HITBOX_W
+from battle.ai_controller import AIController
+from battle.match_random import MatchRandom
+from battle.characters import CHARACTERS
+from engine.collision_masks import COLLISION_MASKS
+
+
+SIM_HZ = 60                 # Tick per detik (sama dengan FPS lama)
+SIM_VERSION = 2             # Naikkan jika aturan simulasi berubah (replay lama tidak valid)
+INTRO_TICKS = 60            # Lama tiap angka countdown (1 detik)
+SCREEN_W, SCREEN_H = 1400, 800
+SPAWN_P1 = (200, 450)       # Posisi awal P1 (kiri)
+SPAWN_P2 = (1000, 450)      # Posisi awal P2 (kanan)
+
+
+def headless_fighter(name, x, y, flip):
+    """
+    Buat Fighter tanpa sprite (untuk simulasi tanpa display)
+
+    Animasi diisi None dengan jumlah frame yang sama seperti sprite asli,
+    sehingga urutan animasi (dan durasi attack/hurt) identik dengan versi render.
+    Mask collision tetap dipakai (dari sprite pack / decode tanpa display),
+    jadi hit identik dengan versi render.
+
+    Args:
+        name: Nama karakter (key di CHARACTERS)
+        x, y: Posisi spawn
+        flip: True jika menghadap kiri
+
+    Returns:
+        Fighter
+    """
+    folder, scale, offset, files, frames = CHARACTERS.get(name, CHARACTERS['Samurai'])
+    animations = [[None] * n for n in frames]
+    collision = COLLISION_MASKS.get(folder, scale, offset, files, frames, HITBOX_W)
+    return Fighter(name, x, y, flip, {'scale': scale, 'offset': offset},
+                   animations, animations, collision)
+
+
+class BattleSimulation:
+    """
+    State + logika satu pertandingan dalam tick integer
+    
+    Attributes:
+        p1, p2: Fighter
+        ai: AIController P2 (None jika PvP)
+        ai_p1: AIController P1 (hanya mode 'cpu')
+        rng: MatchRandom milik match
+        tick: Jumlah tick yang sudah dijalankan
+        intro_count: Angka countdown (0 = fight)
+        round_over, winner: Status akhir pertandingan
+        last_inputs: (P1, P2) bitmask yang dipakai tick terakhir (termasuk AI)
+        timer: FrameTimer untuk fase 'ai' / 'physics' (None = tanpa instrumentasi)
+    """
+    
+    def __init__(self, p1, p2, mode='pvp', seed=0, screen_w=SCREEN_W, screen_h=SCREEN_H):
+        """
+        Constructor
+        
+        Args:
+            p1, p2: Fighter (dengan sprite atau headless)
+            mode: 'pvp', 'ai' (AI mengontrol P2), atau 'cpu' (AI vs AI)
+            seed: Seed RNG match
+            screen_w, screen_h: Batas arena
+        """
+        self.p1 = p1
+        self.p2 = p2
+        self.mode = mode
+        self.seed = seed
+        self.screen_w = screen_w
+        self.screen_h = screen_h
+        
+        # === RNG & AI ===
+        self.rng = MatchRandom(seed)
+        self.ai = AIController(p2, p1, self.rng) if mode in ('ai', 'cpu') else None
+        self.ai_p1 = AIController(p1, p2, self.rng) if mode == 'cpu' else None
+        
+        # === GAME STATE ===
+        self.tick = 0
+        self.intro_count = 3        # Countdown sebelum mulai
+        self.intro_timer = 0        # Tick sejak angka countdown terakhir berganti
+        self.round_over = False     # True jika ada pemenang
+        self.winner = None          # 1 atau 2
+        self.last_inputs = (0, 0)   # Input P1, P2 yang benar-benar dipakai tick terakhir
+        self.timer = None           # FrameTimer (frame_timing.py) saat instrumentasi aktif
+    
+    
+    @classmethod
+    def headless(cls, char_p1, char_p2, mode='pvp', seed=0):
+        """
+        Buat simulasi tanpa sprite (tidak butuh display)
+        
+        Args:
+            char_p1, char_p2: Nama karakter
+            mode: 'pvp', 'ai', atau 'cpu'
+            seed: Seed RNG match
+        """
+        p1 = headless_fighter(char_p1, *SPAWN_P1, False)
+        p2 = headless_fighter(char_p2, *SPAWN_P2, True)
+        return cls(p1, p2, mode, seed)
+    
+    
+    def step(self, p1_input, p2_input=0):
+        """
+        Jalankan satu tick
+        
+        Args:
+            p1_input: Bitmask INPUT_* P1 (diabaikan di mode 'cpu')
+            p2_input: Bitmask INPUT_* P2 (diabaikan di mode 'ai' / 'cpu')
+        
+        Returns:
+            bool: True jika tick ini masih countdown intro
+        """
+        self.tick += 1
+        
+        # === INTRO COUNTDOWN ===
+        in_intro = self.intro_count > 0
+        if in_intro:
+            self.last_inputs = (0, 0)
+            self.intro_timer += 1
+            if self.intro_timer >= INTRO_TICKS:
+                self.intro_count -= 1
+                self.intro_timer = 0
+            return True
+        
+        # === GAME LOGIC ===
+        w, h = self.screen_w, self.screen_h
+        timer = self.timer
+        if timer is not None:
+            timer.mark('input')
+        # P1: input atau AI (mode 'cpu')
+        if self.ai_p1:
+            p1_input = self.ai_p1.decide(self.round_over)
+            if timer is not None:
+                timer.mark('ai')
+        if p1_input is not None:
+            self.p1.step(w, h, self.p2, self.round_over, p1_input)
+        
+        # P2: AI atau input
+        if self.ai:
+            if timer is not None:
+                timer.mark('physics')
+            p2_input = self.ai.decide(self.round_over)
+            if timer is not None:
+                timer.mark('ai')
+        if p2_input is not None:
+            self.p2.step(w, h, self.p1, self.round_over, p2_input)
+        self.last_inputs = (p1_input or 0, p2_input or 0)     # Untuk replay
+        
+        # Update animasi
+        self.p1.update()
+        self.p2.update()
+        
+        # Hit dicek setelah animasi maju: frame yang dicek = frame yang tampil tick ini
+        if not self.round_over:
+            self.p1.resolve_attack(self.p2)
+            self.p2.resolve_attack(self.p1)
+        if timer is not None:
+            timer.mark('physics')
+        
+        # === CEK PEMENANG ===
+        if not self.round_over:
+            if not self.p1.alive:
+                self.round_over = True
+                self.winner = 2
+            elif not self.p2.alive:
+                self.round_over = True
+                self.winner = 1
+        return False
+
+
+def fighter_state(f):
+    """Tuple state gameplay Fighter (untuk membandingkan dua simulasi)."""
+    return (f.rect.x, f.rect.y, f.vel_y, f.health, f.alive, f.running, f.jump,
+            f.attacking, f.attack_type, f.attack_cooldown, f.hit, f.action,
+            f.frame_index, f.ticks, f.update_time, f.hits_landed, f.attack_hit)
+
+
+def _run_headless(seed, ticks):
+    """Jalankan match AI vs input acak, return (state akhir, detik)."""
+    sim = BattleSimulation.headless('Samurai', 'Countess Vampire', 'ai', seed)
+    inputs = MatchRandom(seed ^ 0xFFFF)     # Input P1 acak tapi ter-seed
+    start = time.perf_counter()
+    for _ in range(ticks):
+        sim.step(inputs.next_u64() & 0x3F)
+    elapsed = time.perf_counter() - start
+    state = (sim.tick, sim.winner, sim.rng.getstate(),
+             fighter_state(sim.p1), fighter_state(sim.p2))
+    return state, elapsed
+
+
+# === ENTRY POINT (cek determinisme) ===
+if __name__ == "__main__":
+    TICKS = 20000
+    a, elapsed = _run_headless(1234, TICKS)
+    b, _ = _run_headless(1234, TICKS)
+    c, _ = _run_headless(4321, TICKS)
+    print(f"deterministic: {a == b}   different seed differs: {a != c}")
+    print(f"{TICKS} ticks in {elapsed:.3f}s -> {TICKS / elapsed:,.0f} ticks/s")
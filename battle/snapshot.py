@@ -0,0 +1,230 @@
+"""
+FILE: snapshot.py
+DESKRIPSI: Snapshot / restore state pertandingan lengkap dalam buffer bytes ber-layout tetap
+DIGUNAKAN OLEH: battle_system.py (save / load state), netplay.py (rollback),
+                replay.py (keyframe)
+MENGGUNAKAN: struct, zlib (crc32), simulation.py (BattleSimulation), ai_controller.py (AIState)
+
+ALUR PROGRAM:
+1. snapshot(sim) mengumpulkan semua field gameplay:
+   - 2 Fighter: posisi, fisika, HP, flag, cooldown, animasi (index, bukan surface)
+   - 2 slot AIController (P1 mode 'cpu', P2 mode 'ai'/'cpu'): state FSM, timer, action
+   - BattleSimulation: tick, countdown intro, round_over, winner, state RNG
+   lalu mem-pack-nya dengan SATU struct.Struct -> bytes MATCH_SIZE byte
+2. restore(sim, data) meng-unpack dan menulis balik semua field;
+   Fighter.image diambil ulang dari animations[action][image_frame]
+3. SnapshotRing menyimpan N snapshot terakhir di satu bytearray (memori tetap),
+   dipakai untuk rewind / rollback per tick
+4. checksum(data) = crc32 snapshot (deteksi desync)
+
+Yang TIDAK disimpan: sprite (animations), nama karakter, mode, ukuran arena -
+semuanya konstan selama match.
+"""
+import struct
+import zlib
+from operator import attrgetter
+from battle.ai_controller import AIState
+
+
+# === LAYOUT ===
+# Fighter: x, y, vel_y, health | alive, running, jump, attacking, hit, flip, attack_hit |
+#          attack_type, attack_cooldown | action, frame_index, image_frame |
+#          ticks, update_time, hits_landed
+FIGHTER_FIELDS = ('rect.x', 'rect.y', 'vel_y', 'health',
+                  'alive', 'running', 'jump', 'attacking', 'hit', 'flip',
+                  'attack_hit', 'attack_type', 'attack_cooldown',
+                  'action', 'frame_index', 'image_frame',
+                  'ticks', 'update_time', 'hits_landed')
+FIGHTER_FORMAT = 'hhhh???????bhBBBIIH'
+
+# AIController: ada?, state, state_timer, cooldown, action
+AI_FORMAT = '?BHhB'
+
+# BattleSimulation: tick, intro_count, intro_timer, round_over, winner, rng state
+SIM_FORMAT = 'IbH?BQ'
+
+FIGHTER = struct.Struct('<' + FIGHTER_FORMAT)
+AI = struct.Struct('<' + AI_FORMAT)
+SIM = struct.Struct('<' + SIM_FORMAT)
+MATCH = struct.Struct('<' + FIGHTER_FORMAT * 2 + AI_FORMAT * 2 + SIM_FORMAT)
+MATCH_SIZE = MATCH.size
+
+# Offset tiap bagian di dalam buffer MATCH (tanpa padding karena '<')
+P1_OFFSET = 0
+P2_OFFSET = FIGHTER.size
+AI1_OFFSET = 2 * FIGHTER.size
+AI2_OFFSET = AI1_OFFSET + AI.size
+SIM_OFFSET = AI2_OFFSET + AI.size
+
+# Enum / string <-> index
+AI_STATES = tuple(AIState)
+AI_STATE_INDEX = {state: i for i, state in enumerate(AI_STATES)}
+AI_ACTIONS = ('move_forward', 'move_back', 'jump', 'attack1', 'attack2', 'attack3')
+AI_ACTION_INDEX = {action: i for i, action in enumerate(AI_ACTIONS)}
+
+_fighter_values = attrgetter(*FIGHTER_FIELDS)
+_NO_AI = (False, 0, 0, 0, 0)
+
+
+def _ai_values(ai):
+    """Tuple nilai AIController untuk AI_FORMAT (slot kosong jika None)."""
+    if ai is None:
+        return _NO_AI
+    return (True, AI_STATE_INDEX[ai.state], ai.state_timer, ai.cooldown,
+            AI_ACTION_INDEX[ai.action])
+
+
+def _values(sim):
+    """Semua nilai state match, urut sesuai MATCH."""
+    return (*_fighter_values(sim.p1), *_fighter_values(sim.p2),
+            *_ai_values(sim.ai_p1), *_ai_values(sim.ai),
+            sim.tick, sim.intro_count, sim.intro_timer, sim.round_over,
+            sim.winner or 0, sim.rng.state)
+
+
+def snapshot(sim):
+    """
+    Snapshot state match
+
+    Args:
+        sim: BattleSimulation
+
+    Returns:
+        bytes: Buffer MATCH_SIZE byte
+    """
+    return MATCH.pack(*_values(sim))
+
+
+def snapshot_into(sim, buffer, offset=0):
+    """Snapshot langsung ke buffer yang sudah ada (tanpa alokasi bytes baru)."""
+    MATCH.pack_into(buffer, offset, *_values(sim))
+
+
+def _restore_fighter(f, data, offset):
+    """Tulis balik satu Fighter dari buffer."""
+    (x, y, f.vel_y, f.health,
+     f.alive, f.running, f.jump, f.attacking, f.hit, f.flip,
+     f.attack_hit, f.attack_type, f.attack_cooldown,
+     f.action, f.frame_index, f.image_frame,
+     f.ticks, f.update_time, f.hits_landed) = FIGHTER.unpack_from(data, offset)
+    f.rect.topleft = (x, y)
+    f.image = f.animations[f.action][f.image_frame]     # Surface via index, tidak di-copy
+
+
+def _restore_ai(ai, data, offset):
+    """Tulis balik satu AIController dari buffer (slot kosong diabaikan)."""
+    present, state, ai.state_timer, ai.cooldown, action = AI.unpack_from(data, offset)
+    if present:
+        ai.state = AI_STATES[state]
+        ai.action = AI_ACTIONS[action]
+
+
+def restore(sim, data, offset=0):
+    """
+    Kembalikan match ke state snapshot
+
+    Args:
+        sim: BattleSimulation dengan karakter & mode yang sama seperti saat snapshot
+        data: Buffer dari snapshot() / SnapshotRing
+        offset: Posisi snapshot di dalam buffer
+    """
+    _restore_fighter(sim.p1, data, offset + P1_OFFSET)
+    _restore_fighter(sim.p2, data, offset + P2_OFFSET)
+    if sim.ai_p1 is not None:
+        _restore_ai(sim.ai_p1, data, offset + AI1_OFFSET)
+    if sim.ai is not None:
+        _restore_ai(sim.ai, data, offset + AI2_OFFSET)
+    (sim.tick, sim.intro_count, sim.intro_timer, sim.round_over,
+     winner, rng_state) = SIM.unpack_from(data, offset + SIM_OFFSET)
+    sim.winner = winner or None
+    sim.rng.state = rng_state
+
+
+def checksum(data):
+    """CRC32 snapshot (untuk deteksi desync antar peer / replay)."""
+    return zlib.crc32(data)
+
+
+class SnapshotRing:
+    """
+    Ring buffer snapshot per tick dengan memori tetap
+    
+    Attributes:
+        capacity: Jumlah snapshot yang disimpan (tick terbaru)
+        buffer: bytearray capacity * MATCH_SIZE
+    """
+    
+    
+    def __init__(self, capacity):
+        """
+        Constructor
+        
+        Args:
+            capacity: Jumlah tick terakhir yang bisa di-rewind
+        """
+        self.capacity = capacity
+        self.buffer = bytearray(capacity * MATCH_SIZE)
+        self._ticks = [-1] * capacity       # Tick yang tersimpan di tiap slot
+    
+    
+    def save(self, sim):
+        """Simpan state sim pada slot tick-nya (menimpa tick lama)."""
+        slot = sim.tick % self.capacity
+        MATCH.pack_into(self.buffer, slot * MATCH_SIZE, *_values(sim))
+        self._ticks[slot] = sim.tick
+    
+    
+    def has(self, tick):
+        """True jika snapshot tick ini masih ada di ring."""
+        return self._ticks[tick % self.capacity] == tick
+    
+    
+    def load(self, sim, tick):
+        """
+        Restore sim ke tick tertentu
+        
+        Raises:
+            KeyError: Jika tick sudah tertimpa / belum pernah disimpan
+        """
+        slot = tick % self.capacity
+        if self._ticks[slot] != tick:
+            raise KeyError(tick)
+        restore(sim, self.buffer, slot * MATCH_SIZE)
+    
+    
+    def view(self, tick):
+        """memoryview snapshot tick (tanpa copy), mis. untuk checksum()."""
+        slot = tick % self.capacity
+        if self._ticks[slot] != tick:
+            raise KeyError(tick)
+        return memoryview(self.buffer)[slot * MATCH_SIZE:(slot + 1) * MATCH_SIZE]
+
+
+# === ENTRY POINT (cek round-trip + kecepatan) ===
+if __name__ == "__main__":
+    import timeit
+    from battle.simulation import BattleSimulation
+
+    sim = BattleSimulation.headless('Samurai', 'Countess Vampire', 'cpu', 99)
+    for _ in range(400):
+        sim.step(0)
+    saved = snapshot(sim)
+
+    # Jalankan terus, lalu rewind dan jalankan ulang -> harus identik
+    for _ in range(300):
+        sim.step(0)
+    after = snapshot(sim)
+    restore(sim, saved)
+    assert snapshot(sim) == saved
+    for _ in range(300):
+        sim.step(0)
+    print(f"round-trip: {'OK' if snapshot(sim) == after else 'MISMATCH'} "
+          f"({MATCH_SIZE} byte/snapshot, crc32 {checksum(after):08x})")
+
+    ring = SnapshotRing(128)
+    n = 200000
+    t_snap = timeit.timeit(lambda: snapshot(sim), number=n) / n
+    t_ring = timeit.timeit(lambda: ring.save(sim), number=n) / n
+    t_restore = timeit.timeit(lambda: restore(sim, saved), number=n) / n
+    print(f"snapshot {t_snap * 1e6:.2f} us   ring.save {t_ring * 1e6:.2f} us   "
+          f"restore {t_restore * 1e6:.2f} us")
@@ -0,0 +1,191 @@
+"""
+FILE: team_battle.py
+DESKRIPSI: Renderer battle 2-8 fighter (tim / 2v2, tag team, free-for-all) di atas
+           loop BattleSystem
+DIGUNAKAN OLEH: Player (dijalankan dari terminal)
+MENGGUNAKAN: battle_system.py (BattleSystem: loop, timing, render, create_fighter),
+             team_simulation.py (TeamSimulation, team_layout, spawn_points),
+             projectiles.py (sprite_set, ProjectilePool.draw / rects), sprite_cache.py
+
+ALUR PROGRAM:
+1. TeamBattle(chars, fmt, arena, mode) -> create_match(): fighter dibuat di
+   spawn_points() lalu TeamSimulation (grid broadphase, AI multi-lawan)
+2. Loop BattleSystem.run() dipakai apa adanya; yang diganti hanya:
+   - advance(): keyboard P1 / P2 -> TeamSimulation.step((input P1, input P2))
+   - field_fighters(): fighter di arena (tag: hanya yang sedang bertanding)
+   - draw_ui(): health bar kecil per fighter, warna per tim
+   - winner_label(): "TEAM n WINS!" / "<nama> WINS!" (ffa) / "DRAW!"
+   - draw_effects() / effect_rects(): semua projectile digambar sekaligus
+     (satu Surface.blits) di atas fighter, lalu partikel BattleSystem
+3. Enter (REMATCH_KEY) setelah ada pemenang: match baru (seed baru); save / load
+   state (F5 / F6) dan replay belum tersedia untuk battle N fighter
+
+Jalankan:
+    python -m battle.team_battle --format team --chars Samurai Shinobi Fighter "Vampire Girl"
+    python -m battle.team_battle --format ffa --mode cpu --chars Samurai Shinobi Fighter \\
+        "Converted Vampire" "Countess Vampire" "Vampire Girl" Samurai Shinobi
+"""
+import random
+import argparse
+import pygame
+from battle.battle_system import (
+    BattleSystem, SCREEN_W, REMATCH_KEY, WHITE, RED, YELLOW, CYAN, ORANGE,
+)
+from battle.fighter_base import keys_to_input
+from battle.characters import CHARACTERS, ARENAS, PROJECTILES
+from battle.team_simulation import TeamSimulation, FORMATS, team_layout, spawn_points
+from engine.text_cache import render_text
+from engine.sprite_cache import SPRITE_CACHE
+from engine.projectiles import sprite_set
+
+
+# Warna per tim (tim 0 = CYAN seperti P1, tim 1 = ORANGE seperti P2)
+TEAM_COLORS = (CYAN, ORANGE, (120, 230, 120), (230, 120, 230),
+               (180, 140, 255), (90, 220, 200), (255, 120, 160), WHITE)
+HUD_MARGIN, HUD_GAP = 50, 20
+HUD_TOP = 20                # Label di HUD_TOP, bar di bawahnya
+BAR_H = 20
+
+
+def hud_slots(n):
+    """
+    Posisi HUD tiap fighter: n kolom rata di atas layar
+
+    Returns:
+        list: Tuple (x, lebar bar) per fighter
+    """
+    width = min(400, (SCREEN_W - 2 * HUD_MARGIN - HUD_GAP * (n - 1)) // n)
+    if n == 2:      # Sama dengan layout 1v1: kiri & kanan
+        return [(HUD_MARGIN, width), (SCREEN_W - HUD_MARGIN - width, width)]
+    return [(HUD_MARGIN + i * (width + HUD_GAP), width) for i in range(n)]
+
+
+class TeamBattle(BattleSystem):
+    """
+    BattleSystem untuk 2-8 fighter
+
+    Attributes:
+        chars: Nama karakter per fighter
+        fmt: 'team', 'tag', atau 'ffa'
+        sim: TeamSimulation
+        projectile_sprites: Hasil sprite_set() per jenis projectile (index = kind)
+    """
+
+    def __init__(self, chars, fmt='team', arena='Keputih', mode='ai', seed=None, **kwargs):
+        """
+        Constructor
+
+        Args:
+            chars: Nama karakter per fighter (urutan tim lihat team_layout())
+            fmt: 'team', 'tag', atau 'ffa'
+            arena: Nama arena
+            mode: 'cpu' (semua AI), 'ai' (P1 + AI), 'pvp' (P1 + P2 + AI)
+            seed: Seed RNG match (None = acak)
+            kwargs: Diteruskan ke BattleSystem (dirty_rects, render_fps, vsync, ...)
+        """
+        self.chars = list(chars)
+        self.fmt = fmt
+        team_layout(fmt, len(self.chars))      # Validasi sebelum membuat window
+        super().__init__(self.chars[0], self.chars[-1], arena, mode, seed=seed,
+                         record=False, **kwargs)
+        self.hud_rects = [pygame.Rect(x - 2, HUD_TOP - 2, width + 4, 34 + BAR_H)
+                          for x, width in hud_slots(len(self.chars))]
+
+    def create_match(self, seed):
+        """Fighter di spawn_points() + TeamSimulation (tanpa snapshot: belum didukung)."""
+        teams = team_layout(self.fmt, len(self.chars))
+        points = spawn_points(teams, self.fmt == 'tag')
+        fighters = [self.create_fighter(name, *point) for name, point in zip(self.chars, points)]
+        self.sim = TeamSimulation(fighters, teams, self.mode, seed, self.fmt == 'tag')
+        self.projectile_sprites = self.load_projectile_sprites()
+        self.p1 = fighters[0]
+        self.p2 = next(f for f, t in zip(fighters, teams) if t != teams[0])
+        self.ai = None
+        self.start_state = None
+        self.saved_state = None
+
+    def load_projectile_sprites(self):
+        """Frame kanan / kiri tiap jenis projectile dari SPRITE_CACHE (index = kind)."""
+        kinds = self.sim.projectile_kinds
+        sprites = [None] * len(kinds)
+        for name, kind in kinds.items():
+            folder, scale = CHARACTERS[name][:2]
+            _, file, num_frames, size = PROJECTILES[name][:4]
+            path = f"{folder}/{file}"
+            try:
+                frames = SPRITE_CACHE.get_frames(path, num_frames, scale)
+                flipped = SPRITE_CACHE.get_mirrored(path, num_frames, scale)
+            except Exception:
+                # Fallback: kotak merah seukuran hitbox
+                dummy = pygame.Surface(size, pygame.SRCALPHA)
+                dummy.fill(RED)
+                frames = flipped = [dummy]
+            sprites[kind] = sprite_set(frames, flipped, size)
+        return sprites
+
+    def draw_effects(self):
+        self.sim.projectiles.draw(self.screen, self.projectile_sprites, self.alpha)
+        super().draw_effects()
+
+    def effect_rects(self):
+        return self.sim.projectiles.rects(self.projectile_sprites, self.alpha) + super().effect_rects()
+
+    def field_fighters(self):
+        return [self.sim.fighters[i] for i in self.sim.on_field]
+
+    def winner_label(self):
+        winner = self.sim.winner
+        if not winner:
+            return "DRAW!", WHITE
+        color = TEAM_COLORS[(winner - 1) % len(TEAM_COLORS)]
+        if self.fmt == 'ffa':
+            return f"{self.chars[winner - 1]} WINS!", color
+        return f"TEAM {winner} WINS!", color
+
+    def draw_ui(self):
+        """Health bar + label per fighter; warna tim, kuning / merah saat HP rendah."""
+        sim = self.sim
+        for i, (fighter, (x, width)) in enumerate(zip(sim.fighters, hud_slots(len(sim.fighters)))):
+            team_color = TEAM_COLORS[sim.teams[i] % len(TEAM_COLORS)]
+            if fighter.health > 50:
+                color = team_color
+            elif fighter.health > 25:
+                color = YELLOW
+            else:
+                color = RED
+            slot = sim.human_slot[i]
+            label = "AI" if slot is None else f"P{slot + 1}"
+            self.screen.blit(render_text(f"{label}: {fighter.name}", 24, team_color),
+                             (x, HUD_TOP))
+            self.draw_health_bar(max(0, fighter.health), x, HUD_TOP + 26, color, width, BAR_H)
+
+    def advance(self, key):
+        """Keyboard P1 (WASD + R/T/Y) dan P2 (Arrow + Numpad) -> TeamSimulation."""
+        return self.sim.step((keys_to_input(key, 0), keys_to_input(key, 1)))
+
+    def handle_state_key(self, key):
+        """REMATCH_KEY (Enter) setelah ada pemenang: match baru dengan seed baru."""
+        if key == REMATCH_KEY and self.sim.round_over:
+            self.create_match(random.getrandbits(64))
+            self.sim.timer = self.timer if self.timer.enabled else None
+            self.last_scene = None
+            self.tick_positions = None
+            self.reset_effects()
+
+
+# === ENTRY POINT ===
+if __name__ == "__main__":
+    names = list(CHARACTERS)
+    parser = argparse.ArgumentParser(description="Battle 2-8 fighter (tim, tag, ffa)")
+    parser.add_argument('--format', choices=FORMATS, default='team')
+    parser.add_argument('--chars', nargs='+', choices=names, default=names[:4],
+                        help="karakter per fighter (2-8)")
+    parser.add_argument('--mode', choices=('cpu', 'ai', 'pvp'), default='ai')
+    parser.add_argument('--arena', choices=list(ARENAS), default=next(iter(ARENAS)))
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+    try:
+        team_layout(args.format, len(args.chars))
+    except ValueError as e:
+        parser.error(str(e))
+    TeamBattle(args.chars, args.format, args.arena, args.mode, args.seed).run()
@@ -0,0 +1,460 @@
+"""
+FILE: team_simulation.py
+DESKRIPSI: Simulasi battle deterministik 2-8 fighter (tim, tag team, free-for-all)
+           dengan broadphase spatial grid untuk collision, hit, projectile, dan
+           pemilihan target
+DIGUNAKAN OLEH: team_battle.py (renderer), benchmark.py (grup 'teams')
+MENGGUNAKAN: fighter_base.py (Fighter.step/update/resolve_attack), ai_controller.py,
+             match_random.py, spatial_grid.py (SpatialGrid), projectiles.py
+             (ProjectilePool), characters.py (PROJECTILES), simulation.py
+             (headless_fighter, konstanta tick & arena)
+
+ALUR PROGRAM:
+1. TeamSimulation(fighters, teams, mode, seed, tag) dibuat di awal match
+   - teams[i] = nomor tim fighter i (lihat team_layout(): 'team', 'tag', 'ffa')
+   - mode 'cpu': semua AI; 'ai': fighter 0 dikontrol P1; 'pvp': P1 + P2
+     (fighter pertama tim lain)
+   - tag=True: satu fighter per tim di arena; anggota berikutnya masuk TAG_TICKS
+     setelah fighter di arena KO
+2. Setiap tick (countdown sama dengan BattleSimulation):
+   - Fighter di arena diproses urut index: target = lawan terdekat (grid.nearest,
+     sekali per tick - dipakai AI dan arah hadap) -> input (AI / player) -> lawan
+     di sekitar (grid.query) untuk collision badan -> Fighter.step() -> posisi di
+     grid diupdate
+   - update() animasi semua fighter di arena
+   - Hit: attack_rect() tiap fighter -> grid.query -> resolve_attack(kandidat lawan)
+   - Projectile: fighter dengan shot_pending menembak (spawn ke pool), pool.update()
+     menggerakkan semua projectile sekaligus, pool.collide() memakai grid yang sama
+     -> Fighter.hurt_by() (mask hurt) -> damage, projectile habis
+   - Fighter KO keluar dari grid; ronde selesai jika tinggal satu tim
+3. Biaya per tick ikut jumlah pasangan yang berdekatan, bukan N^2 pasangan
+4. Dengan 2 fighter (format 'team') hasilnya identik dengan BattleSimulation
+
+Jalankan langsung untuk cek (1v1 == BattleSimulation, grid == brute force,
+determinisme, projectile) dan biaya per tick N = 2, 4, 8:
+    python -m battle.team_simulation
+
+CATATAN:
+    Snapshot / replay / netplay masih khusus 1v1 (BattleSimulation); projectile
+    (PROJECTILES) hanya aktif di TeamSimulation.
+"""
+import time
+import pygame
+from battle.fighter_base import HITBOX_W, HITBOX_H, SPEED
+from battle.ai_controller import AIController
+from battle.match_random import MatchRandom
+from battle.characters import PROJECTILES
+from battle.simulation import (
+    BattleSimulation, headless_fighter, fighter_state,
+    INTRO_TICKS, SCREEN_W, SCREEN_H, SPAWN_P1, SPAWN_P2,
+)
+from engine.spatial_grid import SpatialGrid, CELL_SIZE
+from engine.projectiles import ProjectilePool, MAX_PROJECTILES
+
+
+MAX_FIGHTERS = 8
+FORMATS = ('team', 'tag', 'ffa')
+TAG_TICKS = 60              # Jeda setelah KO sebelum anggota tim berikutnya masuk (tag)
+
+
+def team_layout(fmt, n):
+    """
+    Nomor tim tiap fighter untuk satu format
+
+    Args:
+        fmt: 'team' (dua tim, mis. 2v2), 'tag' (dua tim bergiliran), 'ffa' (semua lawan)
+        n: Jumlah fighter (2..MAX_FIGHTERS)
+
+    Returns:
+        tuple: Nomor tim per fighter (tim 0 lebih dulu = sisi kiri)
+    """
+    if not 2 <= n <= MAX_FIGHTERS:
+        raise ValueError(f"jumlah fighter harus 2..{MAX_FIGHTERS}: {n}")
+    if fmt == 'ffa':
+        return tuple(range(n))
+    if fmt in ('team', 'tag'):
+        half = (n + 1) // 2
+        return (0,) * half + (1,) * (n - half)
+    raise ValueError(f"format tidak dikenal: {fmt}")
+
+
+def spawn_points(teams, tag=False):
+    """
+    Posisi awal tiap fighter: tersebar rata dari SPAWN_P1 sampai SPAWN_P2
+
+    Tag: tiap tim punya satu titik (anggota cadangan masuk di titik yang sama)
+
+    Returns:
+        list: Tuple (x, y, flip) per fighter
+    """
+    slots = sorted(set(teams)) if tag else list(range(len(teams)))
+    count = len(slots)
+    xs = [SPAWN_P1[0] + (SPAWN_P2[0] - SPAWN_P1[0]) * i // (count - 1) for i in range(count)]
+    points = []
+    for i, team in enumerate(teams):
+        x = xs[slots.index(team)] if tag else xs[i]
+        points.append((x, SPAWN_P1[1], x + HITBOX_W // 2 > SCREEN_W // 2))
+    return points
+
+
+def body_bounds(fighter):
+    """
+    Kotak (relatif pojok kiri atas hitbox) yang memuat hitbox + semua hurt mask
+
+    Dipakai sebagai rect fighter di grid, sehingga query hit tidak melewatkan
+    sprite yang lebih lebar dari hitbox-nya
+    """
+    bounds = pygame.Rect(0, 0, HITBOX_W, HITBOX_H)
+    if fighter.collision is not None:
+        for facing in fighter.collision:
+            for row in facing:
+                for frame in row:
+                    if frame.hurt_rect is not None:
+                        bounds.union_ip(frame.hurt_rect)
+    return bounds
+
+
+class TeamSimulation:
+    """
+    State + logika satu pertandingan N fighter dalam tick integer
+
+    Attributes:
+        fighters: Semua Fighter (termasuk cadangan tag)
+        teams: Nomor tim per fighter
+        on_field: Index fighter yang ada di arena (digambar & disimulasikan)
+        ais: AIController per fighter (None = dikontrol player)
+        human_slot: Slot input player per fighter (0 = P1, 1 = P2, None = AI)
+        grid: SpatialGrid berisi fighter hidup di arena (key = index)
+        targets: Lawan terdekat per fighter (hasil query tick ini)
+        rng: MatchRandom milik match
+        tick, intro_count, round_over: Sama dengan BattleSimulation
+        winner: Nomor tim pemenang + 1 (0 = seri, semua KO di tick yang sama)
+        last_inputs: Bitmask per slot player yang dipakai tick terakhir
+        projectiles: ProjectilePool match ini
+        projectile_kinds: Nama karakter -> index jenis projectile di pool
+        timer: FrameTimer untuk fase 'ai' / 'physics' (None = tanpa instrumentasi)
+    """
+
+    def __init__(self, fighters, teams, mode='cpu', seed=0, tag=False,
+                 screen_w=SCREEN_W, screen_h=SCREEN_H, cell_size=CELL_SIZE,
+                 projectile_capacity=MAX_PROJECTILES):
+        """
+        Constructor
+
+        Args:
+            fighters: List Fighter (posisi awal dari spawn_points())
+            teams: Nomor tim per fighter
+            mode: 'cpu', 'ai' (P1 + AI), atau 'pvp' (P1 + P2 + AI)
+            seed: Seed RNG match
+            tag: True untuk tag team (satu fighter per tim di arena)
+            screen_w, screen_h: Batas arena
+            cell_size: Ukuran cell grid (>= arena = satu cell, setara brute force)
+            projectile_capacity: Jumlah slot ProjectilePool
+        """
+        if len(fighters) != len(teams) or not 2 <= len(fighters) <= MAX_FIGHTERS:
+            raise ValueError("fighters / teams tidak valid")
+        self.fighters = list(fighters)
+        self.teams = tuple(teams)
+        self.mode = mode
+        self.seed = seed
+        self.tag = tag
+        self.screen_w = screen_w
+        self.screen_h = screen_h
+
+        # === ARENA & GRID ===
+        if tag:
+            self.on_field = [self.teams.index(t) for t in sorted(set(self.teams))]
+        else:
+            self.on_field = list(range(len(fighters)))
+        self.spawn = [f.rect.topleft for f in self.fighters]
+        self.tag_timer = {}                 # Tim -> sisa tick sebelum anggota berikutnya masuk
+        self.bounds = [body_bounds(f) for f in self.fighters]
+        self.grid = SpatialGrid(screen_w, screen_h, cell_size)
+        for i in self.on_field:
+            self._place(i)
+
+        # === PROJECTILE (jenis didaftarkan sekali per karakter) ===
+        self.projectiles = ProjectilePool(projectile_capacity)
+        self.projectile_kinds = {}
+        for fighter in self.fighters:
+            spec = PROJECTILES.get(fighter.name)
+            if spec is None:
+                continue
+            if fighter.name not in self.projectile_kinds:
+                self.projectile_kinds[fighter.name] = self.projectiles.register_kind(*spec[3])
+            fighter.ranged_attack = spec[0]
+
+        # === KONTROL (player / AI) ===
+        human_teams = {'cpu': (), 'ai': (self.teams[0],)}.get(mode)
+        if human_teams is None:     # pvp: tim P1 + tim pertama lain
+            human_teams = (self.teams[0], next(t for t in self.teams if t != self.teams[0]))
+        self.human_slot = [None] * len(fighters)
+        for slot, team in enumerate(human_teams):
+            members = [i for i, t in enumerate(self.teams) if t == team]
+            for i in (members if tag else members[:1]):
+                self.human_slot[i] = slot
+        self.targets = [None] * len(fighters)
+        self.rng = MatchRandom(seed)
+        self.ais = [None if self.human_slot[i] is not None else
+                    AIController(f, None, self.rng, self._target_finder(i))
+                    for i, f in enumerate(self.fighters)]
+
+        # === GAME STATE ===
+        self.tick = 0
+        self.intro_count = 3
+        self.intro_timer = 0
+        self.round_over = False
+        self.winner = None
+        self.last_inputs = (0,) * len(human_teams)
+        self.timer = None
+
+    @classmethod
+    def headless(cls, chars, fmt='team', mode='cpu', seed=0, cell_size=CELL_SIZE):
+        """
+        Buat simulasi tanpa sprite
+
+        Args:
+            chars: Nama karakter per fighter (urutan = urutan tim di team_layout())
+            fmt: 'team', 'tag', atau 'ffa'
+        """
+        teams = team_layout(fmt, len(chars))
+        points = spawn_points(teams, fmt == 'tag')
+        fighters = [headless_fighter(name, *point) for name, point in zip(chars, points)]
+        return cls(fighters, teams, mode, seed, fmt == 'tag', cell_size=cell_size)
+
+    # === QUERY GRID ===
+
+    def _place(self, i):
+        """Masukkan / pindahkan fighter i di grid (rect = body bounds, titik = pusat hitbox)."""
+        rect = self.fighters[i].rect
+        self.grid.insert(i, self.bounds[i].move(rect.topleft), rect.center)
+
+    def _target_finder(self, i):
+        """Callable find_target untuk AIController fighter i (hasil query tick ini)."""
+        return lambda: self.targets[i]
+
+    def nearest_opponent(self, i):
+        """
+        Lawan hidup di arena yang paling dekat dengan fighter i
+
+        Returns:
+            Fighter | None
+        """
+        team, teams = self.teams[i], self.teams
+        x, y = self.fighters[i].rect.center
+        key = self.grid.nearest(x, y, lambda k: teams[k] != team)
+        return None if key is None else self.fighters[key]
+
+    def opponents_in(self, i, rect):
+        """
+        Lawan hidup di arena yang body bounds-nya bersentuhan dengan rect (urut index)
+
+        Fighter yang HP-nya habis tick ini masih di grid sampai _update_field(),
+        jadi disaring lewat health agar tidak bisa dipukul / ditabrak lagi
+        """
+        team, teams, fighters = self.teams[i], self.teams, self.fighters
+        return [fighters[k] for k in self.grid.query(rect)
+                if teams[k] != team and fighters[k].health > 0]
+
+    # === TICK ===
+
+    def step(self, inputs=()):
+        """
+        Jalankan satu tick
+
+        Args:
+            inputs: Bitmask INPUT_* per slot player (P1, P2); diabaikan untuk AI
+
+        Returns:
+            bool: True jika tick ini masih countdown intro
+        """
+        self.tick += 1
+
+        # === INTRO COUNTDOWN ===
+        if self.intro_count > 0:
+            self.last_inputs = (0,) * len(self.last_inputs)
+            self.intro_timer += 1
+            if self.intro_timer >= INTRO_TICKS:
+                self.intro_count -= 1
+                self.intro_timer = 0
+            return True
+
+        # === GAME LOGIC (urut index) ===
+        w, h = self.screen_w, self.screen_h
+        fighters = self.fighters
+        timer = self.timer
+        if timer is not None:
+            timer.mark('input')
+        used = list(self.last_inputs)
+        for i in self.on_field:
+            fighter = fighters[i]
+            target = self.targets[i] = self.nearest_opponent(i)
+            ai = self.ais[i]
+            if ai is not None:
+                fighter_input = ai.decide(self.round_over)
+                if timer is not None:
+                    timer.mark('ai')
+            else:
+                slot = self.human_slot[i]
+                fighter_input = inputs[slot] if slot < len(inputs) else 0
+                used[slot] = fighter_input
+            if fighter_input is None:
+                continue
+            # Gerak horizontal maks SPEED per tick -> kandidat collision cukup di sekitar
+            others = self.opponents_in(i, fighter.rect.inflate(2 * SPEED, 0))
+            fighter.step(w, h, target, self.round_over, fighter_input, others)
+            if i in self.grid:
+                self._place(i)
+            if timer is not None:
+                timer.mark('physics')
+        self.last_inputs = tuple(used)
+
+        # Update animasi
+        for i in self.on_field:
+            fighters[i].update()
+
+        # === HIT (broadphase grid -> resolve_attack) ===
+        if not self.round_over:
+            for i in self.on_field:
+                hit_rect = fighters[i].attack_rect()
+                if hit_rect is not None:
+                    fighters[i].resolve_attack(*self.opponents_in(i, hit_rect))
+
+        # === PROJECTILE (update massal, hit lewat grid yang sama) ===
+        for i in self.on_field:
+            if fighters[i].shot_pending:
+                self._fire(i)
+        self.projectiles.update(w, h)
+        if not self.round_over:
+            self.projectiles.collide(self.grid, self._projectile_hit)
+        if timer is not None:
+            timer.mark('physics')
+
+        self._update_field()
+        return False
+
+    def _fire(self, i):
+        """Tembakkan projectile fighter i dari titik muzzle ke arah hadapnya."""
+        fighter = self.fighters[i]
+        fighter.shot_pending = False
+        _, _, _, (w, h), (mx, my), speed, life, damage = PROJECTILES[fighter.name]
+        direction = -1 if fighter.flip else 1
+        self.projectiles.spawn(fighter.rect.centerx + direction * mx - w // 2,
+                               fighter.rect.y + my - h // 2, direction * speed, 0, life,
+                               i, self.teams[i], damage, self.projectile_kinds[fighter.name])
+
+    def _projectile_hit(self, slot, keys, hitbox):
+        """
+        Narrowphase projectile vs kandidat dari grid (callback ProjectilePool.collide)
+
+        Returns:
+            bool: True jika projectile mengenai lawan (projectile habis)
+        """
+        pool = self.projectiles
+        team = pool.team[slot]
+        mask = pool.kind_masks[pool.kind[slot]]
+        for key in keys:
+            target = self.fighters[key]
+            if self.teams[key] == team or target.health <= 0:
+                continue    # Kawan, atau sudah KO tick ini (masih di grid)
+            if target.hurt_by(mask, hitbox):
+                target.health -= int(pool.damage[slot])
+                target.hit = True
+                self.fighters[pool.owner[slot]].hits_landed += 1
+                return True
+        return False
+
+    def _update_field(self):
+        """Fighter KO keluar dari grid, giliran tag, cek pemenang."""
+        fighters = self.fighters
+        for i in self.on_field:
+            if not fighters[i].alive and i in self.grid:
+                self.grid.remove(i)
+                if self.tag:
+                    self.tag_timer[self.teams[i]] = TAG_TICKS
+
+        # === TAG: ANGGOTA BERIKUTNYA MASUK ===
+        for team in sorted(self.tag_timer):
+            self.tag_timer[team] -= 1
+            if self.tag_timer[team] > 0:
+                continue
+            del self.tag_timer[team]
+            waiting = [i for i, t in enumerate(self.teams)
+                       if t == team and fighters[i].alive and i not in self.on_field]
+            if waiting:
+                out = next(i for i in self.on_field if self.teams[i] == team)
+                self.on_field[self.on_field.index(out)] = waiting[0]
+                self._place(waiting[0])
+
+        # === CEK PEMENANG ===
+        if not self.round_over:
+            standing = {self.teams[i] for i, f in enumerate(fighters) if f.alive}
+            if len(standing) <= 1:
+                self.round_over = True
+                self.winner = standing.pop() + 1 if standing else 0
+
+
+def _state(sim):
+    """State gameplay semua fighter (untuk membandingkan dua simulasi)."""
+    return (sim.tick, sim.winner, sim.rng.getstate(), tuple(sim.on_field),
+            tuple(fighter_state(f) for f in sim.fighters), sim.projectiles.state())
+
+
+def _check_1v1(seed, ticks=3000):
+    """TeamSimulation 2 fighter vs BattleSimulation dengan input acak yang sama."""
+    team = TeamSimulation.headless(['Samurai', 'Vampire Girl'], 'team', 'pvp', seed)
+    duel = BattleSimulation.headless('Samurai', 'Vampire Girl', 'pvp', seed)
+    inputs = MatchRandom(seed ^ 0xBEEF)
+    for _ in range(ticks):
+        a, b = inputs.next_u64() & 0x3F, inputs.next_u64() & 0x3F
+        team.step((a, b))
+        duel.step(a, b)
+        if duel.round_over:
+            break
+        if tuple(map(fighter_state, team.fighters)) != (fighter_state(duel.p1),
+                                                        fighter_state(duel.p2)):
+            return False
+    return True
+
+
+def _run(chars, fmt, seed, ticks, cell_size=CELL_SIZE):
+    """Jalankan match AI, return (state akhir, detik per tick)."""
+    sim = TeamSimulation.headless(chars, fmt, 'cpu', seed, cell_size)
+    sim.intro_count = 0
+    start = time.perf_counter()
+    for _ in range(ticks):
+        sim.step()
+    return _state(sim), (time.perf_counter() - start) / ticks
+
+
+# === ENTRY POINT (cek + biaya per tick) ===
+if __name__ == "__main__":
+    from battle.characters import CHARACTERS
+
+    names = list(CHARACTERS)
+    print(f"1v1 == BattleSimulation: {all(_check_1v1(seed) for seed in range(8))}")
+    for fmt in FORMATS:
+        chars = [names[i % len(names)] for i in range(8 if fmt != 'tag' else 6)]
+        a, _ = _run(chars, fmt, 99, 3000)
+        b, _ = _run(chars, fmt, 99, 3000)
+        brute, _ = _run(chars, fmt, 99, 3000, cell_size=10 ** 6)
+        print(f"{fmt:>4}: deterministic {a == b}   grid == brute force {a == brute}   "
+              f"winner {a[1]} @ tick {a[0]}")
+
+    shots = [0, 0, 0]
+    for seed in range(8):
+        countess = TeamSimulation.headless(['Countess Vampire', 'Samurai', 'Countess Vampire',
+                                            'Shinobi'], 'ffa', 'cpu', seed)
+        for _ in range(3000):
+            countess.step()
+        pool = countess.projectiles
+        shots = [shots[0] + pool.spawned, shots[1] + pool.hits, shots[2] + pool.dropped]
+    print(f"projectile (8 match): {shots[0]} ditembak, {shots[1]} kena, {shots[2]} dibuang")
+
+    TICKS = 600
+    for n in (2, 4, 8):
+        chars = [names[i % len(names)] for i in range(n)]
+        _, per_tick = _run(chars, 'ffa', 7, TICKS)
+        _, brute = _run(chars, 'ffa', 7, TICKS, cell_size=10 ** 6)
+        print(f"N={n}: {per_tick * 1e6:7.1f} us/tick  {per_tick * 1e6 / n:6.1f} us/fighter   "
+              f"(brute force {brute * 1e6 / n:6.1f} us/fighter)")
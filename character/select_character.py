@@ -19,6 +19,14 @@ import sys
 import math
 import random
 import os
+from engine.sprite_cache import SPRITE_CACHE
+from engine.prefetch import PREFETCHER
+from engine.text_cache import render_text, blit_alpha
+from engine.layers import StaticLayer
+from engine.glow_cache import get_glow
+from engine.frame_timing import frame_timer, TIMING_KEY
+from engine.profiler import scene_profiler
+from battle.battle_system import character_jobs
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
@@ -46,6 +54,10 @@ CHARACTERS = [
     {"name": "Vampire Girl", "path": os.path.join(BASE_DIR, "assets/character/Vampire3/Idle.png"), "frames": 5},
 ]
 
+def sprite_fit(slot_width=180, slot_height=200):
+    """Spesifikasi scale "fit" sprite idle di dalam kartu (lihat sprite_cache.fit_scale)."""
+    return (slot_width - 40, slot_height - 80, 2.5)
+
 class CharacterSlot:
     """
     Class untuk merepresentasikan kartu pilihan karakter dalam grid.
@@ -83,22 +95,12 @@ class CharacterSlot:
         self.select_alpha_p2 = 0
         
         try:
-            spritesheet = pygame.image.load(char_data["path"]).convert_alpha()
-            sprite_width = spritesheet.get_width() // self.num_frames
-            sprite_height = spritesheet.get_height()
-            
-            scale_x = (slot_width - 40) / sprite_width
-            scale_y = (slot_height - 80) / sprite_height
-            scale = min(scale_x, scale_y, 2.5)
+            # Frames idle diambil dari SPRITE_CACHE (dipakai bersama battle),
+            # scale "fit" agar sprite muat di dalam kartu (maksimal 2.5x)
+            fit = sprite_fit(slot_width, slot_height)
+            self.frames = SPRITE_CACHE.get_frames(char_data["path"], self.num_frames, fit)
             
-            self.frames = []
-            for i in range(self.num_frames):
-                frame = spritesheet.subsurface(pygame.Rect(i * sprite_width, 0, sprite_width, sprite_height))
-                frame = pygame.transform.scale(frame, (int(sprite_width * scale), int(sprite_height * scale)))
-                self.frames.append(frame)
-            
-            self.sprite_width = int(sprite_width * scale)
-            self.sprite_height = int(sprite_height * scale)
+            self.sprite_width, self.sprite_height = self.frames[0].get_size()
             self.loaded = True
         except:
             self.loaded = False
@@ -124,18 +126,17 @@ class CharacterSlot:
         """
         card_rect = pygame.Rect(self.x, self.y, self.slot_width, self.slot_height)
         
-        # 1. Background Dasar
-        card_surf = pygame.Surface((self.slot_width, self.slot_height), pygame.SRCALPHA)
-        pygame.draw.rect(card_surf, (20, 40, 80, 180), card_surf.get_rect(), border_radius=15)
+        # 1. Background Dasar (surface dari glow cache)
+        card_surf = get_glow((self.slot_width, self.slot_height), (20, 40, 80), 180, 15)
         screen.blit(card_surf, (self.x, self.y))
 
         # 2. Render Glow Selection P1 & P2
         for p_color, alpha in [(P1_COLOR, self.select_alpha_p1), (P2_COLOR, self.select_alpha_p2)]:
             if alpha > 0:
                 for i in range(3):
-                    glow_surf = pygame.Surface((self.slot_width + 8 + i*4, self.slot_height + 8 + i*4), pygame.SRCALPHA)
+                    glow_surf = get_glow((self.slot_width + 8 + i*4, self.slot_height + 8 + i*4),
+                                         p_color, alpha // (4 + i), 15)
                     glow_rect = glow_surf.get_rect(center=(self.x + self.slot_width//2, self.y + self.slot_height//2))
-                    pygame.draw.rect(glow_surf, (*p_color, alpha // (4 + i)), glow_surf.get_rect(), border_radius=15)
                     screen.blit(glow_surf, glow_rect)
                 pygame.draw.rect(screen, (*p_color, alpha), card_rect, 4, border_radius=15)
 
@@ -144,9 +145,8 @@ class CharacterSlot:
             frame_rect = self.frames[self.current_frame].get_rect(centerx=self.x + self.slot_width // 2, centery=self.y + 85)
             screen.blit(self.frames[self.current_frame], frame_rect)
             
-            name_font = pygame.font.Font(None, 22)
             name_color = P1_COLOR if self.is_selected_p1 else (P2_COLOR if self.is_selected_p2 else WHITE)
-            name_text = name_font.render(self.name, True, name_color)
+            name_text = render_text(self.name, 22, name_color)
             screen.blit(name_text, name_text.get_rect(center=(self.x + self.slot_width//2, self.y + self.slot_height - 25)))
             
     def get_rect(self):
@@ -178,6 +178,9 @@ class CharacterSelection:
         self.load_background()
         self.load_badges()
         self.load_characters()
+        self.static_layer = StaticLayer(self.draw_static)
+        self.timer = frame_timer('character_selection')    # Timing per fase (F3)
+        self.profiler = scene_profiler('character_selection')  # Profiler (F9)
     
     def load_badges(self):
         """Memuat ikon badge (P1, P2, AI) yang akan diletakkan di atas slot terpilih."""
@@ -210,19 +213,32 @@ class CharacterSelection:
         for slot in self.slots: slot.update()
         self.both_ready = self.selected_index_p1 is not None and self.selected_index_p2 is not None
 
-    def draw_header(self):
-        """Render header teks, efek glow judul, dan instruksi giliran pemain."""
+    def draw_static(self, surface, both_ready):
+        """
+        Compose bagian statis screen (background, header, judul, footer) ke layer.
+        
+        Args:
+            surface: Surface layer (lihat engine/layers.py).
+            both_ready: Status kesiapan pemain (mengubah teks footer).
+        """
+        if self.background: surface.blit(self.background, (0, 0))
+        else: surface.fill((10, 20, 40))
+        
         header_surf = pygame.Surface((SCREEN_WIDTH, 180), pygame.SRCALPHA)
         header_surf.fill((10, 25, 50, 150))
-        self.screen.blit(header_surf, (0, 0))
+        surface.blit(header_surf, (0, 0))
         
-        title_font = pygame.font.Font(None, 80)
         title_text = "SELECT YOUR CHARACTER"
         for i in range(3):
-            glow = title_font.render(title_text, True, (*ORANGE, 60 - i*15))
-            self.screen.blit(glow, glow.get_rect(center=(SCREEN_WIDTH // 2 + i, 70 + i)))
-        self.screen.blit(title_font.render(title_text, True, WHITE), title_font.render(title_text, True, WHITE).get_rect(center=(SCREEN_WIDTH // 2, 70)))
+            glow = render_text(title_text, 80, (*ORANGE, 60 - i*15))
+            surface.blit(glow, glow.get_rect(center=(SCREEN_WIDTH // 2 + i, 70 + i)))
+        title = render_text(title_text, 80, WHITE)
+        surface.blit(title, title.get_rect(center=(SCREEN_WIDTH // 2, 70)))
         
+        self.draw_footer(surface, both_ready)
+
+    def draw_header(self):
+        """Render bagian header yang beranimasi: garis dekoratif dan instruksi giliran pemain."""
         # Animated Decorative Line
         line_w = 600
         lx = (SCREEN_WIDTH - line_w) // 2
@@ -232,7 +248,6 @@ class CharacterSelection:
         
         # Turn Instructions
         if not self.both_ready:
-            turn_font = pygame.font.Font(None, 35)
             t_text, t_color = ("", WHITE)
             if self.selected_index_p1 is None:
                 t_text, t_color = "PLAYER 1: CHOOSE YOUR HERO", P1_COLOR
@@ -241,30 +256,30 @@ class CharacterSelection:
             
             if t_text:
                 alpha = int(155 + abs(math.sin(self.time * 0.1)) * 100)
-                s = turn_font.render(t_text, True, t_color)
-                s.set_alpha(alpha)
-                self.screen.blit(s, s.get_rect(center=(SCREEN_WIDTH // 2, 140)))
+                s = render_text(t_text, 35, t_color)
+                blit_alpha(self.screen, s, s.get_rect(center=(SCREEN_WIDTH // 2, 140)), alpha)
         else:
-            inst = pygame.font.Font(None, 35).render("PRESS SPACE TO START FIGHT!", True, GOLD)
-            inst.set_alpha(int(155 + abs(math.sin(self.time * 0.1)) * 100))
-            self.screen.blit(inst, inst.get_rect(center=(SCREEN_WIDTH // 2, 140)))
+            inst = render_text("PRESS SPACE TO START FIGHT!", 35, GOLD)
+            alpha = int(155 + abs(math.sin(self.time * 0.1)) * 100)
+            blit_alpha(self.screen, inst, inst.get_rect(center=(SCREEN_WIDTH // 2, 140)), alpha)
             
-    def draw_footer(self):
+    def draw_footer(self, surface, both_ready):
+        """Render panel instruksi kontrol (bagian dari layer statis)."""
         footer_surf = pygame.Surface((SCREEN_WIDTH, 70), pygame.SRCALPHA)
         footer_surf.fill((10, 25, 50, 180))
-        self.screen.blit(footer_surf, (0, SCREEN_HEIGHT - 70))
+        surface.blit(footer_surf, (0, SCREEN_HEIGHT - 70))
         
-        font = pygame.font.Font(None, 24)
-        ctrls = [("CLICK", "Select"), ("SPACE", "Confirm" if self.both_ready else "Wait"), ("ESC", "Menu")]
+        ctrls = [("CLICK", "Select"), ("SPACE", "Confirm" if both_ready else "Wait"), ("ESC", "Menu")]
         for i, (key, act) in enumerate(ctrls):
             x = (SCREEN_WIDTH - 800) // 2 + i * 266
-            pygame.draw.rect(self.screen, (40, 70, 120, 200), (x + 40, SCREEN_HEIGHT - 52, 90, 24), border_radius=4)
-            self.screen.blit(font.render(key, True, GOLD), (x + 60, SCREEN_HEIGHT - 48))
-            self.screen.blit(font.render(act, True, WHITE), (x + 60, SCREEN_HEIGHT - 25))
+            pygame.draw.rect(surface, (40, 70, 120, 200), (x + 40, SCREEN_HEIGHT - 52, 90, 24), border_radius=4)
+            surface.blit(render_text(key, 24, GOLD), (x + 60, SCREEN_HEIGHT - 48))
+            surface.blit(render_text(act, 24, WHITE), (x + 60, SCREEN_HEIGHT - 25))
             
     def draw(self):
-        if self.background: self.screen.blit(self.background, (0, 0))
-        else: self.screen.fill((10, 20, 40))
+        # Layer statis di-compose ulang hanya saat both_ready berubah
+        self.static_layer.draw(self.screen, (self.both_ready,))
+        self.timer.mark('draw_bg')
         
         self.draw_header()
         for slot in self.slots: slot.draw(self.screen)
@@ -276,8 +291,10 @@ class CharacterSelection:
             s = self.slots[self.selected_index_p2]
             self.screen.blit(self.p2_badge, (s.x + s.slot_width - 55, s.y + 5))
             
-        self.draw_footer()
+        self.timer.mark('draw_ui')
+        self.timer.draw(self.screen)
         pygame.display.flip()
+        self.timer.mark('display')
 
     def handle_click(self, mouse_pos):
         for i, slot in enumerate(self.slots):
@@ -310,6 +327,14 @@ class CharacterSelection:
                         self.selected_index_p2 = random.choice(available)
                         self.slots[self.selected_index_p2].is_selected_p2 = True
                     return
+
+    def prefetch_selection(self):
+        """Mulai prefetch sprite battle untuk karakter terpilih (batalkan jika selection berubah)."""
+        for group, idx in (('p1', self.selected_index_p1), ('p2', self.selected_index_p2)):
+            if idx is None:
+                PREFETCHER.cancel(group)
+            else:
+                PREFETCHER.prefetch(group, character_jobs(self.slots[idx].name))
             
     def run(self):
         """
@@ -320,20 +345,33 @@ class CharacterSelection:
             None: Jika dibatalkan (ESC atau Quit).
         """
         clock = pygame.time.Clock()
-        while True:
-            m_pos = pygame.mouse.get_pos()
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT: return None
-                if event.type == pygame.MOUSEBUTTONDOWN: self.handle_click(m_pos)
-                if event.type == pygame.MOUSEMOTION:
-                    for s in self.slots: s.is_hovered = s.get_rect().collidepoint(m_pos)
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_SPACE and self.both_ready:
-                        return self.slots[self.selected_index_p1].name, self.slots[self.selected_index_p2].name
-                    if event.key == pygame.K_ESCAPE: return None
-            self.update()
-            self.draw()
-            clock.tick(FPS)
+        try:
+            while True:
+                self.timer.frame()
+                self.profiler.frame()
+                m_pos = pygame.mouse.get_pos()
+                self.timer.mark('input')
+                for event in pygame.event.get():
+                    if event.type == pygame.QUIT: return None
+                    if event.type == pygame.MOUSEBUTTONDOWN:
+                        self.handle_click(m_pos)
+                        self.prefetch_selection()
+                    if event.type == pygame.MOUSEMOTION:
+                        for s in self.slots: s.is_hovered = s.get_rect().collidepoint(m_pos)
+                    if event.type == pygame.KEYDOWN:
+                        if event.key == pygame.K_SPACE and self.both_ready:
+                            return self.slots[self.selected_index_p1].name, self.slots[self.selected_index_p2].name
+                        if event.key == pygame.K_ESCAPE: return None
+                        if event.key == TIMING_KEY: self.timer = self.timer.toggled()
+                        self.profiler.handle_key(event.key)
+                self.timer.mark('events')
+                self.update()
+                self.timer.mark('physics')
+                self.draw()
+                clock.tick(FPS)
+        finally:
+            self.timer.close()
+            self.profiler.close()
 
 if __name__ == "__main__":
     result = CharacterSelection(game_mode='pvp').run()
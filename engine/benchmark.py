@@ -0,0 +1,443 @@
+"""
+FILE: benchmark.py
+DESKRIPSI: Benchmark suite headless (SDL_VIDEODRIVER=dummy) untuk jalur panas game:
+           load aset, render battle, fisika, AI, dan draw tiap screen pemilihan
+DIGUNAKAN OLEH: Developer (dijalankan manual dari terminal / CI)
+MENGGUNAKAN: timeit, platform, battle_system.py, simulation.py, fighter_base.py,
+             ai_controller.py, snapshot.py, team_simulation.py, projectiles.py, particles.py, mode_selection.py, select_character.py,
+             select_arena.py, sprite_cache.py, sprite_pack.py
+
+ALUR PROGRAM:
+1. SDL di-set ke driver dummy (tanpa display & audio) SEBELUM pygame.init()
+2. Setiap benchmark mengukur satu jalur panas dan menghasilkan waktu per operasi:
+   - create_fighter.cold.<karakter>: SPRITE_CACHE & COLLISION_MASKS dikosongkan dulu
+     (sprite pack tetap dipakai jika sudah di-bake - lihat engine.sprite_pack)
+   - create_fighter.warm.<karakter>: semua frame sudah ada di cache
+   - battle.render_full / battle.render_dirty: satu frame draw battle (fps)
+   - fighter.update / fighter.apply_physics / simulation.step: tick per detik
+   - ai.update: keputusan AI + gerak per detik
+   - teams.ffa<N>.step / .per_fighter: TeamSimulation N = 2, 4, 8 fighter (broadphase
+     grid; biaya tumbukan tumbuh linear dengan N, bukan N^2 - sampai N = 8 belum
+     lebih cepat dari cek semua pasangan)
+   - projectiles.<N>.tick / .frame: stress N projectile hidup (update massal + hit lewat
+     grid, lalu + draw Surface.blits); frame harus tetap >= 60 fps
+   - particles.<N>.frame: N partikel hidup, update massal + draw (target beberapa ms
+     untuk 5000 partikel)
+   - screen.<nama>.draw: satu frame screen mode / karakter / arena
+3. Hasil + info mesin ditulis ke JSON (default reports/benchmark.json)
+4. Jika ada baseline (default reports/benchmark_baseline.json), setiap benchmark
+   dibandingkan; lebih lambat dari threshold = REGRESSION (exit code 1)
+5. --save-baseline menyimpan hasil run ini sebagai baseline baru
+
+Jalankan:
+    python -m engine.benchmark                    # ukur + bandingkan dengan baseline
+    python -m engine.benchmark --save-baseline    # simpan sebagai baseline
+    python -m engine.benchmark --quick --only battle,simulation --threshold 0.25
+
+CATATAN:
+    Angka absolut hanya bermakna di mesin yang sama; baseline sengaja disimpan
+    lokal (reports/ tidak di-commit). Setiap angka = median beberapa repeat.
+"""
+import os
+
+# Harus sebelum pygame.init() (dipanggil oleh screen / BattleSystem)
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+# Instrumentasi F3 tidak ikut diukur
+os.environ.pop('PYFIGHTER_TIMING', None)
+os.environ.pop('PYFIGHTER_TIMING_CSV', None)
+
+import sys
+import json
+import time
+import timeit
+import argparse
+import platform
+import statistics
+from datetime import datetime
+import pygame
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+OUTPUT_PATH = os.path.join(BASE_DIR, 'reports', 'benchmark.json')
+BASELINE_PATH = os.path.join(BASE_DIR, 'reports', 'benchmark_baseline.json')
+THRESHOLD = 0.15        # Lebih lambat > 15% dari baseline = regresi
+REPEAT = 5              # Jumlah repeat per benchmark (diambil median)
+MIN_TIME = 0.2          # Durasi minimal satu repeat (detik, lihat timeit.autorange)
+COLD_REPEAT = 3         # create_fighter cold: cache dikosongkan tiap repeat
+DRAW_WARMUP = 30        # Frame pemanasan sebelum mengukur draw
+FIGHT_TICK = 300        # Tick awal benchmark battle (intro sudah lewat)
+TEAM_SIZES = (2, 4, 8)  # Jumlah fighter benchmark teams
+TEAM_TICKS = 300        # Tick per repeat benchmark teams (match baru tiap repeat)
+PROJECTILE_COUNTS = (100, 500, 1000)    # Jumlah projectile hidup benchmark stress
+PARTICLE_COUNTS = (1000, 5000)          # Jumlah partikel hidup benchmark stress
+
+
+def machine_info():
+    """Info mesin & versi library (disimpan bersama hasil)."""
+    from engine.sprite_pack import PACK_PATH
+    return {
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'processor': platform.processor() or platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'pygame': pygame.version.ver,
+        'sdl': '.'.join(map(str, pygame.get_sdl_version())),
+        'video_driver': os.environ.get('SDL_VIDEODRIVER'),
+        'sprite_pack': os.path.exists(PACK_PATH),
+    }
+
+
+def measure(fn, repeat=REPEAT, min_time=MIN_TIME):
+    """
+    Waktu per panggilan fn() (detik): median dari repeat
+
+    Jumlah panggilan per repeat dikalibrasi agar satu repeat >= min_time
+    """
+    timer = timeit.Timer(fn)
+    number, elapsed = timer.autorange()
+    number = max(1, round(number * min_time / elapsed))
+    return statistics.median(t / number for t in timer.repeat(repeat, number))
+
+
+def result(seconds, unit, calls=1):
+    """
+    Record satu benchmark
+
+    Args:
+        seconds: Waktu per operasi
+        unit: Satuan rate ('fps', 'ticks/s', 'calls/s', ...)
+        calls: Jumlah operasi dalam satu pengukuran (rate = calls / seconds)
+    """
+    per_op = seconds / calls
+    return {'ms': per_op * 1000, 'rate': 1 / per_op if per_op else 0.0, 'unit': unit}
+
+
+# === BENCHMARK ===
+
+def bench_create_fighter(battle, repeat):
+    """create_fighter per karakter: cold (cache kosong) lalu warm (cache hit)."""
+    from battle.characters import CHARACTERS
+    from battle.simulation import SPAWN_P1
+    from engine.sprite_cache import SPRITE_CACHE
+    from engine.collision_masks import COLLISION_MASKS
+
+    results = {}
+    for name in CHARACTERS:
+        cold = []
+        for _ in range(max(1, min(repeat, COLD_REPEAT))):
+            SPRITE_CACHE.clear()
+            COLLISION_MASKS.clear()
+            start = time.perf_counter()
+            battle.create_fighter(name, *SPAWN_P1, False)
+            cold.append(time.perf_counter() - start)
+        results[f'create_fighter.cold.{name}'] = result(statistics.median(cold), 'fighters/s')
+        warm = measure(lambda: battle.create_fighter(name, *SPAWN_P1, False), repeat)
+        results[f'create_fighter.warm.{name}'] = result(warm, 'fighters/s')
+    return results
+
+
+def bench_battle_draw(battle, repeat, frames=120):
+    """
+    Render satu frame battle (full & dirty-rect), simulasi tetap jalan di antaranya
+
+    Yang diukur hanya render; sim.step() dilakukan di luar jam
+    """
+    from battle.snapshot import snapshot, restore
+
+    sim = battle.sim
+    for _ in range(FIGHT_TICK):
+        sim.step(0)
+    fight_state = snapshot(sim)
+
+    results = {}
+    for name, render in (('battle.render_full', lambda: battle.render_full(False)),
+                         ('battle.render_dirty', battle.render_dirty)):
+        for _ in range(DRAW_WARMUP):
+            render()
+        samples = []
+        for _ in range(repeat):
+            restore(sim, fight_state)
+            elapsed = 0.0
+            for _ in range(frames):
+                sim.step(0)
+                start = time.perf_counter()
+                render()
+                elapsed += time.perf_counter() - start
+            samples.append(elapsed)
+        results[name] = result(statistics.median(samples), 'fps', frames)
+    return results
+
+
+def bench_simulation(repeat):
+    """Fighter.update, Fighter._apply_physics, AIController.update, BattleSimulation.step."""
+    from battle.simulation import BattleSimulation, SCREEN_W, SCREEN_H
+    from battle.fighter_base import GRAVITY
+    from battle.snapshot import snapshot, restore
+
+    sim = BattleSimulation.headless('Samurai', 'Countess Vampire', 'cpu', 1234)
+    for _ in range(FIGHT_TICK):
+        sim.step(0)
+    fight_state = snapshot(sim)
+    p1, p2, ai = sim.p1, sim.p2, sim.ai
+
+    def reset_then(fn, calls=1000):
+        """Restore state fight tiap batch agar semua repeat mengukur kondisi yang sama."""
+        def run():
+            restore(sim, fight_state)
+            for _ in range(calls):
+                fn()
+        return run
+
+    return {
+        'fighter.update': result(measure(reset_then(p1.update), repeat), 'ticks/s', 1000),
+        'fighter.apply_physics': result(measure(reset_then(
+            lambda: p1._apply_physics(0, 0, SCREEN_W, SCREEN_H, p2, GRAVITY)), repeat),
+            'ticks/s', 1000),
+        'ai.update': result(measure(reset_then(
+            lambda: ai.update(SCREEN_W, SCREEN_H, False)), repeat), 'calls/s', 1000),
+        'simulation.step': result(measure(reset_then(lambda: sim.step(0)), repeat),
+                                  'ticks/s', 1000),
+    }
+
+
+def bench_teams(repeat):
+    """TeamSimulation.step free-for-all N fighter (semua AI), per tick & per fighter."""
+    from battle.team_simulation import TeamSimulation
+    from battle.characters import CHARACTERS
+
+    names = list(CHARACTERS)
+    results = {}
+    for n in TEAM_SIZES:
+        chars = [names[i % len(names)] for i in range(n)]
+        times = []
+        for seed in range(repeat):
+            # Match baru tiap repeat (belum ada snapshot N fighter); pembuatan tidak diukur
+            sim = TeamSimulation.headless(chars, 'ffa', 'cpu', seed)
+            sim.intro_count = 0
+            start = time.perf_counter()
+            for _ in range(TEAM_TICKS):
+                sim.step()
+            times.append((time.perf_counter() - start) / TEAM_TICKS)
+        seconds = statistics.median(times)
+        results[f'teams.ffa{n}.step'] = result(seconds, 'ticks/s')
+        results[f'teams.ffa{n}.per_fighter'] = result(seconds, 'fighter-ticks/s', n)
+    return results
+
+
+def bench_projectiles(repeat):
+    """StressScene: tick (update + collide) dan frame (tick + draw) per jumlah projectile."""
+    from battle.battle_system import SCREEN_W, SCREEN_H
+    from battle.characters import CHARACTERS, PROJECTILES
+    from engine.projectiles import StressScene, sprite_set
+    from engine.sprite_cache import SPRITE_CACHE
+
+    screen = pygame.display.get_surface() or pygame.display.set_mode((SCREEN_W, SCREEN_H))
+    folder, scale = CHARACTERS['Countess Vampire'][:2]
+    _, file, frames, size = PROJECTILES['Countess Vampire'][:4]
+    path = f"{folder}/{file}"
+    sprites = [sprite_set(SPRITE_CACHE.get_frames(path, frames, scale),
+                          SPRITE_CACHE.get_mirrored(path, frames, scale), size)]
+
+    results = {}
+    for count in PROJECTILE_COUNTS:
+        scene = StressScene(SCREEN_W, SCREEN_H, count, size)
+
+        def frame():
+            scene.tick()
+            scene.pool.draw(screen, sprites, 0.5)
+
+        results[f'projectiles.{count}.tick'] = result(measure(scene.tick, repeat), 'ticks/s')
+        results[f'projectiles.{count}.frame'] = result(measure(frame, repeat), 'fps')
+    return results
+
+
+def bench_particles(repeat):
+    """StressScene partikel: frame (isi ulang + update + draw) per jumlah partikel."""
+    from battle.battle_system import SCREEN_W, SCREEN_H
+    from engine.particles import StressScene
+
+    screen = pygame.display.get_surface() or pygame.display.set_mode((SCREEN_W, SCREEN_H))
+    results = {}
+    for count in PARTICLE_COUNTS:
+        scene = StressScene(SCREEN_W, SCREEN_H, count)
+        for _ in range(DRAW_WARMUP):
+            scene.frame(screen)
+        results[f'particles.{count}.frame'] = result(
+            measure(lambda: scene.frame(screen), repeat), 'fps')
+    return results
+
+
+def bench_screens(repeat):
+    """draw() satu frame tiap screen pemilihan (termasuk update animasi)."""
+    from battle.mode_selection import ModeSelection
+    from character.select_character import CharacterSelection
+    from arena.select_arena import ArenaSelection
+
+    def mode_frame(screen):
+        screen.time += 1
+        for btn in screen.buttons:
+            btn.update()
+        screen.draw()
+
+    def selection_frame(screen):
+        screen.update()
+        screen.draw()
+
+    results = {}
+    for name, factory, frame in (('mode_selection', ModeSelection, mode_frame),
+                                 ('character_selection', CharacterSelection, selection_frame),
+                                 ('arena_selection', ArenaSelection, selection_frame)):
+        screen = factory()
+        for _ in range(DRAW_WARMUP):
+            frame(screen)
+        results[f'screen.{name}.draw'] = result(measure(lambda: frame(screen), repeat), 'fps')
+    return results
+
+
+GROUPS = ('create_fighter', 'battle', 'simulation', 'teams', 'projectiles', 'particles',
+          'screens')
+
+
+def run_all(groups=GROUPS, repeat=REPEAT, log=print):
+    """
+    Jalankan grup benchmark yang dipilih
+
+    Returns:
+        dict: Nama benchmark -> {'ms', 'rate', 'unit'}
+    """
+    from battle.battle_system import BattleSystem
+    from battle.characters import ARENAS
+
+    pygame.init()
+    results = {}
+    battle = None
+    if 'create_fighter' in groups or 'battle' in groups:
+        battle = BattleSystem('Samurai', 'Countess Vampire', next(iter(ARENAS)), 'cpu',
+                              seed=1234, record=False, render_fps=0, vsync=False)
+
+    for group in groups:
+        log(f"[{group}]")
+        start = time.perf_counter()
+        if group == 'create_fighter':
+            part = bench_create_fighter(battle, repeat)
+        elif group == 'battle':
+            part = bench_battle_draw(battle, repeat)
+        elif group == 'simulation':
+            part = bench_simulation(repeat)
+        elif group == 'teams':
+            part = bench_teams(repeat)
+        elif group == 'projectiles':
+            part = bench_projectiles(repeat)
+        elif group == 'particles':
+            part = bench_particles(repeat)
+        else:
+            part = bench_screens(repeat)
+        for name, r in part.items():
+            log(f"  {name:<40}{r['ms']:10.4f} ms  {r['rate']:>12,.1f} {r['unit']}")
+        log(f"  ({time.perf_counter() - start:.1f}s)")
+        results.update(part)
+    return results
+
+
+# === BASELINE ===
+
+def compare(results, baseline, threshold=THRESHOLD):
+    """
+    Bandingkan hasil dengan baseline
+
+    Args:
+        results: Hasil run_all()
+        baseline: Dict 'results' dari file baseline
+        threshold: Rasio perlambatan yang dianggap regresi (0.15 = 15%)
+
+    Returns:
+        list: Tuple (nama, ms baseline, ms sekarang, perubahan, regresi?) untuk
+              benchmark yang ada di keduanya
+    """
+    rows = []
+    for name, r in results.items():
+        base = baseline.get(name)
+        if not base or not base['ms']:
+            continue
+        change = r['ms'] / base['ms'] - 1
+        rows.append((name, base['ms'], r['ms'], change, change > threshold))
+    return rows
+
+
+def load_report(path):
+    """Baca file JSON hasil benchmark (None jika tidak ada)."""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_report(path, report):
+    """Tulis file JSON hasil benchmark (folder dibuat jika belum ada)."""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Py-Fighter headless benchmark suite")
+    parser.add_argument('--only', help=f"Grup dipisah koma ({', '.join(GROUPS)})")
+    parser.add_argument('--repeat', type=int, default=REPEAT)
+    parser.add_argument('--quick', action='store_true', help="repeat=2 (cek cepat)")
+    parser.add_argument('--output', default=OUTPUT_PATH)
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--threshold', type=float, default=THRESHOLD,
+                        help="Perlambatan yang dianggap regresi (0.15 = 15%%)")
+    parser.add_argument('--save-baseline', action='store_true',
+                        help="Simpan hasil run ini sebagai baseline")
+    args = parser.parse_args(argv)
+
+    groups = GROUPS
+    if args.only:
+        groups = tuple(g.strip() for g in args.only.split(','))
+        unknown = set(groups) - set(GROUPS)
+        if unknown:
+            parser.error(f"grup tidak dikenal: {', '.join(sorted(unknown))}")
+    repeat = 2 if args.quick else args.repeat
+
+    machine = machine_info()
+    results = run_all(groups, repeat)
+    report = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'machine': machine,
+        'repeat': repeat,
+        'results': results,
+    }
+    write_report(args.output, report)
+    print(f"\nHasil: {args.output}")
+
+    if args.save_baseline:
+        write_report(args.baseline, report)
+        print(f"Baseline disimpan: {args.baseline}")
+        return 0
+
+    baseline = load_report(args.baseline)
+    if baseline is None:
+        print(f"Baseline belum ada ({args.baseline}); jalankan dengan --save-baseline")
+        return 0
+    if baseline.get('machine') != machine:
+        print("PERINGATAN: baseline dibuat di mesin / konfigurasi berbeda")
+
+    rows = compare(results, baseline['results'], args.threshold)
+    regressions = [row for row in rows if row[4]]
+    print(f"\nPerbandingan dengan baseline ({baseline.get('created')}, "
+          f"threshold {args.threshold:.0%}):")
+    for name, base_ms, ms, change, regressed in rows:
+        flag = 'REGRESSION' if regressed else ('faster' if change < -args.threshold else '')
+        print(f"  {name:<40}{base_ms:10.4f} -> {ms:10.4f} ms  {change:+7.1%}  {flag}")
+    print(f"\n{len(regressions)} regresi dari {len(rows)} benchmark")
+    return 1 if regressions else 0
+
+
+# === ENTRY POINT ===
+if __name__ == "__main__":
+    sys.exit(main())
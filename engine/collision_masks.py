@@ -0,0 +1,223 @@
+"""
+FILE: collision_masks.py
+DESKRIPSI: Mask collision per frame animasi (hurt = seluruh sprite, hit = bagian serangan)
+           dibuat dari alpha sprite saat load, satu set per arah hadap
+DIGUNAKAN OLEH: battle_system.py (create_fighter), simulation.py (headless_fighter),
+                batch_engine.py, sprite_pack.py (bake mask ke pack)
+MENGGUNAKAN: pygame.mask, sprite_pack.py (mask hasil bake), sprite_cache.py (slice_sheet)
+
+ALUR PROGRAM:
+1. COLLISION_MASKS.get(folder, scale, files, frames) dipanggil saat fighter dibuat
+   - Cache per (karakter, scale) di memori: dibangun sekali per process
+   - Miss: ambil dari sprite pack (mask sudah di-bake), jika tidak ada dibangun dari
+     frame (frame battle yang sudah dimuat, atau decode PNG tanpa display)
+2. build_masks(animations, ...) untuk tiap arah hadap (0 = kanan, 1 = kiri):
+   - hurt: alpha frame (di-crop ke bounding box)
+   - hit (hanya animasi attack): pixel frame yang TIDAK ada di pose idle dan berada
+     di depan tengah badan = senjata / tangan / efek yang menjangkau ke depan
+   - Frame aktif: hit >= MIN_ACTIVE_PIXELS pixel dan jangkauannya >= ACTIVE_REACH x
+     jangkauan terjauh animasi tersebut (windup / recovery tidak melukai); frame
+     pertama animasi attack > 1 frame selalu windup
+   - Pose yang hampir tidak menjangkau ke depan (mis. serangan sihir Countess
+     Vampire: jangkauan terjauh < MIN_REACH dari depan hitbox) memakai kotak lama
+     ATTACK_W x HITBOX_H di depan hitbox pada frame aktifnya (tanpa frame aktif:
+     frame terakhir), agar karakter tetap bisa mengenai lawan
+3. Fighter.resolve_attack() memakai CollisionFrame frame yang sedang tampil:
+   AABB (hit_rect vs hurt_rect) dulu, baru Mask.overlap jika kotak bersentuhan
+
+Posisi mask relatif terhadap hitbox (Fighter.rect): tengah siluet idle = tengah hitbox,
+vertikal ikut offset sprite. Sprite tiap karakter tidak tergambar di tengah hitbox-nya
+(dan bergeser saat flip), jadi mask mengikuti hitbox agar jarak serang konsisten
+untuk semua karakter & kedua arah - hitbox juga yang dipakai collision badan.
+"""
+import os
+import zlib
+from collections import namedtuple
+import pygame
+from engine.sprite_pack import SPRITE_PACK
+from engine.sprite_cache import slice_sheet
+from battle.fighter_base import HITBOX_H, ATTACK_W
+
+
+ATTACK_ACTIONS = (3, 4, 5)      # Index animasi Attack 1/2/3 (lihat Fighter.update)
+MIN_ACTIVE_PIXELS = 32          # Hit mask lebih kecil dari ini = frame tidak aktif
+ACTIVE_REACH = 0.75             # Frame aktif: jangkauan >= 75% jangkauan terjauh animasinya
+MIN_REACH = 24                  # Jangkauan depan hitbox di bawah ini = pakai kotak ATTACK_W
+MASK_VERSION = 2                # Naikkan jika aturan pembuatan mask berubah (pack di-bake ulang)
+
+# Mask satu frame: Mask ter-crop + Rect posisinya relatif terhadap pojok kiri atas hitbox
+# (hit / hit_rect = None jika frame bukan frame aktif)
+CollisionFrame = namedtuple('CollisionFrame', ('hurt', 'hurt_rect', 'hit', 'hit_rect'))
+
+
+def crop_mask(mask):
+    """
+    Potong mask ke bounding box pixel yang set
+
+    Returns:
+        tuple: (Mask, Rect) atau (None, None) jika mask kosong
+    """
+    rects = mask.get_bounding_rects()
+    if not rects:
+        return None, None
+    box = rects[0].unionall(rects[1:])
+    cropped = pygame.mask.Mask(box.size)
+    cropped.draw(mask, (-box.x, -box.y))
+    return cropped, box
+
+
+def _facing_masks(animations, facing_right, hitbox_w, offset_y):
+    """CollisionFrame tiap [action][frame] untuk satu arah hadap."""
+    idle = pygame.mask.from_surface(animations[0][0])
+    _, body = crop_mask(idle)
+    if body is None:
+        raise pygame.error("frame idle kosong")
+    center = body.centerx
+    # Geser dari koordinat sprite ke koordinat hitbox: tengah siluet idle = tengah hitbox
+    shift = (hitbox_w // 2 - center, -offset_y)
+
+    result = []
+    for action, frames in enumerate(animations):
+        row, reaches = [], []
+        for frame in frames:
+            mask = pygame.mask.from_surface(frame)
+            hurt, hurt_rect = crop_mask(mask)
+            hit = hit_rect = None
+            if action in ATTACK_ACTIONS:
+                reach = mask.copy()
+                reach.erase(idle, (0, 0))               # Buang pose dasar
+                w, h = reach.get_size()
+                if facing_right:                        # Buang semua di belakang tengah badan
+                    reach.erase(pygame.mask.Mask((center, h), fill=True), (0, 0))
+                else:
+                    reach.erase(pygame.mask.Mask((w - center, h), fill=True), (center, 0))
+                # Frame pertama animasi > 1 frame = windup (tidak pernah aktif)
+                if reach.count() >= MIN_ACTIVE_PIXELS and (row or len(frames) == 1):
+                    hit, hit_rect = crop_mask(reach)
+            reaches.append(0 if hit is None else
+                           (hit_rect.right - center if facing_right else center - hit_rect.left))
+            row.append([hurt, hurt_rect, hit, hit_rect])
+
+        # Frame aktif = frame yang jangkauannya dekat jangkauan maksimum animasi ini
+        longest = max(reaches)
+        active = [hit is not None and reach >= longest * ACTIVE_REACH
+                  for (_, _, hit, _), reach in zip(row, reaches)]
+        box = None
+        if action in ATTACK_ACTIONS and longest - hitbox_w // 2 < MIN_REACH:
+            # Pose tidak menjangkau ke depan: kotak serangan lama di depan hitbox
+            box = (pygame.mask.Mask((ATTACK_W, HITBOX_H), fill=True),
+                   pygame.Rect(hitbox_w if facing_right else -ATTACK_W, 0, ATTACK_W, HITBOX_H))
+            if not any(active):
+                active[-1] = True
+        frames_out = []
+        for (hurt, hurt_rect, hit, hit_rect), is_active in zip(row, active):
+            if not is_active:
+                hit = hit_rect = None
+            elif box is not None:
+                hit, hit_rect = box
+            else:
+                hit_rect = hit_rect.move(shift)
+            if hurt_rect is not None:
+                hurt_rect = hurt_rect.move(shift)
+            frames_out.append(CollisionFrame(hurt, hurt_rect, hit, hit_rect))
+        result.append(frames_out)
+    return result
+
+
+def build_masks(animations, hitbox_w, offset_y):
+    """
+    Bangun mask collision semua frame
+
+    Args:
+        animations: Frames hadap kanan [action][frame] (Surface dengan alpha)
+        hitbox_w: Lebar hitbox fighter (tengah siluet idle diletakkan di tengahnya)
+        offset_y: Offset vertikal sprite terhadap hitbox (sama dengan Fighter.draw)
+
+    Returns:
+        tuple: (mask hadap kanan, mask hadap kiri), index dengan Fighter.flip
+    """
+    flipped = [[pygame.transform.flip(f, True, False) for f in frames] for frames in animations]
+    return (_facing_masks(animations, True, hitbox_w, offset_y),
+            _facing_masks(flipped, False, hitbox_w, offset_y))
+
+
+def active_frames(masks, facing=0):
+    """Index frame aktif (punya hit mask) tiap animasi attack."""
+    return {action: [i for i, f in enumerate(masks[facing][action]) if f.hit is not None]
+            for action in ATTACK_ACTIONS}
+
+
+# === SERIALISASI (sprite pack) ===
+
+def mask_to_bytes(mask):
+    """Mask -> bytes terkompresi (1 byte per pixel: 0 / 255)."""
+    surface = mask.to_surface(setcolor=(255, 255, 255, 255), unsetcolor=(0, 0, 0, 0))
+    return zlib.compress(pygame.image.tobytes(surface, 'RGBA')[3::4])
+
+
+def mask_from_bytes(data, size):
+    """Kebalikan mask_to_bytes (surface 8-bit + colorkey 0 -> Mask)."""
+    surface = pygame.image.frombuffer(bytearray(zlib.decompress(data)), size, 'P')
+    surface.set_colorkey(0)
+    return pygame.mask.from_surface(surface)
+
+
+def load_animations(folder, scale, files, frames):
+    """Decode frame semua animasi tanpa display (tanpa convert_alpha)."""
+    return [slice_sheet(pygame.image.load(os.path.join(folder, file)), n, scale)
+            for file, n in zip(files, frames)]
+
+
+class MaskCache:
+    """
+    Cache mask collision per (karakter, scale) untuk satu process
+
+    Attributes:
+        built: Jumlah set mask yang dibangun dari frame (bukan dari pack)
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self.built = 0
+
+    @staticmethod
+    def make_key(folder, scale):
+        """Key cache / pack: (karakter, 'masks', scale) - format sama dengan SpriteCache."""
+        return (os.path.basename(os.path.normpath(folder)), 'masks', scale)
+
+    def get(self, folder, scale, offset, files, frames, hitbox_w, animations=None):
+        """
+        Mask collision satu karakter
+
+        Args:
+            folder, scale, offset, files, frames: Data karakter (lihat CHARACTERS)
+            hitbox_w: Lebar hitbox fighter
+            animations: Frames hadap kanan yang sudah dimuat (hemat decode), atau None
+
+        Returns:
+            tuple | None: (kanan, kiri) dari build_masks(), None jika sprite tidak ada
+                          (fighter kembali ke hitbox kotak)
+        """
+        key = self.make_key(folder, scale)
+        if key in self._entries:
+            return self._entries[key]
+
+        paths = [os.path.join(folder, file) for file in files]
+        masks = SPRITE_PACK.load_masks(key, paths, frames, (hitbox_w, offset[1]))
+        if masks is None:
+            try:
+                if animations is None:
+                    animations = load_animations(folder, scale, files, frames)
+                masks = build_masks(animations, hitbox_w, offset[1])
+                self.built += 1
+            except (pygame.error, OSError):
+                masks = None
+        self._entries[key] = masks
+        return masks
+
+    def clear(self):
+        self._entries.clear()
+
+
+# === INSTANCE BERSAMA ===
+COLLISION_MASKS = MaskCache()
@@ -0,0 +1,240 @@
+"""
+FILE: frame_timing.py
+DESKRIPSI: Timer per fase frame (event, input, AI, fisika, efek, draw, display) dengan overlay
+           in-game (rata-rata, p95/p99, grafik frame time) dan export CSV per frame
+DIGUNAKAN OLEH: battle_system.py, simulation.py (fase AI / fisika),
+                mode_selection.py, select_character.py, select_arena.py
+MENGGUNAKAN: time.perf_counter, pygame, text_cache.py
+
+ALUR PROGRAM:
+1. Screen memanggil frame_timer(scene) di awal run():
+   - Default (mati): NullTimer - semua method no-op, tanpa perf_counter
+   - PYFIGHTER_TIMING=1: FrameTimer dengan overlay tampil
+   - PYFIGHTER_TIMING_CSV=path: FrameTimer yang menulis satu baris CSV per frame
+2. Di dalam loop, timer.mark(fase) menambahkan waktu sejak mark sebelumnya ke fase
+   itu (fase boleh di-mark berkali-kali per frame, mis. beberapa tick simulasi)
+3. timer.frame() di awal loop (setelah clock.tick): sisa waktu = 'idle',
+   frame ditutup -> masuk rolling window + CSV
+4. timer.draw(screen) menggambar overlay (di-compose ulang tiap OVERLAY_REFRESH frame)
+5. TIMING_KEY (F3) memanggil timer.toggled(): NullTimer <-> FrameTimer
+"""
+import os
+import time
+from collections import deque
+import pygame
+from engine.text_cache import render_text, get_font
+
+
+# Urutan fase dalam satu frame (kolom CSV & baris overlay)
+PHASES = ('events', 'input', 'ai', 'physics', 'effects', 'draw_bg', 'draw_fighters',
+          'draw_ui', 'overlay', 'display', 'idle')
+WINDOW = 300                # Jumlah frame untuk rata-rata & persentil (5 detik)
+GRAPH_FRAMES = 150          # Jumlah bar di grafik frame time
+GRAPH_MAX_MS = 50.0         # Tinggi grafik = 50 ms
+BUDGET_MS = 1000 / 60       # Garis budget 60 FPS di grafik
+OVERLAY_REFRESH = 15        # Overlay di-render ulang tiap N frame
+TIMING_KEY = pygame.K_F3
+
+OVERLAY_BG = (0, 0, 0, 170)
+OVERLAY_TEXT = (230, 230, 230)
+OVERLAY_WARN = (255, 120, 80)
+
+
+def _percentile(ordered, p):
+    """Persentil dari list yang sudah diurutkan (nearest rank)."""
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+
+class NullTimer:
+    """Timer mati: semua method tidak melakukan apa-apa (biaya = satu method call)."""
+
+    enabled = False
+    overlay = False
+
+    def __init__(self, scene):
+        self.scene = scene
+
+    def mark(self, phase):
+        pass
+
+    def frame(self):
+        pass
+
+    def draw(self, surface):
+        pass
+
+    def close(self):
+        pass
+
+    def toggled(self):
+        """Hotkey: nyalakan timer dengan overlay."""
+        return FrameTimer(self.scene)
+
+
+class FrameTimer:
+    """
+    Pengukur waktu per fase dengan rolling window
+
+    Attributes:
+        scene: Nama screen (kolom CSV & judul overlay)
+        overlay: True jika overlay digambar
+        frames: Jumlah frame yang sudah ditutup
+        totals: deque frame time (ms) WINDOW frame terakhir
+        phase_ms: fase -> deque waktu (ms) per frame
+    """
+
+    enabled = True
+
+    def __init__(self, scene, overlay=True, csv_path=None, window=WINDOW):
+        """
+        Constructor
+
+        Args:
+            scene: Nama screen
+            overlay: Tampilkan overlay
+            csv_path: File CSV (append, header ditulis jika file baru) atau None
+            window: Ukuran rolling window
+        """
+        self.scene = scene
+        self.overlay = overlay
+        self.frames = 0
+        self.totals = deque(maxlen=window)
+        self.phase_ms = {p: deque(maxlen=window) for p in PHASES}
+        self._current = dict.fromkeys(PHASES, 0.0)
+        self._last = time.perf_counter()
+        self._surface = None
+
+        self._csv = None
+        if csv_path:
+            os.makedirs(os.path.dirname(csv_path) or '.', exist_ok=True)
+            new = not os.path.exists(csv_path) or os.path.getsize(csv_path) == 0
+            self._csv = open(csv_path, 'a')
+            if new:
+                self._csv.write('scene,frame,total_ms,' + ','.join(f"{p}_ms" for p in PHASES) + '\n')
+
+
+    def mark(self, phase):
+        """Waktu sejak mark sebelumnya masuk ke fase ini."""
+        now = time.perf_counter()
+        self._current[phase] += now - self._last
+        self._last = now
+
+
+    def frame(self):
+        """Tutup frame: sisa waktu = 'idle', simpan ke window + CSV, mulai frame baru."""
+        self.mark('idle')
+        current = self._current
+        total = 0.0
+        for phase, seconds in current.items():
+            ms = seconds * 1000
+            self.phase_ms[phase].append(ms)
+            total += ms
+            current[phase] = 0.0
+        self.totals.append(total)
+        self.frames += 1
+        if self._csv:
+            row = ','.join(f"{self.phase_ms[p][-1]:.3f}" for p in PHASES)
+            self._csv.write(f"{self.scene},{self.frames},{total:.3f},{row}\n")
+
+
+    def stats(self):
+        """
+        Statistik rolling window
+
+        Returns:
+            dict: avg_ms, p95_ms, p99_ms, fps, phases (fase -> rata-rata ms)
+        """
+        n = len(self.totals)
+        if not n:
+            return {'avg_ms': 0.0, 'p95_ms': 0.0, 'p99_ms': 0.0, 'fps': 0.0, 'phases': {}}
+        ordered = sorted(self.totals)
+        avg = sum(ordered) / n
+        return {
+            'avg_ms': avg,
+            'p95_ms': _percentile(ordered, 0.95),
+            'p99_ms': _percentile(ordered, 0.99),
+            'fps': 1000 / avg if avg else 0.0,
+            'phases': {p: sum(d) / len(d) for p, d in self.phase_ms.items() if d},
+        }
+
+
+    def draw(self, surface):
+        """Gambar overlay di pojok kiri bawah (waktunya masuk fase 'overlay')."""
+        if not self.overlay:
+            return
+        if self._surface is None or self.frames % OVERLAY_REFRESH == 0:
+            self._surface = self._compose()
+        surface.blit(self._surface, (10, surface.get_height() - self._surface.get_height() - 10))
+        self.mark('overlay')
+
+
+    def _compose(self):
+        """Render ulang panel overlay (teks angka tidak masuk TEXT_CACHE)."""
+        font = get_font(20)
+        s = self.stats()
+        lines = [
+            (f"{self.scene}  {s['fps']:.0f} fps", OVERLAY_TEXT),
+            (f"frame {s['avg_ms']:.2f} ms  p95 {s['p95_ms']:.2f}  p99 {s['p99_ms']:.2f}",
+             OVERLAY_WARN if s['p99_ms'] > BUDGET_MS else OVERLAY_TEXT),
+        ]
+        for phase in PHASES:
+            ms = s['phases'].get(phase, 0.0)
+            if ms >= 0.005:
+                lines.append((f"{phase:<14}{ms:7.2f} ms", OVERLAY_TEXT))
+
+        width, line_h, graph_h = 320, 18, 60
+        panel = pygame.Surface((width, 12 + line_h * len(lines) + graph_h), pygame.SRCALPHA)
+        panel.fill(OVERLAY_BG)
+        for i, (text, color) in enumerate(lines):
+            panel.blit(font.render(text, True, color), (8, 6 + i * line_h))
+
+        # === GRAFIK FRAME TIME (bar per frame, garis = budget 60 FPS) ===
+        base = panel.get_height() - 4
+        recent = list(self.totals)[-GRAPH_FRAMES:]
+        bar_w = (width - 16) / GRAPH_FRAMES
+        for i, ms in enumerate(recent):
+            h = min(graph_h - 8, ms / GRAPH_MAX_MS * (graph_h - 8))
+            color = OVERLAY_WARN if ms > BUDGET_MS else (120, 220, 120)
+            pygame.draw.rect(panel, color, (8 + i * bar_w, base - h, max(1, bar_w), h))
+        budget_y = base - BUDGET_MS / GRAPH_MAX_MS * (graph_h - 8)
+        pygame.draw.line(panel, (255, 255, 0), (8, budget_y), (width - 8, budget_y))
+        panel.blit(render_text("16.6", 16, (255, 255, 0)), (width - 36, budget_y - 12))
+        return panel
+
+
+    def close(self):
+        """Tutup file CSV (jika ada)."""
+        if self._csv:
+            self._csv.close()
+            self._csv = None
+
+
+    def toggled(self):
+        """
+        Hotkey: sembunyikan / tampilkan overlay
+
+        Saat CSV aktif timer tetap jalan (overlay saja yang berubah);
+        tanpa CSV timer dimatikan kembali ke NullTimer.
+        """
+        if self._csv:
+            self.overlay = not self.overlay
+            return self
+        return NullTimer(self.scene)
+
+
+def frame_timer(scene):
+    """
+    Timer untuk satu screen sesuai env
+
+    Env:
+        PYFIGHTER_TIMING=1: overlay tampil sejak awal
+        PYFIGHTER_TIMING_CSV=path: stream timing per frame ke CSV (timer selalu jalan)
+
+    Returns:
+        NullTimer | FrameTimer
+    """
+    csv_path = os.environ.get('PYFIGHTER_TIMING_CSV')
+    overlay = os.environ.get('PYFIGHTER_TIMING') == '1'
+    if not csv_path and not overlay:
+        return NullTimer(scene)
+    return FrameTimer(scene, overlay, csv_path)
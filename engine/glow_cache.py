@@ -0,0 +1,108 @@
+"""
+FILE: glow_cache.py
+DESKRIPSI: Cache surface efek glow / hover (rounded rect transparan) dengan alpha terkuantisasi
+DIGUNAKAN OLEH: mode_selection.py (ModeButton), select_character.py (CharacterSlot),
+                select_arena.py (ArenaSlot)
+MENGGUNAKAN: pygame
+
+ALUR PROGRAM:
+1. Screen memanggil get_glow(size, color, alpha, border_radius) setiap frame
+2. Alpha dikuantisasi (kelipatan ALPHA_STEP) agar jumlah variasi kecil
+3. Hit: surface yang sama dipakai ulang (cukup 1 blit)
+   Miss: surface SRCALPHA dibuat + rounded rect digambar sekali, lalu disimpan
+4. Cache dibatasi jumlah byte; entry paling lama tidak dipakai dibuang (LRU)
+
+Animasi hover/fade jadi rangkaian lookup, bukan alokasi + rasterisasi ulang.
+"""
+import pygame
+from collections import OrderedDict
+
+
+ALPHA_STEP = 4                          # Kuantisasi alpha
+MAX_GLOW_BYTES = 32 * 1024 * 1024       # Batas memori cache glow
+
+
+def quantize_alpha(alpha):
+    """Bulatkan alpha ke kelipatan ALPHA_STEP terdekat (0-255)."""
+    return min(255, (alpha + ALPHA_STEP // 2) // ALPHA_STEP * ALPHA_STEP)
+
+
+class GlowCache:
+    """
+    Cache LRU untuk surface rounded rect transparan
+
+    Attributes:
+        max_bytes: Batas memori pixel (byte)
+        used: Memori yang sedang dipakai (byte)
+        hits, misses: Counter statistik
+    """
+
+    def __init__(self, max_bytes=MAX_GLOW_BYTES):
+        """
+        Constructor - Setup cache kosong
+
+        Args:
+            max_bytes: Batas memori pixel sebelum entry lama dibuang
+        """
+        self.max_bytes = max_bytes
+        self.used = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()   # (size, color, alpha, radius) -> Surface
+
+    def get(self, size, color, alpha, border_radius):
+        """
+        Ambil surface glow (atau buat jika belum ada)
+
+        Args:
+            size: (w, h) ukuran surface
+            color: Warna RGB
+            alpha: Alpha 0-255 (dikuantisasi)
+            border_radius: Radius sudut rounded rect
+
+        Returns:
+            Surface: Surface SRCALPHA (dipakai bersama, jangan dimodifikasi)
+        """
+        key = (tuple(size), tuple(color[:3]), quantize_alpha(alpha), border_radius)
+        surf = self._entries.get(key)
+        if surf is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return surf
+
+        self.misses += 1
+        surf = pygame.Surface(key[0], pygame.SRCALPHA)
+        pygame.draw.rect(surf, (*key[1], key[2]), surf.get_rect(), border_radius=border_radius)
+        self._entries[key] = surf
+        self.used += surf.get_width() * surf.get_height() * 4
+
+        while self.used > self.max_bytes and len(self._entries) > 1:
+            _, old = self._entries.popitem(last=False)
+            self.used -= old.get_width() * old.get_height() * 4
+        return surf
+
+    def stats(self):
+        """
+        Statistik cache
+
+        Returns:
+            dict: entries, bytes, max_bytes, hits, misses, hit_rate
+        """
+        total = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'bytes': self.used,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+        }
+
+
+# === INSTANCE BERSAMA ===
+GLOW_CACHE = GlowCache()
+
+
+def get_glow(size, color, alpha, border_radius):
+    """Shortcut GLOW_CACHE.get() - lihat GlowCache.get."""
+    return GLOW_CACHE.get(size, color, alpha, border_radius)
@@ -0,0 +1,77 @@
+"""
+FILE: layers.py
+DESKRIPSI: Compositor layer statis (retained mode) untuk screen seleksi
+DIGUNAKAN OLEH: mode_selection.py, select_character.py, select_arena.py
+MENGGUNAKAN: pygame
+
+ALUR PROGRAM:
+1. Screen membuat StaticLayer(build) dengan fungsi build(surface) yang
+   menggambar semua bagian statis (background, overlay, header, footer, instruksi)
+2. Setiap frame screen memanggil layer.draw(screen, key)
+   - key = tuple input yang mempengaruhi isi layer (mis. status "both_ready")
+   - Jika key sama dengan sebelumnya: cukup 1 blit opaque dari surface cache
+   - Jika key berubah: layer di-compose ulang sekali lewat build()
+3. Elemen animasi (garis judul, tombol hover, sprite idle) digambar di atasnya
+"""
+import pygame
+
+
+class StaticLayer:
+    """
+    Surface hasil compose bagian statis, di-invalidate hanya saat input berubah
+
+    Attributes:
+        build: Fungsi build(surface, *key) untuk menggambar isi layer
+        surface: Surface hasil compose (None sebelum draw pertama)
+        key: Input yang dipakai saat compose terakhir
+        rebuilds: Jumlah compose ulang (statistik)
+    """
+
+    _UNSET = object()
+
+    def __init__(self, build):
+        """
+        Constructor
+
+        Args:
+            build: Callable build(surface, *key) yang menggambar layer statis
+        """
+        self.build = build
+        self.surface = None
+        self.key = self._UNSET
+        self.rebuilds = 0
+
+    def invalidate(self):
+        """Paksa compose ulang pada draw berikutnya."""
+        self.key = self._UNSET
+
+    def get(self, size, key=()):
+        """
+        Ambil surface layer (compose ulang jika key / ukuran berubah)
+
+        Args:
+            size: (w, h) ukuran layer
+            key: Tuple input layer
+
+        Returns:
+            Surface: Layer statis siap blit
+        """
+        if self.surface is None or self.surface.get_size() != size:
+            # Format sama dengan display -> blit opaque tanpa konversi
+            self.surface = pygame.Surface(size).convert()
+            self.key = self._UNSET
+        if key != self.key:
+            self.build(self.surface, *key)
+            self.key = key
+            self.rebuilds += 1
+        return self.surface
+
+    def draw(self, target, key=()):
+        """
+        Blit layer statis ke target (biasanya screen)
+
+        Args:
+            target: Surface tujuan
+            key: Tuple input layer (lihat get)
+        """
+        target.blit(self.get(target.get_size(), key), (0, 0))
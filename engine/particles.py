@@ -0,0 +1,323 @@
+"""
+FILE: particles.py
+DESKRIPSI: Sistem partikel visual (hit spark, debu mendarat, ledakan KO) dengan state
+           di array NumPy, integrasi massal per tick dan draw sekali Surface.blits()
+DIGUNAKAN OLEH: battle_system.py (event hit / mendarat / KO), benchmark.py (grup
+                'particles')
+MENGGUNAKAN: numpy, pygame (colorkey + RLEACCEL, draw.circle, Surface.blits)
+
+ALUR PROGRAM:
+1. ParticleSystem(capacity) membuat array posisi, kecepatan, gravitasi, drag, umur
+   dan index sprite sebesar capacity (hard cap); partikel hidup selalu rapat di
+   index [0, count) sehingga semua operasi cukup memakai slice
+2. emit(effect, x, y, direction) menulis satu burst (EFFECTS) ke slice berikutnya:
+   angka acak dibuat sekaligus per burst, bukan per partikel
+3. update() tiap tick: gravitasi, drag, posisi, umur untuk semua partikel sekaligus;
+   yang habis umur dibuang dengan kompaksi boolean (urutan tetap)
+4. draw(surface): index sprite = warna partikel + level fade dari sisa umur;
+   sprite diambil dari cache sprite pra-warna (sprite_table() dibuat sekali per
+   process) lalu digambar dengan satu Surface.blits()
+5. Batas kualitas berbasis biaya: waktu update + draw per partikel diukur
+   (rata-rata bergerak); limit = budget_ms / biaya per partikel. Burst baru
+   dipotong agar jumlah partikel hidup tidak melewati limit (hard cap tetap capacity)
+
+Sprite sengaja opaque + colorkey (RLE), bukan alpha per pixel: blit ribuan titik
+kecil 3-5x lebih cepat. "Fade" = mengecil + warna lebih gelap per level.
+
+Partikel murni visual: tidak memengaruhi simulasi, replay, atau netplay.
+
+StressScene: layar penuh partikel untuk stress test & benchmark.
+
+Jalankan langsung untuk stress test (update + draw 1000 - 5000 partikel):
+    python -m engine.particles
+"""
+import math
+import time
+import numpy as np
+import pygame
+
+
+MAX_PARTICLES = 8192        # Hard cap partikel hidup
+BUDGET_MS = 4.0             # Target biaya update + draw partikel per frame
+MIN_LIMIT = 256             # Limit hasil kualitas tidak pernah di bawah ini
+COST_SMOOTHING = 0.1        # Bobot sampel baru di rata-rata bergerak biaya
+COST_MIN_SAMPLE = 64        # Biaya per partikel hanya diukur jika partikel >= ini
+FADE_LEVELS = 4             # Jumlah level fade (ukuran & warna) per warna
+FADE_DARKEN = 0.5           # Kecerahan level paling pudar (relatif warna penuh)
+COLORKEY = (255, 0, 255)    # Warna transparan sprite partikel
+
+# Style sprite: nama -> (warna-warna, radius penuh)
+STYLES = {
+    'spark': (((255, 250, 210), (255, 210, 90), (255, 140, 40)), 3),
+    'dust': (((200, 185, 160), (170, 155, 130)), 4),
+    'blood': (((230, 40, 40), (160, 20, 30), (255, 200, 200)), 3),
+}
+
+# Efek: nama -> (style, jumlah, kecepatan min/max, arah (derajat), sebaran (derajat),
+#                umur min/max (tick), gravitasi, drag)
+# Arah 0 = ke depan (direction), 90 = ke atas
+EFFECTS = {
+    'hit_spark': ('spark', 24, (4.0, 11.0), 15, 70, (8, 18), 0.35, 0.90),
+    'landing_dust': ('dust', 16, (1.0, 4.0), 90, 170, (14, 26), -0.04, 0.92),
+    'ko_burst': ('blood', 140, (3.0, 14.0), 90, 360, (20, 45), 0.45, 0.95),
+}
+
+
+# === SPRITE PRA-WARNA (dibuat sekali per process) ===
+
+_sprites = None     # (list Surface, array setengah ukuran, dict style -> index awal)
+
+
+def _dot(color, radius):
+    """Titik bulat opaque: lingkaran + inti lebih terang, sisanya COLORKEY."""
+    size = radius * 2 + 1
+    surface = pygame.Surface((size, size))
+    surface.fill(COLORKEY)
+    pygame.draw.circle(surface, color, (radius, radius), radius)
+    if radius >= 2:
+        core = tuple(min(255, c + 60) for c in color)
+        pygame.draw.circle(surface, core, (radius, radius), radius // 2)
+    if pygame.display.get_surface() is not None:
+        surface = surface.convert()
+    surface.set_colorkey(COLORKEY, pygame.RLEACCEL)
+    return surface
+
+
+def sprite_table():
+    """
+    Sprite semua style x warna x level fade (cache bersama)
+
+    Returns:
+        tuple: (list Surface, array int32 setengah ukuran per sprite,
+                dict style -> index sprite pertama)
+
+    Index sprite = awal style + warna * FADE_LEVELS + level (0 = paling pudar)
+    """
+    global _sprites
+    if _sprites is None:
+        surfaces, bases = [], {}
+        for style, (colors, radius) in STYLES.items():
+            bases[style] = len(surfaces)
+            for color in colors:
+                for level in range(FADE_LEVELS):
+                    step = (level + 1) / FADE_LEVELS
+                    light = FADE_DARKEN + (1 - FADE_DARKEN) * level / (FADE_LEVELS - 1)
+                    surfaces.append(_dot(tuple(round(c * light) for c in color),
+                                         max(1, round(radius * step))))
+        half = np.array([s.get_width() // 2 for s in surfaces], np.int32)
+        _sprites = (surfaces, half, bases)
+    return _sprites
+
+
+class ParticleSystem:
+    """
+    Partikel hidup rapat di index [0, count) tiap array
+
+    Attributes:
+        capacity: Hard cap partikel
+        count: Jumlah partikel hidup
+        budget_ms: Target biaya update + draw per frame
+        limit: Batas partikel hidup dari biaya terukur (<= capacity)
+        cost_us: Rata-rata biaya per partikel per frame (mikrodetik)
+        emitted, culled: Statistik partikel dibuat / dipotong karena limit
+    """
+
+    def __init__(self, capacity=MAX_PARTICLES, budget_ms=BUDGET_MS, seed=None):
+        self.capacity = capacity
+        self.x = np.zeros(capacity, np.float32)
+        self.y = np.zeros(capacity, np.float32)
+        self.vx = np.zeros(capacity, np.float32)
+        self.vy = np.zeros(capacity, np.float32)
+        self.gravity = np.zeros(capacity, np.float32)
+        self.drag = np.zeros(capacity, np.float32)
+        self.life = np.zeros(capacity, np.float32)      # Sisa umur (tick)
+        self.fade = np.zeros(capacity, np.float32)      # FADE_LEVELS / umur awal
+        self.sprite = np.zeros(capacity, np.int32)      # Index sprite warna (+ level saat draw)
+        self._arrays = (self.x, self.y, self.vx, self.vy, self.gravity, self.drag,
+                        self.life, self.fade, self.sprite)
+        self.count = 0
+        self.rng = np.random.default_rng(seed)
+
+        # === BATAS KUALITAS ===
+        self.budget_ms = budget_ms
+        self.limit = capacity
+        self.cost_us = 0.0
+        self._update_s = 0.0        # Waktu update() sejak draw() terakhir
+        self.emitted = 0
+        self.culled = 0
+
+    def clear(self):
+        self.count = 0
+
+    # === EMIT ===
+
+    def emit(self, effect, x, y, direction=1, scale=1.0):
+        """
+        Satu burst partikel
+
+        Args:
+            effect: Nama efek di EFFECTS
+            x, y: Titik asal
+            direction: 1 = ke kanan, -1 = ke kiri (arah 0 derajat efek)
+            scale: Pengali jumlah partikel
+
+        Returns:
+            int: Jumlah partikel yang benar-benar dibuat (dipotong limit / cap)
+        """
+        style, amount, (v_min, v_max), angle, spread, (l_min, l_max), gravity, drag = EFFECTS[effect]
+        want = max(1, round(amount * scale))
+        n = min(want, self.limit - self.count, self.capacity - self.count)
+        self.culled += want - max(0, n)
+        if n <= 0:
+            return 0
+        start, end = self.count, self.count + n
+        rng = self.rng
+        theta = np.radians(angle + (rng.random(n, np.float32) - 0.5) * spread)
+        speed = v_min + rng.random(n, np.float32) * (v_max - v_min)
+        self.x[start:end] = x
+        self.y[start:end] = y
+        self.vx[start:end] = np.cos(theta) * speed * direction
+        self.vy[start:end] = -np.sin(theta) * speed
+        self.gravity[start:end] = gravity
+        self.drag[start:end] = drag
+        life = rng.integers(l_min, l_max + 1, n).astype(np.float32)
+        self.life[start:end] = life
+        self.fade[start:end] = FADE_LEVELS / life
+        _, _, bases = sprite_table()
+        colors = len(STYLES[style][0])
+        self.sprite[start:end] = bases[style] + rng.integers(0, colors, n) * FADE_LEVELS
+        self.count = end
+        self.emitted += n
+        return n
+
+    # === UPDATE MASSAL ===
+
+    def update(self):
+        """Satu tick untuk semua partikel: gravitasi, drag, posisi, umur, kompaksi."""
+        n = self.count
+        if n == 0:
+            return
+        start = time.perf_counter()
+        vx, vy = self.vx[:n], self.vy[:n]
+        vy += self.gravity[:n]
+        vx *= self.drag[:n]
+        vy *= self.drag[:n]
+        self.x[:n] += vx
+        self.y[:n] += vy
+        life = self.life[:n]
+        life -= 1
+        keep = life > 0
+        kept = int(np.count_nonzero(keep))
+        if kept != n:
+            for array in self._arrays:
+                array[:kept] = array[:n][keep]
+            self.count = kept
+        self._update_s += time.perf_counter() - start
+
+    # === RENDER ===
+
+    def draw(self, surface):
+        """
+        Gambar semua partikel dengan satu Surface.blits(), lalu update limit kualitas
+
+        Level fade = sisa umur x FADE_LEVELS / umur awal (partikel mengecil & memudar)
+        """
+        n = self.count
+        if n == 0:
+            self._update_s = 0.0
+            return
+        start = time.perf_counter()
+        surfaces, half, _ = sprite_table()
+        level = np.minimum((self.life[:n] * self.fade[:n]).astype(np.int32), FADE_LEVELS - 1)
+        index = self.sprite[:n] + level
+        offset = half[index]
+        xs = (self.x[:n].astype(np.int32) - offset).tolist()
+        ys = (self.y[:n].astype(np.int32) - offset).tolist()
+        surface.blits(zip(map(surfaces.__getitem__, index.tolist()), zip(xs, ys)),
+                      doreturn=False)
+        self._measure(n, time.perf_counter() - start + self._update_s)
+
+    def _measure(self, n, seconds):
+        """Rata-rata bergerak biaya per partikel -> limit partikel hidup."""
+        self._update_s = 0.0
+        if n < COST_MIN_SAMPLE:
+            return
+        cost = seconds * 1e6 / n
+        if self.cost_us == 0.0:
+            self.cost_us = cost
+        else:
+            self.cost_us += (cost - self.cost_us) * COST_SMOOTHING
+        self.limit = int(min(self.capacity, max(MIN_LIMIT, self.budget_ms * 1000 / self.cost_us)))
+
+    def bounds(self):
+        """
+        Satu Rect yang memuat semua partikel (mode dirty-rect)
+
+        Returns:
+            list: [Rect] atau [] jika tidak ada partikel
+        """
+        n = self.count
+        if n == 0:
+            return []
+        pad = max(r for _, r in STYLES.values()) + 1
+        left = math.floor(float(self.x[:n].min())) - pad
+        top = math.floor(float(self.y[:n].min())) - pad
+        right = math.ceil(float(self.x[:n].max())) + pad
+        bottom = math.ceil(float(self.y[:n].max())) + pad
+        return [pygame.Rect(left, top, right - left, bottom - top)]
+
+
+class StressScene:
+    """
+    Layar penuh partikel untuk stress test / benchmark
+
+    Attributes:
+        system: ParticleSystem tanpa limit kualitas (biaya mentah)
+        count: Jumlah partikel yang dijaga tetap hidup (diisi ulang tiap frame)
+    """
+
+    def __init__(self, width, height, count, seed=0):
+        self.width, self.height = width, height
+        self.count = count
+        self.system = ParticleSystem(max(MAX_PARTICLES, count), budget_ms=1e9, seed=seed)
+        self.rng = np.random.default_rng(seed + 1)
+        self.frames = 0
+        self.refill()
+
+    def refill(self):
+        """Burst bergantian (semua efek) sampai jumlah hidup = count."""
+        names, rng, system = list(EFFECTS), self.rng, self.system
+        while system.count < self.count:
+            self.frames += 1
+            system.emit(names[self.frames % len(names)],
+                        int(rng.integers(100, self.width - 100)),
+                        int(rng.integers(self.height // 4, self.height - 150)),
+                        1 if self.frames % 2 else -1)
+
+    def frame(self, surface):
+        """Satu frame: isi ulang, update massal, draw."""
+        self.refill()
+        self.system.update()
+        self.system.draw(surface)
+
+
+# === ENTRY POINT (stress test) ===
+if __name__ == "__main__":
+    import os
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    pygame.init()
+    screen = pygame.display.set_mode((1400, 800))
+
+    FRAMES = 300
+    for target in (1000, 2500, 5000):
+        scene = StressScene(1400, 800, target, seed=1)
+        spent = 0.0
+        for _ in range(FRAMES):
+            screen.fill((40, 40, 40))
+            start = time.perf_counter()
+            scene.frame(screen)
+            spent += time.perf_counter() - start
+        system = scene.system
+        print(f"{target:5d} partikel: update + draw {spent / FRAMES * 1000:6.2f} ms/frame "
+              f"({system.cost_us:.2f} us/partikel -> limit {BUDGET_MS:g} ms = "
+              f"{int(BUDGET_MS * 1000 / system.cost_us)} partikel)")
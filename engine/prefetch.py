@@ -0,0 +1,171 @@
+"""
+FILE: prefetch.py
+DESKRIPSI: Prefetcher asset di background thread selama player masih di menu
+DIGUNAKAN OLEH: select_character.py & select_arena.py (mulai prefetch saat slot diklik),
+                battle_system.py (mengambil hasil prefetch sebelum load)
+MENGGUNAKAN: threading, queue, sprite_cache.py, sprite_pack.py
+
+ALUR PROGRAM:
+1. Screen seleksi memanggil PREFETCHER.prefetch(group, jobs) saat slot diklik
+   - group = 'p1', 'p2', atau 'arena'; prefetch ulang group yang sama
+     membatalkan job lama (selection berubah)
+   - Job yang sudah ada di cache, atau sudah diantrikan / di-staging untuk group
+     lain (mis. mirror match p1 & p2 memilih karakter yang sama), tidak diantrikan
+     lagi; jika group pemiliknya dibatalkan, job diantrikan ulang untuk group lain
+2. Worker thread mengambil frames dari SPRITE_PACK (tanpa decode PNG) atau
+   men-decode PNG dan memotong/scale frames (tanpa convert), lalu menaruh
+   hasilnya di staging area (dilindungi lock)
+3. BattleSystem memanggil PREFETCHER.collect(wait=True) di main thread:
+   surface di-convert ke format display lalu dimasukkan ke SPRITE_CACHE
+4. create_fighter() / load background kemudian menjadi cache hit
+
+Job:
+    ('frames', path, num_frames, scale) -> animasi (sama seperti get_frames)
+    ('image', path, (w, h))             -> gambar tunggal (sama seperti get_image)
+"""
+import queue
+import threading
+import pygame
+from engine.sprite_cache import SPRITE_CACHE, SpriteCache, slice_sheet
+from engine.sprite_pack import SPRITE_PACK
+
+
+def _job_key(job):
+    """Key SpriteCache untuk sebuah job."""
+    scale = job[2] if job[0] == 'image' else job[3]
+    return SpriteCache.make_key(job[1], scale)
+
+
+class AssetPrefetcher:
+    """
+    Prefetcher dengan satu worker thread
+
+    Attributes:
+        cache: SpriteCache tujuan hasil prefetch
+        loaded, cancelled: Counter statistik job
+    """
+
+    def __init__(self, cache=SPRITE_CACHE):
+        """
+        Constructor - Thread belum dibuat sampai prefetch() pertama
+
+        Args:
+            cache: SpriteCache tujuan
+        """
+        self.cache = cache
+        self.loaded = 0
+        self.cancelled = 0
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._staging = []          # (group, generation, job, raw_surfaces)
+        self._generation = {}       # group -> generation aktif
+        self._jobs = {}             # group -> daftar job aktif
+        self._owner = {}            # key job yang antri / di-staging -> group pemilik
+        self._thread = None
+
+    def prefetch(self, group, jobs):
+        """
+        Mulai (atau ganti) prefetch untuk satu group
+
+        Args:
+            group: Nama group ('p1', 'p2', 'arena')
+            jobs: List job (lihat docstring modul)
+        """
+        jobs = list(jobs)
+        if self._jobs.get(group) == jobs:
+            return      # Selection tidak berubah
+        self.cancel(group)
+        self._jobs[group] = jobs
+        self._queue_jobs(group, jobs)
+
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._worker, daemon=True)
+            self._thread.start()
+
+    def _queue_jobs(self, group, jobs):
+        """Antrikan job yang belum ada di cache dan belum dimiliki group lain."""
+        gen = self._generation[group]
+        with self._lock:
+            for job in jobs:
+                key = _job_key(job)
+                if key in self._owner or self.cache.get(key) is not None:
+                    continue
+                self._owner[key] = group
+                self._queue.put((group, gen, job))
+
+    def cancel(self, group):
+        """Batalkan semua job group (yang antri dan yang sudah di-staging)."""
+        with self._lock:
+            self._generation[group] = self._generation.get(group, 0) + 1
+            before = len(self._staging)
+            self._staging = [s for s in self._staging if s[0] != group]
+            self.cancelled += before - len(self._staging)
+            orphaned = {key for key, owner in self._owner.items() if owner == group}
+            for key in orphaned:
+                del self._owner[key]
+        self._jobs.pop(group, None)
+
+        # Job yang juga diminta group lain dilewati saat group itu prefetch -> antrikan ulang
+        if orphaned:
+            for other, jobs in self._jobs.items():
+                self._queue_jobs(other, [job for job in jobs if _job_key(job) in orphaned])
+
+    def _worker(self):
+        """Loop worker thread: decode + potong + scale, tanpa akses display."""
+        while True:
+            group, gen, job = self._queue.get()
+            try:
+                with self._lock:
+                    if self._generation.get(group) != gen:
+                        self.cancelled += 1
+                        continue
+                if job[0] == 'image':
+                    raw = [pygame.transform.scale(pygame.image.load(job[1]), job[2])]
+                else:
+                    # Pack hit: frame sudah di-scale, tanpa decode PNG (sama seperti get_frames)
+                    raw = SPRITE_PACK.load_frames(_job_key(job), job[1], convert=False)
+                    if raw is None or len(raw) != job[2]:
+                        raw = slice_sheet(pygame.image.load(job[1]), job[2], job[3])
+                with self._lock:
+                    if self._generation.get(group) == gen:
+                        self._staging.append((group, gen, job, raw))
+                    else:
+                        self.cancelled += 1
+            except Exception:
+                # Gagal load: biarkan jalur load normal yang menangani
+                with self._lock:
+                    if self._generation.get(group) == gen:
+                        self._owner.pop(_job_key(job), None)
+            finally:
+                self._queue.task_done()
+
+    def collect(self, wait=False):
+        """
+        Pindahkan hasil prefetch ke cache (HARUS dipanggil dari main thread)
+
+        Args:
+            wait: True untuk menunggu job yang masih berjalan selesai dulu
+
+        Returns:
+            int: Jumlah entry yang masuk ke cache
+        """
+        if wait and self._thread is not None:
+            self._queue.join()
+        with self._lock:
+            staged, self._staging = self._staging, []
+            for group, gen, job, raw in staged:
+                self._owner.pop(_job_key(job), None)
+
+        for group, gen, job, raw in staged:
+            # convert() / convert_alpha() butuh display -> hanya di main thread
+            if job[0] == 'image':
+                surfaces = [raw[0].convert()]
+            else:
+                surfaces = [f.convert_alpha() for f in raw]
+            self.cache.put(_job_key(job), surfaces)
+        self.loaded += len(staged)
+        return len(staged)
+
+
+# === INSTANCE BERSAMA ===
+PREFETCHER = AssetPrefetcher()
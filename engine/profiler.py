@@ -0,0 +1,333 @@
+"""
+FILE: profiler.py
+DESKRIPSI: Hook profiler on-demand per screen: stack sampling (overhead rendah) atau
+           cProfile selama satu window waktu, lalu laporan per scene ke reports/profiles
+DIGUNAKAN OLEH: battle_system.py, mode_selection.py, select_character.py, select_arena.py
+MENGGUNAKAN: sys._current_frames (sampler), cProfile / pstats, threading
+
+ALUR PROGRAM:
+1. Screen membuat scene_profiler(scene) di __init__; loop run() memanggil:
+   - profiler.frame() tiap frame (mulai capture otomatis di frame pertama jika env
+     PYFIGHTER_PROFILE di-set; capture berhenti sendiri setelah window habis)
+   - profiler.handle_key(key) untuk setiap KEYDOWN (PROFILE_KEY = F9: mulai / stop)
+   - profiler.close() saat keluar dari loop
+2. Selama capture:
+   - StackSampler (thread daemon) mengambil stack thread utama tiap SAMPLE_INTERVAL
+   - Mode 'cprofile': cProfile juga aktif di thread utama (hitungan call eksak)
+3. Saat capture selesai, laporan ditulis di thread terpisah (game tidak berhenti):
+   - <scene>_<waktu>_<mode>.txt: top fungsi berdasarkan self & cumulative time
+     (<waktu> = YYYYmmdd_HHMMSS_mmm, resolusi milidetik)
+   - <scene>_<waktu>_<mode>.collapsed: stack "a;b;c count" (flamegraph.pl / speedscope)
+   - <scene>_<waktu>_cprofile.prof: dump pstats (mode cprofile)
+
+Env:
+    PYFIGHTER_PROFILE=sample|cprofile   Capture otomatis tiap screen dimulai
+    PYFIGHTER_PROFILE_SECONDS=10        Panjang window capture
+    PYFIGHTER_PROFILE_DIR=path          Folder laporan (default reports/profiles)
+"""
+import os
+import sys
+import time
+import pstats
+import cProfile
+import threading
+from collections import Counter
+from datetime import datetime
+import pygame
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROFILE_DIR = os.path.join(BASE_DIR, 'reports', 'profiles')
+PROFILE_KEY = pygame.K_F9
+MODES = ('sample', 'cprofile')
+WINDOW_SECONDS = 10.0       # Default panjang capture
+SAMPLE_INTERVAL = 0.005     # 200 sample / detik
+TOP_N = 25                  # Jumlah baris per tabel laporan
+
+
+def code_label(code):
+    """Nama frame untuk laporan: path relatif repo:fungsi:baris (tanpa spasi / ';')."""
+    path = code.co_filename
+    if path.startswith(BASE_DIR):
+        path = os.path.relpath(path, BASE_DIR)
+    else:
+        path = os.path.basename(path)
+    return f"{path}:{code.co_name}:{code.co_firstlineno}".replace(' ', '_').replace(';', '_')
+
+
+class StackSampler:
+    """
+    Sampler stack satu thread dari thread lain (tanpa hook per call)
+
+    Attributes:
+        stacks: Counter tuple code object (leaf dulu) -> jumlah sample
+        samples: Total sample
+    """
+
+    def __init__(self, thread_id, interval=SAMPLE_INTERVAL):
+        """
+        Constructor
+
+        Args:
+            thread_id: threading.get_ident() thread yang di-sample
+            interval: Jeda antar sample (detik)
+        """
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='profiler-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        """Loop sampler: hanya menyimpan tuple code object (label dibuat saat laporan)."""
+        current_frames = sys._current_frames
+        while not self._stop.wait(self.interval):
+            frame = current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(frame.f_code)
+                frame = frame.f_back
+            self.stacks[tuple(stack)] += 1
+            self.samples += 1
+
+    def totals(self):
+        """
+        Self & cumulative sample per fungsi
+
+        Returns:
+            tuple: (Counter self, Counter cumulative) code object -> sample
+        """
+        self_counts = Counter()
+        cum_counts = Counter()
+        for stack, count in self.stacks.items():
+            self_counts[stack[0]] += count
+            for code in set(stack):         # Rekursi dihitung sekali
+                cum_counts[code] += count
+        return self_counts, cum_counts
+
+    def collapsed(self):
+        """Baris collapsed stack 'root;...;leaf count' (format flamegraph)."""
+        labels = {}
+        lines = Counter()
+        for stack, count in self.stacks.items():
+            names = []
+            for code in reversed(stack):
+                name = labels.get(code)
+                if name is None:
+                    name = labels[code] = code_label(code)
+                names.append(name)
+            lines[';'.join(names)] += count
+        return [f"{stack} {count}" for stack, count in lines.most_common()]
+
+
+def _sample_table(counts, total, title):
+    """Tabel top fungsi dari hitungan sample."""
+    lines = [title, f"{'samples':>8} {'%':>6}  function"]
+    for code, count in counts.most_common(TOP_N):
+        lines.append(f"{count:>8} {100 * count / total:>5.1f}%  {code_label(code)}")
+    return lines
+
+
+def _pstats_table(stats, index, title):
+    """Tabel top fungsi dari pstats (index 2 = tottime, 3 = cumtime)."""
+    lines = [title, f"{'ncalls':>9} {'tottime ms':>11} {'cumtime ms':>11}  function"]
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][index], reverse=True)
+    for (path, line, func), (cc, nc, tt, ct, _) in rows[:TOP_N]:
+        if path.startswith(BASE_DIR):
+            path = os.path.relpath(path, BASE_DIR)
+        calls = f"{nc}/{cc}" if nc != cc else str(nc)
+        name = func if path == '~' else f"{path}:{func}:{line}"     # '~' = built-in
+        lines.append(f"{calls:>9} {tt * 1000:>11.2f} {ct * 1000:>11.2f}  {name}")
+    return lines
+
+
+def write_report(directory, scene, mode, started, seconds, frames, sampler, profile=None):
+    """
+    Tulis laporan satu capture
+
+    Args:
+        directory: Folder tujuan
+        scene: Nama screen
+        mode: 'sample' atau 'cprofile'
+        started: datetime mulai capture (nama file, resolusi milidetik)
+        seconds: Durasi capture sebenarnya
+        frames: Jumlah frame selama capture
+        sampler: StackSampler yang sudah berhenti
+        profile: cProfile.Profile (mode 'cprofile') atau None
+
+    Returns:
+        str: Path file laporan .txt
+    """
+    os.makedirs(directory, exist_ok=True)
+    # Milidetik di nama file: dua capture di detik yang sama tidak saling menimpa
+    stamp = f"{started:%Y%m%d_%H%M%S}_{started.microsecond // 1000:03d}"
+    base = os.path.join(directory, f"{scene}_{stamp}_{mode}")
+
+    lines = [
+        f"scene: {scene}",
+        f"mode: {mode}",
+        f"started: {started.isoformat(timespec='milliseconds')}",
+        f"duration: {seconds:.2f} s   frames: {frames}   "
+        f"avg frame: {1000 * seconds / max(1, frames):.2f} ms",
+        f"samples: {sampler.samples} (interval {sampler.interval * 1000:.1f} ms)",
+        f"collapsed stacks: {os.path.basename(base)}.collapsed",
+        "",
+    ]
+    if profile is not None:
+        stats = pstats.Stats(profile)
+        stats.dump_stats(base + '.prof')
+        lines += [f"pstats: {os.path.basename(base)}.prof", ""]
+        lines += _pstats_table(stats, 2, "=== TOP SELF TIME (cProfile) ===") + [""]
+        lines += _pstats_table(stats, 3, "=== TOP CUMULATIVE TIME (cProfile) ===") + [""]
+    if sampler.samples:
+        self_counts, cum_counts = sampler.totals()
+        lines += _sample_table(self_counts, sampler.samples, "=== TOP SELF (samples) ===") + [""]
+        lines += _sample_table(cum_counts, sampler.samples, "=== TOP CUMULATIVE (samples) ===")
+
+    with open(base + '.collapsed', 'w') as f:
+        f.write('\n'.join(sampler.collapsed()) + '\n')
+    with open(base + '.txt', 'w') as f:
+        f.write('\n'.join(lines) + '\n')
+    return base + '.txt'
+
+
+class SceneProfiler:
+    """
+    Profiler untuk satu loop screen
+
+    Attributes:
+        scene: Nama screen (prefix nama file laporan)
+        mode: 'sample' atau 'cprofile'
+        seconds: Panjang window capture
+        directory: Folder laporan
+        active: True selama capture berjalan
+    """
+
+    def __init__(self, scene, mode='sample', seconds=WINDOW_SECONDS, directory=PROFILE_DIR,
+                 auto=False):
+        """
+        Constructor
+
+        Args:
+            scene: Nama screen
+            mode: 'sample' (stack sampling) atau 'cprofile'
+            seconds: Panjang window capture
+            directory: Folder laporan
+            auto: True untuk mulai capture di frame pertama loop
+        """
+        if mode not in MODES:
+            raise ValueError(f"mode profiler tidak dikenal: {mode}")
+        self.scene = scene
+        self.mode = mode
+        self.seconds = seconds
+        self.directory = directory
+        self.active = False
+        self._pending = auto
+        self._sampler = None
+        self._profile = None
+        self._started = None
+        self._start_time = 0.0
+        self._frames = 0
+
+    def start(self):
+        """Mulai capture (dari thread utama / thread loop screen)."""
+        if self.active:
+            return
+        self.active = True
+        self._pending = False
+        self._frames = 0
+        self._started = datetime.now()
+        self._start_time = time.perf_counter()
+        self._sampler = StackSampler(threading.get_ident())
+        self._sampler.start()
+        if self.mode == 'cprofile':
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        print(f"[profiler] {self.scene}: capture {self.mode} {self.seconds:g}s dimulai")
+
+    def stop(self):
+        """Hentikan capture; laporan ditulis di background thread."""
+        if not self.active:
+            return
+        self.active = False
+        if self._profile is not None:
+            self._profile.disable()
+        self._sampler.stop()
+        args = (self.directory, self.scene, self.mode, self._started,
+                time.perf_counter() - self._start_time, self._frames,
+                self._sampler, self._profile)
+        self._sampler = self._profile = None
+        # Non-daemon: laporan tetap selesai ditulis walau game ditutup
+        threading.Thread(target=self._write, args=args, name='profiler-report').start()
+
+    @staticmethod
+    def _write(*args):
+        path = write_report(*args)
+        print(f"[profiler] laporan: {path}")
+
+    def frame(self):
+        """Dipanggil tiap frame: mulai capture otomatis / tutup window yang sudah habis."""
+        if self._pending:
+            self.start()
+        if self.active:
+            self._frames += 1
+            if time.perf_counter() - self._start_time >= self.seconds:
+                self.stop()
+
+    def handle_key(self, key):
+        """PROFILE_KEY: mulai capture, atau hentikan lebih awal jika sedang berjalan."""
+        if key == PROFILE_KEY:
+            if self.active:
+                self.stop()
+            else:
+                self.start()
+
+    def close(self):
+        """Keluar dari screen: capture yang masih berjalan ditutup & dilaporkan."""
+        self._pending = False
+        self.stop()
+
+
+def scene_profiler(scene):
+    """
+    Profiler untuk satu screen sesuai env
+
+    Env:
+        PYFIGHTER_PROFILE: 'sample' / 'cprofile' (atau '1' = sample) -> capture otomatis
+        PYFIGHTER_PROFILE_SECONDS: Panjang window (default WINDOW_SECONDS)
+        PYFIGHTER_PROFILE_DIR: Folder laporan (default PROFILE_DIR)
+
+    Tanpa env, capture hanya dimulai lewat PROFILE_KEY (mode sample).
+    Nilai env lain (mis. 'yes') tidak menghentikan game: peringatan dicetak dan
+    capture otomatis memakai mode sample. Begitu juga PYFIGHTER_PROFILE_SECONDS yang
+    bukan angka > 0: peringatan, lalu WINDOW_SECONDS
+    """
+    env = os.environ.get('PYFIGHTER_PROFILE', '')
+    mode = env if env in MODES else 'sample'
+    if env not in ('', '1') + MODES:
+        print(f"[profiler] PYFIGHTER_PROFILE={env!r} tidak dikenal "
+              f"(pilihan: 1, {', '.join(MODES)}); memakai mode sample")
+    raw = os.environ.get('PYFIGHTER_PROFILE_SECONDS', '')
+    seconds = WINDOW_SECONDS
+    if raw:
+        try:
+            seconds = float(raw)
+        except ValueError:
+            seconds = 0.0
+        if not seconds > 0:     # Juga menolak nan (window tidak akan pernah habis)
+            print(f"[profiler] PYFIGHTER_PROFILE_SECONDS={raw!r} tidak valid; "
+                  f"memakai {WINDOW_SECONDS:g} detik")
+            seconds = WINDOW_SECONDS
+    return SceneProfiler(scene, mode, seconds,
+                         os.environ.get('PYFIGHTER_PROFILE_DIR', PROFILE_DIR),
+                         auto=bool(env))
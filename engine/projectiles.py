@@ -0,0 +1,380 @@
+"""
+FILE: projectiles.py
+DESKRIPSI: Pool projectile berbasis array NumPy (dialokasikan sekali): spawn tanpa
+           alokasi, gerak & umur diupdate sekaligus, hit lewat broadphase SpatialGrid
+DIGUNAKAN OLEH: team_simulation.py (tembakan fighter), team_battle.py (render),
+                benchmark.py (grup 'projectiles')
+MENGGUNAKAN: numpy, pygame (Rect, Mask, Surface.blits), spatial_grid.py (query)
+
+ALUR PROGRAM:
+1. ProjectilePool(capacity) membuat semua array (posisi, kecepatan, umur, pemilik,
+   tim, damage, jenis) + stack slot kosong; register_kind(w, h) mendaftarkan ukuran
+   hitbox tiap jenis projectile
+2. spawn(...) mengambil satu slot dari stack (pool penuh = tembakan dibuang, dihitung
+   di dropped) - tidak ada objek / list baru per tembakan
+3. update(lebar, tinggi) tiap tick: x += vx, y += vy, life -= 1, age += 1 untuk semua
+   slot hidup sekaligus; yang habis umur / keluar arena dikembalikan ke stack
+4. collide(grid, resolve): tiap projectile hidup -> grid.query(hitbox) (grid yang
+   sama dengan collision fighter) -> resolve(slot, keys, hitbox) memutuskan hit;
+   True = projectile habis
+5. Render: sprite_set() menyiapkan frame + offset per jenis, draw() menggambar semua
+   projectile dengan satu Surface.blits(), rects() untuk mode dirty-rect
+
+Semua state integer (pixel / tick), jadi hasilnya deterministik seperti simulasi.
+
+Jalankan langsung untuk stress test (update + collide + draw ratusan projectile):
+    python -m engine.projectiles
+"""
+import numpy as np
+import pygame
+
+
+MAX_PROJECTILES = 1024      # Kapasitas default pool
+ANIM_TICKS = 4              # Tick per frame animasi projectile
+DIRTY_MERGE = 48            # Lebih dari ini: rect dirty projectile digabung jadi satu
+
+
+def sprite_set(frames, flipped, size):
+    """
+    Data render satu jenis projectile
+
+    Frame di-crop (subsurface, tanpa copy pixel) ke gabungan bounding box alpha
+    semua frame - sprite projectile biasanya kecil di tengah frame besar, jadi blit
+    jauh lebih murah. Sprite diletakkan agar tengah pixel frame pertama = tengah
+    hitbox, untuk hadap kanan dan kiri masing-masing
+
+    Args:
+        frames: Frame animasi (terbang ke kanan)
+        flipped: Frame yang sama, terbang ke kiri
+        size: (w, h) hitbox jenis ini
+
+    Returns:
+        tuple: (frames, flipped, offset kanan, offset kiri, ukuran frame)
+    """
+    result = []
+    for images in (frames, flipped):
+        boxes = [image.get_bounding_rect() for image in images]
+        crop = boxes[0].unionall(boxes[1:])
+        if crop.w == 0 or crop.h == 0:          # Frame kosong: pakai apa adanya
+            crop = images[0].get_rect()
+        center = boxes[0].center if boxes[0].w else crop.center
+        result.append(([image.subsurface(crop) for image in images],
+                       (size[0] // 2 - center[0] + crop.x, size[1] // 2 - center[1] + crop.y),
+                       crop.size))
+    (right, right_off, crop_size), (left, left_off, _) = result
+    return right, left, right_off, left_off, crop_size
+
+
+class ProjectilePool:
+    """
+    Semua projectile satu match dalam array berukuran tetap (index = slot)
+
+    Attributes:
+        capacity: Jumlah slot
+        x, y: Pojok kiri atas hitbox (int32)
+        vx, vy: Kecepatan (pixel / tick)
+        life: Sisa umur (tick); age: Umur sejak spawn (animasi)
+        owner, team, damage, kind: Data tembakan per slot
+        alive: True untuk slot yang terpakai
+        live: Jumlah projectile hidup
+        spawned, hits: Statistik tembakan & hit
+        dropped: Tembakan yang dibuang karena pool penuh
+    """
+
+    def __init__(self, capacity=MAX_PROJECTILES):
+        self.capacity = capacity
+        self.x = np.zeros(capacity, np.int32)
+        self.y = np.zeros(capacity, np.int32)
+        self.vx = np.zeros(capacity, np.int32)
+        self.vy = np.zeros(capacity, np.int32)
+        self.life = np.zeros(capacity, np.int32)
+        self.age = np.zeros(capacity, np.int32)
+        self.owner = np.zeros(capacity, np.int32)
+        self.team = np.zeros(capacity, np.int32)
+        self.damage = np.zeros(capacity, np.int32)
+        self.kind = np.zeros(capacity, np.int32)
+        self.alive = np.zeros(capacity, bool)
+        # Stack slot kosong: slot terkecil dipakai lebih dulu (urutan deterministik)
+        self._free = np.arange(capacity - 1, -1, -1, dtype=np.int32)
+        self._free_top = capacity
+        self.live = 0
+        self.spawned = 0
+        self.hits = 0
+        self.dropped = 0
+
+        # === JENIS PROJECTILE ===
+        self.kind_w = np.zeros(0, np.int32)
+        self.kind_h = np.zeros(0, np.int32)
+        self.kind_masks = []                # Mask penuh seukuran hitbox (narrowphase)
+        self._probe = pygame.Rect(0, 0, 0, 0)   # Rect query, dipakai ulang
+
+    def register_kind(self, w, h):
+        """
+        Daftarkan ukuran hitbox satu jenis projectile
+
+        Returns:
+            int: Index jenis (untuk spawn)
+        """
+        self.kind_w = np.append(self.kind_w, np.int32(w))
+        self.kind_h = np.append(self.kind_h, np.int32(h))
+        self.kind_masks.append(pygame.mask.Mask((w, h), fill=True))
+        return len(self.kind_masks) - 1
+
+    # === SPAWN / KILL ===
+
+    def spawn(self, x, y, vx, vy, life, owner=0, team=0, damage=0, kind=0):
+        """
+        Aktifkan satu slot
+
+        Returns:
+            int: Slot yang dipakai, -1 jika pool penuh (tembakan dibuang)
+        """
+        if self._free_top == 0:
+            self.dropped += 1
+            return -1
+        self._free_top -= 1
+        i = self._free[self._free_top]
+        self.x[i] = x
+        self.y[i] = y
+        self.vx[i] = vx
+        self.vy[i] = vy
+        self.life[i] = life
+        self.age[i] = 0
+        self.owner[i] = owner
+        self.team[i] = team
+        self.damage[i] = damage
+        self.kind[i] = kind
+        self.alive[i] = True
+        self.live += 1
+        self.spawned += 1
+        return int(i)
+
+    def kill(self, slots):
+        """Kembalikan slot (array index slot yang hidup) ke stack."""
+        n = len(slots)
+        if n == 0:
+            return
+        self.alive[slots] = False
+        # Slot terbesar masuk lebih dulu -> slot terkecil dipakai ulang lebih dulu
+        self._free[self._free_top:self._free_top + n] = np.sort(slots)[::-1]
+        self._free_top += n
+        self.live -= n
+
+    def clear(self):
+        self.kill(np.flatnonzero(self.alive))
+
+    # === UPDATE MASSAL ===
+
+    def update(self, width, height):
+        """
+        Satu tick untuk semua projectile: gerak, umur, buang yang habis / keluar arena
+
+        Args:
+            width, height: Batas arena (projectile yang seluruhnya di luar dibuang)
+        """
+        if self.live == 0:
+            return
+        alive = self.alive
+        np.add(self.x, self.vx, out=self.x, where=alive)
+        np.add(self.y, self.vy, out=self.y, where=alive)
+        np.subtract(self.life, 1, out=self.life, where=alive)
+        np.add(self.age, 1, out=self.age, where=alive)
+        x, y, kind = self.x, self.y, self.kind
+        expired = alive & ((self.life <= 0) | (x >= width) | (y >= height)
+                           | (x + self.kind_w[kind] <= 0) | (y + self.kind_h[kind] <= 0))
+        self.kill(np.flatnonzero(expired))
+
+    def collide(self, grid, resolve):
+        """
+        Hit projectile lewat broadphase grid (versi array dari grid.query)
+
+        Tiap cell grid yang berisi target: projectile yang span cell-nya menyentuh
+        cell tersebut dites AABB terhadap rect target di cell itu sekaligus (NumPy),
+        jadi tidak ada query Python per projectile. Hasilnya sama dengan
+        grid.query(hitbox) untuk tiap projectile.
+
+        Args:
+            grid: SpatialGrid berisi target (key = index target)
+            resolve: resolve(slot, keys, hitbox) -> True jika projectile habis
+                     (slot urut naik; keys urut naik; hitbox = Rect sementara)
+
+        Returns:
+            int: Jumlah projectile yang habis karena hit
+        """
+        if self.live == 0 or len(grid) == 0:
+            return 0
+        slots = np.flatnonzero(self.alive)
+        kind = self.kind[slots]
+        x, y = self.x[slots], self.y[slots]
+        right, bottom = x + self.kind_w[kind], y + self.kind_h[kind]
+        # Span cell tiap projectile (di-clamp seperti SpatialGrid._cell)
+        size, cols, rows = grid.cell_size, grid.cols, grid.rows
+        c0 = np.clip(x // size, 0, cols - 1)
+        c1 = np.clip((right - 1) // size, 0, cols - 1)
+        r0 = np.clip(y // size, 0, rows - 1)
+        r1 = np.clip((bottom - 1) // size, 0, rows - 1)
+
+        candidates = {}                     # index di slots -> key target yang kena AABB
+        for cell, keys in enumerate(grid.cells):
+            if not keys:
+                continue
+            col, row = cell % cols, cell // cols
+            near = (c0 <= col) & (c1 >= col) & (r0 <= row) & (r1 >= row)
+            if not near.any():
+                continue
+            for key in keys:
+                rect = grid.rect(key)
+                touch = near & (x < rect.right) & (right > rect.left) \
+                    & (y < rect.bottom) & (bottom > rect.top)
+                for j in np.flatnonzero(touch).tolist():
+                    candidates.setdefault(j, set()).add(key)
+
+        probe = self._probe
+        spent = []
+        for j in sorted(candidates):
+            i = int(slots[j])
+            probe.update(int(x[j]), int(y[j]), int(right[j] - x[j]), int(bottom[j] - y[j]))
+            if resolve(i, sorted(candidates[j]), probe):
+                spent.append(i)
+        self.kill(np.array(spent, np.int32))
+        self.hits += len(spent)
+        return len(spent)
+
+    # === RENDER ===
+
+    def _render_list(self, alpha):
+        """List (kind, x, y, hadap kiri, slot) slot hidup, posisi diinterpolasi dengan alpha."""
+        slots = np.flatnonzero(self.alive)
+        back = 1.0 - alpha                  # Posisi tick lalu = posisi - kecepatan
+        xs = (self.x[slots] - np.rint(self.vx[slots] * back)).astype(np.int32)
+        ys = (self.y[slots] - np.rint(self.vy[slots] * back)).astype(np.int32)
+        return (self.kind[slots].tolist(), xs.tolist(), ys.tolist(),
+                (self.vx[slots] < 0).tolist(), slots)
+
+    def draw(self, surface, sprites, alpha=1.0):
+        """
+        Gambar semua projectile dengan satu Surface.blits()
+
+        Args:
+            surface: Layar tujuan
+            sprites: List hasil sprite_set() per jenis (index = kind)
+            alpha: Posisi render antara tick lalu (0) dan sekarang (1)
+        """
+        if self.live == 0:
+            return
+        kinds, xs, ys, lefts, slots = self._render_list(alpha)
+        frames_at = (self.age[slots] // ANIM_TICKS).tolist()
+        blits = []
+        for k, x, y, left, frame in zip(kinds, xs, ys, lefts, frames_at):
+            frames, flipped, right_off, left_off, _ = sprites[k]
+            if left:
+                blits.append((flipped[frame % len(flipped)], (x + left_off[0], y + left_off[1])))
+            else:
+                blits.append((frames[frame % len(frames)], (x + right_off[0], y + right_off[1])))
+        surface.blits(blits, doreturn=False)
+
+    def rects(self, sprites, alpha=1.0):
+        """
+        Area layar yang akan ditimpa draw() (mode dirty-rect)
+
+        Returns:
+            list: Rect per projectile, atau satu Rect gabungan jika lebih dari DIRTY_MERGE
+        """
+        if self.live == 0:
+            return []
+        kinds, xs, ys, lefts, _ = self._render_list(alpha)
+        rects = []
+        for k, x, y, left in zip(kinds, xs, ys, lefts):
+            _, _, right_off, left_off, size = sprites[k]
+            dx, dy = left_off if left else right_off
+            rects.append(pygame.Rect(x + dx, y + dy, *size))
+        if len(rects) > DIRTY_MERGE:
+            return [rects[0].unionall(rects[1:])]
+        return rects
+
+    def state(self):
+        """State semua slot hidup (bytes) untuk membandingkan dua simulasi."""
+        slots = np.flatnonzero(self.alive)
+        return b''.join(a[slots].tobytes() for a in (
+            slots.astype(np.int32), self.x, self.y, self.vx, self.vy, self.life,
+            self.owner, self.team, self.damage, self.kind))
+
+
+# === STRESS TEST ===
+
+class StressScene:
+    """
+    Arena penuh projectile untuk stress test / benchmark
+
+    Attributes:
+        pool: ProjectilePool (satu jenis projectile)
+        grid: SpatialGrid berisi target diam sepanjang lantai (key = index)
+        count: Jumlah projectile yang dijaga tetap hidup (diisi ulang tiap frame)
+    """
+
+    def __init__(self, width, height, count, size=(48, 20), targets=8, seed=0):
+        import random
+        from engine.spatial_grid import SpatialGrid
+
+        self.width, self.height = width, height
+        self.count = count
+        self.pool = ProjectilePool(max(MAX_PROJECTILES, count))
+        self.kind = self.pool.register_kind(*size)
+        self.grid = SpatialGrid(width, height)
+        for key in range(targets):      # Kotak seukuran fighter, tersebar rata
+            x = (width - 80) * key // max(1, targets - 1)
+            self.grid.insert(key, pygame.Rect(x, height - 290, 80, 180))
+        self.rng = random.Random(seed)
+        self.refill()
+
+    def refill(self):
+        """Spawn projectile baru sampai jumlah hidup = count."""
+        rng, pool = self.rng, self.pool
+        for _ in range(self.count - pool.live):
+            vx = rng.choice((-1, 1)) * rng.randrange(8, 17)
+            pool.spawn(rng.randrange(0, self.width), rng.randrange(self.height // 3, self.height - 110),
+                       vx, rng.randrange(-1, 2), rng.randrange(60, 180),
+                       0, rng.randrange(2), 10, self.kind)
+
+    def tick(self):
+        """Satu tick simulasi: isi ulang, update massal, collide lewat grid."""
+        self.refill()
+        self.pool.update(self.width, self.height)
+        # Target tim 0 = key genap; projectile kena jika tim berbeda
+        self.pool.collide(self.grid, lambda slot, keys, hitbox: any(
+            key % 2 != self.pool.team[slot] for key in keys))
+
+
+# === ENTRY POINT (stress test) ===
+if __name__ == "__main__":
+    import os
+    import time
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    from battle.characters import CHARACTERS, PROJECTILES
+    from engine.sprite_cache import SPRITE_CACHE
+
+    pygame.init()
+    screen = pygame.display.set_mode((1400, 800))
+    folder, scale = CHARACTERS['Countess Vampire'][:2]
+    _, file, frames, size = PROJECTILES['Countess Vampire'][:4]
+    path = f"{folder}/{file}"
+    sprites = [sprite_set(SPRITE_CACHE.get_frames(path, frames, scale),
+                          SPRITE_CACHE.get_mirrored(path, frames, scale), size)]
+
+    FRAMES = 300
+    for count in (100, 250, 500, 1000):
+        scene = StressScene(*screen.get_size(), count, size)
+        sim = draw = 0.0
+        for _ in range(FRAMES):
+            start = time.perf_counter()
+            scene.tick()
+            mid = time.perf_counter()
+            screen.fill((40, 40, 40))
+            scene.pool.draw(screen, sprites, 0.5)
+            end = time.perf_counter()
+            sim += mid - start
+            draw += end - mid
+        total = (sim + draw) / FRAMES
+        print(f"{count:5d} projectile: update+collide {sim / FRAMES * 1000:6.2f} ms   "
+              f"draw {draw / FRAMES * 1000:6.2f} ms   -> {1 / total:8.0f} fps "
+              f"({scene.pool.hits} hit, {scene.pool.dropped} dibuang)")
@@ -0,0 +1,253 @@
+"""
+FILE: spatial_grid.py
+DESKRIPSI: Uniform grid untuk broadphase - query kotak & lawan terdekat tanpa cek
+           semua pasangan (biaya ikut jumlah objek yang berdekatan, bukan N^2)
+DIGUNAKAN OLEH: team_simulation.py (collision badan, hit, target hadap, target AI),
+                projectiles.py (hit projectile, versi array dari query)
+MENGGUNAKAN: pygame.Rect
+
+ALUR PROGRAM:
+1. SpatialGrid(lebar, tinggi, cell_size) membagi arena menjadi kolom x baris cell
+2. insert(key, rect, point) mendaftarkan objek ke semua cell yang disentuh rect-nya
+   (untuk query) dan ke satu cell titik pusatnya (untuk nearest); move() hanya
+   memindah cell jika span / cell titik berubah (gerak kecil = update rect saja)
+3. query(rect): key semua objek di cell yang disentuh rect, lalu disaring colliderect
+4. nearest(x, y, accept): pencarian cincin cell dari cell titik (urutan cincin tiap
+   cell dihitung sekali di constructor); berhenti begitu cincin berikutnya pasti
+   lebih jauh dari kandidat terbaik
+5. Hasil selalu urut key (int) -> urutan deterministik untuk simulasi / replay
+
+Rect di luar arena (mis. fighter lompat melewati atas layar) di-clamp ke cell tepi.
+"""
+import pygame
+
+
+CELL_SIZE = 200     # Sedikit lebih besar dari jangkauan serangan terjauh (~160 px)
+
+
+class SpatialGrid:
+    """
+    Uniform grid berisi objek ber-key (int) dengan bounding rect + titik pusat
+
+    Attributes:
+        cell_size: Ukuran cell (pixel)
+        cols, rows: Jumlah cell
+        cells: list per cell berisi key yang rect-nya menyentuh cell
+               (index = row * cols + col)
+        point_cells: list per cell berisi key yang titik pusatnya di cell tersebut
+    """
+
+    def __init__(self, width, height, cell_size=CELL_SIZE):
+        """
+        Constructor
+
+        Args:
+            width, height: Ukuran arena
+            cell_size: Ukuran cell (>= ukuran arena = satu cell = brute force)
+        """
+        self.cell_size = cell_size
+        self.cols = max(1, -(-width // cell_size))
+        self.rows = max(1, -(-height // cell_size))
+        self.cells = [[] for _ in range(self.cols * self.rows)]
+        self.point_cells = [[] for _ in range(self.cols * self.rows)]
+        self._rings = [self._ring_cells(col, row)
+                       for row in range(self.rows) for col in range(self.cols)]
+        self._span = {}         # key -> (col0, row0, col1, row1)
+        self._rects = {}        # key -> Rect
+        self._points = {}       # key -> (x, y) untuk nearest()
+        self._point_cell = {}   # key -> index cell titik pusat
+
+    def __len__(self):
+        return len(self._rects)
+
+    def __contains__(self, key):
+        return key in self._rects
+
+    def _ring_cells(self, col, row):
+        """Index cell per cincin (jarak Chebyshev 0, 1, ...) dari cell (col, row)."""
+        rings = []
+        for ring in range(max(self.cols, self.rows)):
+            rings.append([r * self.cols + c
+                          for r in range(row - ring, row + ring + 1)
+                          for c in range(col - ring, col + ring + 1)
+                          if 0 <= r < self.rows and 0 <= c < self.cols
+                          and max(abs(r - row), abs(c - col)) == ring])
+        return rings
+
+    def _cell(self, x, y):
+        """(col, row) yang memuat titik (di-clamp ke grid)."""
+        col = int(x) // self.cell_size
+        row = int(y) // self.cell_size
+        if col < 0:
+            col = 0
+        elif col >= self.cols:
+            col = self.cols - 1
+        if row < 0:
+            row = 0
+        elif row >= self.rows:
+            row = self.rows - 1
+        return col, row
+
+    def _point_index(self, point):
+        col, row = self._cell(*point)
+        return row * self.cols + col
+
+    def _span_of(self, rect):
+        c0, r0 = self._cell(rect.left, rect.top)
+        c1, r1 = self._cell(rect.right - 1, rect.bottom - 1)
+        return c0, r0, c1, r1
+
+    def _add(self, key, span):
+        c0, r0, c1, r1 = span
+        cols, cells = self.cols, self.cells
+        for row in range(r0, r1 + 1):
+            for col in range(c0, c1 + 1):
+                cells[row * cols + col].append(key)
+
+    def _discard(self, key, span):
+        c0, r0, c1, r1 = span
+        cols, cells = self.cols, self.cells
+        for row in range(r0, r1 + 1):
+            for col in range(c0, c1 + 1):
+                cells[row * cols + col].remove(key)
+
+    # === UPDATE ===
+
+    def insert(self, key, rect, point=None):
+        """
+        Daftarkan objek (key sudah ada = dipindah)
+
+        Args:
+            key: Id objek (int)
+            rect: Bounding rect (dipakai query)
+            point: Titik pusat untuk nearest() (default rect.center)
+        """
+        if key in self._rects:
+            self.move(key, rect, point)
+            return
+        span = self._span_of(rect)
+        self._add(key, span)
+        self._span[key] = span
+        self._rects[key] = pygame.Rect(rect)
+        point = point if point is not None else rect.center
+        cell = self._point_index(point)
+        self.point_cells[cell].append(key)
+        self._points[key] = point
+        self._point_cell[key] = cell
+
+    def move(self, key, rect, point=None):
+        """Update posisi objek; cell hanya diganti jika span / cell titik berubah."""
+        span = self._span_of(rect)
+        old = self._span[key]
+        if span != old:
+            self._discard(key, old)
+            self._add(key, span)
+            self._span[key] = span
+        self._rects[key].update(rect)
+        point = point if point is not None else rect.center
+        cell = self._point_index(point)
+        if cell != self._point_cell[key]:
+            self.point_cells[self._point_cell[key]].remove(key)
+            self.point_cells[cell].append(key)
+            self._point_cell[key] = cell
+        self._points[key] = point
+
+    def remove(self, key):
+        """Keluarkan objek (key tidak ada = diabaikan)."""
+        span = self._span.pop(key, None)
+        if span is not None:
+            self._discard(key, span)
+            self.point_cells[self._point_cell.pop(key)].remove(key)
+            del self._rects[key]
+            del self._points[key]
+
+    def clear(self):
+        for cell in self.cells + self.point_cells:
+            cell.clear()
+        self._span.clear()
+        self._rects.clear()
+        self._points.clear()
+        self._point_cell.clear()
+
+    # === QUERY ===
+
+    def rect(self, key):
+        """Rect terdaftar milik key."""
+        return self._rects[key]
+
+    def query(self, rect):
+        """
+        Key objek yang bounding rect-nya bersentuhan dengan rect
+
+        Returns:
+            list: Key urut naik
+        """
+        c0, r0, c1, r1 = self._span_of(rect)
+        cols, cells, rects = self.cols, self.cells, self._rects
+        if c0 == c1 and r0 == r1:       # Satu cell: tanpa set (tidak ada duplikat)
+            return sorted(key for key in cells[r0 * cols + c0] if rects[key].colliderect(rect))
+        found = set()
+        for row in range(r0, r1 + 1):
+            for col in range(c0, c1 + 1):
+                found.update(cells[row * cols + col])
+        return sorted(key for key in found if rects[key].colliderect(rect))
+
+    def nearest(self, x, y, accept=None):
+        """
+        Objek dengan titik pusat terdekat dari (x, y)
+
+        Args:
+            x, y: Titik asal
+            accept: Filter key (None = semua); key yang ditolak dilewati
+
+        Returns:
+            key | None: Seri jarak -> key terkecil; None jika tidak ada kandidat
+        """
+        cells, points, size = self.point_cells, self._points, self.cell_size
+        best, best_d2 = None, None
+        for ring, ring_cells in enumerate(self._rings[self._point_index((x, y))]):
+            for cell in ring_cells:
+                for key in cells[cell]:
+                    if accept is not None and not accept(key):
+                        continue
+                    px, py = points[key]
+                    d2 = (px - x) ** 2 + (py - y) ** 2
+                    if best is None or d2 < best_d2 or (d2 == best_d2 and key < best):
+                        best, best_d2 = key, d2
+            # Semua cell di luar cincin ini berjarak >= ring * cell_size
+            if best is not None and best_d2 <= (ring * size) ** 2:
+                break
+        return best
+
+
+# === ENTRY POINT (cek query vs brute force) ===
+if __name__ == "__main__":
+    import random
+
+    rng = random.Random(7)
+    grid = SpatialGrid(1400, 800)
+    rects = {}
+    for key in range(200):
+        rect = pygame.Rect(rng.randrange(-50, 1400), rng.randrange(-200, 800),
+                           rng.randrange(10, 300), rng.randrange(10, 300))
+        rects[key] = rect
+        grid.insert(key, rect)
+    for key in range(0, 200, 3):            # Sebagian dipindah, sebagian dihapus
+        rects[key].move_ip(rng.randrange(-100, 100), rng.randrange(-100, 100))
+        grid.move(key, rects[key])
+    for key in range(1, 200, 7):
+        grid.remove(key)
+        del rects[key]
+
+    ok = True
+    for _ in range(500):
+        probe = pygame.Rect(rng.randrange(0, 1400), rng.randrange(0, 800),
+                            rng.randrange(1, 400), rng.randrange(1, 400))
+        want = sorted(k for k, r in rects.items() if r.colliderect(probe))
+        ok &= grid.query(probe) == want
+        x, y = rng.randrange(-100, 1500), rng.randrange(-100, 900)
+        odd = lambda k: k % 2 == 1
+        want = min((k for k in rects if odd(k)),
+                   key=lambda k: ((rects[k].centerx - x) ** 2 + (rects[k].centery - y) ** 2, k))
+        ok &= grid.nearest(x, y, odd) == want
+    print(f"grid {grid.cols}x{grid.rows}, {len(grid)} objek: {'OK' if ok else 'MISMATCH'}")
@@ -0,0 +1,244 @@
+"""
+FILE: sprite_cache.py
+DESKRIPSI: Cache sprite bersama (satu per proses) dengan batas memori dan eviction LRU
+DIGUNAKAN OLEH: battle_system.py (create_fighter, background), select_character.py (CharacterSlot),
+                prefetch.py (hasil prefetch)
+MENGGUNAKAN: pygame (load, subsurface, scale)
+
+ALUR PROGRAM:
+1. Pemanggil meminta frames via SPRITE_CACHE.get_frames(path, num_frames, scale)
+2. Key cache = (karakter, animasi, scale) -> karakter = folder, animasi = nama file
+3. Hit: list frame yang sama dikembalikan (dipakai bersama, tidak di-copy)
+4. Miss: frames diambil dari sprite pack hasil bake (sprite_pack.py) jika ada,
+   jika tidak sprite sheet di-decode, dipotong, di-scale, lalu disimpan
+5. Jika total memori melewati budget, entry paling lama tidak dipakai dibuang
+
+- Encapsulation: Detail decode & eviction tersembunyi di SpriteCache
+- Singleton: SPRITE_CACHE dipakai bersama oleh semua screen
+"""
+import os
+import pygame
+from collections import OrderedDict
+from engine.sprite_pack import SPRITE_PACK
+
+
+# Budget default: cukup untuk semua karakter di battle + select screen
+DEFAULT_BUDGET = 192 * 1024 * 1024
+
+
+def fit_scale(frame_w, frame_h, scale):
+    """
+    Hitung faktor scale final untuk satu frame
+
+    Args:
+        frame_w, frame_h: Ukuran frame asli (pixel)
+        scale: float, atau tuple (box_w, box_h, max_scale) untuk mode "fit"
+               (frame diperkecil agar muat di dalam box, maksimal max_scale)
+
+    Returns:
+        float: Faktor scale yang dipakai
+    """
+    if isinstance(scale, tuple):
+        box_w, box_h, max_scale = scale
+        return min(box_w / frame_w, box_h / frame_h, max_scale)
+    return scale
+
+
+def slice_sheet(sheet, num_frames, scale):
+    """
+    Potong sprite sheet horizontal menjadi frames lalu scale setiap frame
+
+    Args:
+        sheet: Surface sprite sheet (frame berjajar ke kanan)
+        num_frames: Jumlah frame dalam sheet
+        scale: Lihat fit_scale()
+
+    Returns:
+        list: Surface untuk setiap frame
+    """
+    w = sheet.get_width() // num_frames     # Lebar per frame
+    h = sheet.get_height()
+    factor = fit_scale(w, h, scale)
+    size = (int(w * factor), int(h * factor))
+
+    frames = []
+    for i in range(num_frames):
+        frame = sheet.subsurface(i * w, 0, w, h)
+        frames.append(pygame.transform.scale(frame, size))
+    return frames
+
+
+def surface_bytes(surface):
+    """Perkiraan memori pixel sebuah Surface (byte)."""
+    return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+
+class SpriteCache:
+    """
+    Cache frame animasi dengan eviction LRU
+
+    Attributes:
+        budget: Batas memori pixel (byte)
+        used: Total memori yang sedang dipakai entry cache (byte)
+        hits, misses, evictions: Counter statistik
+    """
+
+    def __init__(self, budget=DEFAULT_BUDGET):
+        """
+        Constructor - Setup cache kosong
+
+        Args:
+            budget: Batas memori (byte) sebelum entry lama dibuang
+        """
+        self.budget = budget
+        self.used = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()   # key -> (frames, size_bytes)
+
+    @staticmethod
+    def make_key(path, scale):
+        """Key cache: (karakter, animasi, scale) dari path sprite sheet."""
+        folder, file = os.path.split(os.path.normpath(path))
+        return (os.path.basename(folder), file, scale)
+
+    def get(self, key):
+        """
+        Ambil entry dari cache
+
+        Returns:
+            list | None: Frames jika ada, None jika miss
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)      # Tandai baru dipakai
+        return entry[0]
+
+    def put(self, key, frames):
+        """
+        Simpan frames ke cache lalu buang entry lama jika melewati budget
+
+        Args:
+            key: Key cache (lihat make_key)
+            frames: List Surface
+        """
+        if key in self._entries:
+            self.used -= self._entries.pop(key)[1]
+        size = sum(surface_bytes(f) for f in frames)
+        self._entries[key] = (frames, size)
+        self.used += size
+        self._evict(keep=key)
+
+    def get_frames(self, path, num_frames, scale):
+        """
+        Ambil frames animasi (decode dari disk hanya jika belum ada di cache)
+
+        Args:
+            path: Path sprite sheet
+            num_frames: Jumlah frame dalam sheet
+            scale: float atau tuple fit (lihat fit_scale)
+
+        Returns:
+            list: Frames yang sudah di-scale (dipakai bersama, jangan dimodifikasi)
+
+        Raises:
+            pygame.error / FileNotFoundError jika sheet gagal dimuat
+        """
+        key = self.make_key(path, scale)
+        frames = self.get(key)
+        if frames is not None:
+            self.hits += 1
+            return frames
+
+        self.misses += 1
+        frames = SPRITE_PACK.load_frames(key, path)
+        if frames is None or len(frames) != num_frames:
+            sheet = pygame.image.load(path).convert_alpha()
+            frames = slice_sheet(sheet, num_frames, scale)
+        self.put(key, frames)
+        return frames
+
+    def get_mirrored(self, path, num_frames, scale):
+        """
+        Ambil frames animasi yang sudah di-flip horizontal (hadap kiri)
+
+        Dibuat sekali dari get_frames() lalu disimpan di cache dengan key
+        (karakter, animasi, scale, 'flip'), sehingga Fighter.draw() tidak
+        perlu pygame.transform.flip setiap frame.
+
+        Returns:
+            list: Frames hadap kiri (dipakai bersama, jangan dimodifikasi)
+        """
+        key = self.make_key(path, scale) + ('flip',)
+        frames = self.get(key)
+        if frames is not None:
+            self.hits += 1
+            return frames
+
+        self.misses += 1
+        frames = [pygame.transform.flip(f, True, False)
+                  for f in self.get_frames(path, num_frames, scale)]
+        self.put(key, frames)
+        return frames
+
+    def get_image(self, path, size):
+        """
+        Ambil gambar tunggal (mis. background arena) yang sudah di-resize
+
+        Args:
+            path: Path gambar
+            size: (w, h) ukuran tujuan, juga dipakai sebagai "scale" di key
+
+        Returns:
+            Surface: Gambar opaque (convert) berukuran size
+        """
+        key = self.make_key(path, size)
+        frames = self.get(key)
+        if frames is not None:
+            self.hits += 1
+            return frames[0]
+
+        self.misses += 1
+        image = pygame.transform.scale(pygame.image.load(path).convert(), size)
+        self.put(key, [image])
+        return image
+
+    def _evict(self, keep=None):
+        """Buang entry paling lama (LRU) sampai used <= budget."""
+        while self.used > self.budget:
+            # Entry yang baru disimpan tidak ikut dibuang
+            victim = next((k for k in self._entries if k != keep), None)
+            if victim is None:
+                break
+            self.used -= self._entries.pop(victim)[1]
+            self.evictions += 1
+
+    def clear(self):
+        """Kosongkan cache (counter statistik tidak di-reset)."""
+        self._entries.clear()
+        self.used = 0
+
+    def stats(self):
+        """
+        Statistik cache
+
+        Returns:
+            dict: entries, used, budget, hits, misses, evictions, hit_rate
+        """
+        total = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'used': self.used,
+            'budget': self.budget,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / total if total else 0.0,
+        }
+
+
+# === INSTANCE BERSAMA ===
+# Dipakai oleh battle_system.py dan select_character.py
+SPRITE_CACHE = SpriteCache()
@@ -0,0 +1,408 @@
+"""
+FILE: sprite_pack.py
+DESKRIPSI: Format "sprite pack" - semua frame karakter yang sudah di-scale, siap tampil,
+           dalam satu file biner ber-index yang di-memory-map saat runtime
+DIGUNAKAN OLEH: sprite_cache.py (saat cache miss, sebelum decode PNG),
+                collision_masks.py (mask collision per frame)
+MENGGUNAKAN: pygame (frombuffer/tobytes), mmap, concurrent.futures (bake paralel)
+
+ALUR PROGRAM:
+1. Offline: `python -m engine.sprite_pack` mem-bake semua sprite sheet karakter
+   - Hanya sheet yang hash isinya berubah yang di-bake ulang (incremental)
+   - Sheet yang berubah di-decode & di-scale paralel di process pool
+   - Mask collision tiap karakter battle ikut di-bake (collision_masks.py), di-bake
+     ulang jika salah satu sheet karakter atau MASK_VERSION berubah
+2. Runtime: SPRITE_PACK.load_frames(key, path) dipanggil oleh SpriteCache
+   - File pack di-mmap sekali, frame dibuat dengan pygame.image.frombuffer
+   - Tidak ada decode PNG maupun resample, hanya konversi format pixel
+3. SPRITE_PACK.load_masks(key, paths, frames) dipanggil oleh MaskCache
+4. Jika pack tidak ada / entry tidak ada / hash sumber berbeda -> None,
+   SpriteCache / MaskCache kembali ke jalur decode biasa
+
+FORMAT FILE:
+    MAGIC (8 byte)
+    data pixel RGBA semua frame (berurutan), lalu data mask (zlib, 1 byte per pixel)
+    index JSON: {"version": 2,
+                 "sheets": {key: {"hash", "frames": [[offset, w, h], ...]}},
+                 "masks": {key: {"hash", "frames": [arah][action][frame] =
+                                 [hurt, hit]; masing-masing [offset, len, x, y, w, h] / null}}}
+    footer: offset index (u64), panjang index (u32), MAGIC
+"""
+import os
+import sys
+import json
+import mmap
+import struct
+import hashlib
+import threading
+import pygame
+from concurrent.futures import ProcessPoolExecutor
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PACK_PATH = os.path.join(BASE_DIR, 'assets/cache/sprites.pack')
+PACK_VERSION = 2
+MAGIC = b'PYFPACK1'
+FOOTER = struct.Struct('<QI8s')     # index_offset, index_len, magic
+
+
+def pack_key(key):
+    """Ubah key SpriteCache (karakter, animasi, scale) menjadi string index."""
+    character, animation, scale = key
+    return f"{character}/{animation}@{scale!r}"
+
+
+def file_hash(path):
+    """Hash isi file sumber (sha1 hex) untuk deteksi perubahan."""
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def masks_hash(paths, params):
+    """Hash mask satu karakter: semua sheet sumber + MASK_VERSION + (hitbox_w, offset_y)."""
+    from engine.collision_masks import MASK_VERSION
+    digest = hashlib.sha1(repr((MASK_VERSION, tuple(params))).encode())
+    for path in paths:
+        digest.update(file_hash(path).encode())
+    return digest.hexdigest()
+
+
+def read_index(path):
+    """
+    Baca index dari file pack
+
+    Returns:
+        dict | None: Index pack, None jika file tidak ada atau rusak
+    """
+    try:
+        with open(path, 'rb') as f:
+            f.seek(-FOOTER.size, os.SEEK_END)
+            index_offset, index_len, magic = FOOTER.unpack(f.read(FOOTER.size))
+            if magic != MAGIC:
+                return None
+            f.seek(index_offset)
+            index = json.loads(f.read(index_len))
+    except (OSError, ValueError, struct.error):
+        return None
+    if index.get('version') != PACK_VERSION:
+        return None
+    return index
+
+
+class SpritePack:
+    """
+    Pembaca sprite pack (read-only, memory-mapped)
+
+    Attributes:
+        path: Lokasi file pack
+        index: Index pack (None jika pack tidak tersedia)
+        hits: Jumlah animasi yang berhasil diambil dari pack
+    """
+
+    def __init__(self, path=PACK_PATH):
+        """
+        Constructor - File belum dibuka sampai load_frames() pertama
+
+        Args:
+            path: Lokasi file pack
+        """
+        self.path = path
+        self.index = None
+        self.hits = 0
+        self._mm = None
+        self._opened = False
+        self._open_lock = threading.Lock()     # Main thread & worker prefetch
+
+    def _open(self):
+        """Buka dan mmap file pack (sekali saja, aman dari beberapa thread)."""
+        with self._open_lock:
+            if self._opened:
+                return
+            index = read_index(self.path)
+            if index is not None:
+                with open(self.path, 'rb') as f:
+                    self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self.index = index
+            self._opened = True
+
+    def load_frames(self, key, source_path, convert=True):
+        """
+        Ambil frames yang sudah di-bake untuk satu animasi
+
+        Args:
+            key: Key SpriteCache (karakter, animasi, scale)
+            source_path: Path PNG sumber (untuk cek hash)
+            convert: False untuk surface RGBA mentah tanpa akses display
+                     (worker prefetch; convert dilakukan di main thread)
+
+        Returns:
+            list | None: Frames siap tampil, None jika tidak ada / kadaluarsa
+        """
+        if not self._opened:
+            self._open()
+        if self._mm is None:
+            return None
+
+        entry = self.index['sheets'].get(pack_key(key))
+        if entry is None:
+            return None
+        try:
+            if entry['hash'] != file_hash(source_path):
+                return None     # Sumber berubah sejak bake terakhir
+        except OSError:
+            return None
+
+        view = memoryview(self._mm)
+        display_ready = convert and pygame.display.get_surface() is not None
+        frames = []
+        for offset, w, h in entry['frames']:
+            frame = pygame.image.frombuffer(view[offset:offset + w * h * 4], (w, h), 'RGBA')
+            # convert_alpha menyalin ke format display (tanpa decode/resample)
+            frames.append(frame.convert_alpha() if display_ready else frame.copy())
+        self.hits += 1
+        return frames
+
+    def load_masks(self, key, source_paths, frame_counts, params):
+        """
+        Ambil mask collision satu karakter yang sudah di-bake
+
+        Args:
+            key: Key MaskCache (karakter, 'masks', scale)
+            source_paths: Path semua sheet karakter (untuk cek hash)
+            frame_counts: Jumlah frame tiap animasi
+            params: (hitbox_w, offset_y) yang dipakai build_masks()
+
+        Returns:
+            tuple | None: (kanan, kiri) seperti build_masks(), None jika tidak ada / kadaluarsa
+        """
+        from engine.collision_masks import CollisionFrame, mask_from_bytes
+        if not self._opened:
+            self._open()
+        if self._mm is None:
+            return None
+
+        entry = self.index.get('masks', {}).get(pack_key(key))
+        if entry is None:
+            return None
+        try:
+            if entry['hash'] != masks_hash(source_paths, params):
+                return None
+        except OSError:
+            return None
+        if [len(frames) for frames in entry['frames'][0]] != list(frame_counts):
+            return None
+
+        def load(item):
+            if item is None:
+                return None, None
+            offset, length, x, y, w, h = item
+            return mask_from_bytes(self._mm[offset:offset + length], (w, h)), pygame.Rect(x, y, w, h)
+
+        self.hits += 1
+        return tuple(
+            [[CollisionFrame(*load(hurt), *load(hit)) for hurt, hit in frames] for frames in facing]
+            for facing in entry['frames']
+        )
+
+
+# === BAKE (OFFLINE) ===
+
+def default_jobs():
+    """
+    Daftar semua sheet yang perlu di-bake
+
+    Returns:
+        list: Tuple (key, path, num_frames) untuk battle dan select screen
+    """
+    # Import di sini agar runtime loader tidak bergantung pada modul screen
+    from battle.battle_system import CHARACTERS as BATTLE_CHARACTERS
+    from character.select_character import CHARACTERS as SELECT_CHARACTERS, sprite_fit
+    from engine.sprite_cache import SpriteCache
+
+    jobs = []
+    for folder, scale, _offset, files, frames in BATTLE_CHARACTERS.values():
+        for file, num_frames in zip(files, frames):
+            path = os.path.join(folder, file)
+            jobs.append((SpriteCache.make_key(path, scale), path, num_frames))
+    fit = sprite_fit()
+    for char in SELECT_CHARACTERS:
+        jobs.append((SpriteCache.make_key(char['path'], fit), char['path'], char['frames']))
+    return jobs
+
+
+def default_mask_jobs():
+    """
+    Daftar karakter battle yang mask collision-nya di-bake
+
+    Returns:
+        list: Tuple (key, folder, scale, offset, files, frames, hitbox_w)
+    """
+    from battle.characters import CHARACTERS
+    from battle.fighter_base import HITBOX_W
+    from engine.collision_masks import MaskCache
+    return [(MaskCache.make_key(folder, scale), folder, scale, offset, files, frames, HITBOX_W)
+            for folder, scale, offset, files, frames in CHARACTERS.values()]
+
+
+def _bake_sheet(job):
+    """
+    Worker process - decode, potong, dan scale satu sheet
+
+    Returns:
+        tuple: (key, hash, [(w, h, rgba_bytes), ...])
+    """
+    from engine.sprite_cache import slice_sheet
+    key, path, num_frames = job
+    sheet = pygame.image.load(path)
+    frames = slice_sheet(sheet, num_frames, key[2])
+    return key, file_hash(path), [
+        (f.get_width(), f.get_height(), pygame.image.tobytes(f, 'RGBA')) for f in frames
+    ]
+
+
+def _bake_masks(job):
+    """
+    Worker process - bangun mask collision satu karakter
+
+    Returns:
+        tuple: (key, hash, [arah][action][frame] = (hurt, hit)), hurt / hit =
+               (x, y, w, h, bytes) atau None
+    """
+    from engine.collision_masks import build_masks, load_animations, mask_to_bytes
+    key, folder, scale, offset, files, frames, hitbox_w = job
+    masks = build_masks(load_animations(folder, scale, files, frames), hitbox_w, offset[1])
+
+    def dump(mask, rect):
+        return None if mask is None else (*rect, mask_to_bytes(mask))
+
+    paths = [os.path.join(folder, f) for f in files]
+    return key, masks_hash(paths, (hitbox_w, offset[1])), [
+        [[(dump(f.hurt, f.hurt_rect), dump(f.hit, f.hit_rect)) for f in anim] for anim in facing]
+        for facing in masks
+    ]
+
+
+def bake(path=PACK_PATH, jobs=None, workers=None, force=False, mask_jobs=None):
+    """
+    Bake sprite pack secara incremental dan paralel
+
+    Args:
+        path: Lokasi file pack output
+        jobs: Daftar (key, path, num_frames), default semua karakter
+        workers: Jumlah process (default: jumlah core)
+        force: True untuk bake ulang semua sheet
+        mask_jobs: Daftar (key, folder, scale, offset, files, frames, hitbox_w),
+                   default semua karakter battle
+
+    Returns:
+        dict: Statistik {'sheets', 'baked', 'reused', 'masks', 'masks_baked', 'bytes'}
+    """
+    jobs = default_jobs() if jobs is None else jobs
+    mask_jobs = default_mask_jobs() if mask_jobs is None else mask_jobs
+    old_index = None if force else read_index(path)
+    old_sheets = old_index['sheets'] if old_index else {}
+    old_masks = old_index.get('masks', {}) if old_index else {}
+
+    # === PISAHKAN SHEET YANG MASIH VALID DAN YANG PERLU DI-BAKE ===
+    reused, todo = {}, []
+    for job in jobs:
+        key, src, num_frames = job
+        old = old_sheets.get(pack_key(key))
+        if old and len(old['frames']) == num_frames and old['hash'] == file_hash(src):
+            reused[pack_key(key)] = old
+        else:
+            todo.append(job)
+
+    reused_masks, mask_todo = {}, []
+    for job in mask_jobs:
+        key, folder, _scale, offset, files, _frames, hitbox_w = job
+        old = old_masks.get(pack_key(key))
+        paths = [os.path.join(folder, f) for f in files]
+        if old and old['hash'] == masks_hash(paths, (hitbox_w, offset[1])):
+            reused_masks[pack_key(key)] = old
+        else:
+            mask_todo.append(job)
+
+    baked, baked_masks = {}, {}
+    if todo or mask_todo:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for key, digest, frames in pool.map(_bake_sheet, todo):
+                baked[pack_key(key)] = (digest, frames)
+            for key, digest, frames in pool.map(_bake_masks, mask_todo):
+                baked_masks[pack_key(key)] = (digest, frames)
+
+    # === TULIS PACK BARU (tmp lalu replace agar atomic) ===
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    old_file = open(path, 'rb') if reused or reused_masks else None
+    sheets, masks = {}, {}
+    try:
+        with open(tmp_path, 'wb') as out:
+            out.write(MAGIC)
+            for job in jobs:
+                name = pack_key(job[0])
+                entries = []
+                if name in reused:
+                    old = reused[name]
+                    for offset, w, h in old['frames']:
+                        old_file.seek(offset)
+                        entries.append([out.tell(), w, h])
+                        out.write(old_file.read(w * h * 4))
+                    sheets[name] = {'hash': old['hash'], 'frames': entries}
+                else:
+                    digest, frames = baked[name]
+                    for w, h, data in frames:
+                        entries.append([out.tell(), w, h])
+                        out.write(data)
+                    sheets[name] = {'hash': digest, 'frames': entries}
+
+            # === MASK COLLISION ===
+            def write_mask(item, reuse):
+                if item is None:
+                    return None
+                if reuse:
+                    offset, length, x, y, w, h = item
+                    old_file.seek(offset)
+                    data = old_file.read(length)
+                else:
+                    x, y, w, h, data = item
+                entry = [out.tell(), len(data), x, y, w, h]
+                out.write(data)
+                return entry
+
+            for job in mask_jobs:
+                name = pack_key(job[0])
+                reuse = name in reused_masks
+                digest, frames = ((reused_masks[name]['hash'], reused_masks[name]['frames'])
+                                  if reuse else baked_masks[name])
+                masks[name] = {'hash': digest, 'frames': [
+                    [[[write_mask(hurt, reuse), write_mask(hit, reuse)] for hurt, hit in anim]
+                     for anim in facing]
+                    for facing in frames
+                ]}
+
+            index_offset = out.tell()
+            index = json.dumps({'version': PACK_VERSION, 'sheets': sheets,
+                                'masks': masks}).encode()
+            out.write(index)
+            out.write(FOOTER.pack(index_offset, len(index), MAGIC))
+            size = out.tell()
+    finally:
+        if old_file:
+            old_file.close()
+    os.replace(tmp_path, path)
+
+    return {'sheets': len(jobs), 'baked': len(todo), 'reused': len(reused),
+            'masks': len(mask_jobs), 'masks_baked': len(mask_todo), 'bytes': size}
+
+
+# === INSTANCE BERSAMA ===
+SPRITE_PACK = SpritePack()
+
+
+# === ENTRY POINT (bake offline) ===
+if __name__ == "__main__":
+    result = bake(force='--force' in sys.argv)
+    print(f"Sprite pack: {result['sheets']} sheet, {result['baked']} di-bake, "
+          f"{result['reused']} dipakai ulang, mask {result['masks']} karakter "
+          f"({result['masks_baked']} di-bake), {result['bytes'] / 1024 / 1024:.1f} MB -> {PACK_PATH}")
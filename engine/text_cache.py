@@ -0,0 +1,129 @@
+"""
+FILE: text_cache.py
+DESKRIPSI: Registry font dan cache hasil render teks, dipakai bersama oleh semua screen
+DIGUNAKAN OLEH: battle_system.py, mode_selection.py, select_character.py, select_arena.py
+MENGGUNAKAN: pygame.font
+
+ALUR PROGRAM:
+1. get_font(size) membuka pygame.font.Font(None, size) sekali per ukuran
+2. render_text(text, size, color) mengembalikan Surface teks dari cache
+   - Key cache = (text, size, color, antialias)
+   - Miss: teks di-render sekali lalu disimpan (LRU, jumlah entry dibatasi)
+3. Label statis jadi cukup satu blit per frame (tanpa buka font / rasterisasi)
+
+CATATAN:
+    Surface hasil render_text dipakai bersama - jangan dimodifikasi.
+    Untuk teks dengan alpha berubah-ubah gunakan blit_alpha().
+"""
+import pygame
+from collections import OrderedDict
+
+
+MAX_TEXT_ENTRIES = 256      # Batas jumlah surface teks di cache
+
+_fonts = {}                 # size -> pygame.font.Font
+
+
+def get_font(size):
+    """
+    Ambil font default ukuran tertentu (dibuka sekali saja)
+
+    Args:
+        size: Ukuran font
+
+    Returns:
+        pygame.font.Font
+    """
+    font = _fonts.get(size)
+    if font is None:
+        font = _fonts[size] = pygame.font.Font(None, size)
+    return font
+
+
+class TextCache:
+    """
+    Cache LRU untuk surface teks hasil render
+
+    Attributes:
+        max_entries: Batas jumlah entry
+        hits, misses: Counter statistik
+    """
+
+    def __init__(self, max_entries=MAX_TEXT_ENTRIES):
+        """
+        Constructor - Setup cache kosong
+
+        Args:
+            max_entries: Batas jumlah surface teks yang disimpan
+        """
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()   # (text, size, color, antialias) -> Surface
+
+    def render(self, text, size, color, antialias=True):
+        """
+        Render teks (atau ambil dari cache)
+
+        Args:
+            text: String teks
+            size: Ukuran font
+            color: Warna (tuple RGB / RGBA)
+            antialias: Antialias font
+
+        Returns:
+            Surface: Hasil render (dipakai bersama, jangan dimodifikasi)
+        """
+        key = (text, size, tuple(color), antialias)
+        surf = self._entries.get(key)
+        if surf is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return surf
+
+        self.misses += 1
+        surf = get_font(size).render(text, antialias, color)
+        self._entries[key] = surf
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)   # Buang yang paling lama
+        return surf
+
+    def stats(self):
+        """
+        Statistik cache
+
+        Returns:
+            dict: entries, fonts, hits, misses, hit_rate
+        """
+        total = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'fonts': len(_fonts),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+        }
+
+
+# === INSTANCE BERSAMA ===
+TEXT_CACHE = TextCache()
+
+
+def render_text(text, size, color, antialias=True):
+    """Shortcut TEXT_CACHE.render() - lihat TextCache.render."""
+    return TEXT_CACHE.render(text, size, color, antialias)
+
+
+def blit_alpha(target, source, dest, alpha):
+    """
+    Blit surface cache dengan alpha sementara (surface asli tidak berubah)
+
+    Args:
+        target: Surface tujuan
+        source: Surface dari render_text()
+        dest: Posisi / Rect tujuan
+        alpha: Alpha 0-255 untuk blit ini saja
+    """
+    source.set_alpha(alpha)
+    target.blit(source, dest)
+    source.set_alpha(None)